@@ -145,6 +145,34 @@ def resolve_final_url(url: str, *, hdrs=headers, max_hops: int = 6) -> str:
         return current
     return current        # give up after max_hops
 
+def check_wanted_after_watch_empty():
+    """Wait for the WATCH folder to empty after a download, then check wanted issues."""
+    try:
+        watch_dir = config.get("SETTINGS", "WATCH", fallback="/temp")
+        ignored_exts = config.get("SETTINGS", "IGNORED_EXTENSIONS", fallback=".crdownload")
+        ignored = set(ext.strip().lower() for ext in ignored_exts.split(",") if ext.strip())
+
+        # Poll for up to 5 minutes (30 checks * 10 seconds)
+        for _ in range(30):
+            time.sleep(10)
+            total = 0
+            for root, _, files in os.walk(watch_dir):
+                for f in files:
+                    if f.startswith('.') or f.startswith('_'):
+                        continue
+                    if any(f.lower().endswith(ext) for ext in ignored):
+                        continue
+                    total += 1
+            if total == 0:
+                monitor_logger.info("WATCH folder empty, checking wanted issues")
+                from app import process_incoming_wanted_issues
+                process_incoming_wanted_issues()
+                return
+        monitor_logger.warning("Timeout waiting for WATCH folder to empty")
+    except Exception as e:
+        monitor_logger.error(f"Error checking wanted issues: {e}")
+
+
 # -------------------------------
 # QUEUE AND WORKER THREAD SETUP (for non-scrape downloads)
 # -------------------------------
@@ -237,35 +265,10 @@ def process_download(task):
                 except Exception as e:
                     monitor_logger.error(f"Error updating weekly pack status to completed: {e}")
 
-            # Wait for WATCH folder to be empty, then check wanted issues
-            def check_wanted_after_watch_empty():
-                try:
-                    watch_dir = config.get("SETTINGS", "WATCH", fallback="/temp")
-                    ignored_exts = config.get("SETTINGS", "IGNORED_EXTENSIONS", fallback=".crdownload")
-                    ignored = set(ext.strip().lower() for ext in ignored_exts.split(",") if ext.strip())
-
-                    # Poll for up to 5 minutes (30 checks * 10 seconds)
-                    for _ in range(30):
-                        time.sleep(10)
-                        total = 0
-                        for root, _, files in os.walk(watch_dir):
-                            for f in files:
-                                if f.startswith('.') or f.startswith('_'):
-                                    continue
-                                if any(f.lower().endswith(ext) for ext in ignored):
-                                    continue
-                                total += 1
-                        if total == 0:
-                            monitor_logger.info("WATCH folder empty, checking wanted issues")
-                            from app import process_incoming_wanted_issues
-                            process_incoming_wanted_issues()
-                            return
-                    monitor_logger.warning("Timeout waiting for WATCH folder to empty")
-                except Exception as e:
-                    monitor_logger.error(f"Error checking wanted issues: {e}")
-
-            # Run in background thread to not block
-            threading.Thread(target=check_wanted_after_watch_empty, daemon=True).start()
+            # Wait for WATCH folder to be empty, then check wanted issues; one
+            # waiting job covers every download that finishes meanwhile
+            from job_queue import enqueue_job
+            enqueue_job('wanted_incoming', concurrency_key='wanted_incoming')
             return  # Download succeeded, exit the function
 
         except Exception as e:
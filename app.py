@@ -22,7 +22,7 @@ try:
     import pwd
 except ImportError:
     pwd = None
-from functools import lru_cache
+from functools import lru_cache, partial
 import hashlib
 import re
 import xml.etree.ElementTree as ET
@@ -47,23 +47,23 @@ from models import gcd
 from models import metron
 from config import config, load_flask_config, write_config, load_config
 from cbz_ops.edit import get_edit_modal, save_cbz, cropCenter, cropLeft, cropRight, cropFreeForm, get_image_data_url, modal_body_template
-from memory_utils import initialize_memory_management, cleanup_on_exit, memory_context, get_global_monitor
+from memory_utils import initialize_memory_management, cleanup_on_exit
 from app_logging import app_logger, APP_LOG, MONITOR_LOG
 from helpers import is_hidden
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from collections import OrderedDict
 from version import __version__
 import requests
 from packaging import version as pkg_version
-from database import (init_db, get_db_connection, get_recent_files, log_recent_file, invalidate_browse_cache,
-                      get_file_index_from_db, save_file_index_to_db, update_file_index_entry,
+from database import (init_db, get_db_connection, get_db_pool_stats, get_recent_files, log_recent_file, invalidate_browse_cache,
+                      get_job, get_file_index_from_db, save_file_index_to_db, update_file_index_entry,
                       add_file_index_entry, delete_file_index_entry, clear_file_index_from_db,
+                      move_file_index_entry,
                       sync_file_index_incremental, search_file_index,
                       get_rebuild_schedule, save_rebuild_schedule as db_save_rebuild_schedule, update_last_rebuild,
                       get_sync_schedule, save_sync_schedule as db_save_sync_schedule, update_last_sync,
                       get_path_counts_batch, get_directory_children, clear_stats_cache,
                       clear_stats_cache_keys, mark_issue_read, get_issues_read, get_recent_read_issues,
-                      save_issues_bulk, get_issues_for_series, update_series_sync_time, get_wanted_issues,
+                      get_issues_for_series, get_wanted_issues,
                       delete_issues_for_series, get_series_needing_sync, get_all_mapped_series, get_series_by_id,
                       get_continue_reading_items, get_provider_credentials)
 import recommendations
@@ -74,6 +74,18 @@ from models.timeline import get_reading_timeline
 # Add URL encoding support for template filters
 from urllib.parse import quote_plus
 from file_watcher import FileWatcher
+from file_scanner import ScanReport, iter_file_index_entries, get_last_scan_report, get_active_scan_report
+from directory_cache import directory_cache, list_directory, invalidate_directory_listings, get_directory_cache_stats
+from archive_toc import get_archive_kind, get_archive_toc, read_archive_page, get_archive_toc_stats
+from page_cache import get_page_etag, get_reader_page, prefetch_reader_pages, get_page_cache_stats
+from page_renditions import parse_rendition_args, get_page_rendition, get_rendition_cache_stats
+from thumbnail_pipeline import (PRIORITY_VISIBLE, get_thumbnail_cache_path, render_thumbnail, queue_thumbnail,
+                                is_thumbnail_queued, stop_thumbnail_pipeline, get_thumbnail_pipeline_stats)
+from job_queue import (DIRECTORY_JOB_TYPES, JOB_CANCELLED, JOB_COMPLETED, JOB_FAILED, JOB_QUEUED, directory_job_key,
+                       enqueue_job, start_job_queue, stop_job_queue)
+from models.providers.cache import start_provider_cache_sweeper, stop_provider_cache_sweeper
+from db_writer import (start_db_writer, stop_db_writer, flush_db_writes,
+                       queue_thumbnail_status, queue_reading_position)
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 
@@ -169,6 +181,8 @@ from routes.collection import collection_bp
 app.register_blueprint(collection_bp)
 from routes.metadata import metadata_bp
 app.register_blueprint(metadata_bp)
+from routes.jobs import jobs_bp
+app.register_blueprint(jobs_bp)
 
 # Start unified scheduler
 app_state.scheduler.start()
@@ -177,54 +191,11 @@ app_logger.info("📅 Unified scheduler initialized")
 # Function to perform scheduled file index rebuild
 def scheduled_file_index_rebuild():
     """Rebuild the file index on schedule using incremental sync."""
-    global index_built
-
     try:
         app_logger.info("🔄 Starting scheduled file index sync...")
         start_time = time.time()
 
-        # Scan filesystem to get current state
-        app_logger.info("Scanning filesystem...")
-        filesystem_entries = scan_filesystem_for_sync()
-        scan_time = time.time() - start_time
-        app_logger.info(f"Filesystem scan completed: {len(filesystem_entries)} entries in {scan_time:.2f}s")
-
-        # Incremental sync (preserves metadata for existing files)
-        app_logger.info("Performing incremental sync...")
-        sync_result = sync_file_index_incremental(filesystem_entries)
-        app_logger.info(f"Sync result: {sync_result['added']} added, {sync_result['removed']} removed, {sync_result['unchanged']} unchanged")
-
-        # Queue only NEW files for metadata scanning
-        if sync_result['added'] > 0:
-            from metadata_scanner import queue_files_for_scan, PRIORITY_NEW_FILE
-            new_cbz_paths = [p for p in sync_result['new_paths'] if p.lower().endswith('.cbz')]
-            if new_cbz_paths:
-                queue_files_for_scan(new_cbz_paths, PRIORITY_NEW_FILE)
-                app_logger.info(f"Queued {len(new_cbz_paths)} new CBZ files for metadata scanning")
-
-        # Also queue any other files that still need metadata scanning
-        # (e.g., previously added files that were never scanned)
-        from metadata_scanner import queue_pending_files
-        queued = queue_pending_files()
-        if queued:
-            app_logger.info(f"Queued {queued} additional files for metadata scanning")
-
-        # Refresh in-memory index from DB
-        file_index.clear()
-        db_index = get_file_index_from_db()
-        if db_index:
-            file_index.extend(db_index)
-        index_built = True
-
-        # Update last rebuild timestamp
-        update_last_rebuild()
-
-        # Clear and pre-populate stats cache
-        clear_stats_cache()
-        get_library_stats()
-        get_file_type_distribution()
-        get_top_publishers()
-        get_reading_history_stats()
+        sync_file_index_from_filesystem('scheduled sync')
 
         elapsed = time.time() - start_time
         app_logger.info(f"✅ Scheduled file index sync completed in {elapsed:.2f}s")
@@ -347,50 +318,20 @@ def scheduled_series_sync():
             update_last_sync()
             return
 
-        success_count = 0
-        fail_count = 0
-
-        for series in series_list:
-            series_id = series['id']
-            try:
-                # Fetch series info from API
-                series_info = api.series(series_id)
-                if not series_info:
-                    fail_count += 1
-                    continue
-
-                # Fetch all issues
-                all_issues_result = metron.get_all_issues_for_series(api, series_id)
-                all_issues = list(all_issues_result) if all_issues_result else []
-
-                # Save issues (INSERT OR REPLACE handles updates)
-                save_issues_bulk(all_issues, series_id)
-
-                # Clean up issues that no longer exist in API response
-                if all_issues:
-                    from database import cleanup_stale_issues
-                    api_issue_ids = {i.id if hasattr(i, 'id') else i.get('id') for i in all_issues}
-                    cleanup_stale_issues(series_id, api_issue_ids)
-
-                update_series_sync_time(series_id, len(all_issues))
-
-                success_count += 1
-                app_logger.debug(f"Synced series {series_id}: {len(all_issues)} issues")
-
-            except Exception as e:
-                if metron.is_connection_error(e):
-                    app_logger.warning(f"Metron unavailable while syncing series {series_id}: {e}")
-                else:
-                    app_logger.error(f"Error syncing series {series_id}: {e}")
-                fail_count += 1
+        # Delta sync: only issues modified since each series' last sync
+        from sync import sync_series_batch
+        results = sync_series_batch(api, series_list)
+        success_count = sum(1 for r in results if r['success'])
+        fail_count = len(results) - success_count
+        synced_ids = [r['series_id'] for r in results if r['changed']]
 
         # Update last sync timestamp
         update_last_sync()
 
-        # Clear entire wanted cache since issues may have changed for multiple series
-        from database import clear_wanted_cache_all
-        clear_wanted_cache_all()
-        app_logger.info("Cleared wanted cache after scheduled sync")
+        # Recompute the wanted issues of the synced series; the rest of the
+        # cache stays readable meanwhile
+        from wanted_cache import mark_series_dirty
+        mark_series_dirty(synced_ids, 'sync')
 
         elapsed = time.time() - start_time
         app_logger.info(f"✅ Scheduled series sync completed in {elapsed:.2f}s ({success_count} synced, {fail_count} failed)")
@@ -655,11 +596,12 @@ def process_incoming_wanted_issues():
 
         # Invalidate collection status cache for affected series
         # This ensures the wanted list is updated to remove matched issues
-        from database import invalidate_collection_status_for_series, clear_wanted_cache_for_series
+        from database import invalidate_collection_status_for_series
+        from wanted_cache import mark_series_dirty
         for series_id in affected_series:
             invalidate_collection_status_for_series(series_id)
-            clear_wanted_cache_for_series(series_id)
-            app_logger.info(f"Invalidated collection and wanted cache for series {series_id}")
+            app_logger.info(f"Invalidated collection cache for series {series_id}")
+        mark_series_dirty(affected_series, 'incoming')
     else:
         app_logger.info("No wanted issues matched files in TARGET folder")
 
@@ -1025,7 +967,7 @@ def schedule_weekly_packs_retry():
         trigger = DateTrigger(run_date=run_time)
 
         app_state.scheduler.add_job(
-            scheduled_weekly_packs_download,
+            queue_job_callback('weekly_packs_download'),
             trigger=trigger,
             id='weekly_packs_retry',
             name='Weekly Packs Retry',
@@ -1264,33 +1206,28 @@ def run_komga_sync():
     }
 
 
-def scheduled_komga_sync():
-    """Run Komga reading sync on schedule."""
-    try:
-        app_logger.info("🔄 Starting scheduled Komga reading sync...")
-        run_komga_sync()
-    except Exception as e:
-        app_logger.error(f"❌ Scheduled Komga sync failed: {e}")
-
-
 def configure_komga_sync_schedule():
     """Configure the Komga sync schedule based on database settings."""
     configure_schedule('komga')
 
 
-# Populate job registry now that all callback functions are defined
+def queue_job_callback(job_type):
+    """Scheduler callback that queues a job (one at a time per type) instead of running it inline."""
+    return partial(enqueue_job, job_type, concurrency_key=job_type)
+
+
+# Populate job registry now that all callback functions are defined.
+# Scheduled runs go through the job queue, so a scheduled run and a manual
+# "run now" of the same job never overlap.
 SCHEDULE_JOBS.update({
-    'rebuild': {'callback': scheduled_file_index_rebuild, 'job_id': 'file_index_rebuild', 'label': 'File Index Rebuild'},
-    'sync': {'callback': scheduled_series_sync, 'job_id': 'series_sync', 'label': 'Series Sync'},
-    'getcomics': {'callback': scheduled_getcomics_download, 'job_id': 'getcomics_download', 'label': 'GetComics Auto-Download'},
-    'weekly_packs': {'callback': scheduled_weekly_packs_download, 'job_id': 'weekly_packs_download', 'label': 'Weekly Packs Download'},
-    'komga': {'callback': scheduled_komga_sync, 'job_id': 'komga_sync', 'label': 'Komga Reading Sync'},
+    'rebuild': {'callback': queue_job_callback('file_index_sync'), 'job_id': 'file_index_rebuild', 'label': 'File Index Rebuild'},
+    'sync': {'callback': queue_job_callback('series_sync'), 'job_id': 'series_sync', 'label': 'Series Sync'},
+    'getcomics': {'callback': queue_job_callback('getcomics_download'), 'job_id': 'getcomics_download', 'label': 'GetComics Auto-Download'},
+    'weekly_packs': {'callback': queue_job_callback('weekly_packs_download'), 'job_id': 'weekly_packs_download', 'label': 'Weekly Packs Download'},
+    'komga': {'callback': queue_job_callback('komga_sync'), 'job_id': 'komga_sync', 'label': 'Komga Reading Sync'},
 })
 
 
-# Thread pool for thumbnail generation
-thumbnail_executor = ThreadPoolExecutor(max_workers=2)
-
 def scan_library_task():
     """Background task to scan library for new/changed files and generate thumbnails."""
     app_logger.info("Starting background library scan for thumbnails...")
@@ -1338,6 +1275,9 @@ def scan_library_task():
                                 # stored_mtime might be None if migrated
                                 if stored_mtime is None or current_mtime > stored_mtime:
                                     should_process = True
+                                elif status == 'skipped' and get_archive_kind(full_path):
+                                    # Skipped before CBR/RAR covers were supported
+                                    should_process = True
                                 elif status == 'error':
                                     # Optional: Retry errors? Let's skip for now to avoid loops,
                                     # or maybe retry once per startup?
@@ -1345,24 +1285,11 @@ def scan_library_task():
                                     pass
 
                             if should_process:
-                                # Update DB to mark as pending/processing and update mtime
-                                conn.execute("""
-                                    INSERT INTO thumbnail_jobs (path, status, file_mtime, updated_at)
-                                    VALUES (?, 'processing', ?, CURRENT_TIMESTAMP)
-                                    ON CONFLICT(path) DO UPDATE SET
-                                        status='processing',
-                                        file_mtime=excluded.file_mtime,
-                                        updated_at=CURRENT_TIMESTAMP
-                                """, (full_path, current_mtime))
-
-                                # Queue the job
-                                path_hash = hashlib.md5(full_path.encode('utf-8'), usedforsecurity=False).hexdigest()
-                                shard_dir = path_hash[:2]
-                                filename = f"{path_hash}.jpg"
-                                thumbnails_dir = os.path.join(config.get("SETTINGS", "CACHE_DIR", fallback="/cache"), "thumbnails")
-                                cache_path = os.path.join(thumbnails_dir, shard_dir, filename)
-
-                                thumbnail_executor.submit(generate_thumbnail_task, full_path, cache_path)
+                                # Mark as pending/processing and update mtime
+                                queue_thumbnail_status(full_path, 'processing', current_mtime)
+
+                                # Background priority: covers requested on screen go first
+                                queue_thumbnail(full_path)
                                 count_queued += 1
                             else:
                                 count_skipped += 1
@@ -1370,9 +1297,6 @@ def scan_library_task():
                         except OSError as e:
                             app_logger.error(f"Error accessing file {full_path}: {e}")
 
-                # Commit batches or at end? At end is fine for single thread scan
-                conn.commit()
-            
         app_logger.info(f"Library scan complete. Queued {count_queued} thumbnails, skipped {count_skipped}.")
         
     except Exception as e:
@@ -1382,91 +1306,55 @@ def scan_library_task():
 
 # Start background scanner
 def start_background_scanner():
-    # Delay slightly to let app startup finish
-    def run():
-        time.sleep(5) 
-        scan_library_task()
-    
-    thread = threading.Thread(target=run, daemon=True)
-    thread.start()
-
-start_background_scanner()
+    enqueue_job('thumbnail_scan', concurrency_key='thumbnail_scan')
 
-def refresh_wanted_cache_background():
+def refresh_wanted_cache_background(full=True):
     """
-    Rebuild wanted issues cache for all mapped series.
-    This runs in a background thread and does the heavy file I/O work.
+    Refresh the wanted issues cache (see wanted_cache.py).
+    This runs as a background job and does the heavy file I/O work.
+
+    Args:
+        full: Recompute every mapped series; False only recomputes the
+              series marked dirty since the last refresh
     """
     with app_state.wanted_refresh_lock:
         if app_state.wanted_refresh_in_progress:
+            # The running refresh checks the dirty set again before it finishes
             app_logger.info("Wanted refresh already in progress, skipping")
             return
         app_state.wanted_refresh_in_progress = True
 
+    released = False
     try:
-        from database import (get_all_mapped_series, get_issues_for_series,
-                             save_wanted_issues_for_series, clear_wanted_cache_all,
-                             get_manual_status_for_series)
-
-        app_logger.info("Starting wanted issues cache refresh...")
-        start_time = time.time()
-
-        # Clear existing cache
-        clear_wanted_cache_all()
-
-        # Get all mapped series
-        mapped_series = get_all_mapped_series()
-        total_wanted = 0
-
-        for series in mapped_series:
-            series_id = series['id']
-            series_name = series.get('name', '')
-            series_volume = series.get('volume')
-            mapped_path = series.get('mapped_path')
-
-            if not mapped_path or not os.path.exists(mapped_path):
-                continue
-
-            # Get cached issues for this series
-            issues = get_issues_for_series(series_id)
-            if not issues:
-                continue
-
-            # Convert issues to objects for matching function
-            from models.issue import IssueObj, SeriesObj
-            issue_objs = [IssueObj(i) for i in issues]
-            series_obj = SeriesObj(series)
+        from database import get_wanted_dirty_series
+        from wanted_cache import refresh_wanted_cache
 
-            # Check which issues are in collection
-            issue_status = match_issues_to_collection(mapped_path, issue_objs, series_obj)
+        while not released:
+            app_logger.info(f"Starting {'full' if full else 'incremental'} wanted issues cache refresh...")
+            start_time = time.time()
 
-            # Get manual status for this series (owned/skipped)
-            manual_status = get_manual_status_for_series(series_id)
+            result = refresh_wanted_cache(full=full)
 
-            # Find missing/wanted issues (exclude found and manually marked)
-            wanted_list = []
-            for issue in issues:
-                issue_num = str(issue.get('number', ''))
-                status = issue_status.get(issue_num, {})
-                has_manual = issue_num in manual_status
-
-                if not status.get('found') and not has_manual:
-                    wanted_list.append(issue)
+            elapsed = time.time() - start_time
+            app_logger.info(f"Wanted issues cache refresh complete: {result['wanted']} issues "
+                            f"in {result['series']} series in {elapsed:.2f}s")
 
-            # Save to cache
-            if wanted_list:
-                save_wanted_issues_for_series(series_id, series_name, series_volume, wanted_list)
-                total_wanted += len(wanted_list)
-
-        elapsed = time.time() - start_time
-        app_logger.info(f"Wanted issues cache refresh complete: {total_wanted} issues in {elapsed:.2f}s")
+            # A refresh requested meanwhile was skipped above; run again for
+            # series marked after this one last read the dirty set
+            with app_state.wanted_refresh_lock:
+                if not get_wanted_dirty_series():
+                    app_state.wanted_refresh_in_progress = False
+                    app_state.wanted_last_refresh_time = time.time()
+                    released = True
+            full = False
 
     except Exception as e:
         app_logger.error(f"Error during wanted issues cache refresh: {e}")
     finally:
-        with app_state.wanted_refresh_lock:
-            app_state.wanted_refresh_in_progress = False
-            app_state.wanted_last_refresh_time = time.time()
+        if not released:
+            with app_state.wanted_refresh_lock:
+                app_state.wanted_refresh_in_progress = False
+                app_state.wanted_last_refresh_time = time.time()
 
 
 # Moved to helpers/collection.py - re-exported for backward compatibility
@@ -1601,184 +1489,19 @@ from helpers.library import is_critical_path, get_critical_path_error_message
 #     Cache System      #
 #########################
 
-# Global cache for directory listings with thread safety
-cache_lock = threading.RLock()
-directory_cache = OrderedDict()  # Use OrderedDict for LRU behavior
-cache_timestamps = {}
-cache_stats = {
-    'hits': 0,
-    'misses': 0,
-    'evictions': 0,
-    'invalidations': 0
-}
-CACHE_DURATION = 5  # Cache for 5 seconds
-MAX_CACHE_SIZE = 500  # Increased maximum number of cached directories
+# Directory listings live in directory_cache.py; invalidated by the file
+# watcher and the index/file operations below rather than expiring
 CACHE_REBUILD_INTERVAL = 6 * 60 * 60  # 6 hours in seconds
 last_cache_rebuild = time.time()
 last_cache_invalidation = None  # Track when cache was last invalidated
 
-def get_directory_hash(path):
-    """Generate a more robust hash for directory contents to detect changes."""
-    try:
-        stat = os.stat(path)
-        # Include inode and creation time for better change detection
-        inode = getattr(stat, 'st_ino', 0)
-        ctime = getattr(stat, 'st_ctime', 0)
-        # Use modification time, size, inode, and creation time
-        return f"{stat.st_mtime}_{stat.st_size}_{inode}_{ctime}"
-    except Exception as e:
-        app_logger.debug(f"Error generating hash for {path}: {e}")
-        return "error"
-
-def is_cache_valid(cache_key):
-    """Check if cached data is still valid with thread safety."""
-    with cache_lock:
-        if cache_key not in cache_timestamps:
-            app_logger.debug(f"Cache key not found in timestamps: {cache_key}")
-            return False
-
-        # Check if cache has expired
-        age = time.time() - cache_timestamps[cache_key]
-        if age > CACHE_DURATION:
-            app_logger.debug(f"Cache expired for {cache_key} (age: {age:.1f}s > {CACHE_DURATION}s)")
-            return False
-
-        # For browse: cache, just use TTL validation (no hash check)
-        # The hash changes on directory access which causes false invalidations
-        # We have automatic invalidation on file operations, so TTL is sufficient
-        if cache_key.startswith("browse:"):
-            app_logger.debug(f"Browse cache valid for {cache_key} (age: {age:.1f}s)")
-            return True
-
-        # For regular directory listings, still use hash validation
-        actual_path = cache_key
-        current_hash = get_directory_hash(actual_path)
-        cached_data = directory_cache.get(cache_key, {})
-        cached_hash = cached_data.get('hash') if isinstance(cached_data, dict) else None
-
-        if current_hash != cached_hash:
-            app_logger.debug(f"Hash mismatch for {cache_key}: current={current_hash}, cached={cached_hash}")
-            return False
-
-        return True
-
-def cleanup_cache():
-    """Remove expired entries from cache with improved LRU management."""
-    with cache_lock:
-        current_time = time.time()
-        expired_paths = [
-            path for path, timestamp in cache_timestamps.items()
-            if current_time - timestamp > CACHE_DURATION
-        ]
-
-        for path in expired_paths:
-            if path in directory_cache:
-                directory_cache.pop(path, None)
-                cache_timestamps.pop(path, None)
-                cache_stats['evictions'] += 1
-
-        # Enforce size limit with LRU eviction
-        while len(directory_cache) > MAX_CACHE_SIZE:
-            # Remove oldest item (first in OrderedDict)
-            oldest_path = next(iter(directory_cache))
-            directory_cache.pop(oldest_path, None)
-            cache_timestamps.pop(oldest_path, None)
-            cache_stats['evictions'] += 1
-
 
 def get_directory_listing(path):
-    """Get directory listing with optimized file system operations, caching, and memory awareness."""
+    """Get a folder's subfolders and files through the directory cache."""
     try:
-        # Check if we have valid cached data
-        if is_cache_valid(path):
-            with cache_lock:
-                cached_data = directory_cache.get(path)
-                if cached_data:
-                    cache_stats['hits'] += 1
-                    app_logger.debug(f"Cache HIT for directory: {path}")
-                    # Move to end for LRU
-                    directory_cache.move_to_end(path)
-                    return cached_data
-
-        # Cache miss - need to read from filesystem
-        cache_stats['misses'] += 1
-        app_logger.debug(f"Cache MISS for directory: {path}")
-
-        # Check memory before operation and adjust cache size if needed
-        monitor = get_global_monitor()
-        memory_usage = monitor.get_memory_usage()
-
-        # Reduce cache size if memory is high
-        if memory_usage > 800:  # 800MB threshold
-            with cache_lock:
-                target_size = max(50, MAX_CACHE_SIZE // 2)
-                while len(directory_cache) > target_size:
-                    oldest_path = next(iter(directory_cache))
-                    directory_cache.pop(oldest_path, None)
-                    cache_timestamps.pop(oldest_path, None)
-                    cache_stats['evictions'] += 1
-
-        with memory_context("list_directories"):
-            entries = os.listdir(path)
-
-            # Single pass to categorize entries
-            directories = []
-            files = []
-            excluded_extensions = {".png", ".jpg", ".jpeg", ".gif", ".html", ".css", ".ds_store", ".json", ".db"}
-            excluded_files = {"cvinfo"}
-            allowed_files = {"missing.txt"}
-
-            for entry in entries:
-                if entry.startswith(('.', '_')):
-                    continue
-
-                full_path = os.path.join(path, entry)
-                try:
-                    stat = os.stat(full_path)
-                    if stat.st_mode & 0o40000:  # Directory
-                        directories.append(entry)
-                    else:  # File
-                        # Check if file should be excluded (but allow specific files like missing.txt)
-                        if entry.lower() in excluded_files:
-                            continue
-                        if entry.lower() in allowed_files or not any(entry.lower().endswith(ext) for ext in excluded_extensions):
-                            files.append({
-                                "name": entry,
-                                "size": stat.st_size
-                            })
-                except (OSError, IOError):
-                    # Skip files we can't access
-                    continue
-
-            # Sort both lists
-            directories.sort(key=lambda s: s.lower())
-            files.sort(key=lambda f: f["name"].lower())
-
-            result = {
-                "directories": directories,
-                "files": files,
-                "hash": get_directory_hash(path)
-            }
-
-            # Store in cache
-            with cache_lock:
-                directory_cache[path] = result
-                cache_timestamps[path] = time.time()
-                # Move to end for LRU
-                directory_cache.move_to_end(path)
-
-                # Enforce cache size limit
-                while len(directory_cache) > MAX_CACHE_SIZE:
-                    oldest_path = next(iter(directory_cache))
-                    directory_cache.pop(oldest_path, None)
-                    cache_timestamps.pop(oldest_path, None)
-                    cache_stats['evictions'] += 1
-
-            # Cleanup expired entries periodically
-            if cache_stats['misses'] % 10 == 0:
-                cleanup_cache()
-
-            return result
+        listing, cached = list_directory(path)
+        app_logger.debug(f"Cache {'HIT' if cached else 'MISS'} for directory: {path}")
+        return listing
     except Exception as e:
         app_logger.error(f"Error getting directory listing for {path}: {e}")
         raise
@@ -1795,53 +1518,7 @@ def invalidate_cache_for_path(path):
     # Invalidate database browse cache
     invalidate_browse_cache(path)
 
-    with cache_lock:
-        invalidated_count = 0
-
-        # Invalidate the specific path (both regular and browse: prefixed)
-        if path in directory_cache:
-            directory_cache.pop(path, None)
-            cache_timestamps.pop(path, None)
-            invalidated_count += 1
-
-        browse_key = f"browse:{path}"
-        if browse_key in directory_cache:
-            directory_cache.pop(browse_key, None)
-            cache_timestamps.pop(browse_key, None)
-            invalidated_count += 1
-
-        # Also invalidate parent directory cache (both regular and browse: prefixed)
-        parent = os.path.dirname(path)
-        if parent:
-            if parent in directory_cache:
-                directory_cache.pop(parent, None)
-                cache_timestamps.pop(parent, None)
-                invalidated_count += 1
-
-            parent_browse_key = f"browse:{parent}"
-            if parent_browse_key in directory_cache:
-                directory_cache.pop(parent_browse_key, None)
-                cache_timestamps.pop(parent_browse_key, None)
-                invalidated_count += 1
-
-        # Invalidate any child directory caches (both regular and browse: prefixed)
-        paths_to_invalidate = []
-        for cached_key in directory_cache.keys():
-            # Handle both regular paths and browse: prefixed keys
-            if cached_key.startswith("browse:"):
-                cached_path = cached_key[7:]
-            else:
-                cached_path = cached_key
-
-            if cached_path.startswith(path + os.sep):
-                paths_to_invalidate.append(cached_key)
-
-        for cached_key in paths_to_invalidate:
-            directory_cache.pop(cached_key, None)
-            cache_timestamps.pop(cached_key, None)
-            invalidated_count += 1
-
-        cache_stats['invalidations'] += invalidated_count
+    invalidated_count = invalidate_directory_listings([path])
 
     # Also invalidate directory stats cache when files change
     app_state.data_dir_stats_last_update = 0
@@ -1854,18 +1531,13 @@ def invalidate_cache_for_path(path):
 
 def rebuild_entire_cache():
     """Rebuild the entire directory cache and search index."""
-    global directory_cache, cache_timestamps, last_cache_rebuild, last_cache_invalidation
+    global last_cache_rebuild, last_cache_invalidation
 
     app_logger.info("🔄 Starting scheduled cache rebuild...")
     start_time = time.time()
 
-    with cache_lock:
-        cleared_count = len(directory_cache)
-        # Clear all caches
-        directory_cache.clear()
-        cache_timestamps.clear()
-        # Keep performance stats but mark rebuild
-        cache_stats['evictions'] += cleared_count
+    # Keep performance stats, only drop the listings
+    cleared_count = directory_cache.clear()
 
     # Rebuild search index
     build_file_index()
@@ -1902,11 +1574,8 @@ def warmup_cache():
     warmed_count = 0
     for path in warmup_paths:
         try:
-            if os.path.exists(path) and path not in directory_cache:
-                listing_data = get_directory_listing(path)
-                with cache_lock:
-                    directory_cache[path] = listing_data
-                    cache_timestamps[path] = time.time()
+            if os.path.exists(path) and not directory_cache.contains(path):
+                get_directory_listing(path)
                 warmed_count += 1
 
                 # Don't warm up too many at once
@@ -1936,17 +1605,10 @@ def should_rebuild_cache():
 @app.route('/clear-cache', methods=['POST'])
 def clear_cache():
     """Manually clear the directory cache."""
-    global directory_cache, cache_timestamps, last_cache_invalidation
-
-    with cache_lock:
-        cleared_count = len(directory_cache)
-        directory_cache.clear()
-        cache_timestamps.clear()
-        # Reset stats
-        cache_stats['hits'] = 0
-        cache_stats['misses'] = 0
-        cache_stats['evictions'] = 0
-        cache_stats['invalidations'] = 0
+    global last_cache_invalidation
+
+    cleared_count = directory_cache.clear()
+    directory_cache.reset_stats()
 
     last_cache_invalidation = time.time()
     app_state.data_dir_stats_last_update = 0  # Also invalidate directory stats cache
@@ -1964,54 +1626,11 @@ def clear_cache():
 @app.route('/api/rebuild-file-index', methods=['POST'])
 def api_rebuild_file_index():
     """Manually rebuild the file index using incremental sync."""
-    global index_built
-
     try:
         app_logger.info("🔄 Manual file index sync requested...")
         start_time = time.time()
 
-        # Scan filesystem to get current state
-        app_logger.info("Scanning filesystem...")
-        filesystem_entries = scan_filesystem_for_sync()
-        scan_time = time.time() - start_time
-        app_logger.info(f"Filesystem scan completed: {len(filesystem_entries)} entries in {scan_time:.2f}s")
-
-        # Incremental sync (preserves metadata for existing files)
-        app_logger.info("Performing incremental sync...")
-        sync_result = sync_file_index_incremental(filesystem_entries)
-        app_logger.info(f"Sync result: {sync_result['added']} added, {sync_result['removed']} removed, {sync_result['unchanged']} unchanged")
-
-        # Queue only NEW files for metadata scanning
-        if sync_result['added'] > 0:
-            from metadata_scanner import queue_files_for_scan, PRIORITY_NEW_FILE
-            new_cbz_paths = [p for p in sync_result['new_paths'] if p.lower().endswith('.cbz')]
-            if new_cbz_paths:
-                queue_files_for_scan(new_cbz_paths, PRIORITY_NEW_FILE)
-                app_logger.info(f"Queued {len(new_cbz_paths)} new CBZ files for metadata scanning")
-
-        # Also queue any other files that still need metadata scanning
-        # (e.g., previously added files that were never scanned)
-        from metadata_scanner import queue_pending_files
-        queued = queue_pending_files()
-        if queued:
-            app_logger.info(f"Queued {queued} additional files for metadata scanning")
-
-        # Refresh in-memory index from DB
-        file_index.clear()
-        db_index = get_file_index_from_db()
-        if db_index:
-            file_index.extend(db_index)
-        index_built = True
-
-        # Update last rebuild timestamp
-        update_last_rebuild()
-
-        # Clear and pre-populate stats cache
-        clear_stats_cache()
-        get_library_stats()
-        get_file_type_distribution()
-        get_top_publishers()
-        get_reading_history_stats()
+        sync_result, report = sync_file_index_from_filesystem('manual sync')
 
         elapsed = time.time() - start_time
         app_logger.info(f"✅ Manual file index sync completed in {elapsed:.2f}s")
@@ -2021,14 +1640,29 @@ def api_rebuild_file_index():
             "message": f"File index synced successfully in {elapsed:.2f} seconds",
             "added": sync_result['added'],
             "removed": sync_result['removed'],
+            "changed": sync_result['changed'],
             "unchanged": sync_result['unchanged'],
             "total_files": len([e for e in file_index if e['type'] == 'file']),
-            "total_directories": len([e for e in file_index if e['type'] == 'directory'])
+            "total_directories": len([e for e in file_index if e['type'] == 'directory']),
+            "timings": report.to_dict()
         })
     except Exception as e:
         app_logger.error(f"❌ File index sync failed: {e}")
         return jsonify({"success": False, "error": str(e)}), 500
 
+@app.route('/api/cache-stats', methods=['GET'])
+def api_cache_stats():
+    """Get hit/miss counters and memory use of the in-process caches."""
+    return jsonify({
+        "success": True,
+        "directory_listings": get_directory_cache_stats(),
+        "archive_toc": get_archive_toc_stats(),
+        "reader_pages": get_page_cache_stats(),
+        "reader_renditions": get_rendition_cache_stats(),
+        "thumbnails": get_thumbnail_pipeline_stats()
+    })
+
+
 @app.route('/api/file-index-status', methods=['GET'])
 def api_file_index_status():
     """Get the current status of the file index."""
@@ -2062,7 +1696,10 @@ def api_file_index_status():
             "total_files": total_files,
             "total_directories": total_directories,
             "last_rebuild": last_rebuild,
-            "index_built": index_built
+            "index_built": index_built,
+            "last_scan": get_last_scan_report(),
+            "current_scan": get_active_scan_report(),
+            "db_pool": get_db_pool_stats()
         })
     except Exception as e:
         app_logger.error(f"Failed to get file index status: {e}")
@@ -2131,11 +1768,12 @@ def api_save_rebuild_schedule():
 def api_run_sync_now():
     """Manually trigger a series sync immediately."""
     try:
-        # Run in a background thread to not block the request
-        threading.Thread(target=scheduled_series_sync, daemon=True).start()
+        # Run on the job queue to not block the request
+        job_id, created = enqueue_job('series_sync', concurrency_key='series_sync')
         return jsonify({
             "success": True,
-            "message": "Series sync started in background"
+            "job_id": job_id,
+            "message": "Series sync started in background" if created else "Series sync already in progress"
         })
     except Exception as e:
         app_logger.error(f"Failed to start sync: {e}")
@@ -2171,22 +1809,9 @@ def build_file_index():
 
     # Database empty, build from filesystem
     app_logger.info("Database empty, building file index from filesystem...")
-    start_time = time.time()
+    report = ScanReport('build')
 
     file_index.clear()
-    excluded_extensions = {".png", ".jpg", ".jpeg", ".gif", ".html", ".css", ".ds_store", ".json", ".db"}
-    excluded_files = {"cvinfo"}
-    allowed_files = {"missing.txt"}
-
-    # Track comic files for recent files database
-    comic_files = []
-
-    # Helper function to check for folder thumbnail
-    def check_has_thumbnail(folder_path):
-        for ext in ['.png', '.jpg', '.jpeg']:
-            if os.path.exists(os.path.join(folder_path, f'folder{ext}')):
-                return 1
-        return 0
 
     try:
         # Iterate over all configured library roots
@@ -2195,208 +1820,134 @@ def build_file_index():
             app_logger.warning("No libraries configured, cannot build file index")
             return
 
-        for library_root in library_roots:
-            if not os.path.exists(library_root):
-                app_logger.warning(f"Library path not found, skipping: {library_root}")
-                continue
-
-            app_logger.info(f"Indexing library: {library_root}")
-
-            for root, dirs, files in os.walk(library_root):
-                # Skip hidden directories
-                dirs[:] = [d for d in dirs if not d.startswith('.') and not d.startswith('_')]
-
-                # Index directories
-                for name in dirs:
-                    try:
-                        full_dir_path = os.path.join(root, name)
-                        rel_path = os.path.relpath(full_dir_path, library_root)
-                        # Use actual library root path in the stored path
-                        dir_path = os.path.join(library_root, rel_path).replace('\\', '/')
-                        parent_rel = os.path.dirname(rel_path)
-                        parent_path = os.path.join(library_root, parent_rel).replace('\\', '/') if parent_rel else library_root
-                        file_index.append({
-                            "name": name,
-                            "path": dir_path,
-                            "type": "directory",
-                            "parent": parent_path,
-                            "has_thumbnail": check_has_thumbnail(full_dir_path)
-                        })
-                    except (OSError, IOError):
-                        continue
-
-                # Index files (excluding certain extensions, but allow specific files)
-                for name in files:
-                    if name.startswith('.') or name.startswith('_'):
-                        continue
-
-                    # Skip explicitly excluded files
-                    if name.lower() in excluded_files:
-                        continue
-
-                    # Skip excluded file types (but allow specific files like missing.txt)
-                    if name.lower() not in allowed_files and any(name.lower().endswith(ext) for ext in excluded_extensions):
-                        continue
-
-                    try:
-                        full_path = os.path.join(root, name)
-                        rel_path = os.path.relpath(full_path, library_root)
-                        file_size = os.path.getsize(full_path)
-                        mtime = os.path.getmtime(full_path)
-
-                        # Use actual library root path in the stored path
-                        file_path = os.path.join(library_root, rel_path).replace('\\', '/')
-                        parent_rel = os.path.dirname(rel_path)
-                        parent_path = os.path.join(library_root, parent_rel).replace('\\', '/') if parent_rel else library_root
-
-                        file_index.append({
-                            "name": name,
-                            "path": file_path,
-                            "type": "file",
-                            "size": file_size,
-                            "parent": parent_path,
-                            "modified_at": mtime
-                        })
-
-                        # Track comic files for recent files list
-                        if name.lower().endswith(('.cbz', '.cbr')):
-                            try:
-                                mtime = os.path.getmtime(full_path)
-                                comic_files.append({
-                                    'path': full_path,
-                                    'name': name,
-                                    'size': file_size,
-                                    'mtime': mtime
-                                })
-                            except (OSError, IOError):
-                                pass
-
-                    except (OSError, IOError):
-                        continue
+        file_index.extend(iter_file_index_entries(library_roots, report))
 
     except Exception as e:
         app_logger.error(f"Error building file index: {e}")
         return
 
-    build_time = time.time() - start_time
-    app_logger.info(f"File index built successfully: {len(file_index)} items in {build_time:.2f} seconds")
+    app_logger.info(f"File index built successfully: {len(file_index)} items in {time.time() - report.started_at:.2f} seconds")
     index_built = True
 
     # Save index to database for persistence
     app_logger.info("Saving file index to database...")
-    save_start = time.time()
-    if save_file_index_to_db(file_index):
-        save_time = time.time() - save_start
-        app_logger.info(f"✅ File index saved to database in {save_time:.2f} seconds")
+    with report.phase('save'):
+        saved = save_file_index_to_db(file_index)
+    if saved:
+        app_logger.info(f"✅ File index saved to database in {report.phases['save']:.2f} seconds")
     else:
         app_logger.warning("Failed to save file index to database")
 
+    report.finish()
 
 
-    # Legacy: update_recent_files_from_scan(comic_files) - Removed as we now use file_index directly
-
-
-def scan_filesystem_for_sync():
+def scan_filesystem_for_sync(report=None):
     """
-    Scan the filesystem and return a list of entries without modifying the database.
+    Scan the filesystem and stream entries without modifying the database.
 
     Used by incremental sync to compare filesystem state with database state.
     Excludes TARGET folder (from app.config) as those files should not be indexed.
     Scans all enabled libraries.
 
+    Args:
+        report: Optional ScanReport to record timings into
+
     Returns:
-        List of dicts with {name, path, type, size, parent, has_thumbnail, modified_at}
+        Iterator of dicts with {name, path, type, size, parent, has_thumbnail, modified_at}
     """
-    entries = []
-    excluded_extensions = {".png", ".jpg", ".jpeg", ".gif", ".html", ".css", ".ds_store", ".json", ".db"}
-    excluded_files = {"cvinfo"}
-    allowed_files = {"missing.txt"}
-
     # Get TARGET from app.config (the authoritative source)
     target_dir = app.config.get('TARGET', '/downloads/processed')
-    normalized_target_dir = os.path.normpath(target_dir)
 
-    def is_in_target_dir(path):
-        """Check if path is within TARGET folder (should be excluded from index)."""
-        normalized_path = os.path.normpath(path)
-        try:
-            common_path = os.path.commonpath([normalized_path, normalized_target_dir])
-            return os.path.samefile(common_path, normalized_target_dir)
-        except (ValueError, OSError):
-            return normalized_path.startswith(normalized_target_dir)
-
-    def check_has_thumbnail(folder_path):
-        for ext in ['.png', '.jpg', '.jpeg']:
-            if os.path.exists(os.path.join(folder_path, f'folder{ext}')):
-                return 1
-        return 0
-
-    # Get all library roots to scan
-    library_roots = get_library_roots()
-
-    for library_root in library_roots:
-        if not os.path.exists(library_root):
-            app_logger.warning(f"Library path does not exist, skipping: {library_root}")
-            continue
+    if report is None:
+        report = ScanReport('sync')
 
-        try:
-            for root, dirs, files in os.walk(library_root):
-                # Skip hidden directories and TARGET_DIR
-                dirs[:] = [d for d in dirs if not d.startswith('.') and not d.startswith('_')
-                           and not is_in_target_dir(os.path.join(root, d))]
+    return iter_file_index_entries(get_library_roots(), report, excluded_dirs=[target_dir])
 
-                # Index directories
-                for name in dirs:
-                    try:
-                        full_dir_path = os.path.join(root, name)
-                        rel_path = os.path.relpath(full_dir_path, library_root)
-                        entries.append({
-                            "name": name,
-                            "path": f"{library_root}/{rel_path}",
-                            "type": "directory",
-                            "parent": f"{library_root}/{os.path.dirname(rel_path)}" if os.path.dirname(rel_path) else library_root,
-                            "has_thumbnail": check_has_thumbnail(full_dir_path),
-                            "size": None,
-                            "modified_at": None
-                        })
-                    except (OSError, IOError):
-                        continue
 
-                # Index files
-                for name in files:
-                    if name.startswith('.') or name.startswith('_'):
-                        continue
+def sync_file_index_from_filesystem(operation):
+    """
+    Stream a filesystem scan into the incremental file index sync.
 
-                    # Skip explicitly excluded files
-                    if name.lower() in excluded_files:
-                        continue
+    Shared by the scheduled rebuild and the manual rebuild endpoint. Queues
+    new files for metadata scanning, refreshes the in-memory index and the
+    stats cache, and publishes a ScanReport for /api/file-index-status.
 
-                    # Skip excluded file types (but allow specific files like missing.txt)
-                    if name.lower() not in allowed_files and any(name.lower().endswith(ext) for ext in excluded_extensions):
-                        continue
+    Args:
+        operation: Label for the timing report (e.g. 'scheduled sync')
 
-                    try:
-                        full_path = os.path.join(root, name)
-                        rel_path = os.path.relpath(full_path, library_root)
-                        file_size = os.path.getsize(full_path)
-                        mtime = os.path.getmtime(full_path)
-
-                        entries.append({
-                            "name": name,
-                            "path": f"{library_root}/{rel_path}",
-                            "type": "file",
-                            "size": file_size,
-                            "parent": f"{library_root}/{os.path.dirname(rel_path)}" if os.path.dirname(rel_path) else library_root,
-                            "has_thumbnail": 0,
-                            "modified_at": mtime
-                        })
-                    except (OSError, IOError):
-                        continue
+    Returns:
+        Tuple of (sync_result dict, ScanReport)
+    """
+    global index_built
 
-        except Exception as e:
-            app_logger.error(f"Error scanning library {library_root} for sync: {e}")
+    report = ScanReport(operation)
 
-    return entries
+    def log_sync_progress(phase, done, total):
+        report.progress = {'phase': phase, 'done': done, 'total': total}
+        if total:
+            app_logger.info(f"File index sync {phase}: {done}/{total} rows applied")
+
+    # Scan and sync in one pass (preserves metadata for existing files)
+    app_logger.info("Scanning filesystem and performing incremental sync...")
+    with report.phase('sync'):
+        sync_result = sync_file_index_incremental(
+            scan_filesystem_for_sync(report), progress_callback=log_sync_progress
+        )
+    for phase, seconds in sync_result.get('timings', {}).items():
+        report.add_time(f"sync_{phase}", seconds)
+    app_logger.info(
+        f"Filesystem scan completed: {report.counters['directories']} directories, "
+        f"{report.counters['files']} files"
+    )
+    app_logger.info(
+        f"Sync result: {sync_result['added']} added, {sync_result['removed']} removed, "
+        f"{sync_result['changed']} changed, {sync_result['unchanged']} unchanged"
+    )
+
+    with report.phase('queue_metadata'):
+        from metadata_scanner import queue_files_for_scan, is_scannable, PRIORITY_NEW_FILE, PRIORITY_MODIFIED
+
+        # Queue NEW files for metadata scanning
+        if sync_result['added'] > 0:
+            new_archive_paths = [p for p in sync_result['new_paths'] if is_scannable(p)]
+            if new_archive_paths:
+                queue_files_for_scan(new_archive_paths, PRIORITY_NEW_FILE)
+                app_logger.info(f"Queued {len(new_archive_paths)} new archives for metadata scanning")
+
+        # Re-scan files whose size or mtime changed on disk
+        changed_archive_paths = [p for p in sync_result['changed_paths'] if is_scannable(p)]
+        if changed_archive_paths:
+            queue_files_for_scan(changed_archive_paths, PRIORITY_MODIFIED)
+            app_logger.info(f"Queued {len(changed_archive_paths)} changed archives for metadata scanning")
+
+        # Also queue any other files that still need metadata scanning
+        # (e.g., previously added files that were never scanned)
+        from metadata_scanner import queue_pending_files
+        queued = queue_pending_files()
+        if queued:
+            app_logger.info(f"Queued {queued} additional files for metadata scanning")
+
+    with report.phase('reload_index'):
+        # Refresh in-memory index from DB
+        file_index.clear()
+        db_index = get_file_index_from_db()
+        if db_index:
+            file_index.extend(db_index)
+        index_built = True
+
+        # Update last rebuild timestamp
+        update_last_rebuild()
+
+    with report.phase('stats_cache'):
+        # Clear and pre-populate stats cache
+        clear_stats_cache()
+        get_library_stats()
+        get_file_type_distribution()
+        get_top_publishers()
+        get_reading_history_stats()
+
+    report.finish()
+    return sync_result, report
 
 
 def update_index_on_move(old_path, new_path):
@@ -2413,6 +1964,9 @@ def update_index_on_move(old_path, new_path):
         old_path: Original path
         new_path: New path after move
     """
+    # Both folders' listings changed, wherever they are
+    invalidate_directory_listings([old_path, new_path])
+
     try:
         # Normalize paths for comparison
         normalized_old = os.path.normpath(old_path)
@@ -2493,29 +2047,9 @@ def update_index_on_move(old_path, new_path):
                 app_logger.debug(f"Updated file index for moved file: {old_path} -> {new_path}")
 
             else:
-                # Update directory and all children
-                # First update the directory itself
-                dir_name = os.path.basename(new_path)
-                parent = os.path.dirname(new_path)
-                update_file_index_entry(old_path, name=dir_name, new_path=new_path, parent=parent)
-
-                # Update all children paths
-                # We need to update paths that start with old_path to start with new_path
-                conn = get_db_connection()
-                if conn:
-                    c = conn.cursor()
-                    # Update all entries whose path starts with old_path
-                    c.execute('''
-                        UPDATE file_index
-                        SET path = ? || SUBSTR(path, ?),
-                            parent = ? || SUBSTR(parent, ?)
-                        WHERE path LIKE ?
-                    ''', (new_path, len(old_path) + 1, new_path, len(old_path) + 1, f"{old_path}/%"))
-
-                    conn.commit()
-                    rows_affected = c.rowcount
-                    conn.close()
-                    app_logger.debug(f"Updated {rows_affected} child entries for moved directory: {old_path} -> {new_path}")
+                # Update directory and all children (and their folder stats)
+                rows_affected = move_file_index_entry(old_path, new_path)
+                app_logger.debug(f"Updated {rows_affected} entries for moved directory: {old_path} -> {new_path}")
 
             return
 
@@ -2532,6 +2066,8 @@ def update_index_on_delete(path):
     Args:
         path: Path of deleted item
     """
+    invalidate_directory_listings([path])
+
     try:
         delete_file_index_entry(path)
         app_logger.debug(f"Updated file index for deleted item: {path}")
@@ -2546,6 +2082,8 @@ def update_index_on_create(path):
     Args:
         path: Path of new item
     """
+    invalidate_directory_listings([path])
+
     try:
         excluded_extensions = {".png", ".jpg", ".jpeg", ".gif", ".html", ".css", ".ds_store", ".json", ".db", ".xml"}
         excluded_files = {"cvinfo"}
@@ -2599,8 +2137,9 @@ def update_index_on_create(path):
                         file_path = os.path.join(root, file_name)
                         file_parent = os.path.dirname(file_path)
                         try:
-                            file_size = os.path.getsize(file_path)
-                            add_file_index_entry(file_name, file_path, 'file', size=file_size, parent=file_parent)
+                            file_stat = os.stat(file_path)
+                            add_file_index_entry(file_name, file_path, 'file', size=file_stat.st_size,
+                                                 parent=file_parent, modified_at=file_stat.st_mtime)
                         except (OSError, IOError):
                             continue
 
@@ -3051,7 +2590,12 @@ def find_folder_thumbnails_batch(folder_paths):
 
 @app.route('/api/read/<path:comic_path>/page/<int:page_num>')
 def read_comic_page(comic_path, page_num):
-    """Serve a specific page from a comic file."""
+    """
+    Serve a specific page from a comic file.
+
+    Optional query parameters request a resized/re-encoded rendition:
+    w, h (max pixels), fmt (webp|jpeg), q (quality 1-100), gray (1).
+    """
 
     # Add leading slash if missing (for absolute paths on Unix systems)
     if not comic_path.startswith('/'):
@@ -3061,67 +2605,50 @@ def read_comic_page(comic_path, page_num):
         app_logger.error(f"Comic file not found: {comic_path}")
         return send_file('static/images/error.svg', mimetype='image/svg+xml')
 
+    if not get_archive_kind(comic_path):
+        return jsonify({"error": "Unsupported file format"}), 400
+
     try:
-        # Determine archive type
-        ext = os.path.splitext(comic_path)[1].lower()
-
-        # Get list of image files from archive
-        image_files = []
-        archive = None
-
-        if ext in ['.cbz', '.zip']:
-            archive = zipfile.ZipFile(comic_path, 'r')
-            all_files = archive.namelist()
-        elif ext == '.cbr':
-            archive = rarfile.RarFile(comic_path, 'r')
-            all_files = archive.namelist()
-        else:
-            return jsonify({"error": "Unsupported file format"}), 400
-
-        # Filter for image files
-        image_extensions = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp')
-        for filename in all_files:
-            if filename.lower().endswith(image_extensions):
-                # Skip macOS metadata files
-                if not filename.startswith('__MACOSX') and not os.path.basename(filename).startswith('.'):
-                    image_files.append(filename)
-
-        # Sort naturally
-        def natural_sort_key(s):
-            return [int(text) if text.isdigit() else text.lower() for text in re.split('([0-9]+)', s)]
-        image_files.sort(key=natural_sort_key)
-
-        # Check if page number is valid
-        if page_num < 0 or page_num >= len(image_files):
+        # Page list comes from the cached table of contents
+        toc = get_archive_toc(comic_path)
+        if page_num < 0 or page_num >= len(toc.pages):
             return jsonify({"error": "Invalid page number"}), 400
 
-        # Read the requested page
-        target_file = image_files[page_num]
-        image_data = archive.read(target_file)
-
-        # Close archive
-        archive.close()
-
-        # Determine mime type
-        file_ext = os.path.splitext(target_file)[1].lower()
-        mime_types = {
-            '.jpg': 'image/jpeg',
-            '.jpeg': 'image/jpeg',
-            '.png': 'image/png',
-            '.gif': 'image/gif',
-            '.webp': 'image/webp',
-            '.bmp': 'image/bmp'
-        }
-        mime_type = mime_types.get(file_ext, 'image/jpeg')
+        try:
+            rendition = parse_rendition_args(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        max_age = config.getint("SETTINGS", "READER_PAGE_MAX_AGE", fallback=3600)
+        etag = get_page_etag(toc, page_num)
+        if rendition:
+            etag = f"{etag}-{rendition.key}"
+        if request.if_none_match.contains(etag):
+            # Browser already has this page; keep reading ahead for the next ones
+            prefetch_reader_pages(toc, page_num)
+            response = Response(status=304)
+        else:
+            session_key = (request.remote_addr, comic_path)
+            if rendition:
+                image_data = get_page_rendition(
+                    toc, page_num, rendition,
+                    lambda: get_reader_page(toc, page_num, session_key)[0]
+                )
+                mime_type = rendition.mime_type
+                # A cached rendition skips the page cache; still read ahead the sources
+                prefetch_reader_pages(toc, page_num)
+            else:
+                image_data, mime_type = get_reader_page(toc, page_num, session_key)
+            response = Response(image_data, mimetype=mime_type)
 
-        # Return image
-        return Response(image_data, mimetype=mime_type)
+        response.set_etag(etag)
+        response.cache_control.private = True
+        response.cache_control.max_age = max_age
+        return response
 
     except Exception as e:
         app_logger.error(f"Error reading comic page {page_num} from {comic_path}: {e}")
         app_logger.error(traceback.format_exc())
-        if archive:
-            archive.close()
         return send_file('static/images/error.svg', mimetype='image/svg+xml')
 
 
@@ -3136,55 +2663,27 @@ def read_comic_page_info(comic_path, page_num):
     if not os.path.exists(comic_path):
         return jsonify({"success": False, "error": "File not found"}), 404
 
+    if not get_archive_kind(comic_path):
+        return jsonify({"success": False, "error": "Unsupported format"}), 400
+
     try:
-        ext = os.path.splitext(comic_path)[1].lower()
-        archive = None
+        toc = get_archive_toc(comic_path)
 
-        if ext in ['.cbz', '.zip']:
-            archive = zipfile.ZipFile(comic_path, 'r')
-        elif ext == '.cbr':
-            archive = rarfile.RarFile(comic_path, 'r')
-        else:
-            return jsonify({"success": False, "error": "Unsupported format"}), 400
-
-        # Get list of image files
-        image_extensions = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp')
-        image_files = []
-        for filename in archive.namelist():
-            if filename.lower().endswith(image_extensions):
-                if not filename.startswith('__MACOSX') and not os.path.basename(filename).startswith('.'):
-                    image_files.append(filename)
-
-        # Sort naturally
-        def natural_sort_key(s):
-            return [int(text) if text.isdigit() else text.lower() for text in re.split('([0-9]+)', s)]
-        image_files.sort(key=natural_sort_key)
-
-        if page_num < 0 or page_num >= len(image_files):
-            archive.close()
+        if page_num < 0 or page_num >= len(toc.pages):
             return jsonify({"success": False, "error": "Invalid page number"}), 400
 
-        target_file = image_files[page_num]
-
-        # Get file info from archive
-        info = archive.getinfo(target_file)
-        file_size = info.file_size if hasattr(info, 'file_size') else info.compress_size
-        file_name = os.path.basename(target_file)
-
-        archive.close()
+        page = toc.pages[page_num]
 
         return jsonify({
             "success": True,
             "page_num": page_num,
-            "file_name": file_name,
-            "file_size": file_size,
-            "archive_path": target_file
+            "file_name": os.path.basename(page.name),
+            "file_size": page.file_size,
+            "archive_path": page.name
         })
 
     except Exception as e:
         app_logger.error(f"Error getting page info for {comic_path} page {page_num}: {e}")
-        if archive:
-            archive.close()
         return jsonify({"success": False, "error": str(e)}), 500
 
 
@@ -3199,33 +2698,15 @@ def read_comic_info(comic_path):
     if not os.path.exists(comic_path):
         return jsonify({"error": "Comic file not found"}), 404
 
-    try:
-        # Determine archive type
-        ext = os.path.splitext(comic_path)[1].lower()
-
-        # Get list of image files from archive
-        image_files = []
-
-        if ext in ['.cbz', '.zip']:
-            with zipfile.ZipFile(comic_path, 'r') as archive:
-                all_files = archive.namelist()
-        elif ext == '.cbr':
-            with rarfile.RarFile(comic_path, 'r') as archive:
-                all_files = archive.namelist()
-        else:
-            return jsonify({"error": "Unsupported file format"}), 400
+    if not get_archive_kind(comic_path):
+        return jsonify({"error": "Unsupported file format"}), 400
 
-        # Filter for image files
-        image_extensions = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp')
-        for filename in all_files:
-            if filename.lower().endswith(image_extensions):
-                # Skip macOS metadata files
-                if not filename.startswith('__MACOSX') and not os.path.basename(filename).startswith('.'):
-                    image_files.append(filename)
+    try:
+        toc = get_archive_toc(comic_path)
 
         return jsonify({
             "success": True,
-            "page_count": len(image_files),
+            "page_count": len(toc.pages),
             "filename": os.path.basename(comic_path)
         })
 
@@ -3413,13 +2894,15 @@ def api_reading_position():
     POST: Save/update position for a comic
     DELETE: Remove saved position
     """
-    from database import save_reading_position, get_reading_position, delete_reading_position
+    from database import get_reading_position, delete_reading_position
 
     if request.method == 'GET':
         comic_path = request.args.get('path')
         if not comic_path:
             return jsonify({"error": "Missing path parameter"}), 400
 
+        # Read back positions saved moments ago that are still queued
+        flush_db_writes(timeout=2)
         position = get_reading_position(comic_path)
         if position:
             return jsonify({
@@ -3440,78 +2923,20 @@ def api_reading_position():
         if not comic_path or page_number is None:
             return jsonify({"error": "Missing comic_path or page_number"}), 400
 
-        success = save_reading_position(comic_path, page_number, total_pages, time_spent)
-        return jsonify({"success": success})
+        # Page turns are frequent; the writer batches them and keeps only the latest per comic
+        queue_reading_position(comic_path, page_number, total_pages, time_spent)
+        return jsonify({"success": True})
 
     elif request.method == 'DELETE':
         comic_path = request.args.get('path')
         if not comic_path:
             return jsonify({"error": "Missing path parameter"}), 400
 
+        flush_db_writes(timeout=2)
         success = delete_reading_position(comic_path)
         return jsonify({"success": success})
 
 
-def generate_thumbnail_task(file_path, cache_path):
-    """Background task to generate thumbnail."""
-    app_logger.info(f"Starting thumbnail generation for {file_path}")
-    
-    # Skip CBR and RAR files - they are not supported by this background task
-    if file_path.lower().endswith(('.cbr', '.rar')):
-        app_logger.info(f"Skipping thumbnail generation for CBR/RAR file: {file_path}")
-        conn = get_db_connection()
-        if conn:
-            conn.execute('UPDATE thumbnail_jobs SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE path = ?', ('skipped', file_path))
-            conn.commit()
-            conn.close()
-        return
-    
-    try:
-        # Extract and resize
-        import zipfile
-        from PIL import Image
-        
-        # Ensure cache directory exists
-        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
-        
-        with zipfile.ZipFile(file_path, 'r') as zf:
-            file_list = zf.namelist()
-            image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp'}
-            image_files = sorted([f for f in file_list if os.path.splitext(f.lower())[1] in image_extensions], key=str.lower)
-            
-            if image_files:
-                with zf.open(image_files[0]) as image_file:
-                    img = Image.open(image_file)
-                    if img.mode in ('RGBA', 'LA', 'P'):
-                        img = img.convert('RGB')
-                    
-                    # Resize to 300px height
-                    aspect_ratio = img.width / img.height
-                    new_height = 300
-                    new_width = int(new_height * aspect_ratio)
-                    img.thumbnail((new_width, new_height), Image.Resampling.LANCZOS)
-                    
-                    img.save(cache_path, format='JPEG', quality=85)
-                    
-                    # Update DB success
-                    conn = get_db_connection()
-                    if conn:
-                        conn.execute('UPDATE thumbnail_jobs SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE path = ?', ('completed', file_path))
-                        conn.commit()
-                        conn.close()
-                        app_logger.info(f"Thumbnail generated successfully for {file_path}")
-            else:
-                raise Exception("No images found in archive")
-                
-    except Exception as e:
-        app_logger.error(f"Error generating thumbnail for {file_path}: {e}")
-        conn = get_db_connection()
-        if conn:
-            conn.execute('UPDATE thumbnail_jobs SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE path = ?', ('error', file_path))
-            conn.commit()
-            conn.close()
-
-
 def generate_thumbnail_sync(file_path: str, cache_path: str) -> bool:
     """
     Generate a thumbnail synchronously for immediate use.
@@ -3525,79 +2950,19 @@ def generate_thumbnail_sync(file_path: str, cache_path: str) -> bool:
         True if successful, False otherwise
     """
     try:
-        import zipfile
-        from PIL import Image
-
-        # Ensure cache directory exists
-        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
-
-        image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp'}
-
-        # Handle CBZ files
-        if file_path.lower().endswith(('.cbz', '.zip')):
-            with zipfile.ZipFile(file_path, 'r') as zf:
-                file_list = zf.namelist()
-                image_files = sorted([
-                    f for f in file_list
-                    if os.path.splitext(f.lower())[1] in image_extensions
-                    and not f.startswith('__MACOSX')
-                    and not os.path.basename(f).startswith('.')
-                ], key=str.lower)
-
-                if not image_files:
-                    app_logger.warning(f"No images found in {file_path}")
-                    return False
-
-                with zf.open(image_files[0]) as image_file:
-                    img = Image.open(image_file)
-                    if img.mode in ('RGBA', 'LA', 'P'):
-                        img = img.convert('RGB')
-
-                    # Resize to 300px height
-                    aspect_ratio = img.width / img.height
-                    new_height = 300
-                    new_width = int(new_height * aspect_ratio)
-                    img.thumbnail((new_width, new_height), Image.Resampling.LANCZOS)
-
-                    img.save(cache_path, format='JPEG', quality=85)
-                    app_logger.info(f"Generated thumbnail sync for {file_path}")
-                    return True
-
-        # Handle CBR files
-        elif file_path.lower().endswith('.cbr'):
-            import rarfile
-            with rarfile.RarFile(file_path, 'r') as rf:
-                file_list = rf.namelist()
-                image_files = sorted([
-                    f for f in file_list
-                    if os.path.splitext(f.lower())[1] in image_extensions
-                    and not f.startswith('__MACOSX')
-                    and not os.path.basename(f).startswith('.')
-                ], key=str.lower)
-
-                if not image_files:
-                    app_logger.warning(f"No images found in {file_path}")
-                    return False
-
-                with rf.open(image_files[0]) as image_file:
-                    img = Image.open(image_file)
-                    if img.mode in ('RGBA', 'LA', 'P'):
-                        img = img.convert('RGB')
-
-                    # Resize to 300px height
-                    aspect_ratio = img.width / img.height
-                    new_height = 300
-                    new_width = int(new_height * aspect_ratio)
-                    img.thumbnail((new_width, new_height), Image.Resampling.LANCZOS)
-
-                    img.save(cache_path, format='JPEG', quality=85)
-                    app_logger.info(f"Generated thumbnail sync for {file_path}")
-                    return True
-
-        else:
+        if not get_archive_kind(file_path):
             app_logger.warning(f"Unsupported file type: {file_path}")
             return False
 
+        # Cover is the reader's first page, from the cached table of contents
+        if not get_archive_toc(file_path).pages:
+            app_logger.warning(f"No images found in {file_path}")
+            return False
+
+        render_thumbnail(file_path, cache_path)
+        app_logger.info(f"Generated thumbnail sync for {file_path}")
+        return True
+
     except Exception as e:
         app_logger.error(f"generate_thumbnail_sync failed for {file_path}: {e}")
         return False
@@ -3610,50 +2975,40 @@ def get_thumbnail():
     if not file_path:
         return jsonify({"error": "Missing path"}), 400
         
-    # Calculate cache path
-    cache_dir = config.get("SETTINGS", "CACHE_DIR", fallback="/cache")
-    thumbnails_dir = os.path.join(cache_dir, "thumbnails")
-    
-    # Create a hash of the file path to use as filename
-    import hashlib
-    path_hash = hashlib.md5(file_path.encode('utf-8'), usedforsecurity=False).hexdigest()
-    
-    # Sharding: use first 2 chars of hash as subdirectory to avoid too many files in one folder
-    shard_dir = path_hash[:2]
-    filename = f"{path_hash}.jpg"
-    
-    # Full path for checking existence / generation
-    cache_path = os.path.join(thumbnails_dir, shard_dir, filename)
-    
+    # Sharded cache path: first 2 chars of the path hash as subdirectory
+    cache_path = get_thumbnail_cache_path(file_path)
+    shard_path, filename = os.path.split(cache_path)
+
     # Check if thumbnail exists
     if os.path.exists(cache_path):
-        return send_from_directory(os.path.join(thumbnails_dir, shard_dir), filename)
-        
+        return send_from_directory(shard_path, filename)
+
+    # Already queued (e.g. by the library scan): move it to the front
+    if is_thumbnail_queued(file_path):
+        queue_thumbnail(file_path, cache_path, PRIORITY_VISIBLE)
+        return redirect(url_for('static', filename='images/loading.svg'))
+
     # Check DB status
     conn = get_db_connection()
     job = None
     if conn:
-        job = conn.execute('SELECT * FROM thumbnail_jobs WHERE path = ?', (file_path,)).fetchone()
+        job = conn.execute('SELECT status FROM thumbnail_jobs WHERE path = ?', (file_path,)).fetchone()
         conn.close()
-        
-    if job and job['status'] == 'completed' and os.path.exists(cache_path):
-        return send_from_directory(os.path.join(thumbnails_dir, shard_dir), filename)
-        
-    if job and job['status'] == 'processing':
-        return redirect(url_for('static', filename='images/loading.svg'))
-        
+
     if job and job['status'] == 'error':
         return redirect(url_for('static', filename='images/error.svg'))
-        
-    # Insert 'processing' status synchronously to prevent race conditions
-    conn = get_db_connection()
-    if conn:
-        conn.execute('INSERT OR REPLACE INTO thumbnail_jobs (path, status) VALUES (?, ?)', (file_path, 'processing'))
-        conn.commit()
-        conn.close()
 
-    # Submit task
-    thumbnail_executor.submit(generate_thumbnail_task, file_path, cache_path)
+    if job and job['status'] == 'skipped' and not get_archive_kind(file_path):
+        return redirect(url_for('static', filename='images/error.svg'))
+
+    # Not queued in this process: new file, a job lost on restart, or a cover
+    # skipped before CBR support. The pipeline dedupes concurrent requests.
+    try:
+        file_mtime = os.path.getmtime(file_path)
+    except OSError:
+        file_mtime = None
+    queue_thumbnail_status(file_path, 'processing', file_mtime)
+    queue_thumbnail(file_path, cache_path, PRIORITY_VISIBLE)
 
     return redirect(url_for('static', filename='images/loading.svg'))
 
@@ -4997,6 +4352,64 @@ def config_page():
 #########################
 #   Streaming Routes    #
 #########################
+SSE_HEADERS = {
+    "Content-Type": "text/event-stream",
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+    "Connection": "keep-alive"
+}
+
+# How often a job stream re-reads its job row
+JOB_STREAM_POLL_SECONDS = 1.0
+
+
+def stream_job_progress(job_id, created=True, poll_seconds=None):
+    """
+    Server-sent events following a queued job until it finishes.
+
+    Progress changes are sent as data lines; a keepalive comment goes out
+    on every poll without a change. Closing the stream leaves the job
+    running.
+    """
+    poll_seconds = JOB_STREAM_POLL_SECONDS if poll_seconds is None else poll_seconds
+    if not created:
+        yield "data: This operation is already running for this folder; following its progress.\n\n"
+
+    last = None
+    while True:
+        job = get_job(job_id)
+        if job is None:
+            yield "data: ERROR: Job no longer exists.\n\n"
+            return
+
+        if job['status'] == JOB_QUEUED and last is None:
+            yield "data: Waiting for other jobs to finish...\n\n"
+        done, total, message = progress = (job['progress_done'], job['progress_total'], job['message'])
+        if progress != last and message:
+            # Same lines the directory scripts printed, which the file browser parses
+            if total and not (last and last[1]):
+                yield f"data: Found {total} files to process\n\n"
+            yield f"data: Processing file: {message} ({done}/{total})\n\n" if total else f"data: {message}\n\n"
+        last = progress
+
+        if job['status'] == JOB_COMPLETED:
+            result = json.loads(job['result']) if job['result'] else None
+            result = result if isinstance(result, dict) else {}
+            if result.get('summary'):
+                yield f"data: {result['summary']}\n\n"
+            if result.get('missing_url'):
+                yield (f"data: Download missing list: <a href='{result['missing_url']}' "
+                       f"target='_blank'>missing.txt</a>\n\n")
+            yield "event: completed\ndata: Process completed successfully.\n\n"
+            return
+        if job['status'] in (JOB_FAILED, JOB_CANCELLED):
+            yield f"data: ERROR: Job {job['status']}: {job['error'] or 'no details'}\n\n"
+            yield f"data: An error occurred while streaming logs. Job {job['status']}.\n\n"
+            return
+
+        yield ": keepalive\n\n"
+        time.sleep(poll_seconds)
+
 @app.route('/stream/<script_type>')
 def stream_logs(script_type):
     file_path = request.args.get('file_path')  # Get file_path for single_file script
@@ -5035,17 +4448,25 @@ def stream_logs(script_type):
 
         return Response(generate_logs(), content_type='text/event-stream')
 
+    # Directory operations run on the job queue; the stream follows the job
+    elif script_type in DIRECTORY_JOB_TYPES:
+        if not directory or not os.path.isdir(directory):
+            return Response("Invalid or missing directory path.", status=400)
+
+        job_id, created = enqueue_job(script_type, {'directory': directory},
+                                      concurrency_key=directory_job_key(script_type, directory))
+        if not job_id:
+            return Response("Failed to queue job.", status=500)
+
+        return Response(stream_job_progress(job_id, created), headers=SSE_HEADERS,
+                        content_type='text/event-stream')
+
     # Handle scripts that operate on directories
-    elif script_type in ['rebuild', 'rename', 'convert', 'pdf', 'missing', 'enhance_dir','comicinfo']:
+    elif script_type == 'comicinfo':
         if not directory or not os.path.isdir(directory):
             return Response("Invalid or missing directory path.", status=400)
 
-        # Scripts in cbz_ops/ package vs root
-        cbz_ops_scripts = ['rebuild', 'rename', 'convert', 'pdf', 'enhance_dir']
-        if script_type in cbz_ops_scripts:
-            script_cmd = ['-m', f"cbz_ops.{script_type}"]
-        else:
-            script_cmd = [f"{script_type}.py"]
+        script_cmd = [f"{script_type}.py"]
 
         def generate_logs():
             # Set longer timeout for large file operations
@@ -5075,13 +4496,6 @@ def stream_logs(script_type):
                                 yield f"data: ERROR: {line}\n\n"
                             else:
                                 yield f"data: {line}\n\n"
-                        else:
-                            # No more output from this stream
-                            continue
-                else:
-                    # No output available, send keepalive for long operations
-                    if script_type in ['convert', 'rebuild']:
-                        yield f"data: \n\n"  # Keepalive to prevent timeout
 
             # Wait for process to complete
             try:
@@ -5091,35 +4505,12 @@ def stream_logs(script_type):
                 yield f"data: ERROR: Process timed out after {timeout_seconds} seconds\n\n"
                 return
 
-            if script_type == 'missing' and process.returncode == 0:
-                # Define the path to the generated missing.txt
-                missing_file_path = os.path.join(directory, "missing.txt")
-                
-                if os.path.exists(missing_file_path):
-                    # Generate a unique filename to prevent overwriting
-                    unique_id = uuid.uuid4().hex
-                    static_missing_filename = f"missing_{unique_id}.txt"
-                    static_missing_path = os.path.join(STATIC_DIR, static_missing_filename)
-                    
-                    try:
-                        shutil.move(missing_file_path, static_missing_path)
-                        missing_url = f"/static/{static_missing_filename}"
-                        yield f"data: Download missing list: <a href='{missing_url}' target='_blank'>missing.txt</a>\n\n"
-                    except Exception as e:
-                        yield f"data: ERROR: Failed to move missing.txt: {str(e)}\n\n"
-
             if process.returncode != 0:
                 yield f"data: An error occurred while streaming logs. Return code: {process.returncode}.\n\n"
             else:
                 yield "event: completed\ndata: Process completed successfully.\n\n"
 
-        headers = {
-            "Content-Type": "text/event-stream",
-            "Cache-Control": "no-cache",
-            "X-Accel-Buffering": "no",
-            "Connection": "keep-alive"
-        }
-        return Response(generate_logs(), headers=headers, content_type='text/event-stream')
+        return Response(generate_logs(), headers=SSE_HEADERS, content_type='text/event-stream')
 
     return Response("Invalid script type.", status=400)
 
@@ -5252,7 +4643,11 @@ def run_monitor():
         app_logger.error(f"monitor.py stderr:\n{stderr}")
 
 def cleanup():
-    """Terminate monitor.py before shutdown."""
+    """Flush queued database writes and terminate monitor.py before shutdown."""
+    stop_thumbnail_pipeline()
+    stop_job_queue()
+    stop_provider_cache_sweeper()
+    stop_db_writer()
     if monitor_process and monitor_process.poll() is None:
         app_logger.info("Terminating monitor.py process...")
         monitor_process.terminate()
@@ -5711,6 +5106,18 @@ def start_background_services():
     """Start all background services. Called once on app startup."""
     app_logger.info("Flask app is starting up...")
 
+    # Background workers queue their database writes through a single writer
+    start_db_writer()
+
+    # Run queued jobs, including those interrupted by the last shutdown
+    start_job_queue()
+
+    # Queue the thumbnail scan of the library
+    start_background_scanner()
+
+    # Expire cached metadata provider lookups
+    start_provider_cache_sweeper()
+
     # Start index building in background
     threading.Thread(target=build_index_background, daemon=True).start()
     app_logger.info("🔄 Building search index in background...")
@@ -5832,8 +5239,12 @@ def api_test_komga_connection():
 @app.route('/api/komga/sync', methods=['POST'])
 def api_sync_komga_now():
     """Manually trigger Komga reading sync."""
-    threading.Thread(target=run_komga_sync, daemon=True).start()
-    return jsonify({"success": True, "message": "Komga sync started in background"})
+    job_id, created = enqueue_job('komga_sync', concurrency_key='komga_sync')
+    return jsonify({
+        "success": True,
+        "job_id": job_id,
+        "message": "Komga sync started in background" if created else "Komga sync already in progress"
+    })
 
 
 @app.route('/api/komga/sync/status', methods=['GET'])
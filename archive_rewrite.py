@@ -0,0 +1,387 @@
+"""
+archive_rewrite.py - CBZ/ZIP edits without extracting or recompressing pages
+
+Tagging and the cbz_ops edits used to extract every page of an archive and
+re-deflate all of it to change one or two members. This module writes with
+as little I/O as the ZIP format allows:
+1. write_zip_member() appends the new member and a new central directory
+   after the end of the file; page data is never read or moved, and no
+   existing byte is overwritten. Replaced entries and the old central
+   directory become dead bytes
+2. The new end record is written last, after the central directory is
+   fsynced, so a crash leaves the old or the new archive; a failed write
+   truncates the file back to its original size
+3. rewrite_zip() streams an archive into a temp file in one sequential
+   pass: kept members are copied as raw compressed bytes (optionally under
+   a new name), only added or changed members are compressed. The temp
+   file is fsynced and renamed over the original. write_zip_member() uses
+   it to compact once dead bytes pass COMPACT_DEAD_RATIO of the archive
+4. repack_folder() packs an extracted folder (the edit modal) back into an
+   archive, raw-copying every file whose size and CRC still match a member
+   of the source archive
+"""
+
+import io
+import os
+import shutil
+import struct
+import time
+import zipfile
+import zlib
+from contextlib import contextmanager
+
+from app_logging import app_logger
+from compression_policy import get_policy
+
+# Compact when dead bytes exceed this fraction of the archive (and the floor)
+COMPACT_DEAD_RATIO = 0.1
+COMPACT_DEAD_MIN_BYTES = 64 * 1024
+
+_COPY_CHUNK = 1024 * 1024
+
+# Readers look for the end of central directory record in the last 64 KiB
+# (plus the record itself); write_zip_member() appends at most this much
+_EOCD_SCAN = 65535
+_SECTOR = 512
+
+_LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+_DATA_DESCRIPTOR_FLAG = 0x08
+_UTF8_FLAG = 0x800
+_ZIP64_EXTRA_ID = 1
+
+
+def _member_span(info):
+    """Approximate bytes a member occupies in the archive body."""
+    span = _LOCAL_HEADER.size + len(info.orig_filename.encode('utf-8')) + len(info.extra) + info.compress_size
+    if info.flag_bits & _DATA_DESCRIPTOR_FLAG:
+        span += 16
+    return span
+
+
+def _new_info(arcname):
+    info = zipfile.ZipInfo(arcname, date_time=time.localtime(time.time())[:6])
+    info.external_attr = 0o644 << 16
+    return info
+
+
+def _copy_raw_member(src, zf, info, arcname=None):
+    """
+    Copy a member's compressed data unchanged into zf.
+
+    A fresh local header is written (under arcname when given) with the
+    CRC and sizes from the central directory, so data descriptors of the
+    source are dropped rather than copied.
+
+    Args:
+        src: Binary file object of the source archive
+        zf: ZipFile open for writing
+        info: ZipInfo of the member in the source archive
+        arcname: Name for the member in zf (default: info.filename)
+    """
+    src.seek(info.header_offset)
+    header = src.read(_LOCAL_HEADER.size)
+    if len(header) != _LOCAL_HEADER.size or header[:4] != _LOCAL_HEADER_SIGNATURE:
+        raise zipfile.BadZipFile(f"Bad local header for {info.filename}")
+    fields = _LOCAL_HEADER.unpack(header)
+    data_offset = info.header_offset + _LOCAL_HEADER.size + fields[9] + fields[10]
+
+    new_info = zipfile.ZipInfo(arcname or info.filename, info.date_time)
+    for attr in ('compress_type', 'comment', 'create_system', 'create_version', 'extract_version',
+                 'volume', 'internal_attr', 'external_attr', 'CRC', 'compress_size', 'file_size'):
+        setattr(new_info, attr, getattr(info, attr))
+    new_info.extra = zipfile._strip_extra(info.extra, (_ZIP64_EXTRA_ID,))
+    new_info.flag_bits = info.flag_bits & ~(_DATA_DESCRIPTOR_FLAG | _UTF8_FLAG)
+    new_info.header_offset = zf.fp.tell()
+    zf.fp.write(new_info.FileHeader())
+
+    src.seek(data_offset)
+    remaining = info.compress_size
+    while remaining:
+        chunk = src.read(min(_COPY_CHUNK, remaining))
+        if not chunk:
+            raise zipfile.BadZipFile(f"Truncated data for {info.filename}")
+        zf.fp.write(chunk)
+        remaining -= len(chunk)
+
+    zf.filelist.append(new_info)
+    zf.NameToInfo[new_info.filename] = new_info
+    zf.start_dir = zf.fp.tell()
+    zf._didModify = True
+
+
+@contextmanager
+def _atomic_zip(zip_path):
+    """
+    Yield a ZipFile writing to a temp file next to zip_path.
+
+    On success the temp file is fsynced and renamed over zip_path, so a crash
+    leaves either the old or the new archive; on failure it is removed.
+    """
+    file_dir = os.path.dirname(zip_path) or '.'
+    base_name = os.path.splitext(os.path.basename(zip_path))[0]
+    temp_zip_path = os.path.join(file_dir, f".tmp_{base_name}_{os.getpid()}.cbz")
+
+    try:
+        with open(temp_zip_path, 'wb') as dst_fp:
+            with zipfile.ZipFile(dst_fp, 'w', strict_timestamps=False) as dst:
+                yield dst
+            dst_fp.flush()
+            os.fsync(dst_fp.fileno())
+
+        if os.path.exists(zip_path):
+            shutil.copymode(zip_path, temp_zip_path)
+        os.replace(temp_zip_path, zip_path)
+    finally:
+        if os.path.exists(temp_zip_path):
+            try:
+                os.unlink(temp_zip_path)
+            except OSError:
+                pass
+
+
+def _arcname(path):
+    return path.replace(os.sep, '/')
+
+
+def rewrite_zip(zip_path, keep=None, add=None, rename=None, sort=False, policy=None):
+    """
+    Rewrite an archive through a temp file, copying kept members raw.
+
+    Args:
+        zip_path: Path to the .zip/.cbz file
+        keep: Callable(ZipInfo) -> bool selecting members to copy (default: all)
+        add: List of (arcname, data) to write after the copied members; data
+             is bytes or the path of a file on disk. Callers must not add a
+             name that is also kept.
+        rename: Callable(ZipInfo) -> arcname for kept members (default: unchanged)
+        sort: Write all members ordered by arcname instead of archive order
+        policy: CompressionPolicy for added members (default: the library's)
+
+    Raises:
+        zipfile.BadZipFile: Not a ZIP archive (e.g. a RAR named .cbz)
+    """
+    policy = policy or get_policy(zip_path)
+    with open(zip_path, 'rb') as src_fp, zipfile.ZipFile(src_fp, 'r') as src:
+        entries = [
+            (rename(info) if rename else info.filename, info)
+            for info in sorted(src.infolist(), key=lambda i: i.header_offset)
+            if keep is None or keep(info)
+        ]
+        entries.extend(add or [])
+        if sort:
+            entries.sort(key=lambda entry: entry[0])
+
+        with _atomic_zip(zip_path) as dst:
+            dst.comment = src.comment
+            for arcname, item in entries:
+                if isinstance(item, zipfile.ZipInfo):
+                    _copy_raw_member(src_fp, dst, item, arcname)
+                elif isinstance(item, (bytes, bytearray)):
+                    dst.writestr(_new_info(arcname), item, **policy.options(arcname))
+                else:
+                    dst.write(item, arcname, **policy.options(arcname))
+
+
+def _file_crc(path):
+    crc = 0
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(_COPY_CHUNK)
+            if not chunk:
+                return crc
+            crc = zlib.crc32(chunk, crc)
+
+
+def repack_folder(folder, zip_path, source_path=None, policy=None):
+    """
+    Pack a folder into zip_path, ordered by relative path.
+
+    Files whose size and CRC match a member of source_path (the archive the
+    folder was extracted from) are copied as raw compressed bytes; only new
+    or edited files are compressed.
+
+    Args:
+        folder: Folder to pack; member names are relative to it
+        zip_path: Archive to write (replaced atomically)
+        source_path: Archive the folder was extracted from, if any
+        policy: CompressionPolicy for files that are not copied raw
+                (default: the library's)
+
+    Returns:
+        Number of members copied raw from source_path
+    """
+    files = []
+    for root, _, names in os.walk(folder):
+        for name in names:
+            full_path = os.path.join(root, name)
+            files.append((_arcname(os.path.relpath(full_path, folder)), full_path))
+    files.sort(key=lambda x: x[0])
+
+    policy = policy or get_policy(zip_path)
+    copied = 0
+    src_fp = open(source_path, 'rb') if source_path else None
+    try:
+        by_size = {}
+        if src_fp:
+            with zipfile.ZipFile(src_fp, 'r') as src:
+                for info in src.infolist():
+                    if not info.is_dir():
+                        by_size.setdefault(info.file_size, []).append(info)
+
+        with _atomic_zip(zip_path) as dst:
+            for arcname, full_path in files:
+                candidates = by_size.get(os.path.getsize(full_path))
+                match = None
+                if candidates:
+                    crc = _file_crc(full_path)
+                    match = next((info for info in candidates if info.CRC == crc), None)
+                if match is not None:
+                    _copy_raw_member(src_fp, dst, match, arcname)
+                    copied += 1
+                else:
+                    dst.write(full_path, arcname, **policy.options(arcname))
+    finally:
+        if src_fp:
+            src_fp.close()
+
+    return copied
+
+
+class _OffsetBuffer(io.BytesIO):
+    """BytesIO reporting positions as archive offsets starting at base."""
+
+    def __init__(self, base):
+        super().__init__()
+        self.base = base
+
+    def tell(self):
+        return self.base + super().tell()
+
+
+def _render_end_record(zf, start_dir):
+    """Central directory and end records of zf, as written at start_dir."""
+    buf = _OffsetBuffer(start_dir)
+    fp, zf.fp = zf.fp, buf
+    zf.start_dir = start_dir
+    try:
+        zf._write_end_record()
+    finally:
+        zf.fp = fp
+    return buf.getvalue()
+
+
+def _commit_pad(cd_end, end_len):
+    """Padding keeping the end record [cd_end + pad, + end_len) inside one disk sector."""
+    if end_len > _SECTOR:
+        return 0
+    return (-cd_end) % _SECTOR if cd_end % _SECTOR + end_len > _SECTOR else 0
+
+
+def write_zip_member(zip_path, arcname, data, replaces=None, policy=None):
+    """
+    Add or replace one member of a ZIP/CBZ without touching the other members.
+
+    The new member and a new central directory are appended after the
+    current end of the file; no existing byte is overwritten. The central
+    directory is fsynced before the 22-byte end record that points at it is
+    written (padded so it does not straddle a disk sector) and fsynced in
+    turn. Until then the original end record is still the last one within
+    the 64 KiB readers scan, so a crash at any point (SIGKILL, OOM kill,
+    power loss) leaves either the old or the new archive. Appends too large
+    to keep that guarantee go through rewrite_zip() instead, as do archives
+    whose dead bytes (replaced members, old central directories) pass
+    COMPACT_DEAD_RATIO.
+
+    Args:
+        zip_path: Path to the .zip/.cbz file
+        arcname: Name of the member to write
+        data: Member content (bytes)
+        replaces: Callable(ZipInfo) -> bool for existing members to drop
+                  (default: members named exactly arcname)
+        policy: CompressionPolicy for the new member (default: the library's)
+
+    Returns:
+        'appended' when written in place, 'compacted' when the archive was
+        rewritten (dropping dead entries)
+
+    Raises:
+        zipfile.BadZipFile: Not a ZIP archive (e.g. a RAR named .cbz)
+    """
+    if replaces is None:
+        replaces = lambda info: info.filename == arcname
+    policy = policy or get_policy(zip_path)
+
+    with open(zip_path, 'r+b') as f:
+        # Mode 'a' would append a new archive to a non-ZIP file; refuse instead
+        if not zipfile.is_zipfile(f):
+            raise zipfile.BadZipFile("File is not a zip file")
+        zf = zipfile.ZipFile(f, 'a')
+        infos = zf.infolist()
+        removed = [info for info in infos if replaces(info)]
+        live = [info for info in infos if not replaces(info)]
+
+        # After the append everything but the live members is dead, the old
+        # central directory included
+        size = os.fstat(f.fileno()).st_size
+        body_start = min((info.header_offset for info in infos), default=zf.start_dir)
+        dead = max(0, size - body_start - sum(_member_span(info) for info in live))
+
+        # The old end record must stay within the readers' scan until the new one is down
+        budget = _EOCD_SCAN - len(zf.comment)
+        name_len = len(arcname.encode('utf-8'))
+        estimate = len(data) + len(data) // 100 + 2 * name_len + (size - zf.start_dir) + 1024
+
+        if dead > max(COMPACT_DEAD_MIN_BYTES, size * COMPACT_DEAD_RATIO) or estimate > budget:
+            zf._didModify = False
+            zf.close()
+        else:
+            try:
+                for info in removed:
+                    zf.filelist.remove(info)
+                    if zf.NameToInfo.get(info.filename) is info:
+                        del zf.NameToInfo[info.filename]
+                zf.start_dir = size
+                zf.writestr(_new_info(arcname), data, **policy.options(arcname))
+                member_end = zf.start_dir
+
+                end_len = 22 + len(zf.comment)
+                cd_len = len(_render_end_record(zf, member_end)) - end_len
+                pad = _commit_pad(member_end + cd_len, end_len)
+                tail = _render_end_record(zf, member_end + pad)
+                if member_end + pad + len(tail) - size > budget:
+                    raise _AppendTooLarge()
+                zf._didModify = False
+                zf.close()
+
+                f.seek(member_end)
+                f.write(b'\0' * pad + tail[:-end_len])
+                f.flush()
+                os.fsync(f.fileno())
+                f.write(tail[-end_len:])
+                f.flush()
+                os.fsync(f.fileno())
+            except BaseException as e:
+                # Only bytes past the original end were written; drop them
+                zf._didModify = False
+                zf.close()
+                f.truncate(size)
+                f.flush()
+                os.fsync(f.fileno())
+                if not isinstance(e, _AppendTooLarge):
+                    raise
+            else:
+                return 'appended'
+
+    app_logger.info(f"Compacting {os.path.basename(zip_path)} ({dead} dead bytes)")
+    rewrite_zip(
+        zip_path,
+        keep=lambda info: not replaces(info),
+        add=[(arcname, data)],
+        policy=policy,
+    )
+    return 'compacted'
+
+
+class _AppendTooLarge(Exception):
+    """The append would push the original end record out of the readers' scan."""
@@ -0,0 +1,313 @@
+"""
+archive_toc.py - Cached tables of contents for comic archives
+
+The reader endpoints and thumbnail generation used to open the archive, parse
+the whole central directory, filter and natural-sort the image list for every
+request. This module keeps that work in a shared LRU cache:
+1. get_archive_toc() parses an archive once into its sorted page list with the
+   per-page offset, sizes and mime type
+2. Entries are keyed by path and validated against the file's mtime and size,
+   so a rewritten archive is re-parsed on its next access
+3. The cache is bounded by an estimated memory budget (ARCHIVE_TOC_CACHE_MB)
+4. read_archive_page() reads a ZIP page straight from its local header offset
+   without reopening the central directory; RAR pages go through rarfile
+5. get_archive_toc_stats() reports hits, misses and evictions
+"""
+
+import os
+import re
+import struct
+import threading
+import zipfile
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import rarfile
+
+from app_logging import app_logger
+from config import config
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp')
+
+MIME_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp',
+    '.bmp': 'image/bmp'
+}
+
+# Archive formats the reader understands, by file extension
+ARCHIVE_TYPES = {
+    '.cbz': 'zip',
+    '.zip': 'zip',
+    '.cbr': 'rar',
+    '.rar': 'rar',
+}
+
+DEFAULT_CACHE_MB = 32
+
+# Rough per-object sizes used for the memory budget
+_PAGE_OVERHEAD = 200
+_TOC_OVERHEAD = 400
+
+_LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+
+
+@dataclass(frozen=True)
+class ArchivePage:
+    """One image page of an archive."""
+    name: str
+    file_size: int
+    compress_size: int
+    mime_type: str
+    offset: Optional[int] = None        # ZIP local header offset
+    compress_type: Optional[int] = None  # ZIP compression method
+    crc: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class ArchiveToc:
+    """Sorted page list of an archive as of a given mtime/size."""
+    path: str
+    kind: str
+    mtime_ns: int
+    size: int
+    pages: Tuple[ArchivePage, ...]
+
+    @property
+    def nbytes(self):
+        """Estimated memory used by this entry."""
+        return _TOC_OVERHEAD + len(self.path) + sum(_PAGE_OVERHEAD + len(p.name) for p in self.pages)
+
+
+def natural_sort_key(s):
+    """Sort key that orders 'page2' before 'page10'."""
+    return [int(text) if text.isdigit() else text.lower() for text in re.split('([0-9]+)', s)]
+
+
+def is_page_image(filename):
+    """Check if an archive member is a readable page (image, not macOS metadata)."""
+    if not filename.lower().endswith(IMAGE_EXTENSIONS):
+        return False
+    return not filename.startswith('__MACOSX') and not os.path.basename(filename).startswith('.')
+
+
+def get_archive_kind(path):
+    """Return 'zip', 'rar' or None for an unsupported extension."""
+    return ARCHIVE_TYPES.get(os.path.splitext(path)[1].lower())
+
+
+class ArchiveTocCache:
+    """Thread-safe LRU of ArchiveToc objects bounded by estimated bytes."""
+
+    def __init__(self, max_bytes=None):
+        self._max_bytes = max_bytes
+        self._entries = OrderedDict()  # path -> ArchiveToc
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'stale': 0, 'evictions': 0}
+
+    @property
+    def max_bytes(self):
+        if self._max_bytes is None:
+            return config.getint("SETTINGS", "ARCHIVE_TOC_CACHE_MB", fallback=DEFAULT_CACHE_MB) * 1024 * 1024
+        return self._max_bytes
+
+    def get(self, path):
+        """
+        Get the table of contents of an archive, parsing it on a miss.
+
+        Raises:
+            OSError: The file cannot be read
+            ValueError: Unsupported archive extension
+            zipfile.BadZipFile / rarfile.Error: Corrupt archive
+        """
+        st = os.stat(path)
+        with self._lock:
+            toc = self._entries.get(path)
+            if toc is not None:
+                if toc.mtime_ns == st.st_mtime_ns and toc.size == st.st_size:
+                    self._entries.move_to_end(path)
+                    self.stats['hits'] += 1
+                    return toc
+                self._remove(path)
+                self.stats['stale'] += 1
+            self.stats['misses'] += 1
+
+        toc = _parse_archive(path, st)
+        self._store(toc)
+        return toc
+
+    def invalidate(self, path=None):
+        """Drop one archive, or everything when path is None."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._bytes = 0
+            elif path in self._entries:
+                self._remove(path)
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+        stats['max_bytes'] = self.max_bytes
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        return stats
+
+    def _store(self, toc):
+        size = toc.nbytes
+        budget = self.max_bytes
+        if size > budget:
+            return
+        with self._lock:
+            if toc.path in self._entries:
+                self._remove(toc.path)
+            self._entries[toc.path] = toc
+            self._bytes += size
+            while self._bytes > budget and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.stats['evictions'] += 1
+
+    def _remove(self, path):
+        toc = self._entries.pop(path)
+        self._bytes -= toc.nbytes
+
+
+def _parse_archive(path, st):
+    kind = get_archive_kind(path)
+    if kind == 'zip':
+        with zipfile.ZipFile(path, 'r') as archive:
+            pages = [
+                ArchivePage(
+                    name=info.filename,
+                    file_size=info.file_size,
+                    compress_size=info.compress_size,
+                    mime_type=MIME_TYPES.get(os.path.splitext(info.filename)[1].lower(), 'image/jpeg'),
+                    offset=info.header_offset,
+                    compress_type=None if info.flag_bits & 0x1 else info.compress_type,
+                    crc=info.CRC,
+                )
+                for info in archive.infolist()
+                if not info.is_dir() and is_page_image(info.filename)
+            ]
+    elif kind == 'rar':
+        with rarfile.RarFile(path, 'r') as archive:
+            pages = [
+                ArchivePage(
+                    name=info.filename,
+                    file_size=info.file_size,
+                    compress_size=info.compress_size,
+                    mime_type=MIME_TYPES.get(os.path.splitext(info.filename)[1].lower(), 'image/jpeg'),
+                )
+                for info in archive.infolist()
+                if not info.is_dir() and is_page_image(info.filename)
+            ]
+    else:
+        raise ValueError(f"Unsupported archive format: {path}")
+
+    pages.sort(key=lambda p: natural_sort_key(p.name))
+    return ArchiveToc(path=path, kind=kind, mtime_ns=st.st_mtime_ns, size=st.st_size, pages=tuple(pages))
+
+
+def _read_zip_member_direct(path, page):
+    """
+    Read a STORED or DEFLATED member from its local header offset.
+
+    Returns:
+        Decompressed bytes, or None if the member needs the zipfile module
+        (encrypted, other compression method, unexpected header)
+    """
+    if page.compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+        return None
+
+    with open(path, 'rb') as f:
+        f.seek(page.offset)
+        header = f.read(_LOCAL_HEADER.size)
+        if len(header) != _LOCAL_HEADER.size:
+            return None
+        fields = _LOCAL_HEADER.unpack(header)
+        if fields[0] != _LOCAL_HEADER_SIGNATURE:
+            return None
+        f.seek(fields[9] + fields[10], os.SEEK_CUR)
+        raw = f.read(page.compress_size)
+
+    if len(raw) != page.compress_size:
+        return None
+    data = raw if page.compress_type == zipfile.ZIP_STORED else zlib.decompress(raw, -zlib.MAX_WBITS)
+    if len(data) != page.file_size or zlib.crc32(data) != page.crc:
+        return None
+    return data
+
+
+# Process-wide cache shared by the reader endpoints and thumbnail generation
+toc_cache = ArchiveTocCache()
+
+
+def get_archive_toc(path):
+    """Get the cached table of contents of a CBZ/ZIP/CBR archive."""
+    return toc_cache.get(path)
+
+
+def read_archive_page(path, page_num):
+    """
+    Read one page of an archive.
+
+    Args:
+        path: Archive path
+        page_num: 0-based page index in natural-sort order
+
+    Returns:
+        Tuple of (image bytes, ArchivePage)
+
+    Raises:
+        IndexError: page_num is out of range
+    """
+    return read_toc_page(get_archive_toc(path), page_num)
+
+
+def read_toc_page(toc, page_num):
+    """
+    Read one page of an archive whose table of contents is already loaded.
+
+    Returns:
+        Tuple of (image bytes, ArchivePage)
+
+    Raises:
+        IndexError: page_num is out of range
+    """
+    if page_num < 0 or page_num >= len(toc.pages):
+        raise IndexError(f"Page {page_num} out of range (0-{len(toc.pages) - 1})")
+    page = toc.pages[page_num]
+
+    if toc.kind == 'zip':
+        try:
+            data = _read_zip_member_direct(toc.path, page)
+        except (OSError, zlib.error) as e:
+            app_logger.debug(f"Direct read of {page.name} from {toc.path} failed, using zipfile: {e}")
+            data = None
+        if data is None:
+            with zipfile.ZipFile(toc.path, 'r') as archive:
+                data = archive.read(page.name)
+        return data, page
+
+    with rarfile.RarFile(toc.path, 'r') as archive:
+        return archive.read(page.name), page
+
+
+def invalidate_archive_toc(path=None):
+    """Drop a cached table of contents (all of them when path is None)."""
+    toc_cache.invalidate(path)
+
+
+def get_archive_toc_stats():
+    """Hit/miss/eviction counters and memory use of the TOC cache."""
+    return toc_cache.get_stats()
@@ -1,14 +1,15 @@
 import os
 import sys
-import zipfile
 import shutil
-from PIL import Image, ImageFilter
 from app_logging import app_logger
+from archive_rewrite import write_zip_member
 
 
 def handle_cbz_file(file_path):
     """
-    Handle the conversion of a .cbz file: unzip, process images, compress, and clean up.
+    Handle the addition of a blank image to a .cbz file: stage the image in a
+    folder and append it to the archive. Existing pages are not extracted or
+    recompressed.
 
     :param file_path: Path to the .cbz file.
     :return: None
@@ -21,46 +22,26 @@ def handle_cbz_file(file_path):
         return
 
     base_name = os.path.splitext(file_path)[0]  # Removes the .cbz extension
-    zip_path = base_name + '.zip'
     folder_name = base_name + '_folder'
     
-    app_logger.info(f"Processing CBZ: {file_path} -> {zip_path}")
+    app_logger.info(f"Processing CBZ: {file_path}")
 
     try:
-        # Step 1: Rename .cbz to .zip
-        os.rename(file_path, zip_path)
-
-        # Step 2: Create a folder with the file name
+        # Step 1: Stage the new image in a folder with the file name
         os.makedirs(folder_name, exist_ok=True)
-
-        # Step 3: Unzip the .zip file contents into the folder
-        with zipfile.ZipFile(zip_path, 'r') as zf:
-            zf.extractall(folder_name)
-        
-        # Step 4: Add the new image to the folder
         add_image_to_folder(folder_name)
 
-        # Step 5: Rename the original .zip file to .bak
-        bak_file_path = zip_path + '.bak'
-        os.rename(zip_path, bak_file_path)
-
-        # Step 6: Compress the folder contents back into a .cbz file
-        with zipfile.ZipFile(file_path, 'w', zipfile.ZIP_DEFLATED) as zf:
-            for root, _, files in os.walk(folder_name):
-                for file in files:
-                    file_path_in_folder = os.path.join(root, file)
-                    arcname = os.path.relpath(file_path_in_folder, folder_name)
-                    zf.write(file_path_in_folder, arcname)
-
-        app_logger.info(f"Successfully re-compressed: {file_path}")
+        # Step 2: Append the staged files; only the central directory is rewritten
+        for name in sorted(os.listdir(folder_name)):
+            with open(os.path.join(folder_name, name), 'rb') as f:
+                write_zip_member(file_path, name, f.read())
 
-        # Step 7: Delete the .bak file
-        os.remove(bak_file_path)
+        app_logger.info(f"Successfully updated: {file_path}")
 
     except Exception as e:
         app_logger.error(f"Failed to process {file_path}: {e}")
     finally:
-        # Clean up the temporary folder
+        # Clean up the staging folder
         if os.path.exists(folder_name):
             shutil.rmtree(folder_name)
 
@@ -5,8 +5,10 @@ import zipfile
 import shutil
 import time
 from app_logging import app_logger
+from compression_policy import get_policy
 from config import config, load_config
 from helpers import is_hidden, extract_rar_with_unar
+from job_runner import run_jobs
 
 load_config()
 
@@ -25,15 +27,15 @@ def get_file_size_mb(file_path):
         return 0
 
 
-def count_convertable_files(directory):
+def find_convertable_files(directory):
     """
-    Count the total number of RAR and CBR files that will be converted.
-    
+    List the RAR and CBR files to convert, honouring CONVERT_SUBDIRECTORIES
+    and skipping hidden files and directories.
+
     :param directory: Path to the directory containing RAR and CBR files.
-    :return: Total count of files to convert
+    :return: List of file paths, in directory walk order
     """
-    total_files = 0
-    
+    rar_paths = []
     if convertSubdirectories:
         # Recursively traverse the directory tree.
         for root, dirs, files in os.walk(directory):
@@ -41,21 +43,25 @@ def count_convertable_files(directory):
             dirs[:] = [d for d in dirs if not is_hidden(os.path.join(root, d))]
             for file_name in files:
                 file_path = os.path.join(root, file_name)
-                if is_hidden(file_path):
-                    continue
-                # Count only .rar and .cbr files.
-                if file_name.lower().endswith(('.rar', '.cbr')):
-                    total_files += 1
+                if not is_hidden(file_path) and file_name.lower().endswith(('.rar', '.cbr')):
+                    rar_paths.append(file_path)
     else:
-        # Non-recursive count: only count files in the given directory.
+        # Non-recursive: only files in the given directory.
         for file_name in os.listdir(directory):
             file_path = os.path.join(directory, file_name)
-            if is_hidden(file_path):
-                continue
-            if file_name.lower().endswith(('.rar', '.cbr')):
-                total_files += 1
+            if not is_hidden(file_path) and file_name.lower().endswith(('.rar', '.cbr')):
+                rar_paths.append(file_path)
+    return rar_paths
+
+
+def count_convertable_files(directory):
+    """
+    Count the total number of RAR and CBR files that will be converted.
     
-    return total_files
+    :param directory: Path to the directory containing RAR and CBR files.
+    :return: Total count of files to convert
+    """
+    return len(find_convertable_files(directory))
 
 
 def convert_single_rar_file(rar_path, zip_path, temp_extraction_dir):
@@ -101,8 +107,9 @@ def convert_single_rar_file(rar_path, zip_path, temp_extraction_dir):
         # Step 3: Create CBZ file with progress reporting
         app_logger.info(f"Step 3/3: Creating CBZ file...")
         processed_files = 0
+        policy = get_policy(zip_path)
         
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        with zipfile.ZipFile(zip_path, 'w') as zf:
             for extract_root, extract_dirs, extract_files in os.walk(temp_extraction_dir):
                 # Skip hidden directories within the extraction folder.
                 extract_dirs[:] = [d for d in extract_dirs if not is_hidden(os.path.join(extract_root, d))]
@@ -112,7 +119,7 @@ def convert_single_rar_file(rar_path, zip_path, temp_extraction_dir):
                         continue
                     
                     arcname = os.path.relpath(file_path_inner, temp_extraction_dir)
-                    zf.write(file_path_inner, arcname)
+                    zf.write(file_path_inner, arcname, **policy.options(arcname))
                     
                     processed_files += 1
                     
@@ -129,85 +136,50 @@ def convert_single_rar_file(rar_path, zip_path, temp_extraction_dir):
         return False
 
 
+def convert_rar_path(rar_path):
+    """
+    Convert one RAR/CBR file to a CBZ next to it and delete the original.
+    Runs inside a job_runner worker.
+
+    :param rar_path: Path to the RAR/CBR file
+    :return: The file name without extension if converted, otherwise None
+    """
+    root, file_name = os.path.split(rar_path)
+    temp_extraction_dir = os.path.join(root, f"temp_{file_name[:-4]}")
+    zip_path = os.path.join(root, f"{file_name[:-4]}.cbz")
+
+    try:
+        if convert_single_rar_file(rar_path, zip_path, temp_extraction_dir):
+            # Delete the original RAR/CBR file.
+            os.remove(rar_path)
+            return file_name[:-4]
+        return None
+    finally:
+        # Clean up temp directory
+        if os.path.exists(temp_extraction_dir):
+            shutil.rmtree(temp_extraction_dir)
+
+
 def convert_rar_directory(directory):
     """
     Convert all RAR and CBR files in a directory (and optionally its subdirectories)
     to CBZ files using unar for extraction, skipping hidden system files and directories.
+    Files are converted in parallel through job_runner.
 
     :param directory: Path to the directory containing RAR and CBR files.
     :return: List of successfully converted files (without extensions)
     """
     app_logger.info("********************// Convert Directory to CBZ //********************")
     os.makedirs(directory, exist_ok=True)
-    converted_files = []
-    
-    # Count total files first for progress tracking
-    total_files = count_convertable_files(directory)
-    processed_files = 0
-    
-    if total_files == 0:
-        app_logger.info("No RAR or CBR files found to convert.")
-        return converted_files
-    
-    app_logger.info(f"Found {total_files} files to convert.")
-    
-    if convertSubdirectories:
-        # Recursively traverse the directory tree.
-        for root, dirs, files in os.walk(directory):
-            # Skip hidden directories.
-            dirs[:] = [d for d in dirs if not is_hidden(os.path.join(root, d))]
-            for file_name in files:
-                file_path = os.path.join(root, file_name)
-                if is_hidden(file_path):
-                    continue
 
-                # Process only .rar and .cbr files.
-                if file_name.lower().endswith(('.rar', '.cbr')):
-                    processed_files += 1
-                    
-                    rar_path = file_path
-                    temp_extraction_dir = os.path.join(root, f"temp_{file_name[:-4]}")
-                    zip_path = os.path.join(root, f"{file_name[:-4]}.cbz")
+    rar_paths = find_convertable_files(directory)
+    if not rar_paths:
+        app_logger.info("No RAR or CBR files found to convert.")
+        return []
 
-                    app_logger.info(f"Processing file: {file_name} ({processed_files}/{total_files})")
-                    
-                    success = convert_single_rar_file(rar_path, zip_path, temp_extraction_dir)
-                    
-                    if success:
-                        converted_files.append(file_name[:-4])
-                        # Delete the original RAR/CBR file.
-                        os.remove(rar_path)
-                    
-                    # Clean up temp directory
-                    if os.path.exists(temp_extraction_dir):
-                        shutil.rmtree(temp_extraction_dir)
-    else:
-        # Non-recursive conversion: only process files in the given directory.
-        for file_name in os.listdir(directory):
-            file_path = os.path.join(directory, file_name)
-            if is_hidden(file_path):
-                continue
-
-            if file_name.lower().endswith(('.rar', '.cbr')):
-                processed_files += 1
-                
-                rar_path = file_path
-                temp_extraction_dir = os.path.join(directory, f"temp_{file_name[:-4]}")
-                zip_path = os.path.join(directory, f"{file_name[:-4]}.cbz")
-
-                app_logger.info(f"Processing file: {file_name} ({processed_files}/{total_files})")
-                
-                success = convert_single_rar_file(rar_path, zip_path, temp_extraction_dir)
-                
-                if success:
-                    converted_files.append(file_name[:-4])
-                    os.remove(rar_path)
-                
-                # Clean up temp directory
-                if os.path.exists(temp_extraction_dir):
-                    shutil.rmtree(temp_extraction_dir)
-
-    return converted_files
+    app_logger.info(f"Found {len(rar_paths)} files to convert.")
+    results = run_jobs(convert_rar_path, rar_paths, "convert", scope=directory)
+    return [name for name in results if name]
 
 
 def main(directory):
@@ -1,9 +1,10 @@
+import io
 import os
 import sys
 import zipfile
-import shutil
 from PIL import Image, ImageFilter
 from app_logging import app_logger
+from archive_rewrite import rewrite_zip
 from config import config, load_config
 
 load_config()
@@ -16,7 +17,8 @@ deletedFiles = [ext.strip().lower() for ext in deleted_exts.split(",") if ext.st
 
 def handle_cbz_file(file_path):
     """
-    Handle the conversion of a .cbz file: unzip, process images, compress, and clean up.
+    Handle cropping the cover of a .cbz file. Only the cover is decoded and
+    re-encoded; the other pages are copied as raw compressed bytes.
 
     :param file_path: Path to the .cbz file.
     :return: None
@@ -28,47 +30,46 @@ def handle_cbz_file(file_path):
         app_logger.info("Provided file is not a CBZ file.")
         return
 
-    base_name = os.path.splitext(file_path)[0]  # Removes the .cbz extension
-    zip_path = base_name + '.zip'
-    folder_name = base_name + '_folder'
-    
-    app_logger.info(f"Processing CBZ: {file_path} --> {zip_path}")
+    app_logger.info(f"Processing CBZ: {file_path}")
 
     try:
-        # Step 1: Rename .cbz to .zip
-        os.rename(file_path, zip_path)
-
-        # Step 2: Create a folder with the file name
-        os.makedirs(folder_name, exist_ok=True)
-
-        # Step 3: Unzip the .zip file contents into the folder
-        with zipfile.ZipFile(zip_path, 'r') as zf:
-            zf.extractall(folder_name)
-        
-        # Step 4: Process the extracted images
-        #logger.info(f"Processing images in folder: {folder_name}")
-        process_image(folder_name)
-
-        # Step 5: Rename the original .zip file to .bak
-        bak_file_path = zip_path + '.bak'
-        os.rename(zip_path, bak_file_path)
-
-        # Step 6: Compress the folder contents back into a .cbz file in alpha-numerical order
-        file_list = []
-        for root, _, files in os.walk(folder_name):
-            for file in files:
-                file_path_in_folder = os.path.join(root, file)
-                arcname = os.path.relpath(file_path_in_folder, folder_name)
-                file_list.append((arcname, file_path_in_folder))
-                
-        # Sort the file list by arcname (alphabetical order)
-        file_list.sort(key=lambda x: x[0])
-        
-        with zipfile.ZipFile(file_path, 'w', zipfile.ZIP_DEFLATED) as zf:
-            for arcname, file_path_in_folder in file_list:
-                zf.write(file_path_in_folder, arcname)
+        # Step 1: Pick the cover: the first member that is not deleted or skipped
+        with zipfile.ZipFile(file_path, 'r') as zf:
+            cover = None
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                file = os.path.basename(info.filename)
+                ext = os.path.splitext(file)[1].lower()
+                if ext in deletedFiles:
+                    continue
+                if ext in skippedFiles or file == "ComicInfo.xml":
+                    app_logger.info(f"Skipping file: {info.filename}")
+                    continue
+                cover = info
+                break
+
+            if cover is None:
+                app_logger.info("No files found in the archive.")
+                return
+            cover_data = zf.read(cover)
 
-        app_logger.info(f"Successfully re-compressed: {file_path}")
+        # Step 2: Split the cover; only these two members are re-encoded
+        added = crop_cover_image(cover.filename, cover_data)
+
+        # Step 3: Copy every other page raw into the new archive in alpha-numerical order,
+        # dropping any file whose extension is in DELETED_FILES
+        def keep(info):
+            if info.header_offset == cover.header_offset:
+                return False
+            if os.path.splitext(info.filename)[1].lower() in deletedFiles:
+                app_logger.info(f"Removed {os.path.basename(info.filename)} file: {info.filename}")
+                return False
+            return True
+
+        rewrite_zip(file_path, keep=keep, add=added, sort=True)
+
+        app_logger.info(f"Successfully rewrote: {file_path}")
 
         # Regenerate thumbnail for the modified file
         try:
@@ -121,15 +122,29 @@ def handle_cbz_file(file_path):
         except Exception as e:
             app_logger.error(f"Error regenerating thumbnail: {e}")
 
-        # Step 7: Delete the .bak file
-        os.remove(bak_file_path)
-
     except Exception as e:
         app_logger.error(f"Failed to process {file_path}: {e}")
-    finally:
-        # Clean up the temporary folder
-        if os.path.exists(folder_name):
-            shutil.rmtree(folder_name)
+
+
+def crop_cover_image(arcname, data):
+    """
+    Split a cover image the same way as process_image().
+
+    :param arcname: Name of the cover inside the archive.
+    :param data: Bytes of the cover image.
+    :return: List of (arcname, bytes): the original as "<name>b<ext>" and
+             the right half as "<name>a<ext>".
+    """
+    file_name, file_extension = os.path.splitext(arcname)
+    with Image.open(io.BytesIO(data)) as img:
+        width, height = img.size
+        right_half_img = img.crop((width // 2, 0, width, height))
+        buffer = io.BytesIO()
+        right_half_img.save(buffer, format=img.format)
+
+    app_logger.info(f"Processed: {os.path.basename(arcname)} original saved as {file_name}b{file_extension}, "
+                    f"right half saved as {file_name}a{file_extension}.")
+    return [(f"{file_name}b{file_extension}", data), (f"{file_name}a{file_extension}", buffer.getvalue())]
 
 
 def process_image(directory: str) -> None:
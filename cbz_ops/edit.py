@@ -6,6 +6,7 @@ import base64
 from flask import render_template_string, request, jsonify
 from PIL import Image
 from app_logging import app_logger
+from archive_rewrite import repack_folder
 from config import config, load_config
 from helpers import create_thumbnail_streaming, safe_image_open
 import gc
@@ -205,11 +206,12 @@ def get_edit_modal(file_path):
 def save_cbz():
     """
     Processes the CBZ file by:
-      - Renaming the .zip file (created during extraction) to .bak (Step 5)
-      - Re-compressing the extracted folder (sorted) into a .cbz file (Step 6)
-      - Deleting the .bak file and cleaning up (Step 7)
+      - Packing the extracted folder (sorted) into the .cbz file, copying
+        files that were not edited raw from the .zip created during
+        extraction (Step 6)
+      - Deleting the .zip file and cleaning up (Steps 7-8)
     This function is meant to be used as a route handler and is imported in app.py.
-    Uses memory-efficient streaming compression.
+    Only new or edited images are compressed.
     """
     app_logger.info(f"Clean up and re-compressing the CBZ file.")
     folder_name = request.form.get('folder_name')
@@ -220,40 +222,19 @@ def save_cbz():
         return "Missing required data", 400
 
     try:
-        # Step 6: Rename the original .zip file to .bak.
-        bak_file_path = zip_file_path + '.bak'
-        os.rename(zip_file_path, bak_file_path)
+        # Step 6: Pack the folder contents into the .cbz file (sorted). Unchanged
+        # files are matched to their original members by size and CRC.
+        copied = repack_folder(folder_name, original_file_path, zip_file_path)
+        app_logger.info(f"Reused {copied} unchanged file(s) from {zip_file_path}")
         
-        # Step 7: Re-compress the folder contents into a .cbz file (sorted).
-        # Use streaming approach to avoid loading all files into memory
-        with zipfile.ZipFile(original_file_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=6) as cbz:
-            # Collect all files first
-            file_list = []
-            for root, _, files in os.walk(folder_name):
-                for file in files:
-                    full_path = os.path.join(root, file)
-                    rel_path = os.path.relpath(full_path, folder_name)
-                    file_list.append((rel_path, full_path))
-            
-            # Sort files for consistent ordering
-            file_list.sort(key=lambda x: x[0])
-            
-            # Add files to zip one by one
-            for rel_path, full_path in file_list:
-                try:
-                    cbz.write(full_path, rel_path)
-                except Exception as e:
-                    app_logger.warning(f"Failed to add {rel_path} to CBZ: {e}")
-                    continue
-        
-        # Step 8: Delete the .bak file.
+        # Step 7: Delete the original .zip file.
         try:
-            os.remove(bak_file_path)
-            app_logger.info(f"Deleted backup file: {bak_file_path}")
+            os.remove(zip_file_path)
+            app_logger.info(f"Deleted original archive: {zip_file_path}")
         except Exception as e:
-            app_logger.error(f"Error deleting backup file {bak_file_path}: {e}")
+            app_logger.error(f"Error deleting original archive {zip_file_path}: {e}")
         
-        # Step 9: Clean up the extracted folder(s).
+        # Step 8: Clean up the extracted folder(s).
         try:
             # Clean up the current folder (which might be a nested folder)
             if os.path.exists(folder_name):
@@ -2,6 +2,7 @@ from helpers import is_hidden
 from .enhance_single import enhance_comic
 import os
 from app_logging import app_logger
+from job_runner import run_jobs
 import sys
 
 
@@ -9,15 +10,20 @@ def enhance_directory(directory):
     """
     Processes all files (no subdirectories) in the given directory by calling
     enhance_comic(file_path) on each file. Only files directly in 'directory_path'
-    will be processed—no subdirectories are traversed.
+    will be processed—no subdirectories are traversed. Files are enhanced in
+    parallel through job_runner; a re-run after an interruption skips files
+    that were already enhanced.
     """
     # List all files in the directory (not diving into subdirectories).
+    file_paths = []
     for filename in os.listdir(directory):
         file_path = os.path.join(directory, filename)
         
         # Skip hidden files or directories. Then ensure we are only processing files.
         if not is_hidden(file_path) and os.path.isfile(file_path):
-            enhance_comic(file_path)
+            file_paths.append(file_path)
+
+    run_jobs(enhance_comic, file_paths, "enhance_dir", scope=directory)
 
 
 if __name__ == "__main__":
@@ -4,6 +4,7 @@ import os
 import zipfile
 import shutil
 from app_logging import app_logger
+from compression_policy import get_policy
 import sys
 from config import config, load_config
 import gc
@@ -180,7 +181,8 @@ def create_enhanced_cbz(extracted_dir, enhanced_cbz_path):
     Create enhanced CBZ file using streaming approach.
     """
     try:
-        with zipfile.ZipFile(enhanced_cbz_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=6) as cbz_file:
+        policy = get_policy(enhanced_cbz_path)
+        with zipfile.ZipFile(enhanced_cbz_path, 'w') as cbz_file:
             # Collect all files first
             file_list = []
             for root, _, files in os.walk(extracted_dir):
@@ -195,7 +197,7 @@ def create_enhanced_cbz(extracted_dir, enhanced_cbz_path):
             # Add files to zip one by one
             for relative_path, full_path in file_list:
                 try:
-                    cbz_file.write(full_path, relative_path)
+                    cbz_file.write(full_path, relative_path, **policy.options(relative_path))
                 except Exception as e:
                     app_logger.warning(f"Failed to add {relative_path} to CBZ: {e}")
                     continue
@@ -3,8 +3,10 @@ import sys
 import zipfile
 from pdf2image import convert_from_path, pdfinfo_from_path
 from app_logging import app_logger
+from compression_policy import get_policy
 from PIL import Image
 from helpers import is_hidden
+from job_runner import run_jobs
 import gc
 import tempfile
 import shutil
@@ -14,15 +16,14 @@ def scan_and_convert(directory):
     """
     Recursively scans a directory for PDF files, converts each PDF's pages to images, 
     organizes them into folders, and creates a CBZ file for each PDF.
-    Uses memory-efficient streaming and batch processing.
+    Uses memory-efficient streaming and batch processing; PDFs are converted
+    in parallel through job_runner.
 
     :param directory: Root directory to scan
     """
-    # Increase PIL's image pixel limit but still reasonable
-    Image.MAX_IMAGE_PIXELS = 500000000
-
     app_logger.info("********************// Convert All PDF to CBZ //********************")
 
+    pdf_paths = []
     for root, dirs, files in os.walk(directory):
         # Skip hidden directories.
         dirs[:] = [d for d in dirs if not is_hidden(os.path.join(root, d))]
@@ -33,15 +34,19 @@ def scan_and_convert(directory):
                 continue
 
             if file.lower().endswith('.pdf'):
-                process_pdf_file(file_path)
-                # Force garbage collection after each PDF
-                gc.collect()
+                pdf_paths.append(file_path)
+
+    # Each PDF is rendered in its own worker; process_pdf_file collects garbage per page batch
+    run_jobs(process_pdf_file, pdf_paths, "pdf", scope=directory)
 
 
 def process_pdf_file(pdf_path):
     """
     Process a single PDF file with memory-efficient streaming.
     """
+    # Increase PIL's image pixel limit but still reasonable (set here, as this runs in a worker)
+    Image.MAX_IMAGE_PIXELS = 500000000
+
     pdf_name = os.path.splitext(os.path.basename(pdf_path))[0]
     output_folder = os.path.join(os.path.dirname(pdf_path), pdf_name)
     cbz_path = os.path.join(os.path.dirname(pdf_path), f"{pdf_name}.cbz")
@@ -140,7 +145,8 @@ def create_cbz_file(output_folder, cbz_path):
     Create CBZ file using streaming approach to avoid loading all files into memory.
     """
     try:
-        with zipfile.ZipFile(cbz_path, 'w', zipfile.ZIP_STORED) as cbz:
+        policy = get_policy(cbz_path)
+        with zipfile.ZipFile(cbz_path, 'w') as cbz:
             # Walk through the folder and add files one by one
             for folder_root, _, folder_files in os.walk(output_folder):
                 for folder_file in folder_files:
@@ -148,7 +154,7 @@ def create_cbz_file(output_folder, cbz_path):
                     arcname = os.path.relpath(file_path_in_folder, output_folder)
                     
                     # Add file to zip without loading it entirely into memory
-                    cbz.write(file_path_in_folder, arcname)
+                    cbz.write(file_path_in_folder, arcname, **policy.options(arcname))
         
         app_logger.info(f"CBZ file created: {cbz_path}")
         
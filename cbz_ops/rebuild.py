@@ -4,9 +4,13 @@ import subprocess
 import zipfile
 import shutil
 import time
+from functools import partial
 from app_logging import app_logger
+from compression_policy import get_policy
+from archive_rewrite import rewrite_zip
 from config import config, load_config
 from helpers import is_hidden, extract_rar_with_unar
+from job_runner import run_jobs
 
 load_config()
 
@@ -87,8 +91,9 @@ def convert_single_rar_file(rar_path, zip_path, temp_extraction_dir):
         # Step 3: Create CBZ file with progress reporting
         app_logger.info(f"Step 3/3: Creating CBZ file...")
         processed_files = 0
+        policy = get_policy(zip_path)
         
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        with zipfile.ZipFile(zip_path, 'w') as zf:
             for extract_root, extract_dirs, extract_files in os.walk(temp_extraction_dir):
                 # Skip hidden directories within the extraction folder.
                 extract_dirs[:] = [d for d in extract_dirs if not is_hidden(os.path.join(extract_root, d))]
@@ -102,7 +107,6 @@ def convert_single_rar_file(rar_path, zip_path, temp_extraction_dir):
                     # Create ZipInfo manually to control the timestamp
                     # ZIP format requires dates >= 1980-01-01
                     zip_info = zipfile.ZipInfo(filename=arcname)
-                    zip_info.compress_type = zipfile.ZIP_DEFLATED
 
                     # Get file stats
                     file_stat = os.stat(file_path_inner)
@@ -117,7 +121,7 @@ def convert_single_rar_file(rar_path, zip_path, temp_extraction_dir):
 
                     # Write file with controlled timestamp
                     with open(file_path_inner, 'rb') as f:
-                        zf.writestr(zip_info, f.read())
+                        zf.writestr(zip_info, f.read(), **policy.options(arcname))
 
                     processed_files += 1
 
@@ -136,7 +140,8 @@ def convert_single_rar_file(rar_path, zip_path, temp_extraction_dir):
 
 def rebuild_single_cbz_file(cbz_path, directory):
     """
-    Rebuild a single CBZ file with progress reporting.
+    Rebuild a single CBZ file by copying its members' compressed bytes into
+    a fresh archive (see archive_rewrite.rewrite_zip).
     
     :param cbz_path: Path to the CBZ file
     :param directory: Directory containing the file
@@ -149,92 +154,12 @@ def rebuild_single_cbz_file(cbz_path, directory):
     
     if is_large_file:
         app_logger.info(f"Processing large file ({file_size_mb:.1f}MB): {filename}")
-        app_logger.info("This may take several minutes. Progress updates will be provided.")
     
     try:
-        # Step 1: Rename CBZ to ZIP
-        app_logger.info(f"Step 1/4: Preparing {filename} for rebuild...")
-        new_zip_file = os.path.join(directory, base_name + ".zip")
-        shutil.move(cbz_path, new_zip_file)
-        
-        # Step 2: Create extraction folder
-        app_logger.info(f"Step 2/4: Creating extraction folder...")
-        folder_path = os.path.join(directory, base_name)
-        os.makedirs(folder_path, exist_ok=True)
-        
-        # Step 3: Extract ZIP file
-        app_logger.info(f"Step 3/4: Extracting {filename}...")
-        with zipfile.ZipFile(new_zip_file, 'r') as zip_ref:
-            file_list = zip_ref.namelist()
-            total_files = len(file_list)
-            extracted_files = 0
-            
-            for file_info in zip_ref.infolist():
-                zip_ref.extract(file_info, folder_path)
-                extracted_files += 1
-                
-                # Progress reporting for large files
-                if is_large_file and extracted_files % max(1, total_files // 10) == 0:
-                    progress_percent = (extracted_files / total_files) * 100
-                    app_logger.info(f"Extraction progress: {progress_percent:.1f}% ({extracted_files}/{total_files} files)")
-        
-        # Step 4: Recompress to CBZ
-        app_logger.info(f"Step 4/4: Recompressing {filename}...")
-        bak_file = os.path.join(directory, base_name + ".bak")
-        shutil.move(new_zip_file, bak_file)
-        
-        cbz_file = os.path.join(directory, base_name + ".cbz")
-        with zipfile.ZipFile(cbz_file, 'w', zipfile.ZIP_DEFLATED) as zip_ref:
-            file_count = 0
-            total_files = 0
-
-            # Count total files first
-            for root, _, files in os.walk(folder_path):
-                total_files += len(files)
-
-            # Compress files with progress reporting
-            for root, _, files in os.walk(folder_path):
-                for file in files:
-                    file_full_path = os.path.join(root, file)
-                    arcname = os.path.relpath(file_full_path, folder_path)
-
-                    # Create ZipInfo manually to control the timestamp
-                    # ZIP format requires dates >= 1980-01-01
-                    zip_info = zipfile.ZipInfo(filename=arcname)
-                    zip_info.compress_type = zipfile.ZIP_DEFLATED
-
-                    # Get file stats
-                    file_stat = os.stat(file_full_path)
-                    file_time = time.localtime(file_stat.st_mtime)
-
-                    # Check if timestamp is before 1980
-                    if file_time.tm_year < 1980:
-                        # Use a safe default timestamp: 1980-01-01 00:00:00
-                        zip_info.date_time = (1980, 1, 1, 0, 0, 0)
-                    else:
-                        zip_info.date_time = file_time[:6]
-
-                    # Write file with controlled timestamp
-                    with open(file_full_path, 'rb') as f:
-                        zip_ref.writestr(zip_info, f.read())
-
-                    file_count += 1
-
-                    # Progress reporting for large files
-                    if is_large_file and file_count % max(1, total_files // 10) == 0:
-                        progress_percent = (file_count / total_files) * 100
-                        app_logger.info(f"Compression progress: {progress_percent:.1f}% ({file_count}/{total_files} files)")
-        
-        # Clean up
-        for root, dirs, files in os.walk(folder_path, topdown=False):
-            for file in files:
-                os.remove(os.path.join(root, file))
-            for dir in dirs:
-                os.rmdir(os.path.join(root, dir))
-        os.rmdir(folder_path)
-        
-        # Remove backup file
-        os.remove(bak_file)
+        # Copy every member's compressed bytes into a fresh archive; nothing is
+        # extracted or recompressed
+        app_logger.info(f"Rebuilding {filename}...")
+        rewrite_zip(cbz_path)
         
         app_logger.info(f"Successfully rebuilt: {filename}")
         return True
@@ -246,14 +171,7 @@ def rebuild_single_cbz_file(cbz_path, directory):
             
             # Rename the file back to .rar
             rar_file = os.path.join(directory, base_name + ".rar")
-            if os.path.exists(new_zip_file):
-                shutil.move(new_zip_file, rar_file)
-            elif os.path.exists(cbz_path):
-                shutil.move(cbz_path, rar_file)
-            
-            # Clean up any partial extraction folder
-            if os.path.exists(folder_path):
-                shutil.rmtree(folder_path)
+            shutil.move(cbz_path, rar_file)
             
             # Try to convert as RAR file
             temp_extraction_dir = os.path.join(directory, f"temp_{base_name}")
@@ -280,48 +198,56 @@ def rebuild_single_cbz_file(cbz_path, directory):
         return False
 
 
+def convert_rar_path(rar_path):
+    """
+    Convert one RAR/CBR file to a CBZ next to it and delete the original.
+    Runs inside a job_runner worker.
+
+    :param rar_path: Path to the RAR/CBR file
+    :return: The file name without extension if converted, otherwise None
+    """
+    directory, file_name = os.path.split(rar_path)
+    temp_extraction_dir = os.path.join(directory, f"temp_{file_name[:-4]}")
+    zip_path = os.path.join(directory, file_name[:-4] + '.cbz')
+
+    try:
+        if convert_single_rar_file(rar_path, zip_path, temp_extraction_dir):
+            # Delete the original RAR/CBR file.
+            os.remove(rar_path)
+            return file_name[:-4]
+        return None
+    finally:
+        # Clean up temp directory
+        if os.path.exists(temp_extraction_dir):
+            shutil.rmtree(temp_extraction_dir)
+
+
 def convert_rar_to_zip_in_directory(directory, total_files=None, processed_files=None):
     """
     Convert all RAR/CBR files in a directory to CBZ files using unar for extraction,
-    skipping hidden system files and directories.
+    skipping hidden system files and directories. Files are converted in
+    parallel through job_runner.
     
     :param directory: Path to the directory containing RAR/CBR files.
-    :param total_files: Total number of files to process (for progress tracking)
-    :param processed_files: Current processed count (for progress tracking)
+    :param total_files: Unused, kept for callers; job_runner reports progress
+    :param processed_files: Optional one-item list incremented by the number of files handled
     :return: List of successfully converted files (without extensions).
     """
     app_logger.info("********************// Rebuild ALL Files in Directory //********************")
     os.makedirs(directory, exist_ok=True)
-    converted_files = []
 
+    rar_paths = []
     for file_name in os.listdir(directory):
         file_path = os.path.join(directory, file_name)
         # Skip hidden files in the source directory.
-        if is_hidden(file_path):
-            continue
+        if not is_hidden(file_path) and file_name.lower().endswith(('.rar', '.cbr')):
+            rar_paths.append(file_path)
 
-        if file_name.lower().endswith(('.rar', '.cbr')):
-            if total_files and processed_files is not None:
-                processed_files[0] += 1
-            
-            rar_path = file_path
-            temp_extraction_dir = os.path.join(directory, f"temp_{file_name[:-4]}")
-            zip_path = os.path.join(directory, file_name[:-4] + '.cbz')
+    if processed_files is not None:
+        processed_files[0] += len(rar_paths)
 
-            app_logger.info(f"Processing file: {file_name} ({processed_files[0] if processed_files else '?'}/{total_files if total_files else '?'})")
-            
-            success = convert_single_rar_file(rar_path, zip_path, temp_extraction_dir)
-            
-            if success:
-                converted_files.append(file_name[:-4])  # Store the filename without extension.
-                # Delete the original RAR/CBR file.
-                os.remove(rar_path)
-            
-            # Clean up temp directory
-            if os.path.exists(temp_extraction_dir):
-                shutil.rmtree(temp_extraction_dir)
-
-    return converted_files
+    results = run_jobs(convert_rar_path, rar_paths, "rebuild-convert", scope=directory)
+    return [name for name in results if name]
 
 
 def rebuild_task(directory):
@@ -331,7 +257,6 @@ def rebuild_task(directory):
 
     # Count total files for progress tracking first
     total_rebuildable = count_rebuildable_files(directory)
-    processed_files = 0
     
     if total_rebuildable == 0:
         app_logger.info("No files found to rebuild.")
@@ -340,47 +265,33 @@ def rebuild_task(directory):
     app_logger.info(f"Found {total_rebuildable} files to process.")
     app_logger.info(f"Checking for rar/cbr files in directory: {directory}...")
 
-    converted_files = convert_rar_to_zip_in_directory(directory, total_rebuildable, [processed_files])
+    converted_files = convert_rar_to_zip_in_directory(directory, total_rebuildable, [0])
 
     app_logger.info(f"Rebuilding project in directory: {directory}...")
 
-    # Get CBZ files, but also check for any files that might have been renamed during processing
-    cbz_files = [f for f in os.listdir(directory) if f.lower().endswith(".cbz")]
-    total_files = len(cbz_files)
-    app_logger.info(f"Total .cbz files to process: {total_files}")
-
-    i = 1
-    while i <= total_files:
-        # Re-scan directory in case files were renamed during processing
-        current_cbz_files = [f for f in os.listdir(directory) if f.lower().endswith(".cbz")]
-        
-        if i > len(current_cbz_files):
-            break
-            
-        filename = current_cbz_files[i-1]
-        base_name, original_ext = os.path.splitext(filename)
-
+    cbz_paths = []
+    for filename in sorted(os.listdir(directory)):
+        if not filename.lower().endswith(".cbz"):
+            continue
+        file_path = os.path.join(directory, filename)
         # Skip files that were just converted
-        if base_name in converted_files:
+        if os.path.splitext(filename)[0] in converted_files:
             app_logger.info(f"Skipping rebuild for recently converted file: {filename}")
-            i += 1
             continue
-
-        file_path = os.path.join(directory, filename)
-        # Double-check if the file is hidden.
         if is_hidden(file_path):
             app_logger.info(f"Skipping hidden file: {file_path}")
-            i += 1
             continue
+        cbz_paths.append(file_path)
 
-        app_logger.info(f"Processing file: {filename} ({i}/{total_files})")
-        
-        success = rebuild_single_cbz_file(file_path, directory)
-        
+    app_logger.info(f"Total .cbz files to process: {len(cbz_paths)}")
+
+    # Each file keeps its name (a RAR posing as .cbz is converted back to the same .cbz),
+    # so the files can be rebuilt independently
+    results = run_jobs(partial(rebuild_single_cbz_file, directory=directory), cbz_paths,
+                       "rebuild", scope=directory)
+    for file_path, success in zip(cbz_paths, results):
         if not success:
-            app_logger.error(f"Failed to rebuild {filename}, continuing with next file...")
-        
-        i += 1
+            app_logger.error(f"Failed to rebuild {os.path.basename(file_path)}")
 
     app_logger.info(f"Rebuild completed in {directory}!")
 
@@ -1,10 +1,10 @@
 import os
 import sys
 import zipfile
-import shutil
 import re
 from PIL import Image, ImageFilter, features
 from app_logging import app_logger
+from archive_rewrite import rewrite_zip
 
 # Define supported image extensions
 SUPPORTED_IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.bmp', '.gif', '.png', '.webp']
@@ -45,7 +45,8 @@ def check_webp_support():
 
 def handle_cbz_file(file_path):
     """
-    Handle the conversion of a .cbz file: unzip, process images, compress, and clean up.
+    Handle the removal of the first image from a .cbz file. The remaining
+    images are copied into the rewritten archive as raw compressed bytes.
 
     :param file_path: Path to the .cbz file.
     :return: None
@@ -59,59 +60,44 @@ def handle_cbz_file(file_path):
         app_logger.info("Provided file is not a CBZ file.")
         return
 
-    base_name = os.path.splitext(file_path)[0]  # Removes the .cbz extension
-    zip_path = base_name + '.zip'
-    folder_name = base_name + '_folder'
-    
-    app_logger.info(f"Processing CBZ: {file_path} --> {zip_path}")
+    app_logger.info(f"Processing CBZ: {file_path}")
 
     try:
-        # Step 1: Rename .cbz to .zip
-        os.rename(file_path, zip_path)
+        # Step 1: Find the images in the archive that PIL can open
+        image_names = []
+        with zipfile.ZipFile(file_path, 'r') as zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                file_ext = os.path.splitext(info.filename)[1].lower()
+                app_logger.info(f"Processing file: {info.filename} (extension: {file_ext})")
+
+                if file_ext not in SUPPORTED_IMAGE_EXTENSIONS:
+                    app_logger.info(f"Skipping unsupported file type: {info.filename}")
+                    continue
+
+                # Test if we can actually open the image
+                try:
+                    with zf.open(info) as member, Image.open(member) as img:
+                        app_logger.info(f"Successfully verified image: {info.filename} (format: {img.format})")
+                except Exception as e:
+                    app_logger.warning(f"Cannot open image {info.filename} with PIL: {e}")
+                    continue
+                image_names.append(info.filename)
 
-        # Step 2: Create a folder with the file name
-        os.makedirs(folder_name, exist_ok=True)
+        if not image_names:
+            app_logger.info(f"No supported image files found in {file_path}.")
+            return
 
-        # Step 3: Unzip the .zip file contents into the folder
-        with zipfile.ZipFile(zip_path, 'r') as zf:
-            zf.extractall(folder_name)
-        
-        # Step 4: Process the extracted images
-        remove_first_image_file(folder_name)
-
-        # Optional: Apply image processing to all supported images
-        # Uncomment the following line if you want to process images
-        # process_images(folder_name)
-
-        # Step 5: Rename the original .zip file to .bak
-        bak_file_path = zip_path + '.bak'
-        os.rename(zip_path, bak_file_path)
-
-        # Step 6: Compress the folder contents back into a .cbz file
-        with zipfile.ZipFile(file_path, 'w', zipfile.ZIP_DEFLATED) as zf:
-            for root, _, files in os.walk(folder_name):
-                for file in files:
-                    file_ext = os.path.splitext(file)[1].lower()
-                    app_logger.info(f"Processing file: {file} (extension: {file_ext})")
-                    
-                    if file_ext in SUPPORTED_IMAGE_EXTENSIONS:
-                        file_path_in_folder = os.path.join(root, file)
-                        
-                        # Test if we can actually open the image
-                        try:
-                            with Image.open(file_path_in_folder) as img:
-                                app_logger.info(f"Successfully verified image: {file} (format: {img.format})")
-                        except Exception as e:
-                            app_logger.warning(f"Cannot open image {file} with PIL: {e}")
-                            continue
-                        
-                        arcname = os.path.relpath(file_path_in_folder, folder_name)
-                        zf.write(file_path_in_folder, arcname)
-                        app_logger.info(f"Added to archive: {file}")
-                    else:
-                        app_logger.info(f"Skipping unsupported file type: {file}")
+        # Step 2: Drop the first image in natural sort order (matches JavaScript sorting in index.js)
+        first_image = min(image_names, key=natural_sort_key)
+        kept = set(image_names) - {first_image}
+        app_logger.info(f"Removing: {first_image}")
 
-        app_logger.info(f"Successfully re-compressed: {file_path}")
+        # Step 3: Copy the remaining images into the new archive without recompressing them
+        rewrite_zip(file_path, keep=lambda info: info.filename in kept)
+
+        app_logger.info(f"Successfully rewrote: {file_path}")
 
         # Regenerate thumbnail for the modified file
         try:
@@ -164,15 +150,8 @@ def handle_cbz_file(file_path):
         except Exception as e:
             app_logger.error(f"Error regenerating thumbnail: {e}")
 
-        # Step 7: Delete the .bak file
-        os.remove(bak_file_path)
-
     except Exception as e:
         app_logger.error(f"Failed to process {file_path}: {e}")
-    finally:
-        # Clean up the temporary folder
-        if os.path.exists(folder_name):
-            shutil.rmtree(folder_name)
 
 def remove_first_image_file(dir_path):
     """
@@ -1,9 +1,13 @@
 import sys
 import os
 import re
+import threading
+import time
 import configparser
+from functools import partial
 from app_logging import app_logger
 from helpers import is_hidden
+from job_runner import run_jobs
 from config import config
 
 # -------------------------------------------------------------------
@@ -270,6 +274,10 @@ def _apply_filters(val: str, filters: list[str]) -> str:
             val = smart_title_case(val or '')
     return val
 
+_PLACEHOLDER_RE = re.compile(r"\{([^{}]+)\}")
+_EXT_SPLIT_RE = re.compile(r"^(.*)(\.\w+)$")
+
+
 def _format_from_groups(fmt: str, groups: dict[str, str]) -> str:
     def repl(m):
         spec = m.group(1)  # e.g. issue|digits|pad3
@@ -277,27 +285,22 @@ def _format_from_groups(fmt: str, groups: dict[str, str]) -> str:
         key, filters = parts[0], parts[1:]
         val = groups.get(key, "")
         return _apply_filters(val, filters)
-    return re.sub(r"\{([^{}]+)\}", repl, fmt).strip()
+    return _PLACEHOLDER_RE.sub(repl, fmt).strip()
 
-def try_rule_engine(filename: str, cfg_path="/config/rename_rules.ini"):
-    # Split ext safely in case rules don't capture it
-    m = re.match(r"^(.*)(\.\w+)$", filename)
-    if not m:
-        base, ext = filename, ""
-    else:
-        base, ext = m.group(1), m.group(2)
+_rules_lock = threading.Lock()
+_rules_cache = {}  # cfg_path -> ((mtime_ns, size), compiled rules)
 
-    if not os.path.exists(cfg_path):
-        return None
 
+def _compile_rules(cfg_path):
+    """Read and compile the [RENAME] rules of cfg_path, highest priority first."""
     cp = configparser.ConfigParser()
     try:
         cp.read(cfg_path)
     except Exception:
-        return None
+        return []
 
     if "RENAME" not in cp:
-        return None
+        return []
 
     rules = []
     for key in cp["RENAME"]:
@@ -313,12 +316,48 @@ def try_rule_engine(filename: str, cfg_path="/config/rename_rules.ini"):
             rules.append((prio, name, rx, output))
 
     rules.sort(reverse=True)  # highest prio first
+    return rules
+
+
+def load_rename_rules(cfg_path):
+    """
+    Compiled rules of a rename_rules.ini, cached until the file changes
+    (mtime or size), so renaming a directory reads and compiles them once.
+    """
+    if not os.path.exists(cfg_path):
+        return []
+    try:
+        st = os.stat(cfg_path)
+    except OSError:
+        return []
+    stamp = (st.st_mtime_ns, st.st_size)
+
+    with _rules_lock:
+        cached = _rules_cache.get(cfg_path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+
+    rules = _compile_rules(cfg_path)
+    with _rules_lock:
+        _rules_cache[cfg_path] = (stamp, rules)
+    return rules
+
+
+def try_rule_engine(filename: str, cfg_path="/config/rename_rules.ini"):
+    # Split ext safely in case rules don't capture it
+    m = _EXT_SPLIT_RE.match(filename)
+    if not m:
+        base, ext = filename, ""
+    else:
+        base, ext = m.group(1), m.group(2)
+
+    rules = load_rename_rules(cfg_path)
 
     for prio, name, rx, outfmt in rules:
         m = rx.match(filename) or rx.match(base)
         if not m:
             continue
-        app_logger.info(f"Rule {name} (priority {prio}) matched: {filename}")
+        app_logger.debug(f"Rule {name} (priority {prio}) matched: {filename}")
         g = m.groupdict()
 
         # ensure ext available
@@ -375,7 +414,7 @@ def load_custom_rename_config():
         from database import get_user_preference
         enabled = get_user_preference('enable_custom_rename', default=False)
         pattern = get_user_preference('custom_rename_pattern', default='')
-        app_logger.info(f"Loaded custom rename config: enabled={enabled}, pattern={pattern}")
+        app_logger.debug(f"Loaded custom rename config: enabled={enabled}, pattern={pattern}")
         return bool(enabled), pattern or ''
     except Exception as e:
         app_logger.warning(f"Failed to load custom rename config from DB: {e}")
@@ -884,7 +923,7 @@ def get_unique_filepath(file_path):
         counter += 1
 
 
-def get_renamed_filename(filename, file_path=None):
+def get_renamed_filename(filename, file_path=None, custom_config=None):
     """
     Given a single filename (no directory path):
       1) Check if custom rename pattern is enabled and try to apply it
@@ -901,16 +940,19 @@ def get_renamed_filename(filename, file_path=None):
       10) Next, try ISSUE_AFTER_YEAR_PATTERN for cases where the issue number follows the year.
       11) If that fails, try FALLBACK_PATTERN for just (YYYY).
       12) If none match, return None.
+
+    custom_config is the (enabled, pattern) tuple of load_custom_rename_config();
+    pass it when renaming many files so the preferences are read once.
     """
-    app_logger.info(f"Attempting to rename filename: {filename}")
+    app_logger.debug(f"Attempting to rename filename: {filename}")
 
     # ==========================================================
     # 0) Check for custom rename pattern (BEFORE all other logic)
     # ==========================================================
     try:
-        custom_enabled, custom_pattern = load_custom_rename_config()
+        custom_enabled, custom_pattern = custom_config or load_custom_rename_config()
         if custom_enabled and custom_pattern:
-            app_logger.info(f"Custom rename pattern enabled: {custom_pattern}")
+            app_logger.debug(f"Custom rename pattern enabled: {custom_pattern}")
             
             # Extract comic values from the filename
             comic_values = extract_comic_values(filename)
@@ -925,7 +967,7 @@ def get_renamed_filename(filename, file_path=None):
                 except Exception:
                     pass
 
-            app_logger.info(f"Extracted comic values: {comic_values}")
+            app_logger.debug(f"Extracted comic values: {comic_values}")
 
             # Apply custom pattern
             custom_result = apply_custom_pattern(comic_values, custom_pattern)
@@ -945,12 +987,12 @@ def get_renamed_filename(filename, file_path=None):
                 
                 new_filename = base_filename + extension
                 new_filename = clean_final_filename(new_filename)
-                app_logger.info(f"Custom rename result: {filename} -> {new_filename}")
+                app_logger.debug(f"Custom rename result: {filename} -> {new_filename}")
                 return new_filename
             else:
-                app_logger.info("Custom rename pattern failed, falling back to default logic")
+                app_logger.debug("Custom rename pattern failed, falling back to default logic")
         else:
-            app_logger.info("Custom rename pattern disabled or not configured, using default logic")
+            app_logger.debug("Custom rename pattern disabled or not configured, using default logic")
     except Exception as e:
         app_logger.warning(f"Error in custom rename logic: {e}, falling back to default logic")
 
@@ -966,7 +1008,7 @@ def get_renamed_filename(filename, file_path=None):
     # ==========================================================
     issue_year_paren_match = ISSUE_YEAR_PARENTHESES_PATTERN.match(filename)
     if issue_year_paren_match:
-        app_logger.info(f"Matched ISSUE_YEAR_PARENTHESES_PATTERN for: {filename}")
+        app_logger.debug(f"Matched ISSUE_YEAR_PARENTHESES_PATTERN for: {filename}")
         raw_title, issue_num, year, extra, extension = issue_year_paren_match.groups()
         clean_title = smart_title_case(raw_title.replace('_', ' ').strip())
         final_issue = norm_issue(issue_num)
@@ -980,7 +1022,7 @@ def get_renamed_filename(filename, file_path=None):
     # ==========================================================
     title_comma_year_issue_match = TITLE_COMMA_YEAR_ISSUE_PATTERN.match(filename)
     if title_comma_year_issue_match:
-        app_logger.info(f"Matched TITLE_COMMA_YEAR_ISSUE_PATTERN for: {filename}")
+        app_logger.debug(f"Matched TITLE_COMMA_YEAR_ISSUE_PATTERN for: {filename}")
         raw_title, year, issue_num, extra, extension = title_comma_year_issue_match.groups()
         clean_title = smart_title_case(raw_title.replace('_', ' ').strip())
 
@@ -1002,7 +1044,7 @@ def get_renamed_filename(filename, file_path=None):
     # ==========================================================
     title_comma_year_hash_issue_match = TITLE_COMMA_YEAR_HASH_ISSUE_PATTERN.match(filename)
     if title_comma_year_hash_issue_match:
-        app_logger.info(f"Matched TITLE_COMMA_YEAR_HASH_ISSUE_PATTERN for: {filename}")
+        app_logger.debug(f"Matched TITLE_COMMA_YEAR_HASH_ISSUE_PATTERN for: {filename}")
         raw_title, year, hash_issue_num, extra, extension = title_comma_year_hash_issue_match.groups()
         clean_title = smart_title_case(raw_title.replace('_', ' ').strip())
 
@@ -1020,7 +1062,7 @@ def get_renamed_filename(filename, file_path=None):
     # ==========================================================
     issue_after_year_match = ISSUE_AFTER_YEAR_PATTERN.match(filename)
     if issue_after_year_match:
-        app_logger.info(f"Matched ISSUE_AFTER_YEAR_PATTERN for: {filename}")
+        app_logger.debug(f"Matched ISSUE_AFTER_YEAR_PATTERN for: {filename}")
         raw_title, year, issue, extra, extension = issue_after_year_match.groups()
         clean_title = smart_title_case(raw_title.replace('_', ' ').strip())
         # Remove the # from the issue number and zero-pad
@@ -1035,7 +1077,7 @@ def get_renamed_filename(filename, file_path=None):
     # ==========================================================
     year_month_series_volume_issue_match = YEAR_MONTH_SERIES_VOLUME_ISSUE_PATTERN.match(filename)
     if year_month_series_volume_issue_match:
-        app_logger.info(f"Matched YEAR_MONTH_SERIES_VOLUME_ISSUE_PATTERN for: {filename}")
+        app_logger.debug(f"Matched YEAR_MONTH_SERIES_VOLUME_ISSUE_PATTERN for: {filename}")
         year_month, series_name, volume, issue_num, extension = year_month_series_volume_issue_match.groups()
 
         # Extract year from the first 4 digits of year_month
@@ -1059,7 +1101,7 @@ def get_renamed_filename(filename, file_path=None):
     # ==========================================================
     series_year_month_issue_match = SERIES_YEAR_MONTH_ISSUE_PATTERN.match(filename)
     if series_year_month_issue_match:
-        app_logger.info(f"Matched SERIES_YEAR_MONTH_ISSUE_PATTERN for: {filename}")
+        app_logger.debug(f"Matched SERIES_YEAR_MONTH_ISSUE_PATTERN for: {filename}")
         series_name, year, issue_num, extra, extension = series_year_month_issue_match.groups()
 
         # Clean the series name: underscores -> spaces, then strip, then title case
@@ -1077,7 +1119,7 @@ def get_renamed_filename(filename, file_path=None):
     # ==========================================================
     series_year_month_day_issue_match = SERIES_YEAR_MONTH_DAY_ISSUE_PATTERN.match(filename)
     if series_year_month_day_issue_match:
-        app_logger.info(f"Matched SERIES_YEAR_MONTH_DAY_ISSUE_PATTERN for: {filename}")
+        app_logger.debug(f"Matched SERIES_YEAR_MONTH_DAY_ISSUE_PATTERN for: {filename}")
         series_name, year, issue_num, extra, extension = series_year_month_day_issue_match.groups()
 
         # Clean the series name: underscores -> spaces, then strip, then title case
@@ -1097,7 +1139,7 @@ def get_renamed_filename(filename, file_path=None):
     # ==========================================================
     vol_issue_match = VOLUME_ISSUE_PATTERN.match(cleaned_filename)
     if vol_issue_match:
-        app_logger.info(f"Matched VOLUME_ISSUE_PATTERN for: {cleaned_filename}")
+        app_logger.debug(f"Matched VOLUME_ISSUE_PATTERN for: {cleaned_filename}")
         raw_title, volume_part, issue_part, middle, extension = vol_issue_match.groups()
 
         # Clean the title: underscores -> spaces, then strip, then title case
@@ -1134,7 +1176,7 @@ def get_renamed_filename(filename, file_path=None):
     # ==========================================================
     hash_match = ISSUE_HASH_PATTERN.match(cleaned_filename)
     if hash_match:
-        app_logger.info(f"Matched ISSUE_HASH_PATTERN for: {cleaned_filename}")
+        app_logger.debug(f"Matched ISSUE_HASH_PATTERN for: {cleaned_filename}")
         raw_title, issue_num, middle, extension = hash_match.groups()
 
         clean_title = smart_title_case(raw_title.replace('_', ' ').strip())
@@ -1159,7 +1201,7 @@ def get_renamed_filename(filename, file_path=None):
     # ==========================================================
     vol_subtitle_match = VOLUME_SUBTITLE_PATTERN.match(cleaned_filename)
     if vol_subtitle_match:
-        app_logger.info(f"Matched VOLUME_SUBTITLE_PATTERN for: {cleaned_filename}")
+        app_logger.debug(f"Matched VOLUME_SUBTITLE_PATTERN for: {cleaned_filename}")
         raw_title, volume_part, subtitle_part, extension = vol_subtitle_match.groups()
 
         # Clean the title: underscores -> spaces, then strip, then title case
@@ -1194,7 +1236,7 @@ def get_renamed_filename(filename, file_path=None):
     # ==========================================================
     series_match = SERIES_ISSUE_PATTERN.match(cleaned_filename)
     if series_match:
-        app_logger.info(f"Matched SERIES_ISSUE_PATTERN for: {cleaned_filename}")
+        app_logger.debug(f"Matched SERIES_ISSUE_PATTERN for: {cleaned_filename}")
         raw_title, series_num, issue_num, middle, extension = series_match.groups()
 
         # Keep the series number in the title, apply title case
@@ -1218,7 +1260,7 @@ def get_renamed_filename(filename, file_path=None):
     # ==========================================================
     issue_match = ISSUE_PATTERN.match(cleaned_filename)
     if issue_match:
-        app_logger.info(f"Matched ISSUE_PATTERN for: {cleaned_filename}")
+        app_logger.debug(f"Matched ISSUE_PATTERN for: {cleaned_filename}")
         raw_title, issue_part, middle, extension = issue_match.groups()
 
         # Clean the title: underscores -> spaces, then strip, then title case
@@ -1254,7 +1296,7 @@ def get_renamed_filename(filename, file_path=None):
     # ==========================================================
     title_year_match = TITLE_YEAR_PATTERN.match(cleaned_filename)
     if title_year_match:
-        app_logger.info(f"Matched TITLE_YEAR_PATTERN for: {cleaned_filename}")
+        app_logger.debug(f"Matched TITLE_YEAR_PATTERN for: {cleaned_filename}")
         raw_title, found_year, _, extension = title_year_match.groups()
         clean_title = smart_title_case(raw_title.replace('_', ' ').strip())
         # Remove any trailing opening parenthesis that might have been captured
@@ -1267,7 +1309,7 @@ def get_renamed_filename(filename, file_path=None):
     # ==========================================================
     fallback_match = FALLBACK_PATTERN.match(cleaned_filename)
     if fallback_match:
-        app_logger.info(f"Matched FALLBACK_PATTERN for: {cleaned_filename}")
+        app_logger.debug(f"Matched FALLBACK_PATTERN for: {cleaned_filename}")
         raw_title, found_year, _, extension = fallback_match.groups()
         clean_title = smart_title_case(raw_title.replace('_', ' ').strip())
         new_filename = f"{clean_title} ({found_year}){extension}"
@@ -1276,87 +1318,173 @@ def get_renamed_filename(filename, file_path=None):
     # ==========================================================
     # 12) No match => return None
     # ==========================================================
-    app_logger.info(f"No pattern matched for: {filename}")
+    app_logger.debug(f"No pattern matched for: {filename}")
     return None
 
 
-def rename_files(directory):
-    """
-    Walk through the given directory (including subdirectories) and rename
-    all files that match the patterns above, skipping hidden files.
+def _plan_rename(old_path, custom_config=None):
+    """New file name for old_path (None if no pattern matched). Runs on a job_runner thread."""
+    return get_renamed_filename(os.path.basename(old_path), file_path=old_path, custom_config=custom_config)
+
+
+def _unique_planned_path(file_path, occupied):
+    """Like get_unique_filepath(), but against the planned set of paths."""
+    if file_path not in occupied:
+        return file_path
+    name, ext = os.path.splitext(file_path)
+    counter = 1
+    while f"{name} ({counter}){ext}" in occupied:
+        counter += 1
+    return f"{name} ({counter}){ext}"
+
+
+def plan_renames(directory, custom_config=None):
     """
+    Work out the renames for every file under directory without touching it.
 
-    app_logger.info("********************// Rename Directory Files //********************")
-    app_logger.info(f"Starting rename process for directory: {directory}")
-    app_logger.info(f"Current working directory: {os.getcwd()}")
-    #app_logger.info(f"Directory exists: {os.path.exists(directory)}")
-    #app_logger.info(f"Directory is directory: {os.path.isdir(directory)}")
-    
-    files_processed = 0
-    files_renamed = 0
+    New names are worked out in parallel on threads (custom patterns may read
+    ComicInfo.xml from each file) with the rename rules and custom pattern
+    loaded once. Collisions are resolved in walk order, the way renaming the
+    files one by one would: a target that exists, or that an earlier file
+    takes, gets a " (n)" suffix.
+
+    Args:
+        directory: Directory to walk (hidden files and folders are skipped)
+        custom_config: (enabled, pattern); default read from the preferences
+
+    Returns:
+        List of dicts with old_path, new_path (None unless status is 'rename'),
+        status ('rename', 'unchanged' or 'unmatched') and collision (True when
+        a suffix was added)
+    """
+    if custom_config is None:
+        custom_config = load_custom_rename_config()
 
+    old_paths = []
+    occupied = set()
     for subdir, dirs, files in os.walk(directory):
         # Skip hidden directories.
         dirs[:] = [d for d in dirs if not is_hidden(os.path.join(subdir, d))]
-        #app_logger.info(f"Processing subdirectory: {subdir} with {len(files)} files")
-        
-        # List all files in this subdirectory
-        #for filename in files:
-            #app_logger.info(f"Found file: {filename} in {subdir}")
-        
+
         for filename in files:
-            files_processed += 1
             old_path = os.path.join(subdir, filename)
-            
-            app_logger.info(f"Processing file: {filename}")
-            #app_logger.info(f"Full old path: {old_path}")
-            #app_logger.info(f"File exists: {os.path.exists(old_path)}")
-            #app_logger.info(f"File size: {os.path.getsize(old_path) if os.path.exists(old_path) else 'N/A'}")
-            
-            # Skip hidden files.
-            if is_hidden(old_path):
-                app_logger.info(f"Skipping hidden file: {old_path}")
-                continue
+            occupied.add(old_path)
+            if not is_hidden(old_path):
+                old_paths.append(old_path)
+
+    new_names = run_jobs(partial(_plan_rename, custom_config=custom_config), old_paths, "rename",
+                         scope=directory, use_processes=False, resume=False)
+
+    plans = []
+    for old_path, new_name in zip(old_paths, new_names):
+        subdir, filename = os.path.split(old_path)
+        plan = {'old_path': old_path, 'new_path': None, 'status': 'unmatched', 'collision': False}
+        if new_name and new_name != filename:
+            target = os.path.join(subdir, new_name)
+            new_path = _unique_planned_path(target, occupied)
+            occupied.discard(old_path)
+            occupied.add(new_path)
+            plan.update(new_path=new_path, status='rename', collision=new_path != target)
+        elif new_name:
+            plan['status'] = 'unchanged'
+        plans.append(plan)
+    return plans
+
+
+def apply_renames(plans):
+    """
+    Carry out the 'rename' entries of plan_renames() in order, then update
+    the file index for all of them in one transaction.
 
-            app_logger.info(f"Processing file: {filename}")
-            new_name = get_renamed_filename(filename, file_path=old_path)
+    A target that appeared on disk since planning gets a " (n)" suffix; the
+    plan's new_path is updated to the name actually used.
 
-            if new_name and new_name != filename:
-                new_path = os.path.join(subdir, new_name)
+    Returns:
+        List of (old_path, new_path) tuples of the files renamed
+    """
+    from database import rename_file_index_entries
 
-                # Check if target file already exists and generate unique filename if needed
-                original_new_path = new_path
-                new_path = get_unique_filepath(new_path)
+    renamed = []
+    for plan in plans:
+        if plan['status'] != 'rename':
+            continue
+        old_path, new_path = plan['old_path'], plan['new_path']
+        if os.path.exists(new_path):
+            new_path = get_unique_filepath(new_path)
+            app_logger.warning(f"{plan['new_path']} appeared since planning, renaming to {new_path}")
+            plan.update(new_path=new_path, collision=True)
+        try:
+            os.rename(old_path, new_path)
+            renamed.append((old_path, new_path))
+            app_logger.debug(f"Renamed {old_path} -> {new_path}")
+        except OSError as e:
+            app_logger.error(f"Failed to rename {os.path.basename(old_path)}: {e}")
+
+    if renamed:
+        rename_file_index_entries(renamed)
+    return renamed
 
-                if new_path != original_new_path:
-                    app_logger.warning(f"File already exists at destination. Using unique filename to prevent overwrite.")
-                    app_logger.info(f"Original target: {original_new_path}")
-                    app_logger.info(f"New target: {new_path}")
 
-                app_logger.info(f"Renaming:\n  {old_path}\n  --> {new_path}\n")
-                try:
-                    os.rename(old_path, new_path)
-                    files_renamed += 1
-                    #app_logger.info(f"Successfully renamed: {filename} -> {new_name}")
-                    
-                    # Verify the rename actually happened
-                    if os.path.exists(new_path) and not os.path.exists(old_path):
-                        app_logger.info(f"Rename verification successful: new file exists, old file removed")
-                    else:
-                        app_logger.warning(f"Rename verification failed: new file exists: {os.path.exists(new_path)}, old file exists: {os.path.exists(old_path)}")
-                        
-                except Exception as e:
-                    app_logger.error(f"Failed to rename {filename}: {e}")
-            else:
-                if new_name is None:
-                    app_logger.info(f"No rename pattern matched for: {filename}")
-                else:
-                    app_logger.info(f"No change needed for: {filename}")
-    
-    app_logger.info(f"Rename process complete. Processed {files_processed} files, renamed {files_renamed} files.")
+def rename_files(directory):
+    """
+    Walk through the given directory (including subdirectories) and rename
+    all files that match the patterns above, skipping hidden files.
+
+    The renames are planned for the whole tree first (plan_renames), then
+    applied as one batch (apply_renames).
+    """
+
+    app_logger.info("********************// Rename Directory Files //********************")
+    app_logger.info(f"Starting rename process for directory: {directory}")
+
+    plans = plan_renames(directory)
+    collisions = sum(1 for plan in plans if plan['collision'])
+    if collisions:
+        app_logger.warning(f"{collisions} target names already taken; adding (n) suffixes to prevent overwrites")
+
+    files_renamed = len(apply_renames(plans))
+
+    app_logger.info(f"Rename process complete. Processed {len(plans)} files, renamed {files_renamed} files.")
     return files_renamed
 
 
+def benchmark_rename(filenames, custom_config=(False, "")):
+    """
+    Time the rename engine on a corpus of file names; no files are touched.
+
+    Args:
+        filenames: File names (not paths), e.g. from benchmark_library()
+        custom_config: (enabled, pattern) to benchmark; default the built-in patterns
+
+    Returns:
+        Dict with 'files', 'matched', 'changed', 'seconds' and 'files_per_second'
+    """
+    filenames = list(filenames)
+    matched = changed = 0
+    start = time.perf_counter()
+    for filename in filenames:
+        new_name = get_renamed_filename(filename, custom_config=custom_config)
+        if new_name:
+            matched += 1
+            changed += new_name != filename
+    seconds = time.perf_counter() - start
+
+    return {
+        'files': len(filenames),
+        'matched': matched,
+        'changed': changed,
+        'seconds': round(seconds, 4),
+        'files_per_second': round(len(filenames) / seconds) if seconds else 0,
+    }
+
+
+def benchmark_library(root):
+    """Run benchmark_rename() on the names of every file under root."""
+    return benchmark_rename(
+        filename for _, _, files in os.walk(root) for filename in files
+    )
+
+
 def rename_file(file_path):
     """
     Renames a single file if it matches either pattern using the logic
@@ -1507,6 +1635,14 @@ if __name__ == "__main__":
         test_parentheses_cleaning()
         print()
         test_custom_rename()
+    elif sys.argv[1] == "--benchmark" and len(sys.argv) > 2:
+        report = benchmark_library(sys.argv[2])
+        print(f"Rename benchmark: {report['files']} files in {report['seconds']}s "
+              f"({report['files_per_second']} files/s), {report['matched']} matched, {report['changed']} changed")
+    elif sys.argv[1] == "--dry-run" and len(sys.argv) > 2:
+        for plan in plan_renames(sys.argv[2]):
+            if plan['status'] == 'rename':
+                print(f"{plan['old_path']}\n  --> {plan['new_path']}{'  (collision)' if plan['collision'] else ''}")
     else:
         directory = sys.argv[1]
         rename_files(directory)
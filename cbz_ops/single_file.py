@@ -5,6 +5,8 @@ import zipfile
 import shutil
 import time
 from app_logging import app_logger
+from compression_policy import get_policy
+from archive_rewrite import rewrite_zip
 from config import config, load_config
 from helpers import extract_rar_with_unar
 
@@ -64,8 +66,9 @@ def convert_single_rar_file(rar_path, cbz_path, temp_extraction_dir):
         # Step 3: Create CBZ file with progress reporting
         app_logger.info(f"Step 3/3: Creating CBZ file...")
         processed_files = 0
+        policy = get_policy(cbz_path)
         
-        with zipfile.ZipFile(cbz_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        with zipfile.ZipFile(cbz_path, 'w') as zf:
             for extract_root, extract_dirs, extract_files in os.walk(temp_extraction_dir):
                 for extract_file in extract_files:
                     file_path_inner = os.path.join(extract_root, extract_file)
@@ -74,7 +77,6 @@ def convert_single_rar_file(rar_path, cbz_path, temp_extraction_dir):
                     # Create ZipInfo manually to control the timestamp
                     # ZIP format requires dates >= 1980-01-01
                     zip_info = zipfile.ZipInfo(filename=arcname)
-                    zip_info.compress_type = zipfile.ZIP_DEFLATED
 
                     # Get file stats
                     file_stat = os.stat(file_path_inner)
@@ -89,7 +91,7 @@ def convert_single_rar_file(rar_path, cbz_path, temp_extraction_dir):
 
                     # Write file with controlled timestamp
                     with open(file_path_inner, 'rb') as f:
-                        zf.writestr(zip_info, f.read())
+                        zf.writestr(zip_info, f.read(), **policy.options(arcname))
 
                     processed_files += 1
 
@@ -151,7 +153,8 @@ def convert_single_rar_file(rar_path, cbz_path, temp_extraction_dir):
 
 def rebuild_single_cbz_file(cbz_path):
     """
-    Rebuild a single CBZ file with progress reporting.
+    Rebuild a single CBZ file by copying its members' compressed bytes into
+    a fresh archive (see archive_rewrite.rewrite_zip).
     
     :param cbz_path: Path to the CBZ file
     :return: bool: True if rebuild was successful
@@ -160,89 +163,16 @@ def rebuild_single_cbz_file(cbz_path):
     is_large_file = file_size_mb > (LARGE_FILE_THRESHOLD / (1024 * 1024))
     filename = os.path.basename(cbz_path)
     base_name = os.path.splitext(filename)[0]
+    directory = os.path.dirname(cbz_path)
     
     if is_large_file:
         app_logger.info(f"Processing large file ({file_size_mb:.1f}MB): {filename}")
-        app_logger.info("This may take several minutes. Progress updates will be provided.")
     
     try:
-        # Step 1: Rename CBZ to ZIP
-        app_logger.info(f"Step 1/4: Preparing {filename} for rebuild...")
-        directory = os.path.dirname(cbz_path)
-        zip_path = os.path.join(directory, base_name + '.zip')
-        shutil.move(cbz_path, zip_path)
-        
-        # Step 2: Create extraction folder
-        app_logger.info(f"Step 2/4: Creating extraction folder...")
-        folder_name = os.path.join(directory, base_name + '_folder')
-        os.makedirs(folder_name, exist_ok=True)
-        
-        # Step 3: Extract ZIP file
-        app_logger.info(f"Step 3/4: Extracting {filename}...")
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            file_list = zip_ref.namelist()
-            total_files = len(file_list)
-            extracted_files = 0
-            
-            for file_info in zip_ref.infolist():
-                zip_ref.extract(file_info, folder_name)
-                extracted_files += 1
-                
-                # Progress reporting for large files
-                if is_large_file and extracted_files % max(1, total_files // 10) == 0:
-                    progress_percent = (extracted_files / total_files) * 100
-                    app_logger.info(f"Extraction progress: {progress_percent:.1f}% ({extracted_files}/{total_files} files)")
-        
-        # Step 4: Recompress to CBZ
-        app_logger.info(f"Step 4/4: Recompressing {filename}...")
-        bak_file_path = zip_path + '.bak'
-        shutil.move(zip_path, bak_file_path)
-        
-        with zipfile.ZipFile(cbz_path, 'w', zipfile.ZIP_DEFLATED) as zf:
-            file_count = 0
-            total_files = 0
-
-            # Count total files first
-            for root, _, files in os.walk(folder_name):
-                total_files += len(files)
-
-            # Compress files with progress reporting
-            for root, _, files in os.walk(folder_name):
-                for file in files:
-                    file_path_in_folder = os.path.join(root, file)
-                    arcname = os.path.relpath(file_path_in_folder, folder_name)
-
-                    # Create ZipInfo manually to control the timestamp
-                    # ZIP format requires dates >= 1980-01-01
-                    zip_info = zipfile.ZipInfo(filename=arcname)
-                    zip_info.compress_type = zipfile.ZIP_DEFLATED
-
-                    # Get file stats
-                    file_stat = os.stat(file_path_in_folder)
-                    file_time = time.localtime(file_stat.st_mtime)
-
-                    # Check if timestamp is before 1980
-                    if file_time.tm_year < 1980:
-                        # Use a safe default timestamp: 1980-01-01 00:00:00
-                        zip_info.date_time = (1980, 1, 1, 0, 0, 0)
-                    else:
-                        zip_info.date_time = file_time[:6]
-
-                    # Write file with controlled timestamp
-                    with open(file_path_in_folder, 'rb') as f:
-                        zf.writestr(zip_info, f.read())
-
-                    file_count += 1
-
-                    # Progress reporting for large files
-                    if is_large_file and file_count % max(1, total_files // 10) == 0:
-                        progress_percent = (file_count / total_files) * 100
-                        app_logger.info(f"Compression progress: {progress_percent:.1f}% ({file_count}/{total_files} files)")
-        
-        # Clean up
-        os.remove(bak_file_path)
-        if os.path.exists(folder_name):
-            shutil.rmtree(folder_name)
+        # Copy every member's compressed bytes into a fresh archive; nothing is
+        # extracted or recompressed
+        app_logger.info(f"Rebuilding {filename}...")
+        rewrite_zip(cbz_path)
         
         app_logger.info(f"Successfully rebuilt: {filename}")
         
@@ -297,14 +227,7 @@ def rebuild_single_cbz_file(cbz_path):
 
             # Rename the file to .rar
             rar_file = os.path.join(directory, base_name + ".rar")
-            if os.path.exists(zip_path):
-                shutil.move(zip_path, rar_file)
-            elif os.path.exists(cbz_path):
-                shutil.move(cbz_path, rar_file)
-
-            # Clean up any partial extraction folder
-            if os.path.exists(folder_name):
-                shutil.rmtree(folder_name)
+            shutil.move(cbz_path, rar_file)
 
             # Try to convert as RAR file
             temp_extraction_dir = os.path.join(directory, f"temp_{base_name}")
@@ -398,13 +321,14 @@ def convert_to_cbz(file_path):
             # Update file index: remove old CBR entry and add new CBZ entry
             try:
                 delete_file_index_entry(file_path)
-                file_size = os.path.getsize(cbz_file_path) if os.path.exists(cbz_file_path) else None
+                file_stat = os.stat(cbz_file_path) if os.path.exists(cbz_file_path) else None
                 add_file_index_entry(
                     name=os.path.basename(cbz_file_path),
                     path=cbz_file_path,
                     entry_type='file',
-                    size=file_size,
-                    parent=parent_dir
+                    size=file_stat.st_size if file_stat else None,
+                    parent=parent_dir,
+                    modified_at=file_stat.st_mtime if file_stat else None
                 )
                 app_logger.info(f"Updated file index: removed CBR, added CBZ")
             except Exception as index_error:
@@ -2,9 +2,11 @@ import os
 import sys
 import re
 import zipfile
+import rarfile
 import xml.etree.ElementTree as ET
 import defusedxml.ElementTree as SafeET
 from app_logging import app_logger
+from archive_rewrite import write_zip_member
 from config import config, load_config
 
 load_config()
@@ -264,6 +266,28 @@ def read_comicinfo_from_zip(zip_path: str) -> dict:
         return {}
 
 
+def read_comicinfo_from_archive(archive_path: str) -> dict:
+    """
+    Reads ComicInfo.xml from a .cbz/.zip or .cbr/.rar archive and returns the
+    parsed data as a dict. If ComicInfo.xml does not exist, returns an empty dict.
+
+    :param archive_path: Path to the archive.
+    :return:             Dictionary of ComicInfo.xml data (tags -> text).
+    """
+    _, ext = os.path.splitext(archive_path)
+    if ext.lower() in ['.zip', '.cbz']:
+        return read_comicinfo_from_zip(archive_path)
+    if ext.lower() not in ['.rar', '.cbr']:
+        raise ValueError("Only .zip, .cbz, .rar or .cbr files are supported by this function.")
+
+    with rarfile.RarFile(archive_path, 'r') as archive:
+        # RAR tools are less consistent about the member name's case
+        name = next((n for n in archive.namelist() if n.lower() == 'comicinfo.xml'), None)
+        if name is None:
+            return {}
+        return read_comicinfo_xml(archive.read(name))
+
+
 def update_comicinfo_xml(xml_data: bytes, updates: dict) -> bytes:
     """
     Given the raw bytes of a ComicInfo.xml file (xml_data) and a dict (updates),
@@ -301,9 +325,9 @@ def update_comicinfo_xml(xml_data: bytes, updates: dict) -> bytes:
 
 def update_comicinfo_in_zip(zip_path: str, updates: dict):
     """
-    Updates the 'ComicInfo.xml' entry in a ZIP or CBZ without extracting
-    all files to disk. Internally, this still rebuilds the ZIP because
-    in-place edits aren't supported by the ZIP format.
+    Updates the 'ComicInfo.xml' entry in a ZIP or CBZ. The updated XML is
+    appended and only the central directory is rewritten; page data is not
+    read or recompressed (see archive_rewrite.write_zip_member).
 
     :param zip_path: Path to the .zip or .cbz file.
     :param updates:  Dict of XML tag -> new value, e.g. {'Title': 'Updated Title'}.
@@ -311,28 +335,14 @@ def update_comicinfo_in_zip(zip_path: str, updates: dict):
     _, ext = os.path.splitext(zip_path)
     if ext.lower() not in ['.zip', '.cbz']:
         raise ValueError("Only .zip or .cbz files are supported by this function.")
-    
-    temp_zip_path = zip_path + ".tmpzip"
-
-    with zipfile.ZipFile(zip_path, 'r') as old_zip, \
-         zipfile.ZipFile(temp_zip_path, 'w', compression=zipfile.ZIP_DEFLATED) as new_zip:
-
-        for item in old_zip.infolist():
-            if item.filename == "ComicInfo.xml":
-                # 1. Read the XML data from the old zip
-                xml_data = old_zip.read(item.filename)
 
-                # 2. Pass it to our separate function for updates
-                updated_xml_data = update_comicinfo_xml(xml_data, updates)
-
-                # 3. Write the updated file into the new zip
-                new_zip.writestr(item, updated_xml_data)
-            else:
-                # Copy all other files as-is
-                new_zip.writestr(item, old_zip.read(item.filename))
+    with zipfile.ZipFile(zip_path, 'r') as zf:
+        if "ComicInfo.xml" not in zf.namelist():
+            return
+        xml_data = zf.read("ComicInfo.xml")
 
-    # Replace the original ZIP/CBZ with the updated one
-    os.replace(temp_zip_path, zip_path)
+    updated_xml_data = update_comicinfo_xml(xml_data, updates)
+    write_zip_member(zip_path, "ComicInfo.xml", updated_xml_data)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,207 @@
+"""
+compression_policy.py - Per-library compression choices for CBZ writers
+
+Comic pages are JPEG/PNG/WebP files that are already compressed; deflating
+them burns CPU for about 1% smaller archives. A policy maps each member type
+to a ZIP method and level:
+1. auto    - store already-compressed images, deflate text and everything else (default)
+2. deflate - deflate every member (what the writers used to do)
+3. store   - store every member
+
+The default comes from SETTINGS/CBZ_COMPRESSION; a library can override it
+with its compression_policy column. benchmark_policies() compresses a sample
+of a library's archives under each policy and reports CPU time and bytes
+saved, so the choice can be made on real data.
+
+Usage:
+    python -m compression_policy /data/comics [sample_size]
+"""
+
+import os
+import random
+import sys
+import time
+import zipfile
+import zlib
+from dataclasses import dataclass
+
+from app_logging import app_logger
+from config import config
+
+DEFAULT_POLICY = 'auto'
+DEFAULT_DEFLATE_LEVEL = 6
+DEFAULT_SAMPLE_SIZE = 20
+
+# Formats that carry their own compression; deflate gains almost nothing on them
+COMPRESSED_IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.avif', '.jxl', '.heic', '.heif'}
+TEXT_EXTENSIONS = {'.xml', '.txt', '.json', '.nfo', '.sfv', '.htm', '.html', '.md', '.csv'}
+
+_STORE = (zipfile.ZIP_STORED, None)
+_DEFLATE = (zipfile.ZIP_DEFLATED, DEFAULT_DEFLATE_LEVEL)
+
+# policy name -> member type -> (compress_type, compresslevel)
+POLICIES = {
+    'auto': {'image': _STORE, 'text': _DEFLATE, 'other': _DEFLATE},
+    'deflate': {'image': _DEFLATE, 'text': _DEFLATE, 'other': _DEFLATE},
+    'store': {'image': _STORE, 'text': _STORE, 'other': _STORE},
+}
+
+ARCHIVE_EXTENSIONS = ('.cbz', '.zip')
+
+
+def member_type(arcname):
+    """Classify an archive member as 'image', 'text' or 'other' by extension."""
+    ext = os.path.splitext(arcname)[1].lower()
+    if ext in COMPRESSED_IMAGE_EXTENSIONS:
+        return 'image'
+    if ext in TEXT_EXTENSIONS:
+        return 'text'
+    return 'other'
+
+
+@dataclass(frozen=True)
+class CompressionPolicy:
+    """A named entry of POLICIES."""
+    name: str = DEFAULT_POLICY
+
+    def method(self, arcname):
+        """(compress_type, compresslevel) for a member name."""
+        return POLICIES[self.name][member_type(arcname)]
+
+    def options(self, arcname):
+        """Keyword arguments for ZipFile.write() / ZipFile.writestr()."""
+        compress_type, compresslevel = self.method(arcname)
+        return {'compress_type': compress_type, 'compresslevel': compresslevel}
+
+
+def get_policy(path=None):
+    """
+    Resolve the policy for an archive path.
+
+    Args:
+        path: Archive (or directory) being written; used to find its library
+
+    Returns:
+        CompressionPolicy of the library containing path if it sets one,
+        otherwise the SETTINGS/CBZ_COMPRESSION default
+    """
+    name = None
+    if path:
+        from helpers.library import get_library_for_path
+        library = get_library_for_path(path)
+        if library:
+            name = library.get('compression_policy')
+    if not name:
+        name = config.get("SETTINGS", "CBZ_COMPRESSION", fallback=DEFAULT_POLICY)
+
+    name = (name or '').strip().lower()
+    if name not in POLICIES:
+        app_logger.warning(f"Unknown compression policy '{name}', using '{DEFAULT_POLICY}'")
+        name = DEFAULT_POLICY
+    return CompressionPolicy(name)
+
+
+def _compressed_size(data, compress_type, compresslevel):
+    if compress_type == zipfile.ZIP_STORED:
+        return len(data)
+    # Raw deflate stream, as zipfile writes it
+    compressor = zlib.compressobj(compresslevel or DEFAULT_DEFLATE_LEVEL, zlib.DEFLATED, -15)
+    return len(compressor.compress(data)) + len(compressor.flush())
+
+
+def sample_archives(root, sample_size=DEFAULT_SAMPLE_SIZE, seed=None):
+    """
+    Pick up to sample_size CBZ/ZIP files under root (reservoir sampling).
+
+    Args:
+        root: Directory to walk
+        sample_size: Number of archives to return
+        seed: Optional random seed for a repeatable sample
+
+    Returns:
+        List of archive paths
+    """
+    rng = random.Random(seed)
+    sample = []
+    seen = 0
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+        for filename in filenames:
+            if filename.startswith('.') or not filename.lower().endswith(ARCHIVE_EXTENSIONS):
+                continue
+            seen += 1
+            path = os.path.join(dirpath, filename)
+            if len(sample) < sample_size:
+                sample.append(path)
+            else:
+                slot = rng.randrange(seen)
+                if slot < sample_size:
+                    sample[slot] = path
+    return sample
+
+
+def benchmark_policies(paths, policies=None):
+    """
+    Compress every member of the given archives under each policy.
+
+    Args:
+        paths: Archive paths (e.g. from sample_archives())
+        policies: Policy names to compare (default: all)
+
+    Returns:
+        Dict with 'archives', 'members', 'original_bytes' and 'policies':
+        policy name -> {'cpu_seconds', 'compressed_bytes', 'bytes_saved', 'saved_percent'}
+    """
+    policies = list(policies or POLICIES)
+    totals = {name: {'cpu_seconds': 0.0, 'compressed_bytes': 0} for name in policies}
+    archives = members = original_bytes = 0
+
+    for path in paths:
+        try:
+            with zipfile.ZipFile(path, 'r') as zf:
+                for info in zf.infolist():
+                    if info.is_dir():
+                        continue
+                    data = zf.read(info)
+                    kind = member_type(info.filename)
+                    members += 1
+                    original_bytes += len(data)
+                    for name in policies:
+                        compress_type, compresslevel = POLICIES[name][kind]
+                        start = time.process_time()
+                        size = _compressed_size(data, compress_type, compresslevel)
+                        totals[name]['cpu_seconds'] += time.process_time() - start
+                        totals[name]['compressed_bytes'] += size
+            archives += 1
+        except (zipfile.BadZipFile, OSError) as e:
+            app_logger.warning(f"Skipping {path} in compression benchmark: {e}")
+
+    for stats in totals.values():
+        stats['cpu_seconds'] = round(stats['cpu_seconds'], 3)
+        stats['bytes_saved'] = original_bytes - stats['compressed_bytes']
+        stats['saved_percent'] = round(100.0 * stats['bytes_saved'] / original_bytes, 2) if original_bytes else 0.0
+
+    return {
+        'archives': archives,
+        'members': members,
+        'original_bytes': original_bytes,
+        'policies': totals,
+    }
+
+
+def benchmark_library(root, sample_size=DEFAULT_SAMPLE_SIZE, seed=None):
+    """Run benchmark_policies() on a random sample of the archives under root."""
+    return benchmark_policies(sample_archives(root, sample_size, seed))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        app_logger.error("No directory provided!")
+    else:
+        size = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_SAMPLE_SIZE
+        report = benchmark_library(sys.argv[1], size)
+        app_logger.info(f"Compression benchmark: {report['archives']} archives, {report['members']} members, "
+                        f"{report['original_bytes'] / (1024 * 1024):.1f} MB uncompressed")
+        for name, stats in report['policies'].items():
+            app_logger.info(f"  {name:8s} cpu {stats['cpu_seconds']:.2f}s, saved "
+                            f"{stats['bytes_saved'] / (1024 * 1024):.1f} MB ({stats['saved_percent']}%)")
@@ -63,7 +63,7 @@ def load_config():
         "BOOTSTRAP_THEME": "default",
         "TIMEZONE": "UTC",
         "ENABLE_METADATA_SCAN": "True",
-        "METADATA_SCAN_THREADS": "2"
+        "METADATA_SCAN_WORKERS": str(min(4, os.cpu_count() or 2))
     }
 
     if not os.path.exists(CONFIG_FILE):
@@ -78,6 +78,10 @@ def load_config():
         if "SETTINGS" not in config:
             config["SETTINGS"] = {}
 
+        # METADATA_SCAN_WORKERS replaces METADATA_SCAN_THREADS; keep its value
+        if "METADATA_SCAN_THREADS" in config["SETTINGS"]:
+            default_settings["METADATA_SCAN_WORKERS"] = config["SETTINGS"]["METADATA_SCAN_THREADS"]
+
         # Migrate/add any missing keys with defaults (preserves existing values)
         settings_updated = False
         missing_keys = []
@@ -2,6 +2,8 @@ import sqlite3
 import os
 import re
 import hashlib
+import threading
+import time
 import zipfile
 from datetime import datetime
 from typing import Optional
@@ -155,6 +157,31 @@ def init_db():
             "CREATE INDEX IF NOT EXISTS idx_file_index_first_indexed ON file_index(first_indexed_at)"
         )
 
+        # Create folder_stats table (materialized recursive counts per directory)
+        c.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name='folder_stats'"
+        )
+        folder_stats_exists = c.fetchone() is not None
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS folder_stats (
+                path TEXT PRIMARY KEY,
+                folder_count INTEGER NOT NULL DEFAULT 0,
+                file_count INTEGER NOT NULL DEFAULT 0,
+                comic_count INTEGER NOT NULL DEFAULT 0,
+                magazine_count INTEGER NOT NULL DEFAULT 0,
+                total_size INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        if not folder_stats_exists:
+            rows = _rebuild_folder_stats(c)
+            if rows:
+                app_logger.info(
+                    f"Migrating file_index: built folder_stats for {rows} directories"
+                )
+
+        # Create file_index_fts (FTS5 search over names and ComicInfo fields)
+        _init_file_index_fts(c)
+
         # Create rebuild_schedule table (store file index rebuild schedule)
         c.execute("""
             CREATE TABLE IF NOT EXISTS rebuild_schedule (
@@ -281,6 +308,15 @@ def init_db():
             "CREATE INDEX IF NOT EXISTS idx_wanted_issues_series ON wanted_issues(series_id)"
         )
 
+        # Series whose wanted issues must be recomputed (see wanted_cache.py)
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS wanted_dirty_series (
+                series_id INTEGER PRIMARY KEY,
+                reason TEXT,
+                marked_at REAL NOT NULL
+            )
+        """)
+
         # Create browse_cache table (cache pre-computed browse results)
         c.execute("""
             CREATE TABLE IF NOT EXISTS browse_cache (
@@ -550,6 +586,9 @@ def init_db():
         if "cover_image" not in series_columns:
             c.execute("ALTER TABLE series ADD COLUMN cover_image TEXT")
             app_logger.info("Added cover_image column to series table")
+        if "last_full_synced_at" not in series_columns:
+            c.execute("ALTER TABLE series ADD COLUMN last_full_synced_at TIMESTAMP")
+            app_logger.info("Added last_full_synced_at column to series table")
 
         # Create issues table (Metron issues cached for tracked series)
         c.execute("""
@@ -623,6 +662,11 @@ def init_db():
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
+        c.execute("PRAGMA table_info(libraries)")
+        columns = [column[1] for column in c.fetchall()]
+        if "compression_policy" not in columns:
+            app_logger.info("Migrating libraries table: adding compression_policy column")
+            c.execute("ALTER TABLE libraries ADD COLUMN compression_policy TEXT")
         c.execute("CREATE INDEX IF NOT EXISTS idx_libraries_path ON libraries(path)")
         c.execute(
             "CREATE INDEX IF NOT EXISTS idx_libraries_enabled ON libraries(enabled)"
@@ -739,6 +783,37 @@ def init_db():
             )
         """)
 
+        # Create background jobs table (see job_queue.py)
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                job_type TEXT NOT NULL,
+                params TEXT,
+                concurrency_key TEXT,
+                status TEXT NOT NULL DEFAULT 'queued',
+                progress_done INTEGER DEFAULT 0,
+                progress_total INTEGER,
+                message TEXT,
+                checkpoint TEXT,
+                result TEXT,
+                error TEXT,
+                attempts INTEGER DEFAULT 0,
+                max_attempts INTEGER DEFAULT 1,
+                cancel_requested INTEGER DEFAULT 0,
+                run_after REAL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                started_at TIMESTAMP,
+                finished_at TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        c.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, run_after)")
+        # At most one queued or running job per concurrency key
+        c.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_active_key ON jobs(concurrency_key)
+            WHERE concurrency_key IS NOT NULL AND status IN ('queued', 'running')
+        """)
+
         # Migration: Populate schedules from legacy tables if empty
         c.execute("SELECT COUNT(*) FROM schedules")
         if c.fetchone()[0] == 0:
@@ -853,21 +928,343 @@ def init_db():
         return False
 
 
-def get_db_connection():
-    """Get a connection to the SQLite database."""
-    try:
-        conn = sqlite3.connect(get_db_path(), timeout=30)
+# =============================================================================
+# Connection Pool
+# =============================================================================
+#
+# Helpers open a connection, run a query or two and close it. Instead of a new
+# sqlite3.connect() per call, get_db_connection() hands out a connection from a
+# small per-thread idle list; close() rolls back anything uncommitted and puts
+# it back. PRAGMA setup happens once per connection and each connection keeps
+# its own prepared statement cache (cached_statements) between calls.
+#
+# get_db_write_connection() returns the single shared writer connection,
+# serialized by a lock, for bulk writers so they queue in-process instead of
+# spinning on SQLITE_BUSY against each other.
+
+DB_CACHED_STATEMENTS = 256
+DEFAULT_DB_POOL_IDLE = 2
+DEFAULT_DB_CACHE_SIZE_MB = 16
+DEFAULT_DB_MMAP_SIZE_MB = 256
+
+_pool_local = threading.local()
+_pool_generation = 0
+_pool_stats = {
+    "hits": 0,
+    "misses": 0,
+    "returned": 0,
+    "discarded": 0,
+    "writer_acquired": 0,
+    "writer_waits": 0,
+    "writer_wait_time": 0.0,
+}
+_pool_stats_lock = threading.Lock()
+
+_writer_lock = threading.Lock()
+_writer_conn = None
+_writer_key = None
+_writer_owner = None
+_writer_depth = 0  # nested get_db_write_connection() calls of the owner thread
+
+
+def _count_pool_stat(name, amount=1):
+    with _pool_stats_lock:
+        _pool_stats[name] += amount
+
+
+def _open_connection(db_path, check_same_thread=True):
+    """Open a new connection with the tuned PRAGMAs applied."""
+    cache_mb = config.getint("SETTINGS", "DB_CACHE_SIZE_MB", fallback=DEFAULT_DB_CACHE_SIZE_MB)
+    mmap_mb = config.getint("SETTINGS", "DB_MMAP_SIZE_MB", fallback=DEFAULT_DB_MMAP_SIZE_MB)
+
+    conn = sqlite3.connect(
+        db_path,
+        timeout=30,
+        cached_statements=DB_CACHED_STATEMENTS,
+        check_same_thread=check_same_thread,
+    )
+    conn.row_factory = sqlite3.Row
+    # Ensure WAL mode and busy timeout for better concurrency
+    conn.execute("PRAGMA busy_timeout=30000")
+    # Enable foreign key enforcement for ON DELETE CASCADE
+    conn.execute("PRAGMA foreign_keys=ON")
+    # NORMAL is durable across application crashes in WAL mode; only the last
+    # transactions can be lost on power failure
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute(f"PRAGMA cache_size=-{max(cache_mb, 1) * 1024}")
+    conn.execute(f"PRAGMA mmap_size={max(mmap_mb, 0) * 1024 * 1024}")
+    return conn
+
+
+def _reset_connection(conn):
+    """Discard uncommitted work so a connection can be reused. Returns False if it is unusable."""
+    try:
+        if conn.in_transaction:
+            conn.rollback()
         conn.row_factory = sqlite3.Row
-        # Ensure WAL mode and busy timeout for better concurrency
-        conn.execute("PRAGMA busy_timeout=30000")
-        # Enable foreign key enforcement for ON DELETE CASCADE
-        conn.execute("PRAGMA foreign_keys=ON")
+        return True
+    except sqlite3.Error:
+        return False
+
+
+class PooledConnection:
+    """
+    Proxy around a pooled sqlite3.Connection.
+
+    Behaves like the connection itself; close() hands the connection back to
+    the pool instead of closing it. Using the proxy after close() raises
+    sqlite3.ProgrammingError, the same as a closed connection.
+    """
+
+    __slots__ = ("_conn", "_release")
+
+    def __init__(self, conn, release):
+        object.__setattr__(self, "_conn", conn)
+        object.__setattr__(self, "_release", release)
+
+    def _connection(self):
+        conn = object.__getattribute__(self, "_conn")
+        if conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
         return conn
+
+    def __getattr__(self, name):
+        return getattr(self._connection(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._connection(), name, value)
+
+    def __enter__(self):
+        self._connection().__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._connection().__exit__(exc_type, exc, tb)
+
+    def close(self):
+        """Return the connection to the pool."""
+        conn = object.__getattribute__(self, "_conn")
+        if conn is None:
+            return
+        object.__setattr__(self, "_conn", None)
+        object.__getattribute__(self, "_release")(conn)
+
+
+def _thread_pool(key):
+    """Idle connections of the calling thread, dropped if the database path changed."""
+    if getattr(_pool_local, "key", None) != key:
+        for conn in getattr(_pool_local, "idle", []):
+            conn.close()
+        _pool_local.key = key
+        _pool_local.idle = []
+    return _pool_local.idle
+
+
+def _release_pooled(conn, key):
+    if not _reset_connection(conn):
+        conn.close()
+        _count_pool_stat("discarded")
+        return
+
+    max_idle = config.getint("SETTINGS", "DB_POOL_IDLE_PER_THREAD", fallback=DEFAULT_DB_POOL_IDLE)
+    idle = _thread_pool(key)
+    if len(idle) < max_idle:
+        idle.append(conn)
+        _count_pool_stat("returned")
+    else:
+        conn.close()
+        _count_pool_stat("discarded")
+
+
+def get_db_connection():
+    """
+    Get a connection to the SQLite database.
+
+    Connections are pooled per thread; call close() as usual to hand the
+    connection back. Nested calls on the same thread get separate connections.
+    """
+    try:
+        key = (get_db_path(), _pool_generation)
+        idle = _thread_pool(key)
+        if idle:
+            conn = idle.pop()
+            _count_pool_stat("hits")
+        else:
+            conn = _open_connection(key[0])
+            _count_pool_stat("misses")
+        return PooledConnection(conn, lambda c: _release_pooled(c, key))
     except Exception as e:
         app_logger.error(f"Failed to connect to database: {e}")
         return None
 
 
+def _release_writer(conn):
+    global _writer_conn, _writer_owner, _writer_depth
+    _writer_depth -= 1
+    if _writer_depth:
+        # Nested close: the outermost holder still owns the transaction
+        return
+    if not _reset_connection(conn):
+        conn.close()
+        _writer_conn = None
+    _writer_owner = None
+    _writer_lock.release()
+
+
+def get_db_write_connection():
+    """
+    Get the shared writer connection.
+
+    Only one thread holds the writer at a time; others wait here until it is
+    closed. Always close() it in a finally block. A nested request from the
+    thread that already holds the writer gets the same connection (and its
+    open transaction); only the outermost close() releases it.
+    """
+    global _writer_conn, _writer_key, _writer_owner, _writer_depth
+
+    if _writer_owner == threading.get_ident():
+        _writer_depth += 1
+        return PooledConnection(_writer_conn, _release_writer)
+
+    start = time.perf_counter()
+    if not _writer_lock.acquire(blocking=False):
+        _writer_lock.acquire()
+        _count_pool_stat("writer_waits")
+        _count_pool_stat("writer_wait_time", time.perf_counter() - start)
+
+    try:
+        key = (get_db_path(), _pool_generation)
+        if _writer_conn is None or _writer_key != key:
+            if _writer_conn is not None:
+                _writer_conn.close()
+            _writer_conn = _open_connection(key[0], check_same_thread=False)
+            _writer_key = key
+        _writer_owner = threading.get_ident()
+        _writer_depth = 1
+        _count_pool_stat("writer_acquired")
+        return PooledConnection(_writer_conn, _release_writer)
+    except Exception as e:
+        _writer_conn = None
+        _writer_lock.release()
+        app_logger.error(f"Failed to open database writer connection: {e}")
+        return None
+
+
+def close_db_pool():
+    """
+    Invalidate all pooled connections.
+
+    Idle connections of other threads are closed the next time those threads
+    ask for one. Call this after replacing the database file.
+    """
+    global _pool_generation, _writer_conn
+    _pool_generation += 1
+    _thread_pool(None)
+    with _writer_lock:
+        if _writer_conn is not None:
+            _writer_conn.close()
+            _writer_conn = None
+
+
+def get_db_pool_stats():
+    """
+    Get connection pool counters.
+
+    Returns:
+        Dict with hits, misses, hit_rate, returned, discarded, writer_acquired,
+        writer_waits and writer_wait_ms
+    """
+    with _pool_stats_lock:
+        stats = dict(_pool_stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+    stats["writer_wait_ms"] = round(stats.pop("writer_wait_time") * 1000, 1)
+    return stats
+
+
+def benchmark_connection_pool(calls=3000, parent=None):
+    """
+    Time a get_directory_children-style query on the configured database
+    with a new connection per call versus pooled connections.
+
+    Args:
+        calls: Number of queries per mode
+        parent: Folder to list (defaults to the folder with the most entries)
+
+    Returns:
+        Dict with the folder, per-call microseconds of each mode and the pool
+        hit rate of the pooled run
+    """
+    query = "SELECT name, path, type, size FROM file_index WHERE parent = ? ORDER BY name"
+    db_path = get_db_path()
+    if parent is None:
+        conn = _open_connection(db_path)
+        row = conn.execute(
+            "SELECT parent FROM file_index GROUP BY parent ORDER BY COUNT(*) DESC LIMIT 1"
+        ).fetchone()
+        conn.close()
+        parent = row[0] if row else ""
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        conn = _open_connection(db_path)
+        conn.execute(query, (parent,)).fetchall()
+        conn.close()
+    per_call = (time.perf_counter() - start) / calls
+
+    before = get_db_pool_stats()
+    start = time.perf_counter()
+    for _ in range(calls):
+        conn = get_db_connection()
+        conn.execute(query, (parent,)).fetchall()
+        conn.close()
+    pooled = (time.perf_counter() - start) / calls
+    after = get_db_pool_stats()
+
+    hits = after["hits"] - before["hits"]
+    lookups = hits + after["misses"] - before["misses"]
+    return {
+        "parent": parent,
+        "calls": calls,
+        "per_call_connection_us": round(per_call * 1e6, 1),
+        "pooled_us": round(pooled * 1e6, 1),
+        "pool_hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+    }
+
+
+# =============================================================================
+# Thumbnail Jobs
+# =============================================================================
+
+
+def _set_thumbnail_job_status(c, path, status, file_mtime=None):
+    """
+    Record a thumbnail job status using cursor c (no commit).
+
+    With file_mtime the job row is created or reset (library scan); without
+    it only the status of an existing row is updated (generation result).
+    """
+    if file_mtime is None:
+        c.execute(
+            "UPDATE thumbnail_jobs SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE path = ?",
+            (status, path),
+        )
+        return
+
+    c.execute(
+        """
+        INSERT INTO thumbnail_jobs (path, status, file_mtime, updated_at)
+        VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(path) DO UPDATE SET
+            status = excluded.status,
+            file_mtime = excluded.file_mtime,
+            updated_at = CURRENT_TIMESTAMP
+    """,
+        (path, status, file_mtime),
+    )
+
+
 # =============================================================================
 # Database Backup Functions
 # =============================================================================
@@ -982,7 +1379,7 @@ def get_libraries(enabled_only=True):
         enabled_only: If True, only return enabled libraries (default True)
 
     Returns:
-        List of dictionaries with id, name, path, enabled, created_at
+        List of dictionaries with id, name, path, enabled, compression_policy, created_at
     """
     try:
         conn = get_db_connection()
@@ -992,11 +1389,11 @@ def get_libraries(enabled_only=True):
         c = conn.cursor()
         if enabled_only:
             c.execute(
-                "SELECT id, name, path, enabled, created_at FROM libraries WHERE enabled = 1 ORDER BY name"
+                "SELECT id, name, path, enabled, compression_policy, created_at FROM libraries WHERE enabled = 1 ORDER BY name"
             )
         else:
             c.execute(
-                "SELECT id, name, path, enabled, created_at FROM libraries ORDER BY name"
+                "SELECT id, name, path, enabled, compression_policy, created_at FROM libraries ORDER BY name"
             )
 
         results = [dict(row) for row in c.fetchall()]
@@ -1024,7 +1421,7 @@ def get_library_by_id(library_id):
 
         c = conn.cursor()
         c.execute(
-            "SELECT id, name, path, enabled, created_at FROM libraries WHERE id = ?",
+            "SELECT id, name, path, enabled, compression_policy, created_at FROM libraries WHERE id = ?",
             (library_id,),
         )
         row = c.fetchone()
@@ -1078,7 +1475,7 @@ def add_library(name, path):
         return None
 
 
-def update_library(library_id, name=None, path=None, enabled=None):
+def update_library(library_id, name=None, path=None, enabled=None, compression_policy=None):
     """
     Update a library.
 
@@ -1087,12 +1484,14 @@ def update_library(library_id, name=None, path=None, enabled=None):
         name: New name (optional)
         path: New path (optional)
         enabled: New enabled state (optional)
+        compression_policy: Name from compression_policy.POLICIES, or '' to
+                            use the CBZ_COMPRESSION default (optional)
 
     Returns:
         True if successful, False otherwise
     """
     try:
-        ALLOWED_COLUMNS = {"name", "path", "enabled"}
+        ALLOWED_COLUMNS = {"name", "path", "enabled", "compression_policy"}
         updates = []
         params = []
 
@@ -1105,6 +1504,9 @@ def update_library(library_id, name=None, path=None, enabled=None):
         if enabled is not None:
             updates.append("enabled")
             params.append(1 if enabled else 0)
+        if compression_policy is not None:
+            updates.append("compression_policy")
+            params.append(compression_policy or None)
 
         if not updates:
             return True  # Nothing to update
@@ -1423,6 +1825,191 @@ def get_directory_children(parent_path, max_retries=3):
             return [], []
 
 
+# =============================================================================
+# Folder Stats (materialized recursive counts)
+# =============================================================================
+#
+# folder_stats holds, for every directory that has indexed descendants, the
+# number of descendant folders and files, comic/magazine counts and total
+# bytes. Every file_index writer applies the delta of the rows it touches to
+# all ancestor directories, so recursive counts are a primary-key lookup
+# instead of a LIKE-prefix scan of the whole file_index table.
+
+COMIC_EXTENSIONS = (".cbz", ".cbr", ".zip")
+MAGAZINE_EXTENSIONS = (".pdf",)
+
+
+def _ancestor_paths(path):
+    """Yield every ancestor directory of a '/'-separated path, nearest first."""
+    parent = path.rsplit("/", 1)[0]
+    while parent and parent != path:
+        yield parent
+        path = parent
+        parent = path.rsplit("/", 1)[0]
+
+
+def _descendant_range(path):
+    """
+    Bounds for `path >= ? AND path < ?` matching exactly the rows below path.
+
+    Unlike LIKE, '_' and '%' in folder names stay literal, case is respected
+    and the range can use the path index. '0' is the character after '/'.
+    """
+    return (f"{path}/", f"{path}0")
+
+
+def _entry_stats(path, entry_type, size):
+    """Contribution of one file_index row: (folders, files, comics, magazines, bytes)."""
+    if entry_type == "directory":
+        return (1, 0, 0, 0, 0)
+    lower = path.lower()
+    return (
+        0,
+        1,
+        1 if lower.endswith(COMIC_EXTENSIONS) else 0,
+        1 if lower.endswith(MAGAZINE_EXTENSIONS) else 0,
+        size or 0,
+    )
+
+
+def _add_folder_stats_delta(deltas, path, stats, sign=1):
+    """Accumulate stats (times sign) into deltas for every ancestor of path."""
+    if not any(stats):
+        return
+    for ancestor in _ancestor_paths(path):
+        delta = deltas.get(ancestor)
+        if delta is None:
+            delta = deltas[ancestor] = [0, 0, 0, 0, 0]
+        for i, value in enumerate(stats):
+            delta[i] += sign * value
+
+
+def _apply_folder_stats_deltas(c, deltas):
+    """Write accumulated deltas to folder_stats and drop rows that reach zero."""
+    rows = [
+        (path, *delta) for path, delta in deltas.items() if any(delta)
+    ]
+    if not rows:
+        return
+    c.executemany(
+        """
+        INSERT INTO folder_stats (path, folder_count, file_count, comic_count, magazine_count, total_size)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(path) DO UPDATE SET
+            folder_count = folder_count + excluded.folder_count,
+            file_count = file_count + excluded.file_count,
+            comic_count = comic_count + excluded.comic_count,
+            magazine_count = magazine_count + excluded.magazine_count,
+            total_size = total_size + excluded.total_size
+    """,
+        rows,
+    )
+    c.executemany(
+        "DELETE FROM folder_stats WHERE path = ? AND folder_count <= 0 AND file_count <= 0",
+        [(row[0],) for row in rows],
+    )
+
+
+def _subtree_stats(c, path, include_descendants=True):
+    """
+    Contribution of a path and (optionally) everything below it.
+
+    Uses the row's own file_index entry plus its folder_stats totals, so a
+    directory of any size costs two primary-key lookups.
+    """
+    totals = [0, 0, 0, 0, 0]
+    c.execute("SELECT type, size FROM file_index WHERE path = ?", (path,))
+    row = c.fetchone()
+    if row:
+        totals = list(_entry_stats(path, row[0], row[1]))
+    if include_descendants:
+        c.execute(
+            """
+            SELECT folder_count, file_count, comic_count, magazine_count, total_size
+            FROM folder_stats WHERE path = ?
+        """,
+            (path,),
+        )
+        row = c.fetchone()
+        if row:
+            totals = [t + (v or 0) for t, v in zip(totals, row)]
+    return totals
+
+
+def _rebuild_folder_stats(c):
+    """Recompute folder_stats from file_index. Returns the number of directories written."""
+    c.execute("DELETE FROM folder_stats")
+    deltas = {}
+    c.execute("SELECT path, type, size FROM file_index")
+    while True:
+        rows = c.fetchmany(10000)
+        if not rows:
+            break
+        for path, entry_type, size in rows:
+            _add_folder_stats_delta(deltas, path, _entry_stats(path, entry_type, size))
+    _apply_folder_stats_deltas(c, deltas)
+    return len(deltas)
+
+
+def rebuild_folder_stats():
+    """
+    Recompute the folder_stats aggregate from scratch.
+
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return False
+
+        c = conn.cursor()
+        rows = _rebuild_folder_stats(c)
+        conn.commit()
+        conn.close()
+
+        app_logger.info(f"Rebuilt folder stats for {rows} directories")
+        return True
+
+    except Exception as e:
+        app_logger.error(f"Failed to rebuild folder stats: {e}")
+        return False
+
+
+def get_folder_stats(path):
+    """
+    Get materialized recursive stats for a directory.
+
+    Args:
+        path: Directory path (e.g., '/data/Marvel')
+
+    Returns:
+        Dict with folder_count, file_count, comic_count, magazine_count, total_size,
+        or None if the directory has no indexed descendants (or on error)
+    """
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return None
+
+        c = conn.cursor()
+        c.execute(
+            """
+            SELECT folder_count, file_count, comic_count, magazine_count, total_size
+            FROM folder_stats WHERE path = ?
+        """,
+            (path.rstrip("/") or "/",),
+        )
+        row = c.fetchone()
+        conn.close()
+
+        return dict(row) if row else None
+
+    except Exception as e:
+        app_logger.error(f"Failed to get folder stats for '{path}': {e}")
+        return None
+
+
 def save_file_index_to_db(file_index):
     """
     Save the entire file index to the database (batch operation).
@@ -1433,8 +2020,9 @@ def save_file_index_to_db(file_index):
     Returns:
         True if successful, False otherwise
     """
+    conn = None
     try:
-        conn = get_db_connection()
+        conn = get_db_write_connection()
         if not conn:
             app_logger.error("Could not get database connection to save file index")
             return False
@@ -1470,9 +2058,9 @@ def save_file_index_to_db(file_index):
         """,
             records,
         )
+        _rebuild_folder_stats(c)
 
         conn.commit()
-        conn.close()
 
         app_logger.info(f"Saved {len(records)} entries to file index database")
         return True
@@ -1480,11 +2068,14 @@ def save_file_index_to_db(file_index):
     except Exception as e:
         app_logger.error(f"Failed to save file index: {e}")
         return False
+    finally:
+        if conn:
+            conn.close()
 
 
 def get_path_counts(path):
     """
-    Get recursive folder and file counts for a path using file_index.
+    Get recursive folder and file counts for a path using folder_stats.
 
     Args:
         path: Directory path (e.g., '/data/Marvel')
@@ -1492,37 +2083,10 @@ def get_path_counts(path):
     Returns:
         Tuple of (folder_count, file_count) or (0, 0) on error
     """
-    try:
-        conn = get_db_connection()
-        if not conn:
-            return (0, 0)
-
-        c = conn.cursor()
-        # Use path prefix to count all descendants (recursive)
-        # Ensure trailing slash to avoid matching partial names (e.g., /data/Marvel vs /data/MarvelMax)
-        path_prefix = path.rstrip("/") + "/"
-
-        c.execute(
-            """
-            SELECT
-                SUM(CASE WHEN type = 'directory' THEN 1 ELSE 0 END) as folder_count,
-                SUM(CASE WHEN type = 'file' THEN 1 ELSE 0 END) as file_count
-            FROM file_index
-            WHERE path LIKE ? || '%'
-        """,
-            (path_prefix,),
-        )
-
-        row = c.fetchone()
-        conn.close()
-
-        if row:
-            return (row["folder_count"] or 0, row["file_count"] or 0)
-        return (0, 0)
-
-    except Exception as e:
-        app_logger.error(f"Failed to get path counts for '{path}': {e}")
-        return (0, 0)
+    stats = get_folder_stats(path)
+    if stats:
+        return (stats["folder_count"], stats["file_count"])
+    return (0, 0)
 
 
 def get_path_counts_batch(paths):
@@ -1547,30 +2111,27 @@ def get_path_counts_batch(paths):
         c = conn.cursor()
         results = {}
 
-        # Process in batches of 100 to avoid SQLite parameter limits
-        BATCH_SIZE = 100
+        # Process in batches to stay under SQLite parameter limits
+        BATCH_SIZE = 500
         for i in range(0, len(paths), BATCH_SIZE):
             batch = paths[i : i + BATCH_SIZE]
-            path_prefixes = [p.rstrip("/") + "/" for p in batch]
-
-            # Build UNION ALL query for batch - one query instead of N
-            query_parts = []
-            params = []
-            for path, prefix in zip(batch, path_prefixes):
-                query_parts.append("""
-                    SELECT ? as path,
-                        SUM(CASE WHEN type = 'directory' THEN 1 ELSE 0 END) as folder_count,
-                        SUM(CASE WHEN type = 'file' THEN 1 ELSE 0 END) as file_count
-                    FROM file_index WHERE path LIKE ? || '%'
-                """)
-                params.extend([path, prefix])
-
-            c.execute(" UNION ALL ".join(query_parts), params)
+            keys = {}
+            for p in batch:
+                keys.setdefault(p.rstrip("/") or "/", []).append(p)
+            placeholders = ",".join("?" * len(keys))
+            c.execute(
+                f"""
+                SELECT path, folder_count, file_count
+                FROM folder_stats WHERE path IN ({placeholders})
+            """,
+                list(keys),
+            )
             for row in c.fetchall():
-                results[row["path"]] = (
-                    row["folder_count"] or 0,
-                    row["file_count"] or 0,
-                )
+                for p in keys[row["path"]]:
+                    results[p] = (
+                        row["folder_count"] or 0,
+                        row["file_count"] or 0,
+                    )
 
         conn.close()
 
@@ -1586,10 +2147,15 @@ def get_path_counts_batch(paths):
         return {p: (0, 0) for p in paths}
 
 
-def update_file_index_entry(path, name=None, new_path=None, parent=None, size=None):
+def update_file_index_entry(
+    path, name=None, new_path=None, parent=None, size=None, modified_at=None
+):
     """
     Update a single file index entry incrementally.
 
+    Only the entry itself is changed; use move_file_index_entry() to move a
+    directory together with its children.
+
     Args:
         path: Current path of the entry (used to find the record)
         name: New name (optional)
@@ -1639,14 +2205,29 @@ def update_file_index_entry(path, name=None, new_path=None, parent=None, size=No
             conn.close()
             return False
 
+        c.execute("SELECT type, size FROM file_index WHERE path = ?", (path,))
+        old_row = c.fetchone()
+
         set_clause = ", ".join(f"{col} = ?" for col in updates)
         set_clause += ", last_updated = CURRENT_TIMESTAMP"
         params.append(path)  # WHERE clause parameter
 
         c.execute("UPDATE file_index SET " + set_clause + " WHERE path = ?", params)
+        rows_affected = c.rowcount
+
+        if rows_affected > 0 and old_row:
+            final_path = new_path if new_path is not None else path
+            final_size = size if size is not None else old_row["size"]
+            deltas = {}
+            _add_folder_stats_delta(
+                deltas, path, _entry_stats(path, old_row["type"], old_row["size"]), -1
+            )
+            _add_folder_stats_delta(
+                deltas, final_path, _entry_stats(final_path, old_row["type"], final_size)
+            )
+            _apply_folder_stats_deltas(c, deltas)
 
         conn.commit()
-        rows_affected = c.rowcount
         conn.close()
 
         if rows_affected > 0:
@@ -1661,57 +2242,168 @@ def update_file_index_entry(path, name=None, new_path=None, parent=None, size=No
         return False
 
 
-def add_file_index_entry(
-    name, path, entry_type, size=None, parent=None, has_thumbnail=0, modified_at=None
-):
+def move_file_index_entry(old_path, new_path):
     """
-    Add a new entry to the file index.
+    Move an entry and all of its descendants to a new path in one transaction.
+
+    Rewrites path/parent of the entry and every child, moves the matching
+    folder_stats rows, and shifts the subtree totals from the old ancestors
+    to the new ones.
 
     Args:
-        name: File or directory name
-        path: Full path
-        entry_type: 'file' or 'directory'
-        size: File size in bytes (optional, None for directories)
-        parent: Parent directory path (optional)
-        has_thumbnail: 1 if directory has folder.png/jpg, 0 otherwise (optional)
-        modified_at: Modification timestamp (optional)
+        old_path: Current path of the file or directory
+        new_path: New path after the move
 
     Returns:
-        True if successful, False otherwise
+        Number of file_index rows updated (0 if nothing matched or on error)
     """
     try:
         conn = get_db_connection()
         if not conn:
-            return False
-
-        import time
-
-        c = conn.cursor()
+            return 0
 
-        # Use ON CONFLICT to preserve first_indexed_at for existing entries
-        c.execute(
-            """
-            INSERT INTO file_index (name, path, type, size, parent, has_thumbnail, modified_at, first_indexed_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(path) DO UPDATE SET
-                name = excluded.name,
-                type = excluded.type,
-                size = excluded.size,
-                parent = excluded.parent,
-                has_thumbnail = excluded.has_thumbnail,
-                modified_at = excluded.modified_at
-        """,
-            (
-                name,
-                path,
-                entry_type,
-                size,
-                parent,
-                has_thumbnail,
-                modified_at,
-                time.time(),
-            ),
-        )
+        rows_affected = _move_file_index_entry(conn.cursor(), old_path, new_path)
+
+        conn.commit()
+        conn.close()
+
+        app_logger.debug(f"Moved {rows_affected} file index entries: {old_path} -> {new_path}")
+        return rows_affected
+
+    except Exception as e:
+        app_logger.error(f"Failed to move file index entry {old_path} -> {new_path}: {e}")
+        return 0
+
+
+def _move_file_index_entry(c, old_path, new_path):
+    """Move an entry, its descendants and their folder_stats using cursor c (no commit)."""
+    subtree = _subtree_stats(c, old_path)
+
+    c.execute(
+        """
+        UPDATE file_index
+        SET name = ?, path = ?, parent = ?, last_updated = CURRENT_TIMESTAMP
+        WHERE path = ?
+    """,
+        (os.path.basename(new_path), new_path, os.path.dirname(new_path), old_path),
+    )
+    rows_affected = c.rowcount
+
+    # Update all entries whose path starts with old_path
+    c.execute(
+        """
+        UPDATE file_index
+        SET path = ? || SUBSTR(path, ?),
+            parent = ? || SUBSTR(parent, ?)
+        WHERE path >= ? AND path < ?
+    """,
+        (new_path, len(old_path) + 1, new_path, len(old_path) + 1, *_descendant_range(old_path)),
+    )
+    rows_affected += c.rowcount
+
+    c.execute(
+        """
+        UPDATE folder_stats
+        SET path = ? || SUBSTR(path, ?)
+        WHERE path = ? OR (path >= ? AND path < ?)
+    """,
+        (new_path, len(old_path) + 1, old_path, *_descendant_range(old_path)),
+    )
+
+    deltas = {}
+    _add_folder_stats_delta(deltas, old_path, subtree, -1)
+    _add_folder_stats_delta(deltas, new_path, subtree)
+    _apply_folder_stats_deltas(c, deltas)
+    return rows_affected
+
+
+def rename_file_index_entries(renames):
+    """
+    Update the file index for many renamed files in one transaction.
+
+    Args:
+        renames: List of (old_path, new_path) tuples of files (not directories)
+
+    Returns:
+        Number of file_index rows updated (0 on error); files that were not
+        indexed are skipped
+    """
+    if not renames:
+        return 0
+
+    conn = None
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return 0
+
+        c = conn.cursor()
+        deltas = {}
+        rows_affected = 0
+        for old_path, new_path in renames:
+            c.execute("SELECT type, size FROM file_index WHERE path = ?", (old_path,))
+            old_row = c.fetchone()
+            if not old_row:
+                continue
+
+            c.execute(
+                """
+                UPDATE file_index
+                SET name = ?, path = ?, parent = ?, last_updated = CURRENT_TIMESTAMP
+                WHERE path = ?
+            """,
+                (os.path.basename(new_path), new_path, os.path.dirname(new_path), old_path),
+            )
+            rows_affected += c.rowcount
+
+            _add_folder_stats_delta(
+                deltas, old_path, _entry_stats(old_path, old_row["type"], old_row["size"]), -1
+            )
+            _add_folder_stats_delta(
+                deltas, new_path, _entry_stats(new_path, old_row["type"], old_row["size"])
+            )
+
+        _apply_folder_stats_deltas(c, deltas)
+        conn.commit()
+
+        app_logger.debug(f"Renamed {rows_affected} file index entries")
+        return rows_affected
+
+    except Exception as e:
+        app_logger.error(f"Failed to rename file index entries: {e}")
+        return 0
+
+    finally:
+        if conn:
+            conn.close()
+
+
+def add_file_index_entry(
+    name, path, entry_type, size=None, parent=None, has_thumbnail=0, modified_at=None
+):
+    """
+    Add a new entry to the file index.
+
+    Args:
+        name: File or directory name
+        path: Full path
+        entry_type: 'file' or 'directory'
+        size: File size in bytes (optional, None for directories)
+        parent: Parent directory path (optional)
+        has_thumbnail: 1 if directory has folder.png/jpg, 0 otherwise (optional)
+        modified_at: Modification timestamp (optional)
+
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return False
+
+        _add_file_index_entry(
+            conn.cursor(), name, path, entry_type, size, parent, has_thumbnail, modified_at
+        )
 
         conn.commit()
         conn.close()
@@ -1724,6 +2416,45 @@ def add_file_index_entry(
         return False
 
 
+def _add_file_index_entry(c, name, path, entry_type, size, parent, has_thumbnail, modified_at):
+    """Upsert one file_index row and its folder_stats deltas using cursor c (no commit)."""
+    c.execute("SELECT type, size FROM file_index WHERE path = ?", (path,))
+    old_row = c.fetchone()
+
+    # Use ON CONFLICT to preserve first_indexed_at for existing entries
+    c.execute(
+        """
+        INSERT INTO file_index (name, path, type, size, parent, has_thumbnail, modified_at, first_indexed_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(path) DO UPDATE SET
+            name = excluded.name,
+            type = excluded.type,
+            size = excluded.size,
+            parent = excluded.parent,
+            has_thumbnail = excluded.has_thumbnail,
+            modified_at = excluded.modified_at
+    """,
+        (
+            name,
+            path,
+            entry_type,
+            size,
+            parent,
+            has_thumbnail,
+            modified_at,
+            time.time(),
+        ),
+    )
+
+    deltas = {}
+    if old_row:
+        _add_folder_stats_delta(
+            deltas, path, _entry_stats(path, old_row["type"], old_row["size"]), -1
+        )
+    _add_folder_stats_delta(deltas, path, _entry_stats(path, entry_type, size))
+    _apply_folder_stats_deltas(c, deltas)
+
+
 def delete_file_index_entry(path):
     """
     Delete an entry from the file index.
@@ -1739,19 +2470,9 @@ def delete_file_index_entry(path):
         if not conn:
             return False
 
-        c = conn.cursor()
-
-        # Delete the entry
-        c.execute("DELETE FROM file_index WHERE path = ?", (path,))
-
-        # Also delete any children (for directories)
-        c.execute(
-            "DELETE FROM file_index WHERE parent = ? OR path LIKE ?",
-            (path, f"{path}/%"),
-        )
+        rows_affected = _delete_file_index_entry(conn.cursor(), path)
 
         conn.commit()
-        rows_affected = c.rowcount
         conn.close()
 
         if rows_affected > 0:
@@ -1766,6 +2487,45 @@ def delete_file_index_entry(path):
         return False
 
 
+def _delete_file_index_entry(c, path):
+    """Delete an entry, its children and their folder_stats using cursor c (no commit)."""
+    deltas = {}
+    _add_folder_stats_delta(deltas, path, _subtree_stats(c, path), -1)
+
+    # Delete the entry
+    c.execute("DELETE FROM file_index WHERE path = ?", (path,))
+    rows_affected = c.rowcount
+
+    # Also delete any children (for directories)
+    c.execute(
+        "DELETE FROM file_index WHERE parent = ? OR (path >= ? AND path < ?)",
+        (path, *_descendant_range(path)),
+    )
+    rows_affected += c.rowcount
+
+    c.execute(
+        "DELETE FROM folder_stats WHERE path = ? OR (path >= ? AND path < ?)",
+        (path, *_descendant_range(path)),
+    )
+    _apply_folder_stats_deltas(c, deltas)
+    return rows_affected
+
+
+def _apply_file_index_batch(c, moves, deletes, upserts):
+    """
+    Apply a batch of file watcher changes using cursor c (no commit):
+    moves first (old_path, new_path), then deletes, then upserts (tuples of
+    _add_file_index_entry's arguments).
+    """
+    for old_path, new_path in moves:
+        _delete_file_index_entry(c, new_path)
+        _move_file_index_entry(c, old_path, new_path)
+    for path in deletes:
+        _delete_file_index_entry(c, path)
+    for entry in upserts:
+        _add_file_index_entry(c, *entry)
+
+
 def delete_file_index_entries(paths, dir_paths=None):
     """
     Batch-delete multiple entries from the file index in a single transaction.
@@ -1787,6 +2547,22 @@ def delete_file_index_entries(paths, dir_paths=None):
         c = conn.cursor()
         total_deleted = 0
 
+        dir_set = set(dir_paths or [])
+        deltas = {}
+        for p in paths:
+            if any(a in dir_set for a in _ancestor_paths(p)):
+                continue  # Already counted with its parent directory's subtree
+            _add_folder_stats_delta(
+                deltas, p, _subtree_stats(c, p, include_descendants=p in dir_set), -1
+            )
+        for dp in dir_set - set(paths):
+            _add_folder_stats_delta(deltas, dp, _subtree_stats(c, dp), -1)
+            # Only the children go; the directory row itself stays
+            c.execute("SELECT type, size FROM file_index WHERE path = ?", (dp,))
+            row = c.fetchone()
+            if row:
+                _add_folder_stats_delta(deltas, dp, _entry_stats(dp, row[0], row[1]))
+
         # Delete exact path entries
         c.executemany("DELETE FROM file_index WHERE path = ?", [(p,) for p in paths])
         total_deleted += c.rowcount
@@ -1795,11 +2571,16 @@ def delete_file_index_entries(paths, dir_paths=None):
         if dir_paths:
             for dp in dir_paths:
                 c.execute(
-                    "DELETE FROM file_index WHERE parent = ? OR path LIKE ?",
-                    (dp, f"{dp}/%"),
+                    "DELETE FROM file_index WHERE parent = ? OR (path >= ? AND path < ?)",
+                    (dp, *_descendant_range(dp)),
                 )
                 total_deleted += c.rowcount
+                c.execute(
+                    "DELETE FROM folder_stats WHERE path = ? OR (path >= ? AND path < ?)",
+                    (dp, *_descendant_range(dp)),
+                )
 
+        _apply_folder_stats_deltas(c, deltas)
         conn.commit()
         conn.close()
 
@@ -1821,17 +2602,18 @@ def clear_file_index_from_db():
     Returns:
         True if successful, False otherwise
     """
+    conn = None
     try:
-        conn = get_db_connection()
+        conn = get_db_write_connection()
         if not conn:
             return False
 
         c = conn.cursor()
         c.execute("DELETE FROM file_index")
+        rows_affected = c.rowcount
+        c.execute("DELETE FROM folder_stats")
 
         conn.commit()
-        rows_affected = c.rowcount
-        conn.close()
 
         app_logger.info(f"Cleared {rows_affected} entries from file index database")
         return True
@@ -1839,57 +2621,183 @@ def clear_file_index_from_db():
     except Exception as e:
         app_logger.error(f"Failed to clear file index database: {e}")
         return False
+    finally:
+        if conn:
+            conn.close()
+
 
+# Rows per staging insert and per write transaction in sync_file_index_incremental
+SYNC_CHUNK_SIZE = 5000
 
-def sync_file_index_incremental(filesystem_entries):
+
+def sync_file_index_incremental(
+    filesystem_entries, chunk_size=SYNC_CHUNK_SIZE, progress_callback=None
+):
     """
     Incrementally sync file_index with filesystem.
 
     - Adds new entries (files in filesystem but not in DB)
     - Removes orphaned entries (files in DB but not in filesystem)
+    - Updates changed entries (size, modified_at or has_thumbnail differ);
+      changed files are flagged for a metadata re-scan
+    - Fills in modified_at for rows indexed without one, keeping their
+      metadata scan state
     - Preserves existing entries (keeps metadata intact)
 
+    The scan is staged into a TEMP table (which does not lock the main
+    database), the differences are computed with set-based SQL, and the
+    changes are applied in short executemany transactions of chunk_size rows
+    so browse-page readers are never blocked for the whole sync.
+
     Args:
-        filesystem_entries: List of dicts with {path, name, type, size, parent, has_thumbnail, modified_at}
+        filesystem_entries: Iterable of dicts with {path, name, type, size, parent, has_thumbnail, modified_at}.
+            Consumed once, so a streaming scanner generator can be passed directly.
+        chunk_size: Rows per staging batch and per write transaction
+        progress_callback: Optional callable(phase, done, total) invoked after each chunk,
+            where phase is 'stage', 'remove', 'add' or 'update'
 
     Returns:
-        Dict with counts: {'added': N, 'removed': N, 'unchanged': N, 'new_paths': [...]}
+        Dict with counts: {'added': N, 'removed': N, 'changed': N, 'unchanged': N,
+        'new_paths': [...], 'changed_paths': [...], 'timings': {phase: seconds}}
     """
+    import time
+
+    empty_result = {
+        "added": 0,
+        "removed": 0,
+        "changed": 0,
+        "unchanged": 0,
+        "new_paths": [],
+        "changed_paths": [],
+        "timings": {},
+    }
+    conn = None
     try:
         conn = get_db_connection()
         if not conn:
-            return {"added": 0, "removed": 0, "unchanged": 0, "new_paths": []}
+            return empty_result
 
         c = conn.cursor()
+        timings = {}
+
+        def report(phase, done, total):
+            app_logger.debug(f"File index sync {phase}: {done}/{total}")
+            if progress_callback:
+                progress_callback(phase, done, total)
+
+        # Stage the filesystem scan into a temp table
+        phase_start = time.perf_counter()
+        c.execute("DROP TABLE IF EXISTS temp.fs_scan")
+        c.execute("""
+            CREATE TEMP TABLE fs_scan (
+                path TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                type TEXT NOT NULL,
+                size INTEGER,
+                parent TEXT,
+                has_thumbnail INTEGER DEFAULT 0,
+                modified_at REAL
+            )
+        """)
+        staged = 0
+        batch = []
 
-        # Get all current paths in DB
-        c.execute("SELECT path FROM file_index")
-        db_paths = set(row[0] for row in c.fetchall())
+        def flush_stage():
+            c.executemany(
+                """
+                INSERT OR REPLACE INTO temp.fs_scan (path, name, type, size, parent, has_thumbnail, modified_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+                batch,
+            )
+            conn.commit()
+            report("stage", staged, None)
 
-        # Get all paths from filesystem scan
-        fs_paths = set(entry["path"] for entry in filesystem_entries)
+        for entry in filesystem_entries:
+            batch.append(
+                (
+                    entry["path"],
+                    entry["name"],
+                    entry["type"],
+                    entry.get("size"),
+                    entry.get("parent"),
+                    entry.get("has_thumbnail", 0),
+                    entry.get("modified_at"),
+                )
+            )
+            staged += 1
+            if len(batch) >= chunk_size:
+                flush_stage()
+                batch = []
+        if batch:
+            flush_stage()
+        timings["stage"] = time.perf_counter() - phase_start
+
+        # Compute the differences with set-based SQL
+        phase_start = time.perf_counter()
+        c.execute("""
+            SELECT f.path, f.type, f.size FROM file_index f
+            WHERE NOT EXISTS (SELECT 1 FROM temp.fs_scan s WHERE s.path = f.path)
+        """)
+        removed_rows = [tuple(row) for row in c.fetchall()]
 
-        # Find differences
-        new_paths = fs_paths - db_paths  # In filesystem, not in DB -> ADD
-        removed_paths = db_paths - fs_paths  # In DB, not in filesystem -> REMOVE
-        existing_paths = fs_paths & db_paths  # In both -> KEEP (preserve metadata)
+        c.execute("""
+            SELECT s.name, s.path, s.type, s.size, s.parent, s.has_thumbnail, s.modified_at
+            FROM temp.fs_scan s
+            WHERE NOT EXISTS (SELECT 1 FROM file_index f WHERE f.path = s.path)
+        """)
+        new_rows = [tuple(row) for row in c.fetchall()]
+
+        c.execute("""
+            SELECT s.path, s.type, s.size, s.has_thumbnail, s.modified_at, f.type, f.size
+            FROM temp.fs_scan s
+            JOIN file_index f ON f.path = s.path
+            WHERE f.type IS NOT s.type
+               OR (s.type = 'file' AND (f.size IS NOT s.size
+                                        OR (f.modified_at IS NOT NULL AND f.modified_at IS NOT s.modified_at)))
+               OR (s.type = 'directory' AND COALESCE(f.has_thumbnail, 0) != COALESCE(s.has_thumbnail, 0))
+        """)
+        changed_rows = [tuple(row) for row in c.fetchall()]
+
+        # Rows indexed without an mtime only get it filled in; their scan state stays
+        c.execute("""
+            SELECT s.modified_at, s.path
+            FROM temp.fs_scan s
+            JOIN file_index f ON f.path = s.path
+            WHERE s.type = 'file' AND f.type = 'file' AND f.size IS s.size
+              AND f.modified_at IS NULL AND s.modified_at IS NOT NULL
+        """)
+        backfill_rows = [tuple(row) for row in c.fetchall()]
 
-        # Remove orphaned entries
-        if removed_paths:
-            for path in removed_paths:
-                c.execute("DELETE FROM file_index WHERE path = ?", (path,))
+        c.execute("""
+            SELECT COUNT(*) FROM temp.fs_scan s
+            WHERE EXISTS (SELECT 1 FROM file_index f WHERE f.path = s.path)
+        """)
+        existing_count = c.fetchone()[0]
+        timings["diff"] = time.perf_counter() - phase_start
+
+        # Apply the changes in chunked write transactions
+        # Each chunk also applies its folder_stats deltas in the same transaction
+        phase_start = time.perf_counter()
+        for i in range(0, len(removed_rows), chunk_size):
+            chunk = removed_rows[i : i + chunk_size]
+            c.executemany("DELETE FROM file_index WHERE path = ?", [(row[0],) for row in chunk])
+            deltas = {}
+            for path, entry_type, size in chunk:
+                _add_folder_stats_delta(deltas, path, _entry_stats(path, entry_type, size), -1)
+            _apply_folder_stats_deltas(c, deltas)
+            conn.commit()
+            report("remove", i + len(chunk), len(removed_rows))
+        if removed_rows:
             app_logger.info(
-                f"Removed {len(removed_paths)} orphaned entries from file_index"
+                f"Removed {len(removed_rows)} orphaned entries from file_index"
             )
 
-        # Add new entries
-        import time
-
         current_time = time.time()
-        new_entries = [e for e in filesystem_entries if e["path"] in new_paths]
-        for entry in new_entries:
+        for i in range(0, len(new_rows), chunk_size):
+            chunk = new_rows[i : i + chunk_size]
             # Use ON CONFLICT to preserve first_indexed_at for existing entries
-            c.execute(
+            c.executemany(
                 """
                 INSERT INTO file_index (name, path, type, size, parent, has_thumbnail, modified_at, first_indexed_at)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
@@ -1901,40 +2809,186 @@ def sync_file_index_incremental(filesystem_entries):
                     has_thumbnail = excluded.has_thumbnail,
                     modified_at = excluded.modified_at
             """,
-                (
-                    entry["name"],
-                    entry["path"],
-                    entry["type"],
-                    entry.get("size"),
-                    entry.get("parent"),
-                    entry.get("has_thumbnail", 0),
-                    entry.get("modified_at"),
-                    current_time,
-                ),
+                [row + (current_time,) for row in chunk],
             )
+            deltas = {}
+            for name, path, entry_type, size, *_ in chunk:
+                _add_folder_stats_delta(deltas, path, _entry_stats(path, entry_type, size))
+            _apply_folder_stats_deltas(c, deltas)
+            conn.commit()
+            report("add", i + len(chunk), len(new_rows))
 
-        conn.commit()
+        for i in range(0, len(changed_rows), chunk_size):
+            chunk = changed_rows[i : i + chunk_size]
+            # Changed files lose their scan state so ComicInfo.xml is re-read
+            c.executemany(
+                """
+                UPDATE file_index
+                SET type = ?, size = ?, has_thumbnail = ?, modified_at = ?,
+                    metadata_scanned_at = CASE WHEN ? = 'file' THEN NULL ELSE metadata_scanned_at END,
+                    has_comicinfo = CASE WHEN ? = 'file' THEN NULL ELSE has_comicinfo END,
+                    last_updated = CURRENT_TIMESTAMP
+                WHERE path = ?
+            """,
+                [
+                    (entry_type, size, has_thumb, mtime, entry_type, entry_type, path)
+                    for path, entry_type, size, has_thumb, mtime, _, _ in chunk
+                ],
+            )
+            deltas = {}
+            for path, entry_type, size, _, _, old_type, old_size in chunk:
+                _add_folder_stats_delta(deltas, path, _entry_stats(path, old_type, old_size), -1)
+                _add_folder_stats_delta(deltas, path, _entry_stats(path, entry_type, size))
+            _apply_folder_stats_deltas(c, deltas)
+            conn.commit()
+            report("update", i + len(chunk), len(changed_rows))
+
+        for i in range(0, len(backfill_rows), chunk_size):
+            c.executemany(
+                "UPDATE file_index SET modified_at = ? WHERE path = ?",
+                backfill_rows[i : i + chunk_size],
+            )
+            conn.commit()
+        timings["apply"] = time.perf_counter() - phase_start
+
+        c.execute("DROP TABLE IF EXISTS temp.fs_scan")
         conn.close()
 
-        if new_paths:
-            app_logger.info(f"Added {len(new_paths)} new entries to file_index")
+        if new_rows:
+            app_logger.info(f"Added {len(new_rows)} new entries to file_index")
+        if changed_rows:
+            app_logger.info(f"Updated {len(changed_rows)} changed entries in file_index")
 
         return {
-            "added": len(new_paths),
-            "removed": len(removed_paths),
-            "unchanged": len(existing_paths),
-            "new_paths": list(new_paths),
+            "added": len(new_rows),
+            "removed": len(removed_rows),
+            "changed": len(changed_rows),
+            "unchanged": existing_count - len(changed_rows),
+            "new_paths": [row[1] for row in new_rows],
+            "changed_paths": [row[0] for row in changed_rows if row[1] == "file"],
+            "timings": timings,
         }
 
     except Exception as e:
         app_logger.error(f"Failed to sync file index incrementally: {e}")
-        return {"added": 0, "removed": 0, "unchanged": 0, "new_paths": []}
+        if conn:
+            # Pooled connections outlive this call; don't keep the staging table around
+            try:
+                conn.rollback()
+                conn.execute("DROP TABLE IF EXISTS temp.fs_scan")
+            except sqlite3.Error:
+                pass
+            conn.close()
+        return empty_result
+
+
+# =============================================================================
+# File Index Full-Text Search (FTS5)
+# =============================================================================
+#
+# file_index_fts is an external-content FTS5 table over file_index, kept in
+# sync by triggers. Python's sqlite3 module cannot register custom FTS5
+# tokenizers, so issue numbers are normalized on the query side instead:
+# a numeric term matches all of its zero-padded forms ("1" finds "#001").
+
+FTS_COLUMNS = ("name", "ci_series", "ci_title", "ci_writer", "ci_characters", "ci_publisher")
+
+# bm25() weights, in FTS_COLUMNS order: file name matches rank highest
+FTS_WEIGHTS = (10.0, 5.0, 3.0, 1.0, 1.0, 1.0)
+
+
+def _init_file_index_fts(c):
+    """Create the FTS5 table and sync triggers, populating it on first run."""
+    c.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name='file_index_fts'"
+    )
+    if c.fetchone():
+        return
+
+    columns = ", ".join(FTS_COLUMNS)
+    new_values = ", ".join(f"new.{col}" for col in FTS_COLUMNS)
+    old_values = ", ".join(f"old.{col}" for col in FTS_COLUMNS)
+    try:
+        c.execute(f"""
+            CREATE VIRTUAL TABLE file_index_fts USING fts5(
+                {columns},
+                content='file_index',
+                content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        app_logger.warning(f"FTS5 unavailable, file search will use LIKE: {e}")
+        return
+
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS file_index_fts_insert AFTER INSERT ON file_index BEGIN
+            INSERT INTO file_index_fts(rowid, {columns}) VALUES (new.id, {new_values});
+        END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS file_index_fts_delete AFTER DELETE ON file_index BEGIN
+            INSERT INTO file_index_fts(file_index_fts, rowid, {columns})
+            VALUES ('delete', old.id, {old_values});
+        END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS file_index_fts_update AFTER UPDATE OF {columns} ON file_index BEGIN
+            INSERT INTO file_index_fts(file_index_fts, rowid, {columns})
+            VALUES ('delete', old.id, {old_values});
+            INSERT INTO file_index_fts(rowid, {columns}) VALUES (new.id, {new_values});
+        END
+    """)
+    c.execute("INSERT INTO file_index_fts(file_index_fts) VALUES ('rebuild')")
+    app_logger.info("Migrating file_index: built full-text search index")
+
+
+def build_fts_query(query):
+    """
+    Convert free text into an FTS5 MATCH expression.
+
+    Words become prefix terms ("bat" -> "bat"*), numbers match any zero
+    padding ("#018" and "18" both become ("18" OR "018" OR ...)), and all
+    terms must match.
+
+    Args:
+        query: User search text
+
+    Returns:
+        FTS5 query string, or None if the text has no searchable terms
+    """
+    terms = []
+    for token in re.findall(r"[^\W_]+", (query or "").lower()):
+        if token.isdigit():
+            base = token.lstrip("0") or "0"
+            variants = dict.fromkeys([base] + [base.zfill(w) for w in (2, 3, 4)])
+            terms.append("(" + " OR ".join(f'"{v}"' for v in variants) + ")")
+        else:
+            terms.append(f'"{token}"*')
+    return " AND ".join(terms) if terms else None
+
+
+def _row_to_search_entry(row):
+    entry = {
+        "name": row["name"],
+        "path": row["path"],
+        "type": row["type"],
+        "parent": row["parent"],
+    }
+    if row["size"] is not None:
+        entry["size"] = row["size"]
+    return entry
 
 
 def search_file_index(query, limit=100):
     """
     Search the file index for entries matching the query.
 
+    Uses the FTS5 index over file names and ComicInfo fields (series, title,
+    writer, characters, publisher), ranked by bm25 with name matches first.
+    Falls back to a LIKE scan on the name when FTS5 is unavailable or the
+    query has no searchable terms.
+
     Args:
         query: Search query string
         limit: Maximum number of results to return
@@ -1948,36 +3002,44 @@ def search_file_index(query, limit=100):
             return []
 
         c = conn.cursor()
+        rows = None
 
-        # Search with LIKE for partial matching (case-insensitive)
-        c.execute(
-            """
-            SELECT name, path, type, size, parent
-            FROM file_index
-            WHERE LOWER(name) LIKE LOWER(?)
-            ORDER BY type DESC, name ASC
-            LIMIT ?
-        """,
-            (f"%{query}%", limit),
-        )
+        fts_query = build_fts_query(query)
+        if fts_query:
+            weights = ", ".join(str(w) for w in FTS_WEIGHTS)
+            try:
+                c.execute(
+                    f"""
+                    SELECT f.name, f.path, f.type, f.size, f.parent
+                    FROM file_index_fts
+                    JOIN file_index f ON f.id = file_index_fts.rowid
+                    WHERE file_index_fts MATCH ?
+                    ORDER BY bm25(file_index_fts, {weights}), f.type DESC, f.name ASC
+                    LIMIT ?
+                """,
+                    (fts_query, limit),
+                )
+                rows = c.fetchall()
+            except sqlite3.OperationalError as e:
+                app_logger.debug(f"FTS search unavailable, using LIKE: {e}")
 
-        rows = c.fetchall()
-        conn.close()
+        if rows is None:
+            # Search with LIKE for partial matching (case-insensitive)
+            c.execute(
+                """
+                SELECT name, path, type, size, parent
+                FROM file_index
+                WHERE LOWER(name) LIKE LOWER(?)
+                ORDER BY type DESC, name ASC
+                LIMIT ?
+            """,
+                (f"%{query}%", limit),
+            )
+            rows = c.fetchall()
 
-        # Convert to list of dictionaries
-        results = []
-        for row in rows:
-            entry = {
-                "name": row["name"],
-                "path": row["path"],
-                "type": row["type"],
-                "parent": row["parent"],
-            }
-            if row["size"] is not None:
-                entry["size"] = row["size"]
-            results.append(entry)
+        conn.close()
 
-        return results
+        return [_row_to_search_entry(row) for row in rows]
 
     except Exception as e:
         app_logger.error(f"Failed to search file index: {e}")
@@ -2002,51 +3064,58 @@ def update_file_metadata(file_id, metadata_dict, scanned_at, has_comicinfo=None)
     Returns:
         True if successful, False otherwise
     """
+    conn = None
     try:
-        conn = get_db_connection()
+        conn = get_db_write_connection()
         if not conn:
             return False
 
-        c = conn.cursor()
-        c.execute(
-            """
-            UPDATE file_index
-            SET ci_title = ?, ci_series = ?, ci_number = ?, ci_count = ?,
-                ci_volume = ?, ci_year = ?, ci_writer = ?, ci_penciller = ?,
-                ci_inker = ?, ci_colorist = ?, ci_letterer = ?, ci_coverartist = ?,
-                ci_publisher = ?, ci_genre = ?, ci_characters = ?,
-                metadata_scanned_at = ?, has_comicinfo = ?
-            WHERE id = ?
-        """,
-            (
-                metadata_dict.get("ci_title", ""),
-                metadata_dict.get("ci_series", ""),
-                metadata_dict.get("ci_number", ""),
-                metadata_dict.get("ci_count", ""),
-                metadata_dict.get("ci_volume", ""),
-                metadata_dict.get("ci_year", ""),
-                metadata_dict.get("ci_writer", ""),
-                metadata_dict.get("ci_penciller", ""),
-                metadata_dict.get("ci_inker", ""),
-                metadata_dict.get("ci_colorist", ""),
-                metadata_dict.get("ci_letterer", ""),
-                metadata_dict.get("ci_coverartist", ""),
-                metadata_dict.get("ci_publisher", ""),
-                metadata_dict.get("ci_genre", ""),
-                metadata_dict.get("ci_characters", ""),
-                scanned_at,
-                has_comicinfo if has_comicinfo is not None else 0,
-                file_id,
-            ),
-        )
+        _update_file_metadata(conn.cursor(), file_id, metadata_dict, scanned_at, has_comicinfo)
 
         conn.commit()
-        conn.close()
         return True
 
     except Exception as e:
         app_logger.error(f"Failed to update file metadata for id {file_id}: {e}")
         return False
+    finally:
+        if conn:
+            conn.close()
+
+
+def _update_file_metadata(c, file_id, metadata_dict, scanned_at, has_comicinfo=None):
+    """Write ComicInfo metadata columns for one file_index row using cursor c (no commit)."""
+    c.execute(
+        """
+        UPDATE file_index
+        SET ci_title = ?, ci_series = ?, ci_number = ?, ci_count = ?,
+            ci_volume = ?, ci_year = ?, ci_writer = ?, ci_penciller = ?,
+            ci_inker = ?, ci_colorist = ?, ci_letterer = ?, ci_coverartist = ?,
+            ci_publisher = ?, ci_genre = ?, ci_characters = ?,
+            metadata_scanned_at = ?, has_comicinfo = ?
+        WHERE id = ?
+    """,
+        (
+            metadata_dict.get("ci_title", ""),
+            metadata_dict.get("ci_series", ""),
+            metadata_dict.get("ci_number", ""),
+            metadata_dict.get("ci_count", ""),
+            metadata_dict.get("ci_volume", ""),
+            metadata_dict.get("ci_year", ""),
+            metadata_dict.get("ci_writer", ""),
+            metadata_dict.get("ci_penciller", ""),
+            metadata_dict.get("ci_inker", ""),
+            metadata_dict.get("ci_colorist", ""),
+            metadata_dict.get("ci_letterer", ""),
+            metadata_dict.get("ci_coverartist", ""),
+            metadata_dict.get("ci_publisher", ""),
+            metadata_dict.get("ci_genre", ""),
+            metadata_dict.get("ci_characters", ""),
+            scanned_at,
+            has_comicinfo if has_comicinfo is not None else 0,
+            file_id,
+        ),
+    )
 
 
 def update_metadata_scanned_at(file_id, scanned_at):
@@ -2066,11 +3135,7 @@ def update_metadata_scanned_at(file_id, scanned_at):
         if not conn:
             return False
 
-        c = conn.cursor()
-        c.execute(
-            "UPDATE file_index SET metadata_scanned_at = ?, has_comicinfo = 0 WHERE id = ?",
-            (scanned_at, file_id),
-        )
+        _update_metadata_scanned_at(conn.cursor(), file_id, scanned_at)
 
         conn.commit()
         conn.close()
@@ -2081,6 +3146,14 @@ def update_metadata_scanned_at(file_id, scanned_at):
         return False
 
 
+def _update_metadata_scanned_at(c, file_id, scanned_at):
+    """Mark one file_index row as scanned without ComicInfo using cursor c (no commit)."""
+    c.execute(
+        "UPDATE file_index SET metadata_scanned_at = ?, has_comicinfo = 0 WHERE id = ?",
+        (scanned_at, file_id),
+    )
+
+
 def get_files_missing_comicinfo(path=None):
     """
     Get all comic files where has_comicinfo = 0 (confirmed no ComicInfo.xml).
@@ -2159,20 +3232,37 @@ def set_has_comicinfo(file_path, value=1):
         return False
 
 
-def get_files_needing_metadata_scan(limit=1000):
+# Archives the metadata scanner reads ComicInfo.xml from
+_METADATA_SCAN_FILES_SQL = """
+    type = 'file'
+    AND (LOWER(path) LIKE '%.cbz' OR LOWER(path) LIKE '%.zip'
+         OR LOWER(path) LIKE '%.cbr' OR LOWER(path) LIKE '%.rar')
+"""
+
+_METADATA_SCAN_PENDING_SQL = _METADATA_SCAN_FILES_SQL + """
+    AND (metadata_scanned_at IS NULL OR metadata_scanned_at < modified_at)
+    AND (has_comicinfo IS NULL OR has_comicinfo != 1)
+"""
+
+
+def get_files_needing_metadata_scan(limit=1000, after_id=0):
     """
-    Get files that need metadata scanning.
+    Get a page of files that need metadata scanning.
 
     Criteria:
     - type = 'file'
-    - path ends with .cbz or .zip
+    - path ends with .cbz, .zip, .cbr or .rar
     - metadata_scanned_at IS NULL OR metadata_scanned_at < modified_at
 
+    Pages are keyed on id, so walking a large library costs one index range
+    scan per page instead of re-sorting the whole table.
+
     Args:
         limit: Maximum number of files to return
+        after_id: Only return files with a larger id (last id of the previous page)
 
     Returns:
-        List of dicts with id, path, modified_at
+        List of dicts with id, path, modified_at, ordered by id
     """
     try:
         conn = get_db_connection()
@@ -2181,17 +3271,14 @@ def get_files_needing_metadata_scan(limit=1000):
 
         c = conn.cursor()
         c.execute(
-            """
+            f"""
             SELECT id, path, modified_at
             FROM file_index
-            WHERE type = 'file'
-            AND (LOWER(path) LIKE '%.cbz' OR LOWER(path) LIKE '%.zip')
-            AND (metadata_scanned_at IS NULL OR metadata_scanned_at < modified_at)
-            AND (has_comicinfo IS NULL OR has_comicinfo != 1)
-            ORDER BY modified_at DESC
+            WHERE id > ? AND {_METADATA_SCAN_PENDING_SQL}
+            ORDER BY id
             LIMIT ?
         """,
-            (limit,),
+            (after_id, limit),
         )
 
         rows = c.fetchall()
@@ -2207,6 +3294,24 @@ def get_files_needing_metadata_scan(limit=1000):
         return []
 
 
+def count_files_needing_metadata_scan():
+    """Count the files get_files_needing_metadata_scan() would return."""
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return 0
+
+        c = conn.cursor()
+        c.execute(f"SELECT COUNT(*) as count FROM file_index WHERE {_METADATA_SCAN_PENDING_SQL}")
+        count = c.fetchone()["count"]
+        conn.close()
+        return count
+
+    except Exception as e:
+        app_logger.error(f"Failed to count files needing metadata scan: {e}")
+        return 0
+
+
 def get_metadata_scan_stats():
     """
     Get statistics for metadata scanning progress.
@@ -2221,21 +3326,12 @@ def get_metadata_scan_stats():
 
         c = conn.cursor()
 
-        # Total CBZ/ZIP files
-        c.execute("""
-            SELECT COUNT(*) as count FROM file_index
-            WHERE type = 'file'
-            AND (LOWER(path) LIKE '%.cbz' OR LOWER(path) LIKE '%.zip')
-        """)
+        # Total scannable archives
+        c.execute(f"SELECT COUNT(*) as count FROM file_index WHERE {_METADATA_SCAN_FILES_SQL}")
         total = c.fetchone()["count"]
 
         # Files needing scan
-        c.execute("""
-            SELECT COUNT(*) as count FROM file_index
-            WHERE type = 'file'
-            AND (LOWER(path) LIKE '%.cbz' OR LOWER(path) LIKE '%.zip')
-            AND (metadata_scanned_at IS NULL OR metadata_scanned_at < modified_at)
-        """)
+        c.execute(f"SELECT COUNT(*) as count FROM file_index WHERE {_METADATA_SCAN_PENDING_SQL}")
         pending = c.fetchone()["count"]
 
         conn.close()
@@ -2282,6 +3378,50 @@ def get_file_index_entry_by_path(path):
         return None
 
 
+def get_indexed_folder_files(folder_path):
+    """
+    Get the files directly inside an indexed folder with their scanned
+    ComicInfo series and number.
+
+    Args:
+        folder_path: Directory path as stored in file_index
+
+    Returns:
+        List of dicts (name, path, modified_at, ci_series, ci_number,
+        metadata_scanned_at) ordered by name, or None when the folder is not
+        in file_index or the lookup failed
+    """
+    conn = None
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return None
+
+        c = conn.cursor()
+        c.execute(
+            "SELECT 1 FROM file_index WHERE path = ? AND type = 'directory'", (folder_path,)
+        )
+        if c.fetchone() is None:
+            return None
+
+        c.execute(
+            """
+            SELECT name, path, modified_at, ci_series, ci_number, metadata_scanned_at
+            FROM file_index
+            WHERE parent = ? AND type = 'file'
+            ORDER BY name
+        """,
+            (folder_path,),
+        )
+        return [dict(row) for row in c.fetchall()]
+    except Exception as e:
+        app_logger.error(f"Failed to get indexed files for {folder_path}: {e}")
+        return None
+    finally:
+        if conn:
+            conn.close()
+
+
 #########################
 #   Unified Schedules   #
 #########################
@@ -2440,6 +3580,344 @@ def update_last_getcomics_run():
     return update_schedule_last_run("getcomics")
 
 
+#########################
+#   Background Jobs     #
+#########################
+
+JOB_COLUMNS = (
+    "id, job_type, params, concurrency_key, status, progress_done, progress_total, message, "
+    "checkpoint, result, error, attempts, max_attempts, cancel_requested, run_after, "
+    "created_at, started_at, finished_at, updated_at"
+)
+
+
+def create_job(job_id, job_type, params=None, concurrency_key=None, max_attempts=1):
+    """
+    Queue a background job unless one with the same concurrency key is active.
+
+    Args:
+        job_id: New job ID
+        job_type: Registered job type name
+        params: JSON string of handler parameters
+        concurrency_key: Jobs sharing a key never run or queue twice (optional)
+        max_attempts: Runs allowed before the job is marked failed
+
+    Returns:
+        Tuple (job_id, created): the new ID and True, or the ID of the active
+        job with the same key and False. (None, False) on error.
+    """
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return None, False
+        try:
+            conn.execute(
+                """
+                INSERT INTO jobs (id, job_type, params, concurrency_key, max_attempts)
+                VALUES (?, ?, ?, ?, ?)
+            """,
+                (job_id, job_type, params, concurrency_key, max_attempts),
+            )
+            conn.commit()
+            return job_id, True
+        except sqlite3.IntegrityError:
+            # idx_jobs_active_key: an active job already holds this key
+            conn.rollback()
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE concurrency_key = ? AND status IN ('queued', 'running')",
+                (concurrency_key,),
+            ).fetchone()
+            return (row["id"] if row else None), False
+        finally:
+            conn.close()
+    except Exception as e:
+        app_logger.error(f"Failed to create job '{job_type}': {e}")
+        return None, False
+
+
+def claim_next_job(now=None, exclude_types=None):
+    """
+    Mark the oldest runnable queued job as running and return it.
+
+    A queued job is runnable once its run_after time has passed and no
+    running job holds its concurrency key.
+
+    Args:
+        now: Current time (defaults to time.time())
+        exclude_types: Job types not to claim (e.g. those of a full worker lane)
+
+    Returns:
+        Job dict, or None if nothing is runnable
+    """
+    now = time.time() if now is None else now
+    exclude_types = list(exclude_types or ())
+    type_filter = ""
+    if exclude_types:
+        type_filter = f"AND job_type NOT IN ({', '.join('?' * len(exclude_types))})"
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return None
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                f"""
+                SELECT {JOB_COLUMNS} FROM jobs
+                WHERE status = 'queued' AND run_after <= ? {type_filter}
+                  AND (concurrency_key IS NULL OR concurrency_key NOT IN (
+                      SELECT concurrency_key FROM jobs
+                      WHERE status = 'running' AND concurrency_key IS NOT NULL))
+                ORDER BY created_at, rowid
+                LIMIT 1
+            """,
+                (now, *exclude_types),
+            ).fetchone()
+            if row is None:
+                conn.rollback()
+                return None
+            conn.execute(
+                """
+                UPDATE jobs SET status = 'running', attempts = attempts + 1,
+                    started_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """,
+                (row["id"],),
+            )
+            conn.commit()
+            job = dict(row)
+            job["status"] = "running"
+            job["attempts"] += 1
+            return job
+        finally:
+            conn.close()
+    except Exception as e:
+        app_logger.error(f"Failed to claim next job: {e}")
+        return None
+
+
+def update_job_progress(job_id, done=None, total=None, message=None, checkpoint=None):
+    """
+    Record progress of a running job.
+
+    Args:
+        job_id: Job ID
+        done: Items finished so far (optional)
+        total: Total items (optional)
+        message: Status line (optional)
+        checkpoint: JSON string the handler can resume from (optional)
+
+    Returns:
+        True if cancellation was requested for the job
+    """
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return False
+        conn.execute(
+            """
+            UPDATE jobs SET
+                progress_done = COALESCE(?, progress_done),
+                progress_total = COALESCE(?, progress_total),
+                message = COALESCE(?, message),
+                checkpoint = COALESCE(?, checkpoint),
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        """,
+            (done, total, message, checkpoint, job_id),
+        )
+        conn.commit()
+        row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        conn.close()
+        return bool(row and row["cancel_requested"])
+    except Exception as e:
+        app_logger.error(f"Failed to update progress of job {job_id}: {e}")
+        return False
+
+
+def finish_job(job_id, status, result=None, error=None):
+    """
+    Move a running job to a final status.
+
+    Args:
+        job_id: Job ID
+        status: 'completed', 'failed' or 'cancelled'
+        result: JSON string of the handler's return value (optional)
+        error: Error message (optional)
+
+    Returns:
+        True if successful
+    """
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return False
+        conn.execute(
+            """
+            UPDATE jobs SET status = ?, result = ?, error = ?,
+                finished_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        """,
+            (status, result, error, job_id),
+        )
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        app_logger.error(f"Failed to finish job {job_id}: {e}")
+        return False
+
+
+def retry_job(job_id, error, run_after):
+    """Put a failed running job back in the queue to run again at run_after (unix time)."""
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return False
+        conn.execute(
+            """
+            UPDATE jobs SET status = 'queued', error = ?, run_after = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        """,
+            (error, run_after, job_id),
+        )
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        app_logger.error(f"Failed to requeue job {job_id}: {e}")
+        return False
+
+
+def request_job_cancel(job_id):
+    """
+    Cancel a job: a queued job is cancelled at once, a running job is flagged
+    and stops at its next progress update.
+
+    Returns:
+        The job's status afterwards, or None if the job does not exist
+    """
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return None
+        conn.execute(
+            """
+            UPDATE jobs SET status = 'cancelled', cancel_requested = 1,
+                finished_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ? AND status = 'queued'
+        """,
+            (job_id,),
+        )
+        conn.execute(
+            "UPDATE jobs SET cancel_requested = 1, updated_at = CURRENT_TIMESTAMP WHERE id = ? AND status = 'running'",
+            (job_id,),
+        )
+        conn.commit()
+        row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        conn.close()
+        return row["status"] if row else None
+    except Exception as e:
+        app_logger.error(f"Failed to cancel job {job_id}: {e}")
+        return None
+
+
+def get_job(job_id):
+    """Get a background job by ID, or None."""
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return None
+        row = conn.execute(f"SELECT {JOB_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        conn.close()
+        return dict(row) if row else None
+    except Exception as e:
+        app_logger.error(f"Failed to get job {job_id}: {e}")
+        return None
+
+
+def list_jobs(status=None, job_type=None, limit=50):
+    """
+    List background jobs, newest first.
+
+    Args:
+        status: Only jobs with this status (optional)
+        job_type: Only jobs of this type (optional)
+        limit: Maximum number of jobs
+
+    Returns:
+        List of job dicts
+    """
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return []
+        clauses, args = [], []
+        if status:
+            clauses.append("status = ?")
+            args.append(status)
+        if job_type:
+            clauses.append("job_type = ?")
+            args.append(job_type)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = conn.execute(
+            f"SELECT {JOB_COLUMNS} FROM jobs {where} ORDER BY created_at DESC, rowid DESC LIMIT ?",
+            (*args, limit),
+        ).fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+    except Exception as e:
+        app_logger.error(f"Failed to list jobs: {e}")
+        return []
+
+
+def requeue_interrupted_jobs():
+    """
+    Queue jobs left 'running' by a previous process (container restart) again.
+
+    Returns:
+        Number of jobs requeued
+    """
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return 0
+        cur = conn.execute(
+            """
+            UPDATE jobs SET status = CASE WHEN cancel_requested THEN 'cancelled' ELSE 'queued' END,
+                run_after = 0, updated_at = CURRENT_TIMESTAMP
+            WHERE status = 'running'
+        """
+        )
+        conn.commit()
+        conn.close()
+        return cur.rowcount
+    except Exception as e:
+        app_logger.error(f"Failed to requeue interrupted jobs: {e}")
+        return 0
+
+
+def prune_finished_jobs(days=7):
+    """Delete completed, failed and cancelled jobs that finished more than days ago."""
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return 0
+        cur = conn.execute(
+            """
+            DELETE FROM jobs
+            WHERE status IN ('completed', 'failed', 'cancelled')
+              AND finished_at < datetime('now', ?)
+        """,
+            (f"-{int(days)} days",),
+        )
+        conn.commit()
+        conn.close()
+        return cur.rowcount
+    except Exception as e:
+        app_logger.error(f"Failed to prune finished jobs: {e}")
+        return 0
+
+
 #########################
 #   Weekly Packs        #
 #########################
@@ -2853,7 +4331,7 @@ def invalidate_browse_cache(path):
             c.execute("DELETE FROM browse_cache WHERE path = ?", (parent,))
 
         # Delete any child paths
-        c.execute("DELETE FROM browse_cache WHERE path LIKE ?", (f"{path}/%",))
+        c.execute("DELETE FROM browse_cache WHERE path >= ? AND path < ?", _descendant_range(path))
 
         conn.commit()
         rows_affected = c.rowcount
@@ -4218,14 +5696,7 @@ def save_reading_position(comic_path, page_number, total_pages=None, time_spent=
         if not conn:
             return False
 
-        c = conn.cursor()
-        c.execute(
-            """
-            INSERT OR REPLACE INTO reading_positions (comic_path, page_number, total_pages, updated_at, time_spent)
-            VALUES (?, ?, ?, CURRENT_TIMESTAMP, ?)
-        """,
-            (comic_path, page_number, total_pages, time_spent),
-        )
+        _save_reading_position(conn.cursor(), comic_path, page_number, total_pages, time_spent)
 
         conn.commit()
         conn.close()
@@ -4238,6 +5709,17 @@ def save_reading_position(comic_path, page_number, total_pages=None, time_spent=
         return False
 
 
+def _save_reading_position(c, comic_path, page_number, total_pages=None, time_spent=0):
+    """Upsert one reading_positions row using cursor c (no commit)."""
+    c.execute(
+        """
+        INSERT OR REPLACE INTO reading_positions (comic_path, page_number, total_pages, updated_at, time_spent)
+        VALUES (?, ?, ?, CURRENT_TIMESTAMP, ?)
+    """,
+        (comic_path, page_number, total_pages, time_spent),
+    )
+
+
 def get_reading_position(comic_path):
     """
     Get saved reading position for a comic.
@@ -5437,6 +6919,66 @@ def save_issue(issue_data, series_id):
         return False
 
 
+def _issue_to_dict(issue_data):
+    """Issue dict from a Mokkari model, an object with attributes or a dict."""
+    # Handle Pydantic models or dicts - convert first
+    if hasattr(issue_data, "model_dump"):
+        return issue_data.model_dump(mode="json")
+    if hasattr(issue_data, "dict"):
+        return issue_data.dict()
+    if hasattr(issue_data, "id"):
+        # Object with attributes - convert to dict
+        return {
+            "id": getattr(issue_data, "id", None),
+            "number": getattr(issue_data, "number", ""),
+            "name": getattr(issue_data, "issue_name", None)
+            or getattr(issue_data, "name", None),
+            "cover_date": getattr(issue_data, "cover_date", None),
+            "store_date": getattr(issue_data, "store_date", None),
+            "image": getattr(issue_data, "image", None),
+            "resource_url": getattr(issue_data, "resource_url", None),
+            "cv_id": getattr(issue_data, "cv_id", None),
+        }
+    return issue_data
+
+
+def _upsert_issues(c, issues_list, series_id):
+    """Insert or replace issues of a series on cursor c. Returns the saved IDs."""
+    saved_ids = []
+    for issue_data in issues_list:
+        issue_dict = _issue_to_dict(issue_data)
+        issue_id = issue_dict.get("id")
+        if not issue_id:
+            continue
+
+        c.execute(
+            """
+            INSERT OR REPLACE INTO issues
+            (id, series_id, number, name, cover_date, store_date, image, resource_url, cv_id,
+             created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?,
+                    COALESCE((SELECT created_at FROM issues WHERE id = ?), CURRENT_TIMESTAMP),
+                    CURRENT_TIMESTAMP)
+        """,
+            (
+                issue_id,
+                series_id,
+                str(issue_dict.get("number", "")),
+                issue_dict.get("issue_name") or issue_dict.get("name"),
+                issue_dict.get("cover_date"),
+                issue_dict.get("store_date"),
+                str(issue_dict.get("image")) if issue_dict.get("image") else None,
+                str(issue_dict.get("resource_url"))
+                if issue_dict.get("resource_url")
+                else None,
+                issue_dict.get("cv_id"),
+                issue_id,
+            ),
+        )
+        saved_ids.append(issue_id)
+    return saved_ids
+
+
 def save_issues_bulk(issues_list, series_id):
     """
     Save multiple issues in a single transaction.
@@ -5455,59 +6997,7 @@ def save_issues_bulk(issues_list, series_id):
             return -1
 
         c = conn.cursor()
-        saved_count = 0
-
-        for issue_data in issues_list:
-            # Handle Pydantic models or dicts - convert first
-            if hasattr(issue_data, "model_dump"):
-                issue_dict = issue_data.model_dump(mode="json")
-            elif hasattr(issue_data, "dict"):
-                issue_dict = issue_data.dict()
-            elif hasattr(issue_data, "id"):
-                # Object with attributes - convert to dict
-                issue_dict = {
-                    "id": getattr(issue_data, "id", None),
-                    "number": getattr(issue_data, "number", ""),
-                    "name": getattr(issue_data, "issue_name", None)
-                    or getattr(issue_data, "name", None),
-                    "cover_date": getattr(issue_data, "cover_date", None),
-                    "store_date": getattr(issue_data, "store_date", None),
-                    "image": getattr(issue_data, "image", None),
-                    "resource_url": getattr(issue_data, "resource_url", None),
-                    "cv_id": getattr(issue_data, "cv_id", None),
-                }
-            else:
-                issue_dict = issue_data
-
-            issue_id = issue_dict.get("id")
-            if not issue_id:
-                continue
-
-            c.execute(
-                """
-                INSERT OR REPLACE INTO issues
-                (id, series_id, number, name, cover_date, store_date, image, resource_url, cv_id,
-                 created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?,
-                        COALESCE((SELECT created_at FROM issues WHERE id = ?), CURRENT_TIMESTAMP),
-                        CURRENT_TIMESTAMP)
-            """,
-                (
-                    issue_id,
-                    series_id,
-                    str(issue_dict.get("number", "")),
-                    issue_dict.get("issue_name") or issue_dict.get("name"),
-                    issue_dict.get("cover_date"),
-                    issue_dict.get("store_date"),
-                    str(issue_dict.get("image")) if issue_dict.get("image") else None,
-                    str(issue_dict.get("resource_url"))
-                    if issue_dict.get("resource_url")
-                    else None,
-                    issue_dict.get("cv_id"),
-                    issue_id,
-                ),
-            )
-            saved_count += 1
+        saved_count = len(_upsert_issues(c, issues_list, series_id))
 
         conn.commit()
         app_logger.info(f"Saved {saved_count} issues for series {series_id}")
@@ -5770,13 +7260,73 @@ def cleanup_stale_issues(series_id, valid_issue_ids):
         conn.commit()
         conn.close()
 
-        if deleted > 0:
-            app_logger.info(
-                f"Cleaned up {deleted} stale issue(s) for series {series_id}"
+        if deleted > 0:
+            app_logger.info(
+                f"Cleaned up {deleted} stale issue(s) for series {series_id}"
+            )
+
+    except Exception as e:
+        app_logger.error(f"Failed to cleanup stale issues for series {series_id}: {e}")
+
+
+def save_series_sync_batch(entries, synced_at):
+    """
+    Save the results of several series syncs in one transaction.
+
+    Args:
+        entries: List of dicts with series_id, issues (new or changed issues)
+                 and full (True when issues is the complete issue list, so
+                 issues missing from it are deleted)
+        synced_at: UTC timestamp ('YYYY-MM-DD HH:MM:SS') the sync started at,
+                   stored as last_synced_at (and last_full_synced_at for full
+                   syncs) so the next delta sync asks for changes since then
+
+    Returns:
+        Number of issues saved, or -1 on error
+    """
+    conn = None
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return -1
+
+        c = conn.cursor()
+        saved_count = 0
+        for entry in entries:
+            series_id = entry["series_id"]
+            saved_ids = _upsert_issues(c, entry["issues"], series_id)
+            saved_count += len(saved_ids)
+
+            if entry.get("full") and saved_ids:
+                placeholders = ",".join("?" * len(saved_ids))
+                c.execute(
+                    "DELETE FROM issues WHERE series_id = ? AND id NOT IN (" + placeholders + ")",
+                    (series_id, *saved_ids),
+                )
+
+            c.execute(
+                """
+                UPDATE series
+                SET last_synced_at = ?,
+                    last_full_synced_at = CASE WHEN ? THEN ? ELSE last_full_synced_at END,
+                    issue_count = (SELECT COUNT(*) FROM issues WHERE series_id = ?),
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """,
+                (synced_at, bool(entry.get("full")), synced_at, series_id, series_id),
             )
 
+        conn.commit()
+        app_logger.info(f"Saved {saved_count} issues for {len(entries)} synced series")
+        return saved_count
+
     except Exception as e:
-        app_logger.error(f"Failed to cleanup stale issues for series {series_id}: {e}")
+        app_logger.error(f"Failed to save series sync batch: {e}")
+        return -1
+
+    finally:
+        if conn:
+            conn.close()
 
 
 # =============================================================================
@@ -5953,6 +7503,53 @@ def invalidate_collection_status_for_path(file_path):
             conn.close()
 
 
+def invalidate_collection_status_for_paths(directories):
+    """
+    Invalidate cached collection status of every series mapped to one of the
+    given directories, in one transaction.
+
+    Args:
+        directories: Directory paths whose contents changed
+
+    Returns:
+        Number of collection status entries removed
+    """
+    directories = list(set(directories))
+    if not directories:
+        return 0
+
+    conn = None
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return 0
+
+        c = conn.cursor()
+        c.execute("CREATE TEMP TABLE IF NOT EXISTS _changed_dirs (path TEXT PRIMARY KEY)")
+        c.execute("DELETE FROM _changed_dirs")
+        c.executemany("INSERT OR IGNORE INTO _changed_dirs (path) VALUES (?)", [(d,) for d in directories])
+        c.execute("""
+            DELETE FROM collection_status
+            WHERE series_id IN (
+                SELECT id FROM series WHERE mapped_path IN (SELECT path FROM _changed_dirs)
+            )
+        """)
+        deleted = c.rowcount
+        c.execute("DELETE FROM _changed_dirs")
+        conn.commit()
+        if deleted > 0:
+            app_logger.debug(
+                f"Invalidated {deleted} collection status entries for {len(directories)} directories"
+            )
+        return deleted
+    except Exception as e:
+        app_logger.error(f"Failed to invalidate collection status for {len(directories)} directories: {e}")
+        return 0
+    finally:
+        if conn:
+            conn.close()
+
+
 # =====================================================
 # WANTED ISSUES CACHE FUNCTIONS
 # =====================================================
@@ -6112,6 +7709,169 @@ def clear_wanted_cache_all():
             conn.close()
 
 
+def prune_wanted_cache(keep_series_ids):
+    """
+    Delete cached wanted issues of series not in keep_series_ids
+    (series that were unmapped or lost their folder).
+
+    Returns:
+        Number of rows deleted
+    """
+    conn = None
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return 0
+
+        c = conn.cursor()
+        c.execute("CREATE TEMP TABLE IF NOT EXISTS _keep_wanted (series_id INTEGER PRIMARY KEY)")
+        c.execute("DELETE FROM _keep_wanted")
+        c.executemany("INSERT OR IGNORE INTO _keep_wanted VALUES (?)", [(sid,) for sid in keep_series_ids])
+        c.execute("DELETE FROM wanted_issues WHERE series_id NOT IN (SELECT series_id FROM _keep_wanted)")
+        deleted = c.rowcount
+        conn.commit()
+        return deleted
+    except Exception as e:
+        app_logger.error(f"Failed to prune wanted cache: {e}")
+        return 0
+    finally:
+        if conn:
+            conn.close()
+
+
+def mark_wanted_series_dirty(series_ids, reason=None):
+    """
+    Flag series for an incremental wanted cache refresh.
+
+    Args:
+        series_ids: Iterable of Metron series IDs
+        reason: What changed ('sync', 'files', 'manual_status', ...)
+
+    Returns:
+        Number of series marked
+    """
+    rows = [(sid, reason, time.time()) for sid in set(series_ids) if sid]
+    if not rows:
+        return 0
+
+    conn = None
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return 0
+
+        c = conn.cursor()
+        c.executemany(
+            """
+            INSERT INTO wanted_dirty_series (series_id, reason, marked_at) VALUES (?, ?, ?)
+            ON CONFLICT(series_id) DO UPDATE SET reason = excluded.reason, marked_at = excluded.marked_at
+        """,
+            rows,
+        )
+        conn.commit()
+        return len(rows)
+    except Exception as e:
+        app_logger.error(f"Failed to mark series dirty for wanted refresh: {e}")
+        return 0
+    finally:
+        if conn:
+            conn.close()
+
+
+def get_wanted_dirty_series():
+    """
+    Get the series flagged for a wanted cache refresh.
+
+    Returns:
+        Dict of series_id -> marked_at
+    """
+    conn = None
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return {}
+
+        c = conn.cursor()
+        c.execute("SELECT series_id, marked_at FROM wanted_dirty_series")
+        return {row["series_id"]: row["marked_at"] for row in c.fetchall()}
+    except Exception as e:
+        app_logger.error(f"Failed to get dirty wanted series: {e}")
+        return {}
+    finally:
+        if conn:
+            conn.close()
+
+
+def clear_wanted_dirty_series(marks):
+    """
+    Unflag refreshed series. A series marked again after marked_at stays
+    flagged, so a change during its refresh is not lost.
+
+    Args:
+        marks: Dict of series_id -> marked_at as returned by get_wanted_dirty_series()
+    """
+    if not marks:
+        return
+
+    conn = None
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return
+
+        c = conn.cursor()
+        c.executemany(
+            "DELETE FROM wanted_dirty_series WHERE series_id = ? AND marked_at <= ?",
+            list(marks.items()),
+        )
+        conn.commit()
+    except Exception as e:
+        app_logger.error(f"Failed to clear dirty wanted series: {e}")
+    finally:
+        if conn:
+            conn.close()
+
+
+def get_series_ids_for_paths(paths):
+    """
+    Get the mapped series whose folder is, or directly contains, any of paths.
+
+    Args:
+        paths: Series folders or files directly inside one (which may no
+               longer exist)
+
+    Returns:
+        Set of series IDs
+    """
+    folders = set()
+    for path in paths:
+        folders.update((path, os.path.dirname(path)))
+    folders = list(folders)
+
+    conn = None
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return set()
+
+        c = conn.cursor()
+        series_ids = set()
+        # Process in batches to stay under SQLite parameter limits
+        BATCH_SIZE = 500
+        for i in range(0, len(folders), BATCH_SIZE):
+            batch = folders[i : i + BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            c.execute(f"SELECT id FROM series WHERE mapped_path IN ({placeholders})", batch)
+            series_ids.update(row["id"] for row in c.fetchall())
+        return series_ids
+    except Exception as e:
+        app_logger.error(f"Failed to get series for {len(paths)} paths: {e}")
+        return set()
+    finally:
+        if conn:
+            conn.close()
+
+
 def get_wanted_cache_age():
     """
     Get the age of the oldest cache entry.
@@ -6817,6 +8577,159 @@ def remove_library_provider(library_id: int, provider_type: str) -> bool:
         return False
 
 
+# =============================================================================
+# Provider Cache Functions
+# =============================================================================
+
+
+def get_provider_cache(provider_type: str, cache_type: str, provider_id: str) -> Optional[str]:
+    """
+    Get an unexpired provider_cache entry.
+
+    Args:
+        provider_type: Provider identifier (e.g., 'metron')
+        cache_type: Kind of cached call (e.g., 'series', 'issues')
+        provider_id: Cache key within the provider and type
+
+    Returns:
+        The cached JSON string, or None on a miss
+    """
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return None
+        row = conn.execute(
+            """
+            SELECT data FROM provider_cache
+            WHERE provider_type = ? AND cache_type = ? AND provider_id = ?
+              AND (expires_at IS NULL OR expires_at > datetime('now'))
+        """,
+            (provider_type, cache_type, provider_id),
+        ).fetchone()
+        conn.close()
+        return row["data"] if row else None
+    except Exception as e:
+        # A cache read failing only costs an API call
+        app_logger.debug(f"Provider cache read failed for {provider_type}/{cache_type}: {e}")
+        return None
+
+
+def set_provider_cache(provider_type: str, cache_type: str, provider_id: str, data: str, ttl: int) -> bool:
+    """
+    Store a provider_cache entry, replacing any previous one.
+
+    Args:
+        provider_type: Provider identifier
+        cache_type: Kind of cached call
+        provider_id: Cache key within the provider and type
+        data: JSON string to cache
+        ttl: Seconds until the entry expires
+
+    Returns:
+        True if stored successfully
+    """
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return False
+        conn.execute(
+            """
+            INSERT INTO provider_cache (provider_type, cache_type, provider_id, data, expires_at)
+            VALUES (?, ?, ?, ?, datetime('now', ?))
+            ON CONFLICT(provider_type, cache_type, provider_id) DO UPDATE SET
+                data = excluded.data,
+                created_at = CURRENT_TIMESTAMP,
+                expires_at = excluded.expires_at
+        """,
+            (provider_type, cache_type, provider_id, data, f"+{int(ttl)} seconds"),
+        )
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        app_logger.debug(f"Provider cache write failed for {provider_type}/{cache_type}: {e}")
+        return False
+
+
+def delete_expired_provider_cache() -> int:
+    """
+    Delete expired provider_cache entries.
+
+    Returns:
+        Number of entries deleted
+    """
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return 0
+        cur = conn.execute("DELETE FROM provider_cache WHERE expires_at <= datetime('now')")
+        conn.commit()
+        conn.close()
+        return cur.rowcount
+    except Exception as e:
+        app_logger.error(f"Failed to delete expired provider cache entries: {e}")
+        return 0
+
+
+def clear_provider_cache(provider_type: Optional[str] = None, negative_only: bool = False) -> int:
+    """
+    Delete provider_cache entries for one provider, or all of them.
+
+    Args:
+        provider_type: Provider identifier, or None for every provider
+        negative_only: Only delete cached empty results (not found / no match)
+
+    Returns:
+        Number of entries deleted
+    """
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return 0
+        clauses, args = [], []
+        if provider_type:
+            clauses.append("provider_type = ?")
+            args.append(provider_type)
+        if negative_only:
+            clauses.append("data IN ('null', '[]')")
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        cur = conn.execute(f"DELETE FROM provider_cache {where}", args)
+        conn.commit()
+        conn.close()
+        return cur.rowcount
+    except Exception as e:
+        app_logger.error(f"Failed to clear provider cache: {e}")
+        return 0
+
+
+def get_provider_cache_counts() -> dict:
+    """
+    Count live provider_cache entries.
+
+    Returns:
+        Dict of provider_type -> {cache_type: count}
+    """
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return {}
+        rows = conn.execute(
+            """
+            SELECT provider_type, cache_type, COUNT(*) AS count FROM provider_cache
+            WHERE expires_at IS NULL OR expires_at > datetime('now')
+            GROUP BY provider_type, cache_type
+        """
+        ).fetchall()
+        conn.close()
+        counts = {}
+        for row in rows:
+            counts.setdefault(row["provider_type"], {})[row["cache_type"]] = row["count"]
+        return counts
+    except Exception as e:
+        app_logger.error(f"Failed to count provider cache entries: {e}")
+        return {}
+
+
 #########################
 #   Komga Sync Functions #
 #########################
@@ -7190,3 +9103,13 @@ def get_komga_sync_stats():
     except Exception as e:
         app_logger.error(f"Failed to get Komga sync stats: {e}")
         return {"total_synced_read": 0, "total_synced_progress": 0, "last_sync": None}
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--benchmark-pool":
+        report = benchmark_connection_pool(int(sys.argv[2]) if len(sys.argv) > 2 else 3000)
+        print(f"Connection pool benchmark ({report['calls']} calls, parent {report['parent']!r}): "
+              f"per-call connection {report['per_call_connection_us']}us/call, "
+              f"pooled {report['pooled_us']}us/call (hit rate {report['pool_hit_rate']})")
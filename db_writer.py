@@ -0,0 +1,356 @@
+"""
+db_writer.py - Single-writer batching queue for background SQLite writes
+
+The metadata scanner, thumbnail tasks, file watcher and reading-position
+saves each used to commit one row per transaction from their own threads.
+This module funnels those writes through one writer thread:
+1. Producers enqueue small write operations and return immediately
+2. The writer applies queued operations in one transaction on the shared
+   writer connection, every DB_WRITE_BATCH_SIZE operations or
+   DB_WRITE_FLUSH_MS milliseconds, whichever comes first
+3. Operations queued under the same key are coalesced, so only the latest
+   reading position or thumbnail status for a path is written
+4. The queue is bounded (DB_WRITE_QUEUE_MAX); producers block while it is full
+5. flush_db_writes() waits until everything queued so far is committed;
+   stop_db_writer() flushes and stops the thread on shutdown
+
+While the writer thread is not running, operations are written synchronously.
+"""
+
+import atexit
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from app_logging import app_logger
+from config import config
+from database import (
+    get_db_write_connection,
+    _add_file_index_entry,
+    _apply_file_index_batch,
+    _delete_file_index_entry,
+    _save_reading_position,
+    _set_thumbnail_job_status,
+    _update_file_metadata,
+    _update_metadata_scanned_at,
+)
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_MS = 250
+DEFAULT_QUEUE_MAX = 10000
+COMMIT_RETRIES = 3
+
+
+class WriteQueue:
+    """
+    Bounded write-behind queue drained by a single writer thread.
+
+    An operation is a callable taking a cursor as its first argument; it must
+    not commit. Each operation runs inside its own savepoint, so a failing
+    operation is rolled back and logged without losing the rest of the batch.
+    """
+
+    def __init__(self, batch_size=None, flush_ms=None, max_pending=None):
+        self.batch_size = batch_size
+        self.flush_ms = flush_ms
+        self.max_pending = max_pending
+
+        self._pending = OrderedDict()  # key -> (seq, func, args)
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._written_seq = 0
+        self._first_pending_at = None
+        self._flush_waiters = 0
+        self._stopping = False
+        self._thread = None
+
+        self.stats = {
+            'enqueued': 0,
+            'coalesced': 0,
+            'written': 0,
+            'batches': 0,
+            'errors': 0,
+            'dropped': 0,
+            'producer_waits': 0,
+            'max_depth': 0,
+        }
+
+    def start(self):
+        """Start the writer thread (no-op if already running)."""
+        with self._cond:
+            if self.is_running():
+                return
+            if self.batch_size is None:
+                self.batch_size = config.getint("SETTINGS", "DB_WRITE_BATCH_SIZE", fallback=DEFAULT_BATCH_SIZE)
+            if self.flush_ms is None:
+                self.flush_ms = config.getint("SETTINGS", "DB_WRITE_FLUSH_MS", fallback=DEFAULT_FLUSH_MS)
+            if self.max_pending is None:
+                self.max_pending = config.getint("SETTINGS", "DB_WRITE_QUEUE_MAX", fallback=DEFAULT_QUEUE_MAX)
+            self.batch_size = max(1, self.batch_size)
+            self.max_pending = max(self.batch_size, self.max_pending)
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, daemon=True, name="DBWriter")
+            self._thread.start()
+        app_logger.info(
+            f"Started database writer (batch {self.batch_size}, every {self.flush_ms}ms, max {self.max_pending} queued)"
+        )
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self, timeout=10):
+        """Write everything still queued and stop the writer thread."""
+        with self._cond:
+            if not self.is_running():
+                return
+            self._stopping = True
+            self._cond.notify_all()
+        self._thread.join(timeout=timeout)
+        if self._thread.is_alive():
+            app_logger.warning(f"Database writer did not finish within {timeout}s; {len(self._pending)} writes pending")
+        else:
+            self._thread = None
+            app_logger.info("Database writer stopped")
+
+    def submit(self, func, *args, key=None):
+        """
+        Queue a write operation.
+
+        Args:
+            func: Callable invoked as func(cursor, *args)
+            *args: Arguments for func
+            key: Optional hashable; a queued operation with the same key is replaced
+        """
+        if not self.is_running():
+            self._write_batch([(func, args)])
+            return
+
+        with self._cond:
+            self._seq += 1
+            self.stats['enqueued'] += 1
+            if key is not None and key in self._pending:
+                # Replace and move to the back so writes stay in submission order
+                del self._pending[key]
+                self.stats['coalesced'] += 1
+            else:
+                while len(self._pending) >= self.max_pending and not self._stopping:
+                    self.stats['producer_waits'] += 1
+                    self._cond.wait()
+                if key is None:
+                    key = ('_seq', self._seq)
+
+            if not self._pending:
+                self._first_pending_at = time.monotonic()
+                self._cond.notify_all()
+            self._pending[key] = (self._seq, func, args)
+
+            depth = len(self._pending)
+            if depth > self.stats['max_depth']:
+                self.stats['max_depth'] = depth
+            if depth >= self.batch_size:
+                self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        Wait until every operation queued before this call is committed.
+
+        Returns:
+            True if flushed, False on timeout
+        """
+        if not self.is_running():
+            return True
+
+        with self._cond:
+            target = self._seq
+            self._flush_waiters += 1
+            self._cond.notify_all()
+            try:
+                return self._cond.wait_for(
+                    lambda: self._written_seq >= target or not self.is_running(),
+                    timeout=timeout,
+                )
+            finally:
+                self._flush_waiters -= 1
+
+    def get_stats(self):
+        """Counters plus the current queue depth."""
+        with self._cond:
+            stats = dict(self.stats)
+            stats['pending'] = len(self._pending)
+            stats['running'] = self.is_running()
+        stats['avg_batch'] = round(stats['written'] / stats['batches'], 1) if stats['batches'] else 0
+        return stats
+
+    def _next_batch(self):
+        """Block until a batch is due and take it off the queue. Returns None to exit."""
+        with self._cond:
+            while True:
+                if self._pending and (
+                    self._stopping
+                    or self._flush_waiters
+                    or len(self._pending) >= self.batch_size
+                ):
+                    break
+                if not self._pending:
+                    if self._stopping:
+                        return None
+                    self._cond.wait()
+                    continue
+                remaining = self._first_pending_at + self.flush_ms / 1000 - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch = []
+            last_seq = 0
+            while self._pending and len(batch) < self.batch_size:
+                _, (seq, func, args) = self._pending.popitem(last=False)
+                batch.append((func, args))
+                last_seq = seq
+            if not self._pending:
+                self._first_pending_at = None
+            # Wake producers waiting for room
+            self._cond.notify_all()
+            return batch, last_seq
+
+    def _run(self):
+        while True:
+            item = self._next_batch()
+            if item is None:
+                break
+            batch, last_seq = item
+            self._write_batch(batch)
+            with self._cond:
+                self._written_seq = max(self._written_seq, last_seq)
+                self._cond.notify_all()
+
+    def _write_batch(self, batch):
+        """Apply a batch of operations in one transaction, retrying if the database is busy."""
+        for attempt in range(COMMIT_RETRIES):
+            conn = get_db_write_connection()
+            if not conn:
+                time.sleep(0.5 * (attempt + 1))
+                continue
+            try:
+                c = conn.cursor()
+                c.execute("BEGIN IMMEDIATE")
+                errors = 0
+                for func, args in batch:
+                    c.execute("SAVEPOINT write_op")
+                    try:
+                        func(c, *args)
+                    except sqlite3.OperationalError as e:
+                        if "locked" in str(e).lower() or "busy" in str(e).lower():
+                            raise
+                        c.execute("ROLLBACK TO write_op")
+                        errors += 1
+                        app_logger.error(f"Queued database write {func.__name__}{args[:1]} failed: {e}")
+                    except Exception as e:
+                        c.execute("ROLLBACK TO write_op")
+                        errors += 1
+                        app_logger.error(f"Queued database write {func.__name__}{args[:1]} failed: {e}")
+                    c.execute("RELEASE write_op")
+                conn.commit()
+
+                with self._cond:
+                    self.stats['written'] += len(batch) - errors
+                    self.stats['errors'] += errors
+                    self.stats['batches'] += 1
+                return
+            except sqlite3.OperationalError as e:
+                app_logger.warning(
+                    f"Database busy writing {len(batch)} queued writes, retrying ({attempt + 1}/{COMMIT_RETRIES}): {e}"
+                )
+                time.sleep(0.5 * (attempt + 1))
+            except Exception as e:
+                app_logger.error(f"Failed to write {len(batch)} queued database writes: {e}")
+                break
+            finally:
+                conn.close()
+
+        with self._cond:
+            self.stats['dropped'] += len(batch)
+        app_logger.error(f"Dropped {len(batch)} queued database writes")
+
+
+# Process-wide writer used by the helpers below
+write_queue = WriteQueue()
+
+
+def start_db_writer():
+    """Start the shared writer thread. Pending writes are flushed at exit."""
+    write_queue.start()
+
+
+def stop_db_writer(timeout=10):
+    """Flush pending writes and stop the shared writer thread."""
+    write_queue.stop(timeout=timeout)
+
+
+def flush_db_writes(timeout=None):
+    """Wait until all writes queued so far are committed."""
+    return write_queue.flush(timeout=timeout)
+
+
+def get_db_writer_stats():
+    """Counters of the shared writer (enqueued, coalesced, written, batches, pending...)."""
+    return write_queue.get_stats()
+
+
+atexit.register(stop_db_writer)
+
+
+# =============================================================================
+# Queued write helpers
+# =============================================================================
+
+def queue_file_metadata(file_id, metadata_dict, scanned_at, has_comicinfo=None):
+    """Queue update_file_metadata() for a file_index row."""
+    write_queue.submit(
+        _update_file_metadata, file_id, metadata_dict, scanned_at, has_comicinfo,
+        key=('file_metadata', file_id),
+    )
+
+
+def queue_metadata_scanned_at(file_id, scanned_at):
+    """Queue update_metadata_scanned_at() for a file_index row."""
+    # Own key: must never replace a queued full metadata write for the file
+    write_queue.submit(_update_metadata_scanned_at, file_id, scanned_at, key=('metadata_scanned_at', file_id))
+
+
+def queue_thumbnail_status(path, status, file_mtime=None):
+    """Queue a thumbnail_jobs status change (creates/resets the row when file_mtime is given)."""
+    # Row creation is never coalesced away by a later status-only update
+    key = ('thumbnail_job', path) if file_mtime is None else None
+    write_queue.submit(_set_thumbnail_job_status, path, status, file_mtime, key=key)
+
+
+def queue_reading_position(comic_path, page_number, total_pages=None, time_spent=0):
+    """Queue save_reading_position(); rapid page turns collapse into one write."""
+    write_queue.submit(
+        _save_reading_position, comic_path, page_number, total_pages, time_spent,
+        key=('reading_position', comic_path),
+    )
+
+
+def queue_file_index_entry(name, path, entry_type, size=None, parent=None, has_thumbnail=0, modified_at=None):
+    """Queue add_file_index_entry()."""
+    write_queue.submit(
+        _add_file_index_entry, name, path, entry_type, size, parent, has_thumbnail, modified_at,
+        key=('file_index', path),
+    )
+
+
+def queue_file_index_delete(path):
+    """Queue delete_file_index_entry()."""
+    write_queue.submit(_delete_file_index_entry, path, key=('file_index', path))
+
+
+def queue_file_index_batch(upserts=(), deletes=(), moves=()):
+    """
+    Queue a burst of file watcher changes as one write: moves (old, new),
+    then deletes, then upserts (name, path, type, size, parent, has_thumbnail,
+    modified_at).
+    """
+    write_queue.submit(_apply_file_index_batch, list(moves), list(deletes), list(upserts))
@@ -0,0 +1,300 @@
+"""
+directory_cache.py - Cached directory listings for the file browser
+
+Listings used to expire after 5 seconds, so most browse requests re-read the
+folder with one os.stat per entry, and every hit paid another os.stat to
+validate the entry. Now:
+1. Listings under a watched root (the file watcher's DATA_DIR) are kept until
+   a change invalidates them: the file watcher, update_index_on_move/delete/
+   create and invalidate_cache_for_path. A hit makes no filesystem call;
+   DIRECTORY_CACHE_MAX_AGE only bounds the damage of a missed event
+2. Listings outside watched roots (e.g. the downloads folder), or while the
+   watcher is not running, keep the short DIRECTORY_CACHE_UNWATCHED_SECONDS TTL.
+   The watcher's liveness is checked on every read, so one that died
+   without stop() does not leave listings cached for DIRECTORY_CACHE_MAX_AGE
+3. Invalidating a path drops its own listing, its parent's and those of every
+   folder below it
+4. The cache is an LRU bounded by an estimated memory budget
+   (DIRECTORY_CACHE_MB); the global MemoryMonitor halves it when process
+   memory passes its cleanup threshold
+5. get_directory_cache_stats() reports hits, misses, evictions, invalidations
+   and memory use
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from app_logging import app_logger
+from config import config
+from memory_utils import get_global_monitor
+
+DEFAULT_CACHE_MB = 16
+DEFAULT_MAX_AGE = 3600
+DEFAULT_UNWATCHED_SECONDS = 5
+
+# Rough per-object sizes used for the memory budget
+_LISTING_OVERHEAD = 300
+_DIRECTORY_OVERHEAD = 60
+_FILE_OVERHEAD = 250
+
+EXCLUDED_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".html", ".css", ".ds_store", ".json", ".db"}
+EXCLUDED_FILES = {"cvinfo"}
+ALLOWED_FILES = {"missing.txt"}
+
+
+def listing_nbytes(path, listing):
+    """Estimated memory used by one cached listing."""
+    return (_LISTING_OVERHEAD + len(path)
+            + sum(_DIRECTORY_OVERHEAD + len(name) for name in listing['directories'])
+            + sum(_FILE_OVERHEAD + len(entry['name']) for entry in listing['files']))
+
+
+class _Entry:
+    __slots__ = ('listing', 'nbytes', 'cached_at', 'watched')
+
+    def __init__(self, listing, nbytes, cached_at, watched):
+        self.listing = listing
+        self.nbytes = nbytes
+        self.cached_at = cached_at
+        self.watched = watched
+
+
+class DirectoryCache:
+    """Thread-safe LRU of directory listings bounded by estimated bytes."""
+
+    def __init__(self, max_bytes=None, max_age=None, unwatched_seconds=None):
+        self._max_bytes = max_bytes
+        self._max_age = max_age
+        self._unwatched_seconds = unwatched_seconds
+        self._entries = OrderedDict()  # path -> _Entry
+        self._bytes = 0
+        self._watched_roots = {}  # root -> callable telling whether its watcher still runs
+        self._generation = 0  # bumped by every invalidation
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0, 'invalidations': 0}
+
+    @property
+    def max_bytes(self):
+        if self._max_bytes is None:
+            return config.getint("SETTINGS", "DIRECTORY_CACHE_MB", fallback=DEFAULT_CACHE_MB) * 1024 * 1024
+        return self._max_bytes
+
+    @property
+    def max_age(self):
+        if self._max_age is None:
+            return config.getint("SETTINGS", "DIRECTORY_CACHE_MAX_AGE", fallback=DEFAULT_MAX_AGE)
+        return self._max_age
+
+    @property
+    def unwatched_seconds(self):
+        if self._unwatched_seconds is None:
+            return config.getint("SETTINGS", "DIRECTORY_CACHE_UNWATCHED_SECONDS",
+                                 fallback=DEFAULT_UNWATCHED_SECONDS)
+        return self._unwatched_seconds
+
+    def add_watched_root(self, root, is_alive=None):
+        """
+        Keep listings under root until invalidated (its changes are reported).
+
+        Args:
+            root: Folder whose changes are reported
+            is_alive: Callable returning False once the watcher reporting them
+                      has died; checked on every read
+        """
+        root = os.path.normpath(root)
+        with self._lock:
+            self._watched_roots[root] = is_alive
+            # Listings cached before the watcher started may already be stale
+            self._invalidate_locked(root, parent=False)
+
+    def remove_watched_root(self, root):
+        root = os.path.normpath(root)
+        with self._lock:
+            self._watched_roots.pop(root, None)
+            self._invalidate_locked(root, parent=False)
+
+    def _is_watched(self, path):
+        """True if path is under a root whose watcher is still running (needs the lock)."""
+        for root in [r for r, alive in self._watched_roots.items() if alive is not None and not alive()]:
+            # The watcher died without stop(); nothing reports changes any more
+            app_logger.warning(f"Directory cache: watcher for {root} is not running, using short TTL")
+            del self._watched_roots[root]
+            self._invalidate_locked(root, parent=False)
+        return any(path == root or path.startswith(root + os.sep) for root in self._watched_roots)
+
+    @property
+    def generation(self):
+        """Pass to put() to drop a listing read while an invalidation happened."""
+        return self._generation
+
+    def get(self, path):
+        """Cached listing of path, or None on a miss."""
+        path = os.path.normpath(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            # The watcher may have died since put(); its listings are dropped then
+            watched = entry is not None and entry.watched and self._is_watched(path)
+            entry = self._entries.get(path)
+            if entry is not None:
+                ttl = self.max_age if watched else self.unwatched_seconds
+                if time.time() - entry.cached_at <= ttl:
+                    self._entries.move_to_end(path)
+                    self.stats['hits'] += 1
+                    return entry.listing
+                self._remove(path)
+                self.stats['expired'] += 1
+            self.stats['misses'] += 1
+            return None
+
+    def put(self, path, listing, generation=None):
+        path = os.path.normpath(path)
+        size = listing_nbytes(path, listing)
+        budget = self.max_bytes
+        if size > budget:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            if path in self._entries:
+                self._remove(path)
+            self._entries[path] = _Entry(listing, size, time.time(), self._is_watched(path))
+            self._bytes += size
+            self._evict_to(budget)
+
+    def contains(self, path):
+        with self._lock:
+            return os.path.normpath(path) in self._entries
+
+    def invalidate(self, paths):
+        """
+        Drop the listings of paths, of their parent folders and of every folder
+        below them.
+
+        Returns:
+            Number of listings dropped
+        """
+        with self._lock:
+            dropped = sum(self._invalidate_locked(os.path.normpath(path)) for path in paths)
+            self.stats['invalidations'] += dropped
+        return dropped
+
+    def _invalidate_locked(self, path, parent=True):
+        self._generation += 1
+        keys = [path, os.path.dirname(path)] if parent else [path]
+        prefix = path.rstrip(os.sep) + os.sep
+        keys.extend(key for key in self._entries if key.startswith(prefix))
+        dropped = 0
+        for key in keys:
+            if key in self._entries:
+                self._remove(key)
+                dropped += 1
+        return dropped
+
+    def clear(self):
+        """Drop every listing. Returns the number dropped."""
+        with self._lock:
+            dropped = len(self._entries)
+            self._generation += 1
+            self._entries.clear()
+            self._bytes = 0
+        return dropped
+
+    def trim(self, fraction=0.5):
+        """Evict least recently used listings down to fraction of the current size."""
+        with self._lock:
+            before = self._bytes
+            self._evict_to(int(before * fraction))
+            freed = before - self._bytes
+        if freed:
+            app_logger.debug(f"Directory cache trimmed by {freed} bytes")
+        return freed
+
+    def reset_stats(self):
+        with self._lock:
+            for key in self.stats:
+                self.stats[key] = 0
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+            stats['watched_roots'] = sorted(self._watched_roots)
+        stats['max_bytes'] = self.max_bytes
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        return stats
+
+    def _evict_to(self, budget):
+        while self._bytes > budget and self._entries:
+            self._remove(next(iter(self._entries)))
+            self.stats['evictions'] += 1
+
+    def _remove(self, path):
+        entry = self._entries.pop(path)
+        self._bytes -= entry.nbytes
+
+
+def read_directory_listing(path):
+    """
+    Read a folder's subfolders and browsable files from the filesystem.
+
+    Returns:
+        Dict with sorted 'directories' (names) and 'files' ({'name', 'size'})
+    """
+    directories = []
+    files = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.name.startswith(('.', '_')):
+                continue
+            try:
+                if entry.is_dir():
+                    directories.append(entry.name)
+                    continue
+                # Check if file should be excluded (but allow specific files like missing.txt)
+                name = entry.name.lower()
+                if name in EXCLUDED_FILES:
+                    continue
+                if name in ALLOWED_FILES or not name.endswith(tuple(EXCLUDED_EXTENSIONS)):
+                    files.append({"name": entry.name, "size": entry.stat().st_size})
+            except OSError:
+                # Skip files we can't access
+                continue
+
+    directories.sort(key=lambda s: s.lower())
+    files.sort(key=lambda f: f["name"].lower())
+    return {"directories": directories, "files": files}
+
+
+# Process-wide cache used by the browse endpoints
+directory_cache = DirectoryCache()
+get_global_monitor().register_cleanup(directory_cache.trim)
+
+
+def list_directory(path):
+    """
+    Get a folder's listing through the shared cache.
+
+    Returns:
+        Tuple of (listing, cached)
+    """
+    generation = directory_cache.generation
+    listing = directory_cache.get(path)
+    if listing is not None:
+        return listing, True
+    listing = read_directory_listing(path)
+    directory_cache.put(path, listing, generation)
+    return listing, False
+
+
+def invalidate_directory_listings(paths):
+    """Drop cached listings affected by changes to paths (see DirectoryCache.invalidate)."""
+    return directory_cache.invalidate(paths)
+
+
+def get_directory_cache_stats():
+    """Counters and memory use of the shared directory cache."""
+    return directory_cache.get_stats()
@@ -0,0 +1,357 @@
+"""
+file_scanner.py - Parallel filesystem scanner for the file index
+
+This module provides the scan engine shared by build_file_index() and
+scan_filesystem_for_sync() in app.py:
+1. Lists directories with os.scandir so the DirEntry type/stat cache is reused
+   instead of separate getsize/getmtime/exists calls per entry
+2. Fans directory subtrees out across a bounded thread pool per library root
+3. Yields index entries as a stream while the walk is still in progress
+4. Records a per-phase timing report exposed via /api/file-index-status
+
+Each directory is listed exactly once. The directory's own index entry is
+emitted by the task that lists it, so has_thumbnail comes from that listing
+rather than four os.path.exists() probes.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+
+from app_logging import app_logger
+from config import config
+
+# Files that are never indexed (matched against the lowercased name)
+EXCLUDED_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".html", ".css", ".ds_store", ".json", ".db")
+EXCLUDED_FILES = {"cvinfo"}
+ALLOWED_FILES = {"missing.txt"}
+
+# Folder thumbnail names checked by the browse page
+FOLDER_THUMBNAIL_NAMES = {"folder.png", "folder.jpg", "folder.jpeg"}
+
+DEFAULT_SCAN_THREADS = 8
+
+# Most recently started report, and the most recent one that finished
+_active_report = None
+_last_report = None
+_report_lock = threading.Lock()
+
+
+def get_scan_threads():
+    """Number of worker threads used per library root (FILE_INDEX_SCAN_THREADS)."""
+    workers = config.getint("SETTINGS", "FILE_INDEX_SCAN_THREADS", fallback=DEFAULT_SCAN_THREADS)
+    return max(1, min(workers, 32))
+
+
+def should_index_file(name):
+    """
+    Check if a file name should be included in the file index.
+
+    Args:
+        name: File name (not a path)
+
+    Returns:
+        True if the file should be indexed
+    """
+    if name.startswith('.') or name.startswith('_'):
+        return False
+    lower = name.lower()
+    if lower in EXCLUDED_FILES:
+        return False
+    if lower not in ALLOWED_FILES and lower.endswith(EXCLUDED_EXTENSIONS):
+        return False
+    return True
+
+
+def should_descend(name):
+    """Check if a directory name should be walked (hidden and _ prefixed dirs are skipped)."""
+    return not (name.startswith('.') or name.startswith('_'))
+
+
+class ScanReport:
+    """
+    Per-phase timing and counters for one file index operation.
+
+    Phases measured by the consumer (sync, save, reload...) are wall-clock
+    durations; a consumer phase that reads the entry stream includes the walk.
+    The 'scandir' and 'stat' phases are summed across all worker threads, so
+    they can exceed the total elapsed time on a parallel walk.
+    """
+
+    def __init__(self, operation):
+        self.operation = operation
+        self.started_at = time.time()
+        self.finished_at = None
+        self.phases = OrderedDict()
+        self.counters = {
+            'libraries': 0,
+            'directories': 0,
+            'files': 0,
+            'errors': 0,
+        }
+        self.workers = get_scan_threads()
+        self.progress = None
+        self._lock = threading.Lock()
+
+        global _active_report
+        with _report_lock:
+            _active_report = self
+
+    def add_time(self, phase, seconds):
+        """Accumulate time spent in a phase (thread-safe)."""
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def increment(self, counter, amount=1):
+        """Increment a counter (thread-safe)."""
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    @contextmanager
+    def phase(self, name):
+        """Context manager that times a block as the named phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def finish(self):
+        """Mark the operation finished and publish it as the latest report."""
+        global _last_report
+        self.finished_at = time.time()
+        with _report_lock:
+            _last_report = self
+        app_logger.info(
+            f"File index {self.operation} timings: "
+            + ", ".join(f"{name}={secs:.2f}s" for name, secs in self.phases.items())
+        )
+
+    def to_dict(self):
+        """Serialize the report for the status API."""
+        with self._lock:
+            end = self.finished_at or time.time()
+            return {
+                'operation': self.operation,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at,
+                'elapsed': round(end - self.started_at, 3),
+                'workers': self.workers,
+                'phases': {name: round(secs, 3) for name, secs in self.phases.items()},
+                'counters': dict(self.counters),
+                'progress': self.progress,
+            }
+
+
+def get_active_scan_report():
+    """
+    Get the report of a file index operation that is still running.
+
+    Returns:
+        Dict from ScanReport.to_dict(), or None if nothing is running
+    """
+    with _report_lock:
+        report = _active_report
+    if report is None or report.finished_at is not None:
+        return None
+    return report.to_dict()
+
+
+def get_last_scan_report():
+    """
+    Get the timing report of the most recent file index operation.
+
+    Returns:
+        Dict from ScanReport.to_dict(), or None if no scan has finished yet
+    """
+    with _report_lock:
+        report = _last_report
+    return report.to_dict() if report else None
+
+
+def _is_excluded_dir(entry, path, excluded_dirs, excluded_inodes):
+    """Check if a subdirectory is one of the excluded roots (e.g. TARGET)."""
+    if not excluded_dirs:
+        return False
+    if os.path.normpath(path) in excluded_dirs:
+        return True
+    # Same directory reached through a different path (symlink, bind mount)
+    try:
+        if entry.inode() in excluded_inodes:
+            return any(os.path.samefile(path, d) for d in excluded_dirs)
+    except OSError:
+        pass
+    return False
+
+
+def _directory_entry(path, parent_path, has_thumbnail):
+    """Build the index entry for a directory."""
+    return {
+        "name": os.path.basename(path),
+        "path": path,
+        "type": "directory",
+        "parent": parent_path,
+        "has_thumbnail": has_thumbnail,
+        "size": None,
+        "modified_at": None
+    }
+
+
+def _probe_thumbnail(folder_path):
+    """Check for a folder thumbnail without listing the directory."""
+    for name in FOLDER_THUMBNAIL_NAMES:
+        if os.path.exists(os.path.join(folder_path, name)):
+            return 1
+    return 0
+
+
+def _scan_directory(dir_path, parent_path, excluded_dirs, excluded_inodes, report):
+    """
+    List one directory and build index entries for it and its files.
+
+    Args:
+        dir_path: Directory to list
+        parent_path: Parent path for the directory's own entry, or None for a library root
+        excluded_dirs: Set of normalized directory paths that must not be walked
+        excluded_inodes: Inode numbers of excluded_dirs for a cheap pre-check
+        report: ScanReport to record timings into
+
+    Returns:
+        Tuple of (entries, subdirectory paths to walk next)
+    """
+    entries = []
+    subdirs = []
+    has_thumbnail = 0
+
+    start = time.perf_counter()
+    try:
+        with os.scandir(dir_path) as it:
+            children = list(it)
+    except OSError as e:
+        app_logger.debug(f"Cannot list directory {dir_path}: {e}")
+        report.increment('errors')
+        children = []
+    report.add_time('scandir', time.perf_counter() - start)
+
+    start = time.perf_counter()
+    file_count = 0
+    for child in children:
+        name = child.name
+        try:
+            if child.is_dir(follow_symlinks=True):
+                if not should_descend(name):
+                    continue
+                child_path = f"{dir_path}/{name}"
+                if _is_excluded_dir(child, child_path, excluded_dirs, excluded_inodes):
+                    continue
+                if child.is_symlink():
+                    # Indexed but not followed (same as os.walk's default)
+                    entries.append(_directory_entry(child_path, dir_path, _probe_thumbnail(child_path)))
+                    report.increment('directories')
+                    continue
+                subdirs.append(child_path)
+                continue
+
+            if name in FOLDER_THUMBNAIL_NAMES:
+                has_thumbnail = 1
+            if not should_index_file(name):
+                continue
+
+            st = child.stat()
+            entries.append({
+                "name": name,
+                "path": f"{dir_path}/{name}",
+                "type": "file",
+                "size": st.st_size,
+                "parent": dir_path,
+                "has_thumbnail": 0,
+                "modified_at": st.st_mtime
+            })
+            file_count += 1
+        except OSError:
+            report.increment('errors')
+            continue
+    report.add_time('stat', time.perf_counter() - start)
+
+    if parent_path is not None:
+        entries.append(_directory_entry(dir_path, parent_path, has_thumbnail))
+        report.increment('directories')
+    report.increment('files', file_count)
+
+    return entries, subdirs
+
+
+def iter_library_entries(library_root, report, excluded_dirs=None, max_workers=None):
+    """
+    Stream file index entries for a single library root.
+
+    Directory listings run on a bounded thread pool; entries are yielded as
+    soon as each directory is listed. The library root itself is not yielded.
+
+    Args:
+        library_root: Root path of the library
+        report: ScanReport to record timings into
+        excluded_dirs: Optional iterable of directory paths to skip entirely
+        max_workers: Thread pool size (default from FILE_INDEX_SCAN_THREADS)
+
+    Yields:
+        Dicts with {name, path, type, size, parent, has_thumbnail, modified_at}
+    """
+    excluded = {os.path.normpath(d) for d in (excluded_dirs or []) if d}
+    excluded_inodes = set()
+    for d in excluded:
+        try:
+            excluded_inodes.add(os.stat(d).st_ino)
+        except OSError:
+            pass
+
+    workers = max_workers or get_scan_threads()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="FileIndexScan")
+    try:
+        pending = {executor.submit(_scan_directory, library_root, None, excluded, excluded_inodes, report)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                entries, subdirs = future.result()
+                for subdir in subdirs:
+                    parent = subdir.rsplit('/', 1)[0]
+                    pending.add(executor.submit(_scan_directory, subdir, parent, excluded, excluded_inodes, report))
+                yield from entries
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def iter_file_index_entries(library_roots, report, excluded_dirs=None, max_workers=None):
+    """
+    Stream file index entries for all library roots.
+
+    Missing roots are skipped with a warning; a failing root is logged and
+    does not stop the others from being scanned.
+
+    Args:
+        library_roots: List of library root paths
+        report: ScanReport to record timings into
+        excluded_dirs: Optional iterable of directory paths to skip entirely
+        max_workers: Thread pool size per library root
+
+    Yields:
+        Dicts with {name, path, type, size, parent, has_thumbnail, modified_at}
+    """
+    for library_root in library_roots:
+        if not os.path.isdir(library_root):
+            app_logger.warning(f"Library path does not exist, skipping: {library_root}")
+            continue
+
+        app_logger.info(f"Indexing library: {library_root}")
+        report.increment('libraries')
+        start = time.perf_counter()
+        try:
+            yield from iter_library_entries(library_root, report, excluded_dirs, max_workers)
+        except Exception as e:
+            app_logger.error(f"Error scanning library {library_root}: {e}")
+            report.increment('errors')
+        finally:
+            report.add_time('walk', time.perf_counter() - start)
@@ -3,17 +3,36 @@ import time
 import threading
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
-from database import add_file_index_entry, delete_file_index_entry, invalidate_collection_status_for_path
+from database import get_file_index_entry_by_path, invalidate_collection_status_for_paths
+from db_writer import queue_file_index_batch, flush_db_writes
+from directory_cache import directory_cache, invalidate_directory_listings
 from app_logging import app_logger
-from metadata_scanner import queue_file_for_scan, PRIORITY_NEW_FILE
+from metadata_scanner import queue_files_for_scan, is_scannable, to_db_path, PRIORITY_NEW_FILE
+from wanted_cache import mark_paths_dirty
 
 
 class DebouncedFileHandler(FileSystemEventHandler):
     """
     File system event handler with debouncing to prevent duplicate events.
-    Only tracks file creation/modification events in the /data directory.
+
+    Events in the /data directory are coalesced per path (the latest event
+    wins) and applied in bursts once they are debounce_seconds old:
+    1. Comic files created or modified, and folders created (walked
+       recursively), are upserted in one file_index write
+    2. Moves of indexed files and folders move their rows, children included;
+       deleted files and folders are removed with their children
+    3. New files are queued for metadata scanning together, and collection
+       status and the wanted cache are invalidated once per changed folder
+    4. Cached browse listings are dropped for every non-hidden path an event
+       touches, comic or not
+    A burst is applied outside the lock the watchdog thread takes to record
+    events, so new events are not held up while it is written.
     """
 
+    CREATE = 'create'
+    DELETE = 'delete'
+    MOVE = 'move'
+
     def __init__(self, debounce_seconds=2):
         """
         Initialize the debounced file handler.
@@ -23,8 +42,9 @@ class DebouncedFileHandler(FileSystemEventHandler):
         """
         super().__init__()
         self.debounce_seconds = debounce_seconds
-        self.pending_events = {}  # {file_path: last_event_time}
+        self.pending_events = {}  # {path: (kind, is_directory, src_path, last_event_time)}
         self.lock = threading.Lock()
+        self.process_lock = threading.Lock()
         self.debounce_timer = None
 
     def _should_process_file(self, file_path):
@@ -35,6 +55,10 @@ class DebouncedFileHandler(FileSystemEventHandler):
         if not os.path.isfile(file_path):
             return False
 
+        return self._is_comic_path(file_path)
+
+    @staticmethod
+    def _is_comic_path(file_path):
         # Ignore hidden files and system files
         basename = os.path.basename(file_path)
         if basename.startswith('.') or basename.startswith('~'):
@@ -42,119 +66,202 @@ class DebouncedFileHandler(FileSystemEventHandler):
 
         # Only process comic book files
         ext = os.path.splitext(file_path)[1].lower()
-        if ext not in ['.cbz', '.cbr']:
-            return False
+        return ext in ['.cbz', '.cbr']
 
-        return True
+    @staticmethod
+    def _file_entry(file_path):
+        """Arguments of one file_index upsert for a file."""
+        return (os.path.basename(file_path), file_path, 'file', os.path.getsize(file_path),
+                os.path.dirname(file_path), 0, os.path.getmtime(file_path))
 
-    def _process_pending_events(self):
-        """Process all pending events that have exceeded the debounce window."""
-        with self.lock:
-            current_time = time.time()
-            events_to_process = []
+    @staticmethod
+    def _directory_entry(dir_path):
+        return (os.path.basename(dir_path), dir_path, 'directory', None, os.path.dirname(dir_path), 0, None)
 
-            # Find events that are ready to process
-            for file_path, event_time in list(self.pending_events.items()):
-                if current_time - event_time >= self.debounce_seconds:
-                    events_to_process.append(file_path)
-                    del self.pending_events[file_path]
+    def _walk_directory(self, directory):
+        """
+        file_index entries for a new folder, its subfolders and comic files.
 
-            # Process the events
-            for file_path in events_to_process:
-                if self._should_process_file(file_path):
+        Returns:
+            (entries, file_paths) - the upserts and the comic files among them
+        """
+        entries = [self._directory_entry(directory)]
+        file_paths = []
+        for root, dirs, files in os.walk(directory):
+            # Skip hidden directories
+            dirs[:] = [d for d in dirs if not d.startswith('.') and not d.startswith('_')]
+            for dir_name in dirs:
+                entries.append(self._directory_entry(os.path.join(root, dir_name)))
+            for file_name in files:
+                file_path = os.path.join(root, file_name)
+                if self._is_comic_path(file_path):
                     try:
-                        file_name = os.path.basename(file_path)
-                        file_size = os.path.getsize(file_path) if os.path.exists(file_path) else None
-                        modified_at = os.path.getmtime(file_path) if os.path.exists(file_path) else None
-                        parent = os.path.dirname(file_path)
-
-                        add_file_index_entry(file_name, file_path, 'file', size=file_size, parent=parent, modified_at=modified_at)
-                        app_logger.info(f"✅ Indexed recent file from watcher: {file_name}")
-
-                        # Queue CBZ files for metadata scanning (high priority for new files)
-                        if file_path.lower().endswith('.cbz'):
-                            queue_file_for_scan(file_path, PRIORITY_NEW_FILE)
-
-                        # Invalidate collection status cache for this directory
-                        invalidate_collection_status_for_path(file_path)
-                    except Exception as e:
-                        app_logger.error(f"Error processing file event for {file_path}: {e}")
+                        entries.append(self._file_entry(file_path))
+                        file_paths.append(file_path)
+                    except OSError:
+                        continue
+        return entries, file_paths
+
+    def _take_ready_events(self, force=False):
+        """Remove and return the events that have exceeded the debounce window."""
+        with self.lock:
+            current_time = time.time()
+            ready = {}
+            for path, event in list(self.pending_events.items()):
+                if force or current_time - event[3] >= self.debounce_seconds:
+                    ready[path] = event
+                    del self.pending_events[path]
+            return ready
+
+    def _schedule(self):
+        """Start the debounce timer (caller holds self.lock)."""
+        self.debounce_timer = threading.Timer(self.debounce_seconds, self._process_pending_events)
+        self.debounce_timer.daemon = True
+        self.debounce_timer.start()
+
+    def _process_pending_events(self, force=False):
+        """Process all pending events that have exceeded the debounce window."""
+        ready = self._take_ready_events(force)
+        if ready:
+            with self.process_lock:
+                try:
+                    self._apply_events(ready)
+                except Exception as e:
+                    app_logger.error(f"Error processing {len(ready)} file events: {e}")
+
+        # Schedule next check if there are still pending events
+        with self.lock:
+            if self.pending_events and not force:
+                self._schedule()
+
+    def flush(self):
+        """Apply every pending event now, debounced or not (e.g. on shutdown)."""
+        self._process_pending_events(force=True)
+
+    def _apply_events(self, events):
+        """Apply one burst of coalesced events."""
+        upserts = []
+        deletes = []
+        moves = []
+        new_files = []
+        changed = []  # (path, is_directory) of everything added, moved or removed
+        visible = []  # every non-hidden path touched; listings show more than comics
+
+        moved_dirs = {src for kind, is_dir, src, _ in events.values() if kind == self.MOVE and is_dir}
+
+        for path, (kind, is_directory, src_path, _) in events.items():
+            visible.extend(p for p in (path, src_path) if p and not os.path.basename(p).startswith('.'))
+            try:
+                if kind == self.DELETE:
+                    if is_directory or self._is_comic_path(path):
+                        deletes.append(path)
+                        changed.append((path, is_directory))
+                    continue
+
+                if kind == self.MOVE:
+                    if any(src_path.startswith(d + os.sep) for d in moved_dirs):
+                        # Moved along with its folder
+                        continue
+                    entry = get_file_index_entry_by_path(src_path)
+                    if entry:
+                        moves.append((src_path, path))
+                        changed.extend(((src_path, is_directory), (path, is_directory)))
+                        if (not is_directory and self._should_process_file(path)
+                                and entry['modified_at'] != os.path.getmtime(path)):
+                            # Modified around the move: refresh the row and rescan it
+                            upserts.append(self._file_entry(path))
+                            new_files.append(path)
+                        continue
+
+                if is_directory:
+                    if not os.path.isdir(path):
+                        continue
+                    entries, file_paths = self._walk_directory(path)
+                    upserts.extend(entries)
+                    new_files.extend(file_paths)
+                    changed.append((path, True))
+                    changed.extend((file_path, False) for file_path in file_paths)
+                elif self._should_process_file(path):
+                    upserts.append(self._file_entry(path))
+                    new_files.append(path)
+                    changed.append((path, False))
                 else:
-                    app_logger.debug(f"File watcher skipped (filtered): {file_path}")
+                    app_logger.debug(f"File watcher skipped (filtered): {path}")
+            except Exception as e:
+                app_logger.error(f"Error processing file event for {path}: {e}")
+
+        # Browse listings of the changed folders, their parents and subfolders
+        # (PDFs, ZIPs and missing.txt are listed too, though not indexed)
+        invalidate_directory_listings(visible)
+
+        if not changed:
+            return
+
+        queue_file_index_batch(upserts=upserts, deletes=deletes, moves=moves)
+        app_logger.info(
+            f"File watcher indexed {len(upserts)} entries, moved {len(moves)}, removed {len(deletes)}"
+        )
+
+        if new_files:
+            # Metadata scan needs the file_index ids, so wait for the batch to land
+            flush_db_writes(timeout=30)
+            # Queue archives for metadata scanning (high priority for new files)
+            queue_files_for_scan([to_db_path(p) for p in new_files if is_scannable(p)], PRIORITY_NEW_FILE)
 
-            # Schedule next check if there are still pending events
-            if self.pending_events:
-                self.debounce_timer = threading.Timer(self.debounce_seconds, self._process_pending_events)
-                self.debounce_timer.daemon = True
-                self.debounce_timer.start()
+        # Invalidate collection status cache once per changed directory
+        folders = {os.path.dirname(p) for p, _ in changed} | {p for p, is_dir in changed if is_dir}
+        invalidate_collection_status_for_paths(folders)
 
-    def _add_event(self, file_path):
+        # Recompute wanted issues of the series these files belong to (one path per folder)
+        file_paths = {os.path.dirname(p): p for p, is_dir in changed if not is_dir}
+        mark_paths_dirty(list(file_paths.values()) + [p for p, is_dir in changed if is_dir])
+
+    def _add_event(self, path, kind=CREATE, is_directory=False, src_path=None):
         """Add or update an event in the pending queue."""
         with self.lock:
-            self.pending_events[file_path] = time.time()
+            previous = self.pending_events.get(path)
+            if kind == self.MOVE:
+                previous = self.pending_events.pop(src_path, None)
+                if previous and previous[0] == self.MOVE:
+                    src_path = previous[2]
+                # A create or modify of the source stays a move: _apply_events
+                # indexes the destination as new only if the source was never indexed
+            elif kind == self.CREATE and previous and previous[0] == self.MOVE:
+                # Written after it moved: keep the source so its row moves
+                kind, src_path = self.MOVE, previous[2]
+            self.pending_events[path] = (kind, is_directory, src_path, time.time())
 
             # Start the debounce timer if not already running
             if self.debounce_timer is None or not self.debounce_timer.is_alive():
-                self.debounce_timer = threading.Timer(self.debounce_seconds, self._process_pending_events)
-                self.debounce_timer.daemon = True
-                self.debounce_timer.start()
+                self._schedule()
 
     def on_any_event(self, event):
         """Log all events for debugging."""
         app_logger.debug(f"File watcher received event: {event.event_type} - {event.src_path}")
 
     def on_created(self, event):
-        """Handle file creation events."""
-        app_logger.info(f"File watcher CREATE event: {event.src_path} (is_dir: {event.is_directory})")
-        if event.is_directory:
-            return
-
-        file_path = event.src_path
-        self._add_event(file_path)
+        """Handle file and folder creation events."""
+        app_logger.debug(f"File watcher CREATE event: {event.src_path} (is_dir: {event.is_directory})")
+        self._add_event(event.src_path, self.CREATE, event.is_directory)
 
     def on_modified(self, event):
         """Handle file modification events."""
-        app_logger.info(f"File watcher MODIFY event: {event.src_path} (is_dir: {event.is_directory})")
+        app_logger.debug(f"File watcher MODIFY event: {event.src_path} (is_dir: {event.is_directory})")
         if event.is_directory:
+            # Folder mtime changes accompany the events of the files in it
             return
 
-        file_path = event.src_path
-        self._add_event(file_path)
+        self._add_event(event.src_path, self.CREATE)
 
     def on_moved(self, event):
-        """Handle file move events (treat destination as a new file)."""
-        app_logger.info(f"File watcher MOVE event: {event.src_path} -> {event.dest_path} (is_dir: {event.is_directory})")
-        if event.is_directory:
-            return
-
-        file_path = event.dest_path
-        self._add_event(file_path)
+        """Handle file and folder move events (indexed rows move with them)."""
+        app_logger.debug(f"File watcher MOVE event: {event.src_path} -> {event.dest_path} (is_dir: {event.is_directory})")
+        self._add_event(event.dest_path, self.MOVE, event.is_directory, src_path=event.src_path)
 
     def on_deleted(self, event):
-        """Handle file deletion events."""
-        app_logger.info(f"File watcher DELETE event: {event.src_path} (is_dir: {event.is_directory})")
-        if event.is_directory:
-            # We also want to remove directories, but for now focusing on files as per request
-            # Logic for directories would be recursive delete which delete_file_index_entry handles
-            delete_file_index_entry(event.src_path)
-            return
-
-        file_path = event.src_path
-        # Check if it was a comic file (extension check)
-        # Since file is gone, we can't check isfile or open it, but we can check extension
-        ext = os.path.splitext(file_path)[1].lower()
-        if ext not in ['.cbz', '.cbr']:
-            return
-
-        try:
-            delete_file_index_entry(file_path)
-            app_logger.info(f"❌ Removed deleted file from index: {os.path.basename(file_path)}")
-
-            # Invalidate collection status cache for this directory
-            invalidate_collection_status_for_path(file_path)
-        except Exception as e:
-            app_logger.error(f"Error removing deleted file {file_path}: {e}")
-
+        """Handle file and folder deletion events."""
+        app_logger.debug(f"File watcher DELETE event: {event.src_path} (is_dir: {event.is_directory})")
+        self._add_event(event.src_path, self.DELETE, event.is_directory)
 
 
 class FileWatcher:
@@ -183,6 +290,8 @@ class FileWatcher:
 
             self.observer.schedule(self.event_handler, self.watch_path, recursive=True)
             self.observer.start()
+            # Changes under the watch path are now reported, so its listings can stay cached
+            directory_cache.add_watched_root(self.watch_path, is_alive=self.is_alive)
             app_logger.info(f"File watcher started for: {self.watch_path}")
             return True
 
@@ -193,12 +302,14 @@ class FileWatcher:
     def stop(self):
         """Stop the file watcher."""
         try:
+            directory_cache.remove_watched_root(self.watch_path)
             self.observer.stop()
             self.observer.join(timeout=5)
+            self.event_handler.flush()
             app_logger.info("File watcher stopped")
         except Exception as e:
             app_logger.error(f"Error stopping file watcher: {e}")
 
     def is_alive(self):
-        """Check if the watcher is running."""
-        return self.observer.is_alive()
+        """Check if the watcher is running (its observer and every emitter thread)."""
+        return self.observer.is_alive() and all(emitter.is_alive() for emitter in self.observer.emitters)
@@ -16,7 +16,8 @@ def generate_filename_pattern(custom_pattern, series_name, issue_number):
     Args:
         custom_pattern: The rename pattern from config (e.g., "{series_name} {issue_number} ({year})")
         series_name: The series name to match
-        issue_number: The issue number to match
+        issue_number: The issue number to match, or None to match any numeric
+                      issue and capture it as the first group
 
     Returns:
         Compiled regex pattern or None if pattern is invalid
@@ -74,10 +75,13 @@ def generate_filename_pattern(custom_pattern, series_name, issue_number):
                     pattern_parts.append(sep)
         series_pattern = the_prefix + ''.join(pattern_parts)
 
-        # Normalize issue number - handle leading zeros (1, 01, 001 all match)
-        issue_num_clean = str(issue_number).strip().lstrip('0') or '0'
-        # Match issue number with optional leading zeros
-        issue_pattern = r'0*' + re.escape(issue_num_clean) + r'(?!\d)'
+        if issue_number is None:
+            issue_pattern = r'\d+(?!\d)'
+        else:
+            # Normalize issue number - handle leading zeros (1, 01, 001 all match)
+            issue_num_clean = str(issue_number).strip().lstrip('0') or '0'
+            # Match issue number with optional leading zeros
+            issue_pattern = r'0*' + re.escape(issue_num_clean) + r'(?!\d)'
 
         # Now substitute our patterns back in
         pattern = pattern.replace('<<<SERIES>>>', f'(?:{series_pattern})')
@@ -134,15 +138,165 @@ def extract_comicinfo(file_path):
     return None
 
 
+COMIC_EXTENSIONS = ('.cbz', '.cbr', '.zip', '.rar')
+
+# Generic filename patterns capturing an issue number:
+# space/dash/underscore + number + delimiter, and #1, #01, #001
+_FILENAME_NUMBER_PATTERNS = (
+    re.compile(r'[\s\-_](\d+)(?=[\s\-_\.\(]|$)'),
+    re.compile(r'#(\d+)(?!\d)'),
+)
+
+
+def _issue_key(number):
+    """Normalize an issue number for comparison ('001' -> '1', '000' -> '0')."""
+    return str(number).strip().lstrip('0') or '0'
+
+
+def _list_series_files(mapped_path):
+    """
+    Comic files in a series folder as {path: {'filename', 'mtime', 'comicinfo'}}.
+
+    Comes from file_index when the folder is indexed: 'comicinfo' is then
+    the scanned ci_series/ci_number, or None when the file changed since its
+    last metadata scan. Otherwise the folder is listed from disk and every
+    'comicinfo' is None (read from the archive when needed).
+
+    Returns:
+        (files, from_index), or (None, False) if the folder cannot be listed
+    """
+    from database import get_indexed_folder_files
+
+    rows = get_indexed_folder_files(mapped_path)
+    files = {}
+    if rows is not None:
+        for row in rows:
+            if not row['name'].lower().endswith(COMIC_EXTENSIONS):
+                continue
+            scanned = row['metadata_scanned_at']
+            fresh = scanned is not None and (row['modified_at'] is None or scanned >= row['modified_at'])
+            files[row['path']] = {
+                'filename': row['name'],
+                'mtime': row['modified_at'],
+                'comicinfo': {'series': row['ci_series'] or '', 'number': row['ci_number'] or ''} if fresh else None,
+            }
+        return files, True
+
+    try:
+        for filename in sorted(os.listdir(mapped_path)):
+            if filename.lower().endswith(COMIC_EXTENSIONS):
+                file_path = os.path.join(mapped_path, filename)
+                try:
+                    mtime = os.path.getmtime(file_path)
+                except OSError:
+                    mtime = None
+                files[file_path] = {'filename': filename, 'mtime': mtime, 'comicinfo': None}
+    except Exception as e:
+        app_logger.error(f"Error scanning directory {mapped_path}: {e}")
+        return None, False
+    return files, False
+
+
+def _cache_is_current(cached, files, from_index):
+    """Whether cached matches still point at unchanged files."""
+    for entry in cached:
+        file_path = entry['file_path']
+        if not file_path:
+            continue
+        if from_index and file_path in files:
+            current_mtime = files[file_path]['mtime']
+        elif from_index:
+            app_logger.debug(f"Cache invalid: file no longer indexed {file_path}")
+            return False
+        else:
+            # Folder not indexed: check the cached files on disk
+            try:
+                current_mtime = os.path.getmtime(file_path)
+            except OSError:
+                app_logger.debug(f"Cache invalid: file no longer exists {file_path}")
+                return False
+        if entry['file_mtime'] and current_mtime is not None and abs(current_mtime - entry['file_mtime']) > 1:
+            app_logger.debug(f"Cache invalid: mtime changed for {file_path}")
+            return False
+    return True
+
+
+def _build_issue_maps(files, custom_pattern, series_name):
+    """
+    One pass over the folder: issue number -> first file matching it via the
+    rename pattern, and via the generic filename patterns.
+    """
+    pattern_map = {}
+    filename_map = {}
+    pattern_regex = generate_filename_pattern(custom_pattern, series_name, None) if custom_pattern and series_name else None
+
+    for file_path, metadata in files.items():
+        filename = metadata['filename']
+        if pattern_regex:
+            match = pattern_regex.search(filename)
+            if match:
+                pattern_map.setdefault(_issue_key(match.group(1)), file_path)
+        for regex in _FILENAME_NUMBER_PATTERNS:
+            for match in regex.finditer(filename):
+                filename_map.setdefault(_issue_key(match.group(1)), file_path)
+    return pattern_map, filename_map
+
+
+def _build_comicinfo_map(files):
+    """Issue number -> [(file_path, series)] from ComicInfo, in folder order."""
+    comicinfo_map = {}
+    for file_path, metadata in files.items():
+        # Only archives changed since the metadata scan (or not indexed) are opened
+        if metadata['comicinfo'] is None:
+            metadata['comicinfo'] = extract_comicinfo(file_path) or {}
+        ci = metadata['comicinfo']
+        if ci.get('number'):
+            comicinfo_map.setdefault(_issue_key(ci['number']), []).append(
+                (file_path, (ci.get('series') or '').lower())
+            )
+    return comicinfo_map
+
+
+# Issue numbers that aren't plain numbers (e.g. '1.MU', '½') can't be looked
+# up in the one-pass maps and are matched file by file instead
+
+def _match_pattern_per_file(issue_num, files, custom_pattern, series_name):
+    if not (custom_pattern and series_name):
+        return None
+    pattern_regex = generate_filename_pattern(custom_pattern, series_name, issue_num)
+    if pattern_regex:
+        for file_path, metadata in files.items():
+            if pattern_regex.search(metadata['filename']):
+                return file_path
+    return None
+
+
+def _match_filename_per_file(issue_num, files):
+    check_num = re.escape(_issue_key(issue_num))
+    patterns = [
+        rf'[\s\-_]0*{check_num}(?:[\s\-_\.\(]|$)',
+        rf'#0*{check_num}(?:\D|$)',
+    ]
+    for file_path, metadata in files.items():
+        for pattern in patterns:
+            if re.search(pattern, metadata['filename'], re.IGNORECASE):
+                return file_path
+    return None
+
+
 def match_issues_to_collection(mapped_path, issues, series_info, use_cache=True):
     """
     Match Metron issues to local files in the mapped directory with caching.
 
     Strategy:
-    1. Check database cache first (if use_cache=True)
-    2. For uncached issues, use CUSTOM_RENAME_PATTERN to generate precise regex
-    3. Fall back to ComicInfo.xml matching
-    4. Cache results in database
+    1. Read the folder from file_index (os.listdir only if it is not indexed)
+       and check the database cache against it (if use_cache=True)
+    2. Build issue number -> file maps in one pass over the folder, using
+       CUSTOM_RENAME_PATTERN to generate a regex capturing the issue number
+    3. Fall back to ComicInfo.xml matching, from the scanned ci_number and
+       ci_series columns; only archives changed since their scan are opened
+    4. Fall back to generic filename patterns
+    5. Cache results in database
 
     Args:
         mapped_path: Path to the series directory
@@ -156,39 +310,24 @@ def match_issues_to_collection(mapped_path, issues, series_info, use_cache=True)
     from database import (
         get_collection_status_for_series,
         save_collection_status_bulk,
+        get_user_preference,
     )
 
     results = {}
-    comic_extensions = ('.cbz', '.cbr', '.zip', '.rar')
 
     # Get series info
     series_id = getattr(series_info, 'id', None) or (series_info.get('id') if isinstance(series_info, dict) else None)
     series_name = getattr(series_info, 'name', '') or (series_info.get('name', '') if isinstance(series_info, dict) else '')
 
+    files, from_index = _list_series_files(mapped_path)
+    if files is None:
+        return results
+
     # Step 1: Check cache first
     if use_cache and series_id:
         cached = get_collection_status_for_series(series_id)
         if cached:
-            # Validate cache by checking file existence and mtime
-            valid_cache = True
-            for entry in cached:
-                if entry['file_path']:
-                    if not os.path.exists(entry['file_path']):
-                        valid_cache = False
-                        app_logger.debug(f"Cache invalid: file no longer exists {entry['file_path']}")
-                        break
-                    try:
-                        current_mtime = os.path.getmtime(entry['file_path'])
-                        if entry['file_mtime'] and abs(current_mtime - entry['file_mtime']) > 1:
-                            valid_cache = False
-                            app_logger.debug(f"Cache invalid: mtime changed for {entry['file_path']}")
-                            break
-                    except OSError:
-                        valid_cache = False
-                        break
-
-            if valid_cache:
-                # Return cached results
+            if _cache_is_current(cached, files, from_index):
                 for entry in cached:
                     results[entry['issue_number']] = {
                         'found': bool(entry['found']),
@@ -196,39 +335,14 @@ def match_issues_to_collection(mapped_path, issues, series_info, use_cache=True)
                     }
                 app_logger.debug(f"Using cached collection status for series {series_id} ({len(results)} issues)")
                 return results
-            else:
-                app_logger.debug(f"Cache invalid for series {series_id}, re-scanning")
-
-    # Step 2: Scan directory and build file metadata
-    local_files = []
-    file_metadata = {}
+            app_logger.debug(f"Cache invalid for series {series_id}, re-scanning")
 
-    try:
-        for filename in os.listdir(mapped_path):
-            if filename.lower().endswith(comic_extensions):
-                file_path = os.path.join(mapped_path, filename)
-                local_files.append(file_path)
-                try:
-                    mtime = os.path.getmtime(file_path)
-                except OSError:
-                    mtime = None
-                file_metadata[file_path] = {
-                    'filename': filename,
-                    'path': file_path,
-                    'mtime': mtime,
-                    'comicinfo': None  # Lazy-loaded
-                }
-    except Exception as e:
-        app_logger.error(f"Error scanning directory {mapped_path}: {e}")
-        return results
-
-    # Step 3: Get custom rename pattern from DB
-    from database import get_user_preference
+    # Step 2: One pass over the folder
     custom_pattern = get_user_preference('custom_rename_pattern', default='') or ''
+    pattern_map, filename_map = _build_issue_maps(files, custom_pattern, series_name)
+    comicinfo_map = None
 
-    # Step 4: Match each issue
     cache_entries = []
-
     for issue in issues:
         issue_num = str(getattr(issue, 'number', '') or (issue.get('number', '') if isinstance(issue, dict) else ''))
         issue_id = getattr(issue, 'id', None) or (issue.get('id') if isinstance(issue, dict) else None)
@@ -236,64 +350,33 @@ def match_issues_to_collection(mapped_path, issues, series_info, use_cache=True)
         if not issue_num:
             continue
 
-        match_found = False
-        matched_file = None
-        matched_via = None
-
-        # 4a: Try CUSTOM_RENAME_PATTERN matching first (most reliable for user's files)
-        if custom_pattern and series_name:
-            pattern_regex = generate_filename_pattern(custom_pattern, series_name, issue_num)
-            if pattern_regex:
-                for file_path, metadata in file_metadata.items():
-                    if pattern_regex.search(metadata['filename']):
-                        match_found = True
-                        matched_file = file_path
-                        matched_via = 'pattern'
-                        break
-
-        # 4b: Fallback to ComicInfo.xml matching
-        if not match_found:
-            for file_path, metadata in file_metadata.items():
-                # Lazy-load ComicInfo.xml only when needed
-                if metadata['comicinfo'] is None:
-                    metadata['comicinfo'] = extract_comicinfo(file_path) or {}
-
-                ci = metadata['comicinfo']
-                if ci.get('number'):
-                    # Normalize issue numbers for comparison
-                    meta_num = str(ci['number']).strip().lstrip('0') or '0'
-                    check_num = issue_num.strip().lstrip('0') or '0'
-
-                    if meta_num == check_num:
-                        # Check series name matches (loose match)
-                        meta_series = ci.get('series', '').lower()
-                        if not meta_series or series_name.lower() in meta_series or meta_series in series_name.lower():
-                            match_found = True
-                            matched_file = file_path
-                            matched_via = 'comicinfo'
-                            break
-
-        # 4c: Final fallback to generic filename patterns
-        if not match_found:
-            check_num = issue_num.strip().lstrip('0') or '0'
-            patterns = [
-                rf'[\s\-_]0*{re.escape(check_num)}(?:[\s\-_\.\(]|$)',  # space/dash/underscore + number + delimiter
-                rf'#0*{re.escape(check_num)}(?:\D|$)',  # #1, #01, #001
-            ]
-
-            for file_path, metadata in file_metadata.items():
-                filename = metadata['filename']
-                for pattern in patterns:
-                    if re.search(pattern, filename, re.IGNORECASE):
-                        match_found = True
-                        matched_file = file_path
-                        matched_via = 'filename'
-                        break
-                if match_found:
+        key = _issue_key(issue_num)
+        numeric = key.isascii() and key.isdigit()
+
+        # CUSTOM_RENAME_PATTERN first (most reliable for user's files)
+        if numeric:
+            matched_file = pattern_map.get(key)
+        else:
+            matched_file = _match_pattern_per_file(issue_num, files, custom_pattern, series_name)
+        matched_via = 'pattern' if matched_file else None
+
+        # Step 3: ComicInfo.xml series and number
+        if not matched_file:
+            if comicinfo_map is None:
+                comicinfo_map = _build_comicinfo_map(files)
+            for file_path, meta_series in comicinfo_map.get(key, ()):
+                # Check series name matches (loose match)
+                if not meta_series or series_name.lower() in meta_series or meta_series in series_name.lower():
+                    matched_file, matched_via = file_path, 'comicinfo'
                     break
 
+        # Step 4: Generic filename patterns
+        if not matched_file:
+            matched_file = filename_map.get(key) if numeric else _match_filename_per_file(issue_num, files)
+            matched_via = 'filename' if matched_file else None
+
         results[issue_num] = {
-            'found': match_found,
+            'found': matched_file is not None,
             'file_path': matched_file
         }
 
@@ -303,9 +386,9 @@ def match_issues_to_collection(mapped_path, issues, series_info, use_cache=True)
                 'series_id': series_id,
                 'issue_id': issue_id,
                 'issue_number': issue_num,
-                'found': 1 if match_found else 0,
+                'found': 1 if matched_file else 0,
                 'file_path': matched_file,
-                'file_mtime': file_metadata.get(matched_file, {}).get('mtime') if matched_file else None,
+                'file_mtime': files[matched_file]['mtime'] if matched_file else None,
                 'matched_via': matched_via
             })
 
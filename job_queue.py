@@ -0,0 +1,439 @@
+"""
+job_queue.py - Persistent queue for long-running library operations
+
+Rebuilds, conversions, wanted refreshes, series syncs and scheduled downloads
+used to run inline in a request or on ad-hoc daemon threads, so a container
+restart lost them and two users could start the same operation twice. Jobs
+now go through a SQLite-backed queue (the jobs table):
+1. Job types are registered by name with register_job_type(); a job is a
+   type plus JSON parameters, so it can be picked up again after a restart.
+   Jobs left 'running' by a previous process are queued again on start()
+2. A concurrency key (e.g. 'rebuild:/data/DC') allows one queued or running
+   job per key; enqueueing a duplicate returns the active job's ID
+3. Jobs run in two lanes so a long directory operation cannot hold up the
+   short ones: JOB_QUEUE_LONG_WORKERS threads run the 'long' job types
+   (directory operations, library scans), JOB_QUEUE_WORKERS threads run the
+   rest. CPU-heavy handlers fan out further through job_runner.run_jobs(),
+   whose per-item progress is forwarded to the job row while it runs
+4. Handlers report progress and a checkpoint through JobContext; a failed
+   job is retried up to its type's max_attempts with a growing delay
+5. cancel_job() cancels a queued job at once and makes a running job raise
+   JobCancelled at its next progress update
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable
+
+from app_logging import app_logger
+from config import config
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+
+DEFAULT_WORKERS = 2
+DEFAULT_LONG_WORKERS = 1
+DEFAULT_RETRY_DELAY = 60
+DEFAULT_HISTORY_DAYS = 7
+
+# How often the dispatcher looks for delayed retries without being notified
+_POLL_SECONDS = 5
+
+
+LANE_DEFAULT = 'default'
+LANE_LONG = 'long'
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when its job was cancelled."""
+
+
+@dataclass(frozen=True)
+class JobType:
+    """A registered handler. handler(ctx, **params) runs the job."""
+    name: str
+    handler: Callable
+    max_attempts: int = 1
+    retry_delay: int = DEFAULT_RETRY_DELAY
+    lane: str = LANE_DEFAULT
+
+
+_job_types = {}
+
+
+def register_job_type(name, handler, max_attempts=1, retry_delay=DEFAULT_RETRY_DELAY, lane=LANE_DEFAULT):
+    """
+    Register a handler for a job type.
+
+    Args:
+        name: Job type name stored with each job
+        handler: Callable(ctx, **params); its return value is stored as the
+                 job result and should be JSON-serializable
+        max_attempts: Runs allowed before the job is marked failed
+        retry_delay: Seconds before the first retry; doubles on each retry
+        lane: LANE_LONG for jobs that can run for minutes or hours, so they
+              only take the long lane's workers
+    """
+    _job_types[name] = JobType(name, handler, max_attempts, retry_delay, lane)
+
+
+def get_job_types():
+    """Names of the registered job types."""
+    return sorted(_job_types)
+
+
+class JobContext:
+    """Handle passed to a running handler for progress, checkpoints and cancellation."""
+
+    def __init__(self, job):
+        self.id = job['id']
+        self.job_type = job['job_type']
+        self.attempt = job['attempts']
+        self.checkpoint = json.loads(job['checkpoint']) if job.get('checkpoint') else None
+
+    def progress(self, done=None, total=None, message=None, checkpoint=None):
+        """
+        Record progress and optionally a checkpoint to resume from.
+
+        Raises:
+            JobCancelled: Cancellation was requested for this job
+        """
+        from database import update_job_progress
+
+        if checkpoint is not None:
+            self.checkpoint = checkpoint
+        cancel_requested = update_job_progress(
+            self.id, done, total, message,
+            json.dumps(checkpoint) if checkpoint is not None else None,
+        )
+        if cancel_requested:
+            raise JobCancelled(f"Job {self.id} cancelled")
+
+
+class JobQueue:
+    """Dispatcher thread claiming jobs from the database for a thread pool."""
+
+    def __init__(self, workers=None, long_workers=None):
+        self._workers = workers
+        self._long_workers = long_workers
+        self._executor = None
+        self._dispatcher = None
+        self._stopping = False
+        self._running = {LANE_DEFAULT: 0, LANE_LONG: 0}
+        self._cond = threading.Condition()
+
+    @property
+    def workers(self):
+        """Workers for the default lane."""
+        if self._workers is None:
+            return max(1, config.getint("SETTINGS", "JOB_QUEUE_WORKERS", fallback=DEFAULT_WORKERS))
+        return self._workers
+
+    @property
+    def long_workers(self):
+        """Workers for the long lane."""
+        if self._long_workers is None:
+            return max(1, config.getint("SETTINGS", "JOB_QUEUE_LONG_WORKERS", fallback=DEFAULT_LONG_WORKERS))
+        return self._long_workers
+
+    def _lane_limits(self):
+        return {LANE_DEFAULT: self.workers, LANE_LONG: self.long_workers}
+
+    def _full_lanes(self):
+        limits = self._lane_limits()
+        return {lane for lane, running in self._running.items() if running >= limits[lane]}
+
+    def start(self):
+        """Recover interrupted jobs, prune old ones and start dispatching."""
+        from database import prune_finished_jobs, requeue_interrupted_jobs
+
+        with self._cond:
+            if self._dispatcher is not None and self._dispatcher.is_alive():
+                return
+            self._stopping = False
+
+        requeued = requeue_interrupted_jobs()
+        if requeued:
+            app_logger.info(f"Requeued {requeued} job(s) interrupted by the last shutdown")
+        prune_finished_jobs(config.getint("SETTINGS", "JOB_HISTORY_DAYS", fallback=DEFAULT_HISTORY_DAYS))
+
+        with self._cond:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers + self.long_workers,
+                                                thread_name_prefix="Job")
+            self._dispatcher = threading.Thread(target=self._dispatch, name="JobDispatcher", daemon=True)
+            self._dispatcher.start()
+        app_logger.info(f"Job queue started ({self.workers} workers, {self.long_workers} for long jobs)")
+
+    def stop(self, wait=True):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            dispatcher, executor = self._dispatcher, self._executor
+        if dispatcher is not None:
+            dispatcher.join(timeout=5)
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def notify(self):
+        """Wake the dispatcher after a job was queued."""
+        with self._cond:
+            self._cond.notify()
+
+    def _dispatch(self):
+        from database import claim_next_job
+
+        while True:
+            with self._cond:
+                while not self._stopping and len(self._full_lanes()) == len(self._running):
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                full = self._full_lanes()
+            # Unregistered types count as default-lane jobs (run_job fails them)
+            job = claim_next_job(exclude_types=[
+                job_type.name for job_type in _job_types.values() if job_type.lane in full
+            ])
+            if job is None:
+                with self._cond:
+                    if not self._stopping:
+                        self._cond.wait(timeout=_POLL_SECONDS)
+                continue
+            lane = job_lane(job['job_type'])
+            with self._cond:
+                self._running[lane] += 1
+            self._executor.submit(self._run, job, lane)
+
+    def _run(self, job, lane=LANE_DEFAULT):
+        try:
+            run_job(job)
+        finally:
+            with self._cond:
+                self._running[lane] -= 1
+                self._cond.notify()
+
+
+def job_lane(job_type):
+    """Lane a job type runs in (LANE_DEFAULT for unknown types)."""
+    registered = _job_types.get(job_type)
+    return registered.lane if registered else LANE_DEFAULT
+
+
+def run_job(job):
+    """Run a claimed job and record its outcome (runs on a queue worker)."""
+    from database import finish_job, retry_job
+    from job_runner import set_progress_listener
+
+    job_type = _job_types.get(job['job_type'])
+    if job_type is None:
+        app_logger.error(f"Job {job['id']} has unknown type '{job['job_type']}'")
+        finish_job(job['id'], JOB_FAILED, error=f"Unknown job type: {job['job_type']}")
+        return
+
+    ctx = JobContext(job)
+    params = json.loads(job['params']) if job.get('params') else {}
+    app_logger.info(f"Job {job['job_type']} {job['id'][:8]} started (attempt {ctx.attempt}/{job['max_attempts']})")
+
+    # Items finished by job_runner inside the handler count as job progress
+    set_progress_listener(lambda done, total, label: ctx.progress(done, total, label))
+    try:
+        result = job_type.handler(ctx, **params)
+    except JobCancelled:
+        app_logger.info(f"Job {job['job_type']} {job['id'][:8]} cancelled")
+        finish_job(job['id'], JOB_CANCELLED)
+    except Exception as e:
+        if ctx.attempt < job['max_attempts']:
+            delay = job_type.retry_delay * (2 ** (ctx.attempt - 1))
+            app_logger.warning(f"Job {job['job_type']} {job['id'][:8]} failed, retrying in {delay}s: {e}")
+            retry_job(job['id'], str(e), time.time() + delay)
+        else:
+            app_logger.error(f"Job {job['job_type']} {job['id'][:8]} failed: {e}")
+            finish_job(job['id'], JOB_FAILED, error=str(e))
+    else:
+        try:
+            result_json = json.dumps(result)
+        except (TypeError, ValueError):
+            result_json = None
+        finish_job(job['id'], JOB_COMPLETED, result=result_json)
+        app_logger.info(f"Job {job['job_type']} {job['id'][:8]} completed")
+    finally:
+        set_progress_listener(None)
+
+
+# Process-wide queue started by app.py
+job_queue = JobQueue()
+
+
+def enqueue_job(job_type, params=None, concurrency_key=None):
+    """
+    Queue a job of a registered type.
+
+    Args:
+        job_type: Registered job type name
+        params: Dict of keyword arguments for the handler (JSON-serializable)
+        concurrency_key: Allow only one queued or running job with this key
+
+    Returns:
+        Tuple (job_id, created): created is False when an active job with the
+        same concurrency key already exists and job_id is that job's ID
+
+    Raises:
+        ValueError: Unknown job type
+    """
+    from database import create_job
+
+    registered = _job_types.get(job_type)
+    if registered is None:
+        raise ValueError(f"Unknown job type: {job_type}")
+
+    job_id, created = create_job(
+        str(uuid.uuid4()), job_type, json.dumps(params or {}), concurrency_key, registered.max_attempts,
+    )
+    if created:
+        app_logger.info(f"Queued job {job_type} {job_id[:8]}" + (f" ({concurrency_key})" if concurrency_key else ""))
+        job_queue.notify()
+    elif job_id:
+        app_logger.info(f"Job {job_type} already active for {concurrency_key}: {job_id[:8]}")
+    return job_id, created
+
+
+def cancel_job(job_id):
+    """Cancel a job. Returns its status afterwards, or None if it does not exist."""
+    from database import request_job_cancel
+    return request_job_cancel(job_id)
+
+
+def start_job_queue():
+    job_queue.start()
+
+
+def stop_job_queue():
+    job_queue.stop(wait=False)
+
+
+# =============================================================================
+# Job types
+# =============================================================================
+#
+# Handlers import their targets lazily: app.py registers nothing itself and
+# the queue can be imported by blueprints without pulling in the app.
+
+# Directory operations that can be started through /api/jobs and /stream;
+# one per directory
+DIRECTORY_JOB_TYPES = ('rebuild', 'convert', 'enhance_dir', 'pdf', 'rename', 'missing')
+
+
+def directory_job_key(job_type, directory):
+    """Concurrency key allowing one job of a type per directory."""
+    return f"{job_type}:{directory}"
+
+
+def _rebuild_directory(ctx, directory):
+    from cbz_ops.rebuild import rebuild_task
+    rebuild_task(directory)
+
+
+def _convert_directory(ctx, directory):
+    from cbz_ops.convert import convert_rar_directory
+    return {'converted': len(convert_rar_directory(directory))}
+
+
+def _enhance_directory(ctx, directory):
+    from cbz_ops.enhance_dir import enhance_directory
+    enhance_directory(directory)
+
+
+def _convert_pdfs(ctx, directory):
+    from cbz_ops.pdf import scan_and_convert
+    scan_and_convert(directory)
+
+
+def _rename_directory(ctx, directory):
+    from cbz_ops.rename import rename_files
+    return {'renamed': rename_files(directory)}
+
+
+def _missing_issues(ctx, directory):
+    from app import STATIC_DIR
+    from missing import check_missing_issues
+
+    missing = check_missing_issues(directory)
+    result = {
+        'missing': missing,
+        'summary': (f"Found <code>{missing}</code> missing issues in <code>{directory}</code>."
+                    if missing else "No missing issues found."),
+    }
+    # missing.txt is served from static/ under a unique name so concurrent
+    # checks of different folders do not overwrite each other's list
+    missing_file_path = os.path.join(directory, "missing.txt")
+    if os.path.exists(missing_file_path):
+        static_missing_filename = f"missing_{uuid.uuid4().hex}.txt"
+        shutil.move(missing_file_path, os.path.join(STATIC_DIR, static_missing_filename))
+        result['missing_url'] = f"/static/{static_missing_filename}"
+    return result
+
+
+def _wanted_refresh(ctx, full=True):
+    from app import refresh_wanted_cache_background
+    refresh_wanted_cache_background(full=full)
+
+
+def _wanted_incoming(ctx):
+    from api import check_wanted_after_watch_empty
+    check_wanted_after_watch_empty()
+
+
+def _series_sync(ctx):
+    from app import scheduled_series_sync
+    scheduled_series_sync()
+
+
+def _getcomics_download(ctx):
+    from app import scheduled_getcomics_download
+    scheduled_getcomics_download()
+
+
+def _weekly_packs_download(ctx):
+    from app import scheduled_weekly_packs_download
+    scheduled_weekly_packs_download()
+
+
+def _komga_sync(ctx):
+    from app import run_komga_sync
+    return run_komga_sync()
+
+
+def _file_index_sync(ctx):
+    from app import scheduled_file_index_rebuild
+    scheduled_file_index_rebuild()
+
+
+def _thumbnail_scan(ctx):
+    from app import scan_library_task
+    scan_library_task()
+
+
+# Directory jobs resume through job_runner's state files, so a retry or a
+# restart skips the files already handled
+register_job_type('rebuild', _rebuild_directory, max_attempts=3, lane=LANE_LONG)
+register_job_type('convert', _convert_directory, max_attempts=3, lane=LANE_LONG)
+register_job_type('enhance_dir', _enhance_directory, max_attempts=3, lane=LANE_LONG)
+register_job_type('pdf', _convert_pdfs, max_attempts=3, lane=LANE_LONG)
+register_job_type('rename', _rename_directory, lane=LANE_LONG)
+register_job_type('missing', _missing_issues, lane=LANE_LONG)
+register_job_type('wanted_refresh', _wanted_refresh)
+register_job_type('wanted_incoming', _wanted_incoming)
+register_job_type('series_sync', _series_sync)
+register_job_type('getcomics_download', _getcomics_download)
+register_job_type('weekly_packs_download', _weekly_packs_download)
+register_job_type('komga_sync', _komga_sync, max_attempts=2, retry_delay=300)
+register_job_type('file_index_sync', _file_index_sync, lane=LANE_LONG)
+register_job_type('thumbnail_scan', _thumbnail_scan, lane=LANE_LONG)
@@ -0,0 +1,286 @@
+"""
+job_runner.py - Parallel runner for directory-wide jobs
+
+Convert, rebuild, enhance, PDF, rename and missing-issue jobs used to walk a
+directory and handle one file after another, although every file is
+independent and most of the work (unar, Pillow, deflate) is CPU-bound.
+run_jobs() gives them a common runner:
+1. A spawn process pool (or threads with use_processes=False, for I/O-bound
+   jobs) sized to JOB_WORKERS, default os.cpu_count(). Functions that cannot
+   be sent to another process (closures, mocks) run on threads instead
+2. Submissions are held back while this process and its workers use more
+   than the MemoryMonitor threshold, so a few huge archives don't push the
+   container into swap; one job is always allowed to run
+3. One "[n/total]" log line per finished item. Workers log to the same
+   stdout, so both show up in the /stream/<script_type> log view
+4. Results come back in input order. Finished items are recorded in a JSONL
+   state file under CACHE_DIR/jobs, with the file's mtime and size when the
+   item is a path; a run that is interrupted and started again for the same
+   job and scope skips them unless the file changed since. The file is
+   removed once a run completes, and ignored once it is older than
+   JOB_RESUME_MAX_AGE_HOURS
+5. A progress listener set on the calling thread (job_queue sets one for
+   the job it runs) is called after every finished item
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from app_logging import app_logger
+from config import config
+from memory_utils import get_global_monitor
+
+# How long to wait for a running job before re-checking memory
+_THROTTLE_POLL_SECONDS = 5
+
+DEFAULT_RESUME_MAX_AGE_HOURS = 24
+
+_listener = threading.local()
+
+
+def set_progress_listener(listener):
+    """
+    Set (or clear with None) the progress listener for run_jobs() calls made
+    on this thread. It is called as listener(done, total, label); an
+    exception it raises stops the run like an interruption.
+    """
+    _listener.callback = listener
+
+
+def get_job_workers():
+    """Worker count for run_jobs(): SETTINGS/JOB_WORKERS, default the CPU count."""
+    return max(1, config.getint("SETTINGS", "JOB_WORKERS", fallback=os.cpu_count() or 2))
+
+
+def _processes_enabled(func, use_processes):
+    if use_processes is None:
+        use_processes = config.getboolean("SETTINGS", "JOB_USE_PROCESSES", fallback=True)
+    if not use_processes:
+        return False
+    try:
+        pickle.dumps(func)
+    except Exception:
+        return False
+    return True
+
+
+def get_job_state_path(name, scope=""):
+    """JSONL file recording the finished items of a job run."""
+    scope_hash = hashlib.md5(f"{name}:{scope}".encode('utf-8'), usedforsecurity=False).hexdigest()[:16]
+    jobs_dir = os.path.join(config.get("SETTINGS", "CACHE_DIR", fallback="/cache"), "jobs")
+    return os.path.join(jobs_dir, f"{name}-{scope_hash}.jsonl")
+
+
+def _item_signature(item):
+    """[mtime_ns, size] of a file item, or None for other items and missing files."""
+    if not isinstance(item, (str, os.PathLike)):
+        return None
+    try:
+        st = os.stat(item)
+    except (OSError, ValueError):
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _load_state(state_path):
+    """Map of item key -> (result, signature) from an interrupted run."""
+    done = {}
+    max_age = config.getint("SETTINGS", "JOB_RESUME_MAX_AGE_HOURS", fallback=DEFAULT_RESUME_MAX_AGE_HOURS)
+    try:
+        if time.time() - os.path.getmtime(state_path) > max_age * 3600:
+            app_logger.info(f"Discarding job state older than {max_age}h: {state_path}")
+            os.unlink(state_path)
+            return done
+        with open(state_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Last line of a killed run may be partial
+                done[entry['key']] = (entry.get('result'), entry.get('sig'))
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        app_logger.warning(f"Could not read job state {state_path}: {e}")
+    return done
+
+
+class _StateFile:
+    """Append-only record of finished items; writing failures disable resume."""
+
+    def __init__(self, path):
+        self.path = path
+        self._fp = None
+        if path:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                self._fp = open(path, 'a', encoding='utf-8')
+            except OSError as e:
+                app_logger.warning(f"Job progress will not be resumable: {e}")
+
+    def record(self, key, result, sig=None):
+        if self._fp is None:
+            return
+        try:
+            line = json.dumps({'key': key, 'result': result, 'sig': sig})
+        except (TypeError, ValueError):
+            line = json.dumps({'key': key, 'result': None, 'sig': sig})
+        self._fp.write(line + "\n")
+        self._fp.flush()
+
+    def close(self, remove):
+        if self._fp is not None:
+            self._fp.close()
+        if remove and self.path:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+
+def run_jobs(func, items, name, scope="", key=str, label=None, workers=None,
+             use_processes=None, resume=True):
+    """
+    Call func(item) for every item in parallel.
+
+    Args:
+        func: Module-level callable taking one item; its return value should
+              be JSON-serializable when resume is on
+        items: Items to process (e.g. file paths)
+        name: Job name used in logs and for the resume state file
+        scope: What the job runs on (e.g. the directory), so runs of the same
+               job on different directories resume separately
+        key: Callable(item) -> str identifying an item in the state file
+        label: Callable(item) -> str for progress lines (default: basename)
+        workers: Worker count (default: get_job_workers())
+        use_processes: Process pool (True) or threads (False); default
+                       SETTINGS/JOB_USE_PROCESSES, True
+        resume: Skip items recorded by an interrupted run of the same job
+                (file items only if their mtime and size are unchanged)
+
+    Returns:
+        List of func's results in the order of items; None for items that
+        raised (the error is logged)
+    """
+    items = list(items)
+    total = len(items)
+    label = label or (lambda item: os.path.basename(str(item)))
+    results = [None] * total
+    if not items:
+        return results
+
+    state_path = get_job_state_path(name, scope) if resume else None
+    finished = _load_state(state_path) if state_path else {}
+    pending = []
+    for index, item in enumerate(items):
+        item_key = key(item)
+        if item_key in finished and finished[item_key][1] == _item_signature(item):
+            results[index] = finished[item_key][0]
+        else:
+            pending.append((index, item, item_key))
+    done = total - len(pending)
+    if done:
+        app_logger.info(f"Resuming {name}: {done}/{total} items already finished")
+
+    workers = min(workers or get_job_workers(), len(pending)) if pending else 1
+    state = _StateFile(state_path)
+    completed = False
+    listener = getattr(_listener, 'callback', None)
+
+    def finish(index, item, item_key, result, error=None):
+        nonlocal done
+        done += 1
+        if error is not None:
+            app_logger.error(f"[{done}/{total}] {label(item)} failed: {error}")
+        else:
+            results[index] = result
+            # Signature after processing: jobs like rebuild rewrite the file
+            state.record(item_key, result, _item_signature(item) if state_path else None)
+            app_logger.info(f"[{done}/{total}] {label(item)} done")
+        if listener is not None:
+            listener(done, total, label(item))
+
+    try:
+        if workers <= 1:
+            for index, item, item_key in pending:
+                try:
+                    result = func(item)
+                except Exception as e:
+                    finish(index, item, item_key, None, e)
+                else:
+                    finish(index, item, item_key, result)
+        else:
+            _run_pool(func, pending, workers, _processes_enabled(func, use_processes), name, finish)
+        completed = True
+    finally:
+        # Keep the state of an interrupted run so the next one can resume
+        state.close(remove=completed)
+
+    return results
+
+
+def _run_pool(func, pending, workers, processes, name, finish):
+    monitor = get_global_monitor()
+
+    def create_executor():
+        if processes:
+            # spawn: the web process is multi-threaded, fork could copy held locks
+            return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"Job-{name}")
+
+    executor = create_executor()
+    app_logger.info(f"Running {name} on {len(pending)} items with {workers} "
+                    f"{'processes' if processes else 'threads'}")
+
+    queue = iter(pending)
+    running = {}
+    throttled = False
+
+    def collect(futures):
+        for future in futures:
+            index, item, item_key = running.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                finish(index, item, item_key, None, e)
+            else:
+                finish(index, item, item_key, result)
+
+    try:
+        for index, item, item_key in queue:
+            while len(running) >= workers or (running and _over_memory(monitor)):
+                if len(running) < workers and not throttled:
+                    throttled = True
+                    app_logger.warning(f"Memory above {monitor.threshold_mb}MB, "
+                                       f"running {len(running)} {name} jobs until it drops")
+                finished_futures, _ = wait(running, timeout=_THROTTLE_POLL_SECONDS, return_when=FIRST_COMPLETED)
+                collect(finished_futures)
+            try:
+                future = executor.submit(func, item)
+            except BrokenExecutor as e:
+                # A worker died (e.g. OOM on a huge archive); the jobs it took down
+                # fail through their futures, this one goes to a fresh pool
+                app_logger.error(f"{name} pool broken, restarting it: {e}")
+                collect(wait(running)[0])
+                executor.shutdown(wait=True)
+                executor = create_executor()
+                future = executor.submit(func, item)
+            running[future] = (index, item, item_key)
+        while running:
+            finished_futures, _ = wait(running, return_when=FIRST_COMPLETED)
+            collect(finished_futures)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _over_memory(monitor):
+    usage = monitor.get_process_tree_memory_usage()
+    if usage > monitor.cleanup_threshold_mb:
+        monitor.force_cleanup()
+    return usage > monitor.threshold_mb
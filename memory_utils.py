@@ -34,6 +34,7 @@ class MemoryMonitor:
         self.monitor_thread = None
         self._last_cleanup_time = 0
         self._min_cleanup_interval = 300  # Minimum 5 minutes between cleanups
+        self._cleanup_callbacks = []
         
     def get_memory_usage(self):
         """
@@ -46,6 +47,22 @@ class MemoryMonitor:
             app_logger.error(f"Error getting memory usage: {e}")
             return 0
     
+    def get_process_tree_memory_usage(self):
+        """
+        Get memory usage of this process and all its children in MB.
+        """
+        try:
+            total = self.process.memory_info().rss
+            for child in self.process.children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+            return total / 1024 / 1024
+        except Exception as e:
+            app_logger.error(f"Error getting process tree memory usage: {e}")
+            return 0
+
     def get_memory_percent(self):
         """
         Get memory usage as percentage of system memory.
@@ -69,6 +86,13 @@ class MemoryMonitor:
             
         return memory_mb
     
+    def register_cleanup(self, callback):
+        """
+        Register a callable run by force_cleanup() before garbage collection,
+        e.g. to shrink an in-process cache.
+        """
+        self._cleanup_callbacks.append(callback)
+
     def force_cleanup(self, log_always=False):
         """
         Force garbage collection and memory cleanup.
@@ -80,6 +104,13 @@ class MemoryMonitor:
             # Get memory before cleanup
             memory_before = self.get_memory_usage()
 
+            # Let registered caches release memory first
+            for callback in self._cleanup_callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    app_logger.error(f"Error in memory cleanup callback: {e}")
+
             # Force garbage collection
             collected = gc.collect()
 
@@ -1,40 +1,88 @@
 """
-metadata_scanner.py - Background worker for scanning ComicInfo.xml metadata
-
-This module provides a priority queue-based background worker that:
-1. Scans CBZ/ZIP files for ComicInfo.xml metadata
-2. Updates the file_index table with extracted metadata
-3. Tracks progress for UI feedback
-
-The scanner runs as daemon threads and processes files in priority order:
-- PRIORITY_NEW_FILE (1): Files just added via file_watcher (highest priority)
-- PRIORITY_MODIFIED (2): Files modified since last scan
-- PRIORITY_UNSCANNED (3): Files never scanned
-- PRIORITY_BATCH (4): Batch scan during startup (lowest priority)
+metadata_scanner.py - Background pipeline for scanning ComicInfo.xml metadata
+
+This module keeps the ComicInfo columns of the file_index table up to date:
+1. A feeder thread streams pending files from file_index one page at a time
+   (METADATA_SCAN_PAGE_SIZE rows, paged on id) and tops the queue up as it
+   drains, so a large library is never loaded at once and the scan never
+   stalls waiting for the next batch
+2. Files reported by file_watcher and incremental syncs go into the same
+   priority queue and are scanned ahead of the backlog:
+   - PRIORITY_NEW_FILE (1): Files just added via file_watcher (highest priority)
+   - PRIORITY_MODIFIED (2): Files modified since last scan
+   - PRIORITY_UNSCANNED (3): Files never scanned
+   - PRIORITY_BATCH (4): Backlog streamed by the feeder (lowest priority)
+3. A dispatcher hands files to a spawn process pool (METADATA_SCAN_WORKERS,
+   or the older METADATA_SCAN_THREADS; default the CPU count capped at 4;
+   METADATA_SCAN_USE_PROCESSES = False uses threads)
+   that reads ComicInfo.xml from CBZ/ZIP and CBR/RAR archives and parses it.
+   Only twice as many files as workers are in flight, so priorities keep
+   applying to the backlog
+4. Results go through the batching database writer, which commits them
+   hundreds of rows per transaction
+5. get_scanner_status() reports throughput and an ETA for the backlog
 """
 
+import multiprocessing
+import os
 import threading
-from queue import PriorityQueue
 import time
-import os
 import zipfile
+from collections import deque
+from concurrent.futures import BrokenExecutor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from queue import PriorityQueue
+
+import rarfile
 
 from app_logging import app_logger
 from config import config
 from database import (
+    count_files_needing_metadata_scan,
     get_files_needing_metadata_scan,
     get_metadata_scan_stats,
-    update_file_metadata,
-    update_metadata_scanned_at,
     get_file_index_entry_by_path
 )
-from comicinfo import read_comicinfo_from_zip
+from db_writer import queue_file_metadata, queue_metadata_scanned_at, flush_db_writes, get_db_writer_stats
+from comicinfo import read_comicinfo_from_archive
 
 # Priority levels (lower = higher priority)
+PRIORITY_STOP = 0          # Shutdown signal for the dispatcher
 PRIORITY_NEW_FILE = 1      # Files just added via file_watcher
 PRIORITY_MODIFIED = 2      # Files modified (modified_at > metadata_scanned_at)
 PRIORITY_UNSCANNED = 3     # Files never scanned (metadata_scanned_at IS NULL)
-PRIORITY_BATCH = 4         # Batch scan during startup
+PRIORITY_BATCH = 4         # Backlog streamed from file_index
+
+# Archives ComicInfo.xml is read from
+SCANNABLE_EXTENSIONS = ('.cbz', '.zip', '.cbr', '.rar')
+
+DEFAULT_PAGE_SIZE = 1000
+# Each worker is a spawned interpreter, so the default stays small
+DEFAULT_MAX_WORKERS = 4
+
+# file_index column -> ComicInfo.xml element
+COMICINFO_COLUMNS = {
+    'ci_title': 'Title',
+    'ci_series': 'Series',
+    'ci_number': 'Number',
+    'ci_count': 'Count',
+    'ci_volume': 'Volume',
+    'ci_year': 'Year',
+    'ci_writer': 'Writer',
+    'ci_penciller': 'Penciller',
+    'ci_inker': 'Inker',
+    'ci_colorist': 'Colorist',
+    'ci_letterer': 'Letterer',
+    'ci_coverartist': 'CoverArtist',
+    'ci_publisher': 'Publisher',
+    'ci_genre': 'Genre',
+    'ci_characters': 'Characters',
+}
+
+# Seconds between feeder passes once the backlog has been queued
+_PASS_INTERVAL = 30
+# Throughput is measured over the files finished in this window
+_RATE_WINDOW_SECONDS = 60
 
 # Global state
 metadata_queue = PriorityQueue()
@@ -48,9 +96,19 @@ scanner_progress = {
     'last_update': None
 }
 scanner_lock = threading.Lock()
-worker_threads = []
-monitor_thread = None
-monitor_stop_event = threading.Event()
+dispatcher_thread = None
+feeder_thread = None
+scanner_stop_event = threading.Event()
+rescan_event = threading.Event()
+
+_executor = None
+_workers = 0
+_use_processes = False
+_max_in_flight = 0
+_in_flight = 0
+_in_flight_cond = threading.Condition()
+_queued_ids = {}              # file_id -> tasks queued or being scanned
+_finished_times = deque()     # Completion times within the rate window
 
 
 class ScanTask:
@@ -75,136 +133,242 @@ class ScanTask:
         return self.created_at < other.created_at
 
 
-def scan_worker():
-    """
-    Worker thread that processes metadata scan tasks from the queue.
+def is_scannable(file_path):
+    """Check whether the scanner reads ComicInfo.xml from this file type."""
+    return file_path.lower().endswith(SCANNABLE_EXTENSIONS)
 
-    Runs indefinitely until shutdown signal (None) is received.
-    """
-    while True:
-        task = None
-        try:
-            task = metadata_queue.get()
-            if task is None:  # Shutdown signal
-                break
 
-            with scanner_lock:
-                scanner_progress['current_file'] = os.path.basename(task.file_path)
+def _filesystem_path(db_path):
+    """Map a file_index path (/data/...) to the actual DATA_DIR location."""
+    if db_path.startswith('/data/'):
+        data_dir = config.get('SETTINGS', 'DATA_DIR', fallback='/data')
+        return os.path.join(data_dir, db_path[6:])
+    return db_path
 
-            process_metadata_scan(task)
 
-            with scanner_lock:
-                scanner_progress['scanned_count'] += 1
-                scanner_progress['last_update'] = time.time()
+def to_db_path(file_path):
+    """Map a filesystem path under DATA_DIR to its file_index path (/data/...)."""
+    data_dir = config.get('SETTINGS', 'DATA_DIR', fallback='/data')
+    if file_path.startswith(data_dir):
+        db_path = '/data/' + file_path[len(data_dir):].lstrip('/').lstrip('\\')
+    else:
+        db_path = file_path
 
-        except Exception as e:
-            app_logger.error(f"Metadata scanner worker error: {e}")
-            with scanner_lock:
-                scanner_progress['errors'] += 1
-        finally:
-            # Always mark task as done (if we got one)
-            if task is not None:
-                metadata_queue.task_done()
+    # Normalize path separators
+    return db_path.replace('\\', '/')
 
 
-def process_metadata_scan(task):
+def read_file_metadata(file_path):
     """
-    Extract metadata from a CBZ file and update file_index.
+    Read the ComicInfo.xml of one archive as file_index columns. Runs inside
+    a pool worker.
 
-    Performance: read_comicinfo_from_zip() takes ~5-50ms per file.
+    Performance: ~5-50ms per file, mostly reading the central directory.
 
     Args:
-        task: ScanTask with file_path, file_id, modified_at
+        file_path: Filesystem path of a CBZ/ZIP or CBR/RAR file
+
+    Returns:
+        Tuple (db_metadata, has_comicinfo), or None if the file is missing
+
+    Raises:
+        zipfile.BadZipFile / rarfile.Error: Not a readable archive
+        Exception: Any other read or parse error
     """
-    try:
-        # Get the actual filesystem path
-        file_path = task.file_path
-
-        # Handle /data/ prefix (Docker mount point)
-        if file_path.startswith('/data/'):
-            data_dir = config.get('SETTINGS', 'DATA_DIR', fallback='/data')
-            # Remove /data prefix and join with actual data dir
-            relative_path = file_path[6:]  # Remove '/data/'
-            file_path = os.path.join(data_dir, relative_path)
-
-        # Skip if file doesn't exist
-        if not os.path.exists(file_path):
-            app_logger.debug(f"Metadata scan skipped (file missing): {task.file_path}")
-            update_metadata_scanned_at(task.file_id, time.time())
+    if not os.path.exists(file_path):
+        return None
+
+    metadata = read_comicinfo_from_archive(file_path)
+    db_metadata = {column: metadata.get(tag, '') for column, tag in COMICINFO_COLUMNS.items()}
+    return db_metadata, 1 if metadata else 0
+
+
+def _put_task(task, skip_queued=False):
+    """Queue a task; with skip_queued, files already queued or in flight are skipped."""
+    with scanner_lock:
+        if skip_queued and task.file_id in _queued_ids:
+            return False
+        _queued_ids[task.file_id] = _queued_ids.get(task.file_id, 0) + 1
+        scanner_progress['total_pending'] += 1
+    metadata_queue.put(task)
+    return True
+
+
+def _task_finished(task, scanned=True, error=False):
+    now = time.time()
+    with scanner_lock:
+        remaining = _queued_ids.get(task.file_id, 0) - 1
+        if remaining > 0:
+            _queued_ids[task.file_id] = remaining
+        else:
+            _queued_ids.pop(task.file_id, None)
+        if not scanned:
             return
+        scanner_progress['scanned_count'] += 1
+        if error:
+            scanner_progress['errors'] += 1
+        scanner_progress['last_update'] = now
+        _finished_times.append(now)
+        while _finished_times and _finished_times[0] < now - _RATE_WINDOW_SECONDS:
+            _finished_times.popleft()
+
 
-        # Extract metadata (~5-50ms)
+
+def _create_executor():
+    if _use_processes:
+        # spawn: the web process is multi-threaded, fork could copy held locks
+        return ProcessPoolExecutor(max_workers=_workers, mp_context=multiprocessing.get_context('spawn'))
+    return ThreadPoolExecutor(max_workers=_workers, thread_name_prefix="MetadataScanner")
+
+
+def _submit(task):
+    global _executor
+
+    file_path = _filesystem_path(task.file_path)
+    try:
+        return _executor.submit(read_file_metadata, file_path)
+    except BrokenExecutor as e:
+        # A worker died (e.g. on a corrupt archive); the files it took down
+        # fail through their futures, the rest go to a fresh pool
+        app_logger.error(f"Metadata scan pool broken, restarting it: {e}")
+        _executor = _create_executor()
+        return _executor.submit(read_file_metadata, file_path)
+
+
+def _record_result(task, future):
+    """Queue the database update for a scanned file (runs when its future is done)."""
+    global _in_flight
+
+    error = False
+    cancelled = future.cancelled()
+    try:
+        if cancelled:
+            return  # Scanner stopped; the file is picked up again next start
+        scanned_at = time.time()
         try:
-            metadata = read_comicinfo_from_zip(file_path)
-        except zipfile.BadZipFile:
-            app_logger.debug(f"Metadata scan skipped (invalid ZIP): {task.file_path}")
-            update_metadata_scanned_at(task.file_id, time.time())
-            return
+            result = future.result()
+        except (zipfile.BadZipFile, rarfile.Error):
+            app_logger.debug(f"Metadata scan skipped (invalid archive): {task.file_path}")
+            queue_metadata_scanned_at(task.file_id, scanned_at)
         except Exception as e:
+            # Mark as scanned even on error to prevent infinite retry loops
             app_logger.warning(f"Error reading ComicInfo.xml from {task.file_path}: {e}")
-            update_metadata_scanned_at(task.file_id, time.time())
-            return
+            queue_metadata_scanned_at(task.file_id, scanned_at)
+            error = True
+        else:
+            if result is None:
+                app_logger.debug(f"Metadata scan skipped (file missing): {task.file_path}")
+                queue_metadata_scanned_at(task.file_id, scanned_at)
+            else:
+                db_metadata, has_comicinfo = result
+                # Update database (batched with other writers by db_writer)
+                queue_file_metadata(task.file_id, db_metadata, scanned_at, has_comicinfo)
+                app_logger.debug(f"Metadata scanned: {os.path.basename(task.file_path)}")
+    except Exception as e:
+        app_logger.error(f"Metadata scan error for {task.file_path}: {e}")
+        error = True
+    finally:
+        _task_finished(task, scanned=not cancelled, error=error)
+        with _in_flight_cond:
+            _in_flight -= 1
+            _in_flight_cond.notify()
+        metadata_queue.task_done()
 
-        # Determine if ComicInfo.xml was present (metadata is non-empty dict)
-        has_comicinfo = 1 if metadata else 0
-
-        # Map ComicInfo fields to database columns
-        db_metadata = {
-            'ci_title': metadata.get('Title', ''),
-            'ci_series': metadata.get('Series', ''),
-            'ci_number': metadata.get('Number', ''),
-            'ci_count': metadata.get('Count', ''),
-            'ci_volume': metadata.get('Volume', ''),
-            'ci_year': metadata.get('Year', ''),
-            'ci_writer': metadata.get('Writer', ''),
-            'ci_penciller': metadata.get('Penciller', ''),
-            'ci_inker': metadata.get('Inker', ''),
-            'ci_colorist': metadata.get('Colorist', ''),
-            'ci_letterer': metadata.get('Letterer', ''),
-            'ci_coverartist': metadata.get('CoverArtist', ''),
-            'ci_publisher': metadata.get('Publisher', ''),
-            'ci_genre': metadata.get('Genre', ''),
-            'ci_characters': metadata.get('Characters', '')
-        }
 
-        # Update database
-        update_file_metadata(task.file_id, db_metadata, time.time(), has_comicinfo)
+def scan_dispatcher():
+    """
+    Thread handing queued files to the pool in priority order.
+
+    Runs until the shutdown task (PRIORITY_STOP) is received.
+    """
+    global _in_flight
+
+    while True:
+        with _in_flight_cond:
+            while _in_flight >= _max_in_flight:
+                _in_flight_cond.wait()
 
-        app_logger.debug(f"Metadata scanned: {os.path.basename(task.file_path)}")
+        task = metadata_queue.get()
+        if task.priority == PRIORITY_STOP:
+            metadata_queue.task_done()
+            break
 
-    except Exception as e:
-        # Mark as scanned even on error to prevent infinite retry loops
-        app_logger.warning(f"Metadata scan error for {task.file_path}: {e}")
-        update_metadata_scanned_at(task.file_id, time.time())
         with scanner_lock:
-            scanner_progress['errors'] += 1
+            scanner_progress['current_file'] = os.path.basename(task.file_path)
+        with _in_flight_cond:
+            _in_flight += 1
 
+        try:
+            future = _submit(task)
+        except Exception as e:
+            # Pool shut down, or it could not be restarted
+            future = Future()
+            future.set_exception(e)
+        future.add_done_callback(partial(_record_result, task))
 
-def queue_pending_files():
+
+def queue_feeder():
     """
-    Queue all files that need metadata scanning.
+    Background thread streaming files that need scanning into the queue.
 
-    Called on startup and can be triggered manually via API.
+    Pages through file_index in id order, keeping about one page queued.
+    Once every pending file has been queued the pass ends; the next one
+    starts after _PASS_INTERVAL seconds, or at once when queue_pending_files()
+    asks for it, and picks up files modified since.
     """
-    try:
-        files = get_files_needing_metadata_scan(limit=10000)
+    page_size = max(1, config.getint('SETTINGS', 'METADATA_SCAN_PAGE_SIZE', fallback=DEFAULT_PAGE_SIZE))
+    after_id = 0
 
-        with scanner_lock:
-            scanner_progress['total_pending'] = len(files)
+    while not scanner_stop_event.is_set():
+        try:
+            if metadata_queue.qsize() >= page_size:
+                scanner_stop_event.wait(timeout=1)
+                continue
 
-        for f in files:
-            task = ScanTask(
-                priority=PRIORITY_BATCH,
-                file_path=f['path'],
-                file_id=f['id'],
-                modified_at=f['modified_at']
-            )
-            metadata_queue.put(task)
+            files = get_files_needing_metadata_scan(limit=page_size, after_id=after_id)
+            if files:
+                if after_id == 0:
+                    app_logger.info(f"Metadata scan: {count_files_needing_metadata_scan()} files pending")
+                after_id = files[-1]['id']
+                for f in files:
+                    task = ScanTask(
+                        priority=PRIORITY_BATCH,
+                        file_path=f['path'],
+                        file_id=f['id'],
+                        modified_at=f['modified_at']
+                    )
+                    _put_task(task, skip_queued=True)
+                continue
 
-        if files:
-            app_logger.info(f"Queued {len(files)} files for metadata scanning")
+            # Pass complete: wait, then make sure results of this pass are
+            # committed so the next one does not queue them again
+            after_id = 0
+            rescan_event.wait(timeout=_PASS_INTERVAL)
+            rescan_event.clear()
+            if not scanner_stop_event.is_set():
+                flush_db_writes(timeout=10)
 
-        return len(files)
+        except Exception as e:
+            app_logger.error(f"Metadata queue feeder error: {e}")
+            scanner_stop_event.wait(timeout=_PASS_INTERVAL)
+
+
+def queue_pending_files():
+    """
+    Start a new pass over the files that need metadata scanning.
+
+    Called after a library sync and from the manual trigger; the feeder
+    streams the files into the queue.
+
+    Returns:
+        Number of files waiting to be scanned (0 if the scanner is not running)
+    """
+    try:
+        if feeder_thread is None or not feeder_thread.is_alive():
+            return 0
+        pending = count_files_needing_metadata_scan()
+        rescan_event.set()
+        return pending
 
     except Exception as e:
         app_logger.error(f"Error queuing pending files for metadata scan: {e}")
@@ -222,19 +386,11 @@ def queue_file_for_scan(file_path, priority=PRIORITY_NEW_FILE):
         priority: Scan priority (default: high priority for new files)
     """
     try:
-        # Only process CBZ/ZIP files
-        if not file_path.lower().endswith(('.cbz', '.zip')):
+        if not is_scannable(file_path):
             return
 
         # Convert filesystem path to database path format (/data/...)
-        data_dir = config.get('SETTINGS', 'DATA_DIR', fallback='/data')
-        if file_path.startswith(data_dir):
-            db_path = '/data/' + file_path[len(data_dir):].lstrip('/').lstrip('\\')
-        else:
-            db_path = file_path
-
-        # Normalize path separators
-        db_path = db_path.replace('\\', '/')
+        db_path = to_db_path(file_path)
 
         # Get file_id from database
         entry = get_file_index_entry_by_path(db_path)
@@ -246,11 +402,7 @@ def queue_file_for_scan(file_path, priority=PRIORITY_NEW_FILE):
                 file_id=entry['id'],
                 modified_at=entry['modified_at'] or time.time()
             )
-            metadata_queue.put(task)
-
-            with scanner_lock:
-                scanner_progress['total_pending'] += 1
-
+            _put_task(task)
             app_logger.debug(f"Queued for metadata scan: {os.path.basename(file_path)}")
 
     except Exception as e:
@@ -271,8 +423,7 @@ def queue_files_for_scan(file_paths, priority=PRIORITY_NEW_FILE):
 
     for file_path in file_paths:
         try:
-            # Only process CBZ/ZIP files
-            if not file_path.lower().endswith(('.cbz', '.zip')):
+            if not is_scannable(file_path):
                 continue
 
             # Normalize path separators
@@ -288,59 +439,38 @@ def queue_files_for_scan(file_paths, priority=PRIORITY_NEW_FILE):
                     file_id=entry['id'],
                     modified_at=entry['modified_at'] or time.time()
                 )
-                metadata_queue.put(task)
+                _put_task(task)
                 queued_count += 1
 
         except Exception as e:
             app_logger.error(f"Error queuing file {file_path} for metadata scan: {e}")
 
     if queued_count > 0:
-        with scanner_lock:
-            scanner_progress['total_pending'] += queued_count
         app_logger.debug(f"Queued {queued_count} files for metadata scan")
 
     return queued_count
 
 
-def queue_monitor():
+def configured_workers():
     """
-    Background thread that continuously monitors and queues pending files.
-
-    Runs every 30 seconds to check if the queue is empty and there are
-    more files needing scanning. This ensures all files eventually get scanned,
-    even if the initial batch limit was exceeded.
+    Pool size from METADATA_SCAN_WORKERS, falling back to the older
+    METADATA_SCAN_THREADS setting and then to min(4, CPU count).
     """
-    check_interval = 30  # seconds between checks
-
-    while not monitor_stop_event.is_set():
-        try:
-            # Wait for the specified interval or until stop event is set
-            if monitor_stop_event.wait(timeout=check_interval):
-                break  # Stop event was set
-
-            # Only queue more files if queue is nearly empty
-            if metadata_queue.qsize() < 100:
-                # Check if there are more files needing scan
-                files_needing_scan = get_files_needing_metadata_scan(limit=1)
-                if files_needing_scan:
-                    queued = queue_pending_files()
-                    if queued > 0:
-                        app_logger.info(f"Queue monitor: Queued {queued} additional files for metadata scanning")
-
-        except Exception as e:
-            app_logger.error(f"Queue monitor error: {e}")
+    default = min(DEFAULT_MAX_WORKERS, os.cpu_count() or 2)
+    threads = config.getint('SETTINGS', 'METADATA_SCAN_THREADS', fallback=default)
+    return config.getint('SETTINGS', 'METADATA_SCAN_WORKERS', fallback=threads)
 
 
 def start_metadata_scanner(num_workers=None):
     """
-    Initialize and start the metadata scanner background workers.
+    Initialize and start the metadata scanner pool, dispatcher and feeder.
 
     Called from app.py during startup after file index is built.
 
     Args:
-        num_workers: Number of worker threads (default from config or 2)
+        num_workers: Number of pool workers (default configured_workers())
     """
-    global worker_threads, monitor_thread
+    global dispatcher_thread, feeder_thread, _executor, _workers, _use_processes, _max_in_flight
 
     # Check if scanning is enabled
     enabled = config.getboolean('SETTINGS', 'ENABLE_METADATA_SCAN', fallback=True)
@@ -348,67 +478,62 @@ def start_metadata_scanner(num_workers=None):
         app_logger.info("Metadata scanning disabled in config")
         return
 
-    # Get configured thread count
+    if dispatcher_thread is not None and dispatcher_thread.is_alive():
+        return
+
     if num_workers is None:
-        num_workers = config.getint('SETTINGS', 'METADATA_SCAN_THREADS', fallback=2)
-    num_workers = max(1, min(num_workers, 4))  # Clamp between 1-4
+        num_workers = configured_workers()
+    _workers = max(1, num_workers)
+    _use_processes = config.getboolean('SETTINGS', 'METADATA_SCAN_USE_PROCESSES', fallback=True)
+    _max_in_flight = _workers * 2
 
     with scanner_lock:
         scanner_progress['is_running'] = True
         scanner_progress['started_at'] = time.time()
         scanner_progress['scanned_count'] = 0
         scanner_progress['errors'] = 0
+        _finished_times.clear()
 
     # Clear the stop event in case scanner was previously stopped
-    monitor_stop_event.clear()
-
-    # Start worker threads
-    for i in range(num_workers):
-        t = threading.Thread(
-            target=scan_worker,
-            daemon=True,
-            name=f"MetadataScanner-{i}"
-        )
-        t.start()
-        worker_threads.append(t)
+    scanner_stop_event.clear()
+    rescan_event.clear()
 
-    app_logger.info(f"Started {num_workers} metadata scanner worker thread(s)")
+    _executor = _create_executor()
+    dispatcher_thread = threading.Thread(target=scan_dispatcher, daemon=True, name="MetadataScanDispatcher")
+    dispatcher_thread.start()
+    app_logger.info(f"Started metadata scanner ({_workers} {'processes' if _use_processes else 'threads'})")
 
-    # Start queue monitor thread to continuously queue pending files
-    monitor_thread = threading.Thread(
-        target=queue_monitor,
-        daemon=True,
-        name="MetadataQueueMonitor"
-    )
-    monitor_thread.start()
-    app_logger.info("Started metadata queue monitor thread")
-
-    # Queue initial batch of files needing scan
-    queue_pending_files()
+    # Stream files needing a scan into the queue
+    feeder_thread = threading.Thread(target=queue_feeder, daemon=True, name="MetadataQueueFeeder")
+    feeder_thread.start()
+    app_logger.info("Started metadata queue feeder thread")
 
 
 def stop_metadata_scanner():
-    """Gracefully stop the metadata scanner workers."""
-    global worker_threads, monitor_thread
+    """Gracefully stop the metadata scanner."""
+    global dispatcher_thread, feeder_thread, _executor
 
     with scanner_lock:
         scanner_progress['is_running'] = False
 
-    # Signal the monitor thread to stop
-    monitor_stop_event.set()
-    if monitor_thread:
-        monitor_thread.join(timeout=5)
-        monitor_thread = None
+    # Signal the feeder thread to stop
+    scanner_stop_event.set()
+    rescan_event.set()
+    if feeder_thread:
+        feeder_thread.join(timeout=5)
+        feeder_thread = None
 
-    # Send shutdown signal to all workers
-    for _ in worker_threads:
-        metadata_queue.put(None)
+    # Send shutdown signal to the dispatcher, ahead of any queued files
+    if dispatcher_thread:
+        metadata_queue.put(ScanTask(PRIORITY_STOP, None, None, None))
+        dispatcher_thread.join(timeout=5)
+        dispatcher_thread = None
 
-    # Wait for workers to finish (with timeout)
-    for t in worker_threads:
-        t.join(timeout=5)
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
 
-    worker_threads = []
+    flush_db_writes(timeout=10)
     app_logger.info("Metadata scanner stopped")
 
 
@@ -417,20 +542,34 @@ def get_scanner_status():
     Get comprehensive scanner status for API.
 
     Returns:
-        Dict with scanner status, progress, and statistics
+        Dict with scanner status, progress, throughput and statistics.
+        files_per_second is measured over the last minute; eta_seconds is
+        the time to scan the files still pending in the database at that rate
     """
     db_stats = get_metadata_scan_stats()
 
     with scanner_lock:
+        now = time.time()
+        started_at = scanner_progress['started_at']
+        window = min(_RATE_WINDOW_SECONDS, now - started_at) if started_at else 0
+        recent = sum(1 for t in _finished_times if t >= now - _RATE_WINDOW_SECONDS)
+        rate = recent / window if window > 0 else 0.0
+        eta = round(db_stats['pending'] / rate) if rate > 0 and db_stats['pending'] else None
+
         return {
             'enabled': config.getboolean('SETTINGS', 'ENABLE_METADATA_SCAN', fallback=True),
             'is_running': scanner_progress['is_running'],
             'queue_size': metadata_queue.qsize(),
+            'in_flight': _in_flight,
             'scanned_this_session': scanner_progress['scanned_count'],
             'error_count': scanner_progress['errors'],
             'current_file': scanner_progress['current_file'],
-            'started_at': scanner_progress['started_at'],
+            'started_at': started_at,
             'last_update': scanner_progress['last_update'],
+            'files_per_second': round(rate, 1),
+            'eta_seconds': eta,
             'db_stats': db_stats,
-            'threads': len(worker_threads)
+            'threads': _workers,
+            'mode': 'processes' if _use_processes else 'threads',
+            'write_queue': get_db_writer_stats()
         }
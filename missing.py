@@ -4,46 +4,31 @@ import re
 from app_logging import app_logger
 from config import config, load_config
 from helpers import is_hidden
+from job_runner import run_jobs
 
 load_config()
 
 raw_terms = config.get("SETTINGS", "IGNORED_TERMS", fallback="Annual")
 terms = [t.strip() for t in raw_terms.split(",") if t.strip()]
 
-def check_missing_issues(root_directory):
-    """
-    Recursively scans 'root_directory' (including sub-directories) for 
-    filenames in one of these forms:
-        <Series Name> <Issue Number> (<Year>).cbz
-        <Series Name> <Issue Number> (<Year>).cbr
-        <Series Name> <Issue Number>.cbz
-        <Series Name> <Issue Number>.cbr
+ISSUE_PATTERN = re.compile(r'^(.+?)\s+#?(\d+)(?:\s*\((\d+)\))?\.(?:cbz|cbr)$', re.IGNORECASE)
 
-    When multiple files in the same directory have the same series name, 
-    but some include a year and others do not, they are treated as the 
-    same series, adopting the year if at least one file has it.
-
-    Any filename containing any of the substrings in IGNORE (case-insensitive)
-    is skipped. We also normalize curly quotes ('’‘“”) to straight quotes 
-    ('"') before checking.
 
-    All missing issues (e.g., #003, #004) are written to a single 
-    'missing.txt' in 'root_directory'. If a consecutive run of missing issues
-    is 50 or more, a single condensed line is used to report that run.
-
-    Now updated to print the directory path once (for each series) only if
-    there are missing issues for that series.
+def _scan_tree(subtree):
     """
+    Parse the comic filenames under one directory.
 
-    app_logger.info("********************// Missing File Check //********************")
-
-    pattern = re.compile(r'^(.+?)\s+#?(\d+)(?:\s*\((\d+)\))?\.(?:cbz|cbr)$', re.IGNORECASE)
-    data_dict = {}
+    :param subtree: (directory, recursive) tuple
+    :return: dict with "matched": [(dirpath, series_name, issue_num, year_str)]
+             and "not_matched": [full_path]
+    """
+    top, recursive = subtree
+    matched = []
     not_matched = []
 
-    for dirpath, dirnames, filenames in os.walk(root_directory):
+    for dirpath, dirnames, filenames in os.walk(top):
         # Skip hidden directories.
-        dirnames[:] = [d for d in dirnames if not is_hidden(os.path.join(dirpath, d))]
+        dirnames[:] = [d for d in dirnames if not is_hidden(os.path.join(dirpath, d))] if recursive else []
         for fname in filenames:
             full_path = os.path.join(dirpath, fname)
             # Skip hidden files.
@@ -61,28 +46,76 @@ def check_missing_issues(root_directory):
             if any(ignore_word and ignore_word.lower() in normalized_fname.lower() for ignore_word in terms):
                 continue
 
-            match = pattern.match(fname_stripped)
+            match = ISSUE_PATTERN.match(fname_stripped)
             if match:
-                series_name = match.group(1).strip()
-                issue_str = match.group(2)
-                year_str = match.group(3)
-
                 try:
-                    issue_num = int(issue_str)
+                    issue_num = int(match.group(2))
                 except ValueError:
                     not_matched.append(full_path)
                     continue
-
-                key = (dirpath, series_name.lower())
-                if key not in data_dict:
-                    data_dict[key] = {"series_name": series_name, "years": set(), "issues": set()}
-                
-                if year_str:
-                    data_dict[key]["years"].add(year_str)
-                data_dict[key]["issues"].add(issue_num)
+                matched.append((dirpath, match.group(1).strip(), issue_num, match.group(3)))
             else:
                 not_matched.append(full_path)
 
+    return {"matched": matched, "not_matched": not_matched}
+
+
+def check_missing_issues(root_directory):
+    """
+    Recursively scans 'root_directory' (including sub-directories) for 
+    filenames in one of these forms:
+        <Series Name> <Issue Number> (<Year>).cbz
+        <Series Name> <Issue Number> (<Year>).cbr
+        <Series Name> <Issue Number>.cbz
+        <Series Name> <Issue Number>.cbr
+
+    When multiple files in the same directory have the same series name, 
+    but some include a year and others do not, they are treated as the 
+    same series, adopting the year if at least one file has it.
+
+    Any filename containing any of the substrings in IGNORE (case-insensitive)
+    is skipped. We also normalize curly quotes ('’‘“”) to straight quotes 
+    ('"') before checking.
+
+    All missing issues (e.g., #003, #004) are written to a single 
+    'missing.txt' in 'root_directory'. If a consecutive run of missing issues
+    is 50 or more, a single condensed line is used to report that run.
+    Returns the number of missing issues.
+
+    Now updated to print the directory path once (for each series) only if
+    there are missing issues for that series.
+
+    Each top-level subdirectory is scanned on its own job_runner thread.
+    """
+
+    app_logger.info("********************// Missing File Check //********************")
+
+    # Walk each top-level subtree on its own thread: the cost is directory
+    # listing, which on network shares is latency rather than CPU
+    subtrees = [(root_directory, False)]
+    for entry in sorted(os.listdir(root_directory)):
+        entry_path = os.path.join(root_directory, entry)
+        if os.path.isdir(entry_path) and not is_hidden(entry_path):
+            subtrees.append((entry_path, True))
+
+    scans = run_jobs(_scan_tree, subtrees, "missing", scope=root_directory,
+                     label=lambda item: item[0], use_processes=False, resume=False)
+
+    data_dict = {}
+    not_matched = []
+    for scan in scans:
+        if scan is None:
+            continue
+        for dirpath, series_name, issue_num, year_str in scan["matched"]:
+            key = (dirpath, series_name.lower())
+            if key not in data_dict:
+                data_dict[key] = {"series_name": series_name, "years": set(), "issues": set()}
+
+            if year_str:
+                data_dict[key]["years"].add(year_str)
+            data_dict[key]["issues"].add(issue_num)
+        not_matched.extend(scan["not_matched"])
+
     missing_file_path = os.path.join(root_directory, "missing.txt")
     num_missing_total = 0
 
@@ -145,6 +178,7 @@ def check_missing_issues(root_directory):
         app_logger.info("No missing issues found.")
     else:
         app_logger.info(f"Found <code>{num_missing_total}</code> missing issues in <code>{root_directory}</code>.")
+    return num_missing_total
 
     
 if __name__ == "__main__":
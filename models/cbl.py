@@ -1,7 +1,7 @@
 import defusedxml.ElementTree as SafeET
 import re
 import os
-from database import search_file_index
+from database import search_file_index, build_fts_query
 from app_logging import app_logger
 
 class CBLLoader:
@@ -110,8 +110,12 @@ class CBLLoader:
             f"{clean_series} #{number}",          # "Avengers #18"
         ])
 
-        # Remove duplicates while preserving order
-        search_patterns = list(dict.fromkeys(search_patterns))
+        # Remove duplicates while preserving order. Patterns that only differ in
+        # issue number padding or '#' build the same full-text query.
+        unique_patterns = {}
+        for pattern in search_patterns:
+            unique_patterns.setdefault(build_fts_query(pattern) or pattern, pattern)
+        search_patterns = list(unique_patterns.values())
 
         for pattern in search_patterns:
             results = search_file_index(pattern, limit=20)
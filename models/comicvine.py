@@ -12,6 +12,7 @@ import os
 import shutil
 import re
 from cbz_ops.rename import load_custom_rename_config
+from models.providers.cache import mark_lookup_failed, provider_cache
 
 try:
     from simyan.comicvine import Comicvine
@@ -546,10 +547,18 @@ def auto_move_file(file_path: str, volume_data: Dict[str, Any], config: Dict[str
         raise
 
 
+def _volume_issue_key(api_key, volume_id, issue_number, year=None, start_year=None) -> str:
+    return f"{volume_id}|{issue_number}|{year or ''}|{start_year or ''}"
+
+
+@provider_cache("comicvine", "comicinfo", _volume_issue_key, ttl=7 * 24 * 3600)
 def get_metadata_by_volume_id(api_key: str, volume_id: int, issue_number: str, year: Optional[int] = None, start_year: Optional[int] = None) -> Optional[Dict[str, Any]]:
     """
     Get issue metadata using a known volume ID (from cvinfo file).
 
+    Results go through the provider cache, so a batch over a tagged volume
+    does not ask ComicVine for the same issue again.
+
     Args:
         api_key: ComicVine API key
         volume_id: ComicVine volume ID (extracted from cvinfo URL)
@@ -574,6 +583,7 @@ def get_metadata_by_volume_id(api_key: str, volume_id: int, issue_number: str, y
         return comicinfo
     except Exception as e:
         app_logger.error(f"Error in get_metadata_by_volume_id: {str(e)}")
+        mark_lookup_failed()
         return None
 
 
@@ -728,6 +738,7 @@ def get_volume_details(api_key: str, volume_id: int) -> Dict[str, Any]:
 
     except Exception as e:
         app_logger.error(f"Error fetching volume details for {volume_id}: {e}")
+        mark_lookup_failed()
         return result
 
 
@@ -6,6 +6,7 @@ import re
 from datetime import datetime
 from typing import Optional, Dict, Any, List, Tuple
 from app_logging import app_logger
+from models.providers.cache import mark_lookup_failed, provider_cache
 
 # Check if mysql.connector is available
 try:
@@ -282,6 +283,11 @@ def validate_issue(series_id: int, issue_number: str) -> Dict[str, Any]:
         }
 
 
+def _series_match_key(series_name, year=None, language_codes=None) -> str:
+    return f"{' '.join(series_name.lower().split())}|{year or ''}|{','.join(language_codes or ['en'])}"
+
+
+@provider_cache("gcd", "series_match", _series_match_key, ttl=24 * 3600)
 def search_series(series_name: str, year: int = None, language_codes: List[str] = None) -> Optional[Dict[str, Any]]:
     """
     Search for a series in GCD and auto-select the best match.
@@ -303,6 +309,7 @@ def search_series(series_name: str, year: int = None, language_codes: List[str]
     try:
         conn = get_connection()
         if not conn:
+            mark_lookup_failed()
             return None
 
         cursor = conn.cursor(dictionary=True)
@@ -367,9 +374,12 @@ def search_series(series_name: str, year: int = None, language_codes: List[str]
 
     except Exception as e:
         app_logger.error(f"Exception in search_series: {e}")
+        mark_lookup_failed()
         return None
 
 
+@provider_cache("gcd", "comicinfo", lambda series_id, issue_number: f"{series_id}|{issue_number}",
+                ttl=7 * 24 * 3600)
 def get_issue_metadata(series_id: int, issue_number: str) -> Optional[Dict[str, Any]]:
     """
     Get metadata for a specific issue from GCD.
@@ -387,6 +397,7 @@ def get_issue_metadata(series_id: int, issue_number: str) -> Optional[Dict[str,
     try:
         conn = get_connection()
         if not conn:
+            mark_lookup_failed()
             return None
 
         cursor = conn.cursor(dictionary=True)
@@ -533,7 +544,9 @@ def get_issue_metadata(series_id: int, issue_number: str) -> Optional[Dict[str,
 
     except mysql.connector.Error as db_error:
         app_logger.error(f"Database error in get_issue_metadata: {db_error}")
+        mark_lookup_failed()
         return None
     except Exception as e:
         app_logger.error(f"Exception in get_issue_metadata: {e}")
+        mark_lookup_failed()
         return None
@@ -3,8 +3,8 @@ Metron API integration for comic metadata retrieval using Mokkari library.
 """
 from app_logging import app_logger
 from typing import Optional, Dict, Any, List
+import inspect
 import re
-import time
 from datetime import datetime, timedelta
 from version import __version__
 
@@ -13,6 +13,8 @@ from mokkari.session import Session as MokkariSession
 from mokkari.exceptions import ApiError, RateLimitError
 from mokkari.schemas.collection import ScrobbleRequest
 
+from models.providers.cache import mark_lookup_failed, provider_cache
+
 # User agent for Metron API requests
 CLU_USER_AGENT = f"CLU/{__version__}"
 
@@ -20,13 +22,48 @@ _RATE_LIMIT_MAX_RETRIES = 3
 _RATE_LIMIT_DEFAULT_WAIT = 60  # seconds, used when retry_after is 0 or unset
 _DAILY_RATE_LIMIT_THRESHOLD = 60  # seconds; retry_after above this implies daily limit exceeded
 
+# mokkari 4 dispatches every HTTP send to an injected rate_limiter; older
+# versions only let us meter whole calls
+_SESSION_METERS_REQUESTS = "rate_limiter" in inspect.signature(MokkariSession.__init__).parameters
+
+
+class SharedRateLimiter:
+    """mokkari rate_limiter taking one shared Metron token per HTTP request.
+
+    A helper that makes several requests (an issue lookup, a paginated list)
+    is charged for each of them, not once per call.
+    """
+
+    def acquire(self, status) -> None:
+        from models.providers.rate_limit import get_rate_limiter
+        get_rate_limiter("metron").acquire()
+
+    def on_rate_limited(self, retry_after: float) -> None:
+        from models.providers.rate_limit import get_rate_limiter
+        # A daily limit is reported to the caller, not waited out by every thread
+        if retry_after <= _DAILY_RATE_LIMIT_THRESHOLD:
+            get_rate_limiter("metron").pause(retry_after or _RATE_LIMIT_DEFAULT_WAIT)
+
+    def release(self, status) -> None:
+        pass
+
+
+def meters_requests(api) -> bool:
+    """True if api takes a shared Metron token for each HTTP request itself."""
+    return isinstance(getattr(api, "rate_limiter", None), SharedRateLimiter)
+
 
 def _handle_rate_limit(e: "RateLimitError", attempt: int, context: str) -> bool:
-    """Sleep and signal whether to retry after a RateLimitError.
+    """Wait out a RateLimitError and signal whether to retry.
+
+    The wait pauses the shared Metron rate limiter, so every thread calling
+    Metron backs off until retry_after has passed, not just this one.
 
     Returns True if the caller should retry, False if retries are exhausted
     or the daily API rate limit has been exceeded.
     """
+    from models.providers.rate_limit import get_rate_limiter
+
     wait = e.retry_after if e.retry_after else _RATE_LIMIT_DEFAULT_WAIT
     if e.retry_after and e.retry_after > _DAILY_RATE_LIMIT_THRESHOLD:
         app_logger.warning(
@@ -38,7 +75,8 @@ def _handle_rate_limit(e: "RateLimitError", attempt: int, context: str) -> bool:
             f"Metron rate limit exceeded {context}: retrying in {wait}s "
             f"(attempt {attempt + 1}/{_RATE_LIMIT_MAX_RETRIES})"
         )
-        time.sleep(wait)
+        # The retry waits for the pause when it acquires its next token
+        get_rate_limiter("metron").pause(wait)
         return True
     app_logger.warning(
         f"Metron rate limit exceeded {context}: giving up after {_RATE_LIMIT_MAX_RETRIES} attempts"
@@ -47,19 +85,57 @@ def _handle_rate_limit(e: "RateLimitError", attempt: int, context: str) -> bool:
 
 
 def _api_call(fn, context: str, default=None):
-    """Call fn() with rate-limit retry and standard error handling."""
+    """Call fn() with rate-limit retry and standard error handling.
+
+    A failure returns default and marks the provider lookup as failed, so the
+    provider cache does not store it as "not found".
+
+    Sessions from get_api() take a token per HTTP request themselves; with an
+    older mokkari each attempt takes one, so a retry waits out the pause.
+    """
+    from models.providers.rate_limit import get_rate_limiter
+
+    limiter = get_rate_limiter("metron")
     for attempt in range(_RATE_LIMIT_MAX_RETRIES):
+        if not _SESSION_METERS_REQUESTS:
+            limiter.acquire()
         try:
             return fn()
         except RateLimitError as e:
             if not _handle_rate_limit(e, attempt, context):
+                mark_lookup_failed()
                 return default
         except ApiError as e:
             app_logger.error(f"Metron API error {context}: {e}")
+            mark_lookup_failed()
             return default
+    mark_lookup_failed()
     return default
 
 
+def rate_limited_call(fn, context: str):
+    """Call fn() under the shared Metron rate limiter, with rate-limit retry.
+
+    Unlike _api_call, failures are raised instead of returning a default:
+    ApiError as is, and RateLimitError once retries are exhausted or the daily
+    limit is reached, so callers can tell "nothing changed" from "could not ask".
+
+    Sessions from get_api() take a token per HTTP request themselves; with an
+    older mokkari the call takes one token per attempt.
+    """
+    from models.providers.rate_limit import get_rate_limiter
+
+    limiter = get_rate_limiter("metron")
+    for attempt in range(_RATE_LIMIT_MAX_RETRIES):
+        if not _SESSION_METERS_REQUESTS:
+            limiter.acquire()
+        try:
+            return fn()
+        except RateLimitError as e:
+            if not _handle_rate_limit(e, attempt, context):
+                raise
+
+
 def is_connection_error(exc: Exception) -> bool:
     """Check if an exception is a Metron connectivity/timeout error."""
     if isinstance(exc, ApiError) and exc.__cause__ is not None and requests_exceptions is not None:
@@ -85,6 +161,9 @@ def get_api(username: str, password: str):
         app_logger.warning("Metron credentials not configured")
         return None
     try:
+        if _SESSION_METERS_REQUESTS:
+            return MokkariSession(username=username, passwd=password, user_agent=CLU_USER_AGENT,
+                                  rate_limiter=SharedRateLimiter())
         return MokkariSession(username=username, passwd=password, user_agent=CLU_USER_AGENT)
     except ApiError as e:
         app_logger.error(f"Metron API error initializing session: {e}")
@@ -306,6 +385,26 @@ def get_issue_metadata(api, series_id: int, issue_number: str) -> Optional[Dict[
     return _api_call(_call, f"fetching issue {issue_number} in series {series_id}")
 
 
+@provider_cache("metron", "comicinfo", lambda api, series_id, issue_number: f"{series_id}|{issue_number}",
+                ttl=7 * 24 * 3600)
+def get_issue_comicinfo(api, series_id: int, issue_number: str) -> Optional[Dict[str, Any]]:
+    """
+    Fetch one issue already mapped to ComicInfo fields, through the provider cache.
+
+    Used by batch tagging: the series' issue list is fetched once and shared by
+    all its files, so each file costs one issue() request instead of two.
+
+    Returns:
+        ComicInfo dict from map_to_comicinfo(), or None if not found
+    """
+    issue_id = get_series_issue_ids(api, series_id).get(str(issue_number))
+    if issue_id is None:
+        issue_data = get_issue_metadata(api, series_id, issue_number)
+    else:
+        issue_data = _api_call(lambda: _to_dict(api.issue(issue_id)), f"fetching issue {issue_id}")
+    return map_to_comicinfo(issue_data) if issue_data else None
+
+
 def _get_attr(obj, key, default=None):
     """Helper to get attribute from dict or object."""
     if isinstance(obj, dict):
@@ -631,6 +730,12 @@ def get_all_issues_for_series(api, series_id):
 
     return _api_call(_call, f"retrieving issues for series {series_id}", default=[]) or []
 
+@provider_cache("metron", "issue_ids", lambda api, series_id: str(series_id), ttl=24 * 3600)
+def get_series_issue_ids(api, series_id) -> Dict[str, int]:
+    """Map each issue number of a series to its Metron issue ID."""
+    return {str(issue.number): issue.id for issue in get_all_issues_for_series(api, series_id)
+            if getattr(issue, 'number', None) is not None}
+
 def search_series_by_name(api, series_name: str, year: Optional[int] = None) -> Optional[Dict[str, Any]]:
     """
     Search Metron for a series by name, optionally filtering by year.
@@ -10,6 +10,7 @@ from typing import Optional, List, Dict, Any
 from app_logging import app_logger
 from .base import BaseProvider, ProviderType, ProviderCredentials, SearchResult, IssueResult
 from . import register_provider
+from .cache import mark_lookup_failed
 
 
 @register_provider
@@ -55,11 +56,16 @@ class AniListProvider(BaseProvider):
 
             if "errors" in data:
                 app_logger.error(f"AniList GraphQL errors: {data['errors']}")
+                if not any(error.get("status") == 404 for error in data["errors"]):
+                    mark_lookup_failed()
                 return None
 
             return data.get("data")
         except requests.RequestException as e:
             app_logger.error(f"AniList request failed: {e}")
+            # A 404 is a real "not found"; anything else is a failed lookup
+            if getattr(e.response, "status_code", None) != 404:
+                mark_lookup_failed()
             return None
 
     def test_connection(self) -> bool:
@@ -193,6 +199,7 @@ class AniListProvider(BaseProvider):
             return results
         except Exception as e:
             app_logger.error(f"AniList search_series failed: {e}")
+            mark_lookup_failed()
             return []
 
     def get_series(self, series_id: str) -> Optional[SearchResult]:
@@ -255,6 +262,7 @@ class AniListProvider(BaseProvider):
             )
         except Exception as e:
             app_logger.error(f"AniList get_series failed: {e}")
+            mark_lookup_failed()
             return None
 
     def get_issues(self, series_id: str) -> List[IssueResult]:
@@ -292,6 +300,7 @@ class AniListProvider(BaseProvider):
             return results
         except Exception as e:
             app_logger.error(f"AniList get_issues failed: {e}")
+            mark_lookup_failed()
             return []
 
     def get_issue(self, issue_id: str) -> Optional[IssueResult]:
@@ -329,6 +338,7 @@ class AniListProvider(BaseProvider):
             )
         except Exception as e:
             app_logger.error(f"AniList get_issue failed: {e}")
+            mark_lookup_failed()
             return None
 
     def get_issue_metadata(self, series_id: str, issue_number: str) -> Optional[Dict[str, Any]]:
@@ -11,6 +11,8 @@ from dataclasses import dataclass
 from typing import Optional, List, Dict, Any
 from enum import Enum
 
+from .cache import cached_provider_method
+
 
 class ProviderType(Enum):
     """Enumeration of supported metadata providers."""
@@ -47,6 +49,11 @@ class SearchResult:
             "description": self.description
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SearchResult":
+        """Create from a to_dict() dictionary."""
+        return cls(**dict(data, provider=ProviderType(data["provider"])))
+
 
 @dataclass
 class IssueResult:
@@ -75,6 +82,11 @@ class IssueResult:
             "summary": self.summary
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IssueResult":
+        """Create from a to_dict() dictionary."""
+        return cls(**dict(data, provider=ProviderType(data["provider"])))
+
 
 @dataclass
 class ProviderCredentials:
@@ -171,6 +183,39 @@ def extract_issue_number(filename: str) -> Optional[str]:
     return None
 
 
+def _search_key(query: str, year: Optional[int] = None) -> str:
+    return f"{' '.join(query.lower().split())}|{year or ''}"
+
+
+def _id_key(provider_id: str) -> str:
+    return str(provider_id)
+
+
+def _decode_series_list(value):
+    return [SearchResult.from_dict(item) for item in value or []]
+
+
+def _decode_series(value):
+    return SearchResult.from_dict(value) if value else None
+
+
+def _decode_issue_list(value):
+    return [IssueResult.from_dict(item) for item in value or []]
+
+
+def _decode_issue(value):
+    return IssueResult.from_dict(value) if value else None
+
+
+# Lookup methods routed through the provider cache: name -> (cache_type, key, decoder)
+CACHED_METHODS = {
+    "search_series": ("search", _search_key, _decode_series_list),
+    "get_series": ("series", _id_key, _decode_series),
+    "get_issues": ("issues", _id_key, _decode_issue_list),
+    "get_issue": ("issue", _id_key, _decode_issue),
+}
+
+
 class BaseProvider(ABC):
     """
     Abstract base class for all metadata providers.
@@ -188,6 +233,24 @@ class BaseProvider(ABC):
     # Default rate limit (requests per minute)
     rate_limit: int = 30
 
+    # Provider cache lifetimes in seconds per cached call, and for empty
+    # results (see models/providers/cache.py)
+    cache_ttl: Dict[str, int] = {
+        "search": 24 * 3600,
+        "series": 7 * 24 * 3600,
+        "issues": 24 * 3600,
+        "issue": 7 * 24 * 3600,
+    }
+    negative_cache_ttl: int = 3600
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Every provider's lookups go through the shared provider cache
+        for name, (cache_type, make_key, decode) in CACHED_METHODS.items():
+            method = cls.__dict__.get(name)
+            if method is not None and not getattr(method, "_provider_cached", False):
+                setattr(cls, name, cached_provider_method(method, cache_type, make_key, decode))
+
     def __init__(self, credentials: Optional[ProviderCredentials] = None):
         """
         Initialize the provider with optional credentials.
@@ -13,6 +13,7 @@ from urllib.parse import quote, urljoin
 from app_logging import app_logger
 from .base import BaseProvider, ProviderType, ProviderCredentials, SearchResult, IssueResult
 from . import register_provider
+from .cache import mark_lookup_failed
 
 # Check if BeautifulSoup is available
 try:
@@ -32,6 +33,8 @@ class BedethequeProvider(BaseProvider):
     requires_auth = False  # Web scraping, no auth needed
     auth_fields = []  # No authentication required
     rate_limit = 10  # Very conservative - respect the website
+    # Scraped pages rarely change; keep them long to spare the site
+    cache_ttl = {**BaseProvider.cache_ttl, "series": 30 * 24 * 3600, "issue": 30 * 24 * 3600}
 
     BASE_URL = "https://www.bedetheque.com"
 
@@ -78,6 +81,9 @@ class BedethequeProvider(BaseProvider):
             return response.text
         except requests.RequestException as e:
             app_logger.error(f"Bedetheque request failed: {e}")
+            # A 404 is a real "not found"; anything else is a failed lookup
+            if getattr(e.response, "status_code", None) != 404:
+                mark_lookup_failed()
             return None
 
     def _is_configured(self) -> bool:
@@ -99,6 +105,7 @@ class BedethequeProvider(BaseProvider):
     def search_series(self, query: str, year: Optional[int] = None) -> List[SearchResult]:
         """Search for comic series on Bedetheque."""
         if not BS4_AVAILABLE:
+            mark_lookup_failed()
             return []
 
         try:
@@ -186,6 +193,7 @@ class BedethequeProvider(BaseProvider):
             return results
         except Exception as e:
             app_logger.error(f"Bedetheque search_series failed: {e}")
+            mark_lookup_failed()
             return []
 
     def _search_alternative(self, query: str, year: Optional[int] = None) -> List[SearchResult]:
@@ -243,6 +251,7 @@ class BedethequeProvider(BaseProvider):
     def get_series(self, series_id: str) -> Optional[SearchResult]:
         """Get comic series details by Bedetheque series ID."""
         if not BS4_AVAILABLE:
+            mark_lookup_failed()
             return None
 
         try:
@@ -309,6 +318,7 @@ class BedethequeProvider(BaseProvider):
             )
         except Exception as e:
             app_logger.error(f"Bedetheque get_series failed: {e}")
+            mark_lookup_failed()
             return None
 
     def _get_album_as_series(self, album_id: str) -> Optional[SearchResult]:
@@ -349,6 +359,7 @@ class BedethequeProvider(BaseProvider):
     def get_issues(self, series_id: str) -> List[IssueResult]:
         """Get albums/issues for a Bedetheque series."""
         if not BS4_AVAILABLE:
+            mark_lookup_failed()
             return []
 
         try:
@@ -440,11 +451,13 @@ class BedethequeProvider(BaseProvider):
             return results
         except Exception as e:
             app_logger.error(f"Bedetheque get_issues failed: {e}")
+            mark_lookup_failed()
             return []
 
     def get_issue(self, issue_id: str) -> Optional[IssueResult]:
         """Get album/issue details by Bedetheque album ID."""
         if not BS4_AVAILABLE:
+            mark_lookup_failed()
             return None
 
         try:
@@ -502,6 +515,7 @@ class BedethequeProvider(BaseProvider):
             )
         except Exception as e:
             app_logger.error(f"Bedetheque get_issue failed: {e}")
+            mark_lookup_failed()
             return None
 
     def get_issue_metadata(self, series_id: str, issue_number: str) -> Optional[Dict[str, Any]]:
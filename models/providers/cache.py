@@ -0,0 +1,277 @@
+"""
+Shared TTL cache for metadata provider lookups.
+
+Batch tagging asked a provider for the same series and issue list once per
+file. BaseProvider routes search_series, get_series, get_issues and get_issue
+of every provider through this cache, backed by the provider_cache table:
+1. Results are stored as JSON per provider, call and key, and expire after
+   the provider's cache_ttl for that call
+2. Empty results (no match, not found) are cached for the provider's
+   negative_cache_ttl, so a series missing from a provider is not looked up
+   again for every file. A lookup that failed (API error, rate limit, no
+   client) calls mark_lookup_failed() on its error path; its empty result is
+   returned but never cached
+3. Concurrent calls for the same key wait for the first one and reuse its
+   result instead of all calling the API
+4. A background sweep deletes expired rows (PROVIDER_CACHE_SWEEP_SECONDS)
+5. get_provider_cache_stats() reports hits, misses and the hit rate per provider
+
+Module-level lookups outside the provider classes (the models/metron,
+models/comicvine and models/gcd helpers batch tagging calls) use the
+provider_cache() decorator for the same behaviour.
+
+PROVIDER_CACHE_ENABLED = False turns the cache off.
+"""
+import functools
+import json
+import threading
+from typing import Any, Callable, Dict
+
+from app_logging import app_logger
+from config import config
+
+DEFAULT_SWEEP_SECONDS = 3600
+DEFAULT_NEGATIVE_TTL = 3600
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = {}
+
+_inflight_lock = threading.Lock()
+_inflight: Dict[tuple, "_Inflight"] = {}
+
+# Per-thread flag set by mark_lookup_failed() during a cached call
+_lookup_state = threading.local()
+
+_sweeper = None
+_sweeper_stop = threading.Event()
+
+
+def is_provider_cache_enabled() -> bool:
+    return config.getboolean("SETTINGS", "PROVIDER_CACHE_ENABLED", fallback=True)
+
+
+def _count(provider_type: str, counter: str):
+    with _stats_lock:
+        counters = _stats.setdefault(provider_type, _new_counters())
+        counters[counter] += 1
+
+
+def _new_counters() -> Dict[str, int]:
+    return {"hits": 0, "negative_hits": 0, "misses": 0, "stores": 0, "failures": 0}
+
+
+def mark_lookup_failed():
+    """
+    Flag the provider lookup running on this thread as failed, so the empty
+    result it returns is not cached as "not found".
+    """
+    _lookup_state.failed = True
+
+
+class _Inflight:
+    """Lookup of one key shared by the calls waiting on it."""
+    __slots__ = ("lock", "users", "value", "done")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.users = 0
+        self.value = None
+        self.done = False
+
+
+def _join(key: tuple) -> _Inflight:
+    with _inflight_lock:
+        entry = _inflight.get(key)
+        if entry is None:
+            entry = _inflight[key] = _Inflight()
+        entry.users += 1
+        return entry
+
+
+def _leave(key: tuple, entry: _Inflight):
+    # The last caller drops the entry, so a waiter never finds a fresh lock
+    # while another call for the same key is still running
+    with _inflight_lock:
+        entry.users -= 1
+        if entry.users == 0 and _inflight.get(key) is entry:
+            del _inflight[key]
+
+
+def _call_tracking_failure(func: Callable, *args, **kwargs):
+    """Run func; returns (result, failed) where failed is set by mark_lookup_failed()."""
+    outer = getattr(_lookup_state, "failed", False)
+    _lookup_state.failed = False
+    try:
+        result = func(*args, **kwargs)
+        failed = _lookup_state.failed
+    finally:
+        # A failed nested lookup also taints the call around it
+        _lookup_state.failed = outer or _lookup_state.failed
+    return result, failed
+
+
+def _cached_call(provider_type: str, cache_type: str, provider_id: str, ttl: Callable,
+                 encode: Callable, decode: Callable, func: Callable, *args, **kwargs):
+    """
+    Serve one lookup from the provider_cache table, calling func on a miss.
+
+    ttl takes the encoded result and returns its lifetime in seconds.
+    """
+    from database import get_provider_cache, set_provider_cache
+
+    key = (provider_type, cache_type, provider_id)
+    entry = _join(key)
+    try:
+        with entry.lock:
+            # A call we waited for got an answer (stored or not)
+            if entry.done:
+                _count(provider_type, "hits" if entry.value else "negative_hits")
+                return decode(entry.value)
+
+            cached = get_provider_cache(provider_type, cache_type, provider_id)
+            if cached is not None:
+                value = json.loads(cached)
+                _count(provider_type, "hits" if value else "negative_hits")
+                return decode(value)
+
+            _count(provider_type, "misses")
+            result, failed = _call_tracking_failure(func, *args, **kwargs)
+            if failed:
+                # Waiters call the API themselves rather than share a failure
+                _count(provider_type, "failures")
+                return result
+
+            value = encode(result)
+            seconds = ttl(value)
+            if seconds > 0 and set_provider_cache(provider_type, cache_type, provider_id,
+                                                  json.dumps(value, default=str), seconds):
+                _count(provider_type, "stores")
+            entry.value, entry.done = value, True
+            return result
+    finally:
+        _leave(key, entry)
+
+
+def cached_provider_method(func: Callable, cache_type: str, make_key: Callable, decode: Callable) -> Callable:
+    """
+    Wrap a provider lookup method with the provider_cache table.
+
+    Args:
+        func: Unbound provider method, e.g. MetronProvider.get_issues
+        cache_type: provider_cache.cache_type for this call ('search', 'series', ...)
+        make_key: Callable taking the method's arguments, returning the cache key
+        decode: Callable turning the cached JSON value back into the method's result
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if not is_provider_cache_enabled():
+            return func(self, *args, **kwargs)
+
+        def ttl(value):
+            return self.cache_ttl.get(cache_type, 0) if value else self.negative_cache_ttl
+
+        return _cached_call(self.provider_type.value, cache_type, make_key(*args, **kwargs), ttl,
+                            _encode, decode, func, self, *args, **kwargs)
+
+    wrapper._provider_cached = True
+    return wrapper
+
+
+def provider_cache(provider_type: str, cache_type: str, make_key: Callable, ttl: int,
+                   negative_ttl: int = DEFAULT_NEGATIVE_TTL) -> Callable:
+    """
+    Decorator routing a module-level provider lookup through the provider_cache table.
+
+    For the models/metron, models/comicvine and models/gcd helpers used outside
+    the provider classes. The result must be JSON data (a dict, list or None);
+    it is stored and returned as is.
+
+    Args:
+        provider_type: provider_cache.provider_type ('metron', 'comicvine', ...)
+        cache_type: provider_cache.cache_type; must differ from the BaseProvider
+            cache types, which store a different result shape
+        make_key: Callable taking the function's arguments, returning the cache key
+        ttl: Lifetime in seconds of a non-empty result
+        negative_ttl: Lifetime in seconds of an empty result
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not is_provider_cache_enabled():
+                return func(*args, **kwargs)
+            return _cached_call(provider_type, cache_type, make_key(*args, **kwargs),
+                                lambda value: ttl if value else negative_ttl,
+                                _identity, _identity, func, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _encode(result: Any) -> Any:
+    if result is None:
+        return None
+    if isinstance(result, list):
+        return [item.to_dict() for item in result]
+    return result.to_dict()
+
+
+def get_provider_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters per provider since startup, with stored entry counts."""
+    from database import get_provider_cache_counts
+
+    with _stats_lock:
+        providers = {name: dict(counters) for name, counters in _stats.items()}
+    entries = get_provider_cache_counts()
+
+    for name in entries:
+        providers.setdefault(name, _new_counters())
+    for name, counters in providers.items():
+        lookups = counters["hits"] + counters["negative_hits"] + counters["misses"]
+        counters["hit_rate"] = round((lookups - counters["misses"]) / lookups, 3) if lookups else 0.0
+        counters["entries"] = entries.get(name, {})
+
+    return {"enabled": is_provider_cache_enabled(), "providers": providers}
+
+
+def reset_provider_cache_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def sweep_provider_cache() -> int:
+    """Delete expired cache entries. Returns the number deleted."""
+    from database import delete_expired_provider_cache
+
+    deleted = delete_expired_provider_cache()
+    if deleted:
+        app_logger.info(f"Provider cache sweep removed {deleted} expired entries")
+    return deleted
+
+
+def _sweep_loop(interval: int):
+    while not _sweeper_stop.wait(timeout=interval):
+        try:
+            sweep_provider_cache()
+        except Exception as e:
+            app_logger.error(f"Provider cache sweep failed: {e}")
+
+
+def start_provider_cache_sweeper():
+    """Start the background thread deleting expired provider cache entries."""
+    global _sweeper
+
+    if _sweeper is not None and _sweeper.is_alive():
+        return
+    interval = max(60, config.getint("SETTINGS", "PROVIDER_CACHE_SWEEP_SECONDS", fallback=DEFAULT_SWEEP_SECONDS))
+    _sweeper_stop.clear()
+    _sweeper = threading.Thread(target=_sweep_loop, args=(interval,), name="ProviderCacheSweeper", daemon=True)
+    _sweeper.start()
+
+
+def stop_provider_cache_sweeper():
+    _sweeper_stop.set()
@@ -8,6 +8,7 @@ from typing import Optional, List, Dict, Any
 from app_logging import app_logger
 from .base import BaseProvider, ProviderType, ProviderCredentials, SearchResult, IssueResult
 from . import register_provider
+from .cache import mark_lookup_failed
 
 
 @register_provider
@@ -71,6 +72,7 @@ class ComicVineProvider(BaseProvider):
         try:
             api_key = self._get_api_key()
             if not api_key:
+                mark_lookup_failed()
                 return []
 
             from models import comicvine as cv_module
@@ -95,6 +97,7 @@ class ComicVineProvider(BaseProvider):
             return results
         except Exception as e:
             app_logger.error(f"ComicVine search_series failed: {e}")
+            mark_lookup_failed()
             return []
 
     def get_series(self, series_id: str) -> Optional[SearchResult]:
@@ -102,6 +105,7 @@ class ComicVineProvider(BaseProvider):
         try:
             api_key = self._get_api_key()
             if not api_key:
+                mark_lookup_failed()
                 return None
 
             from models import comicvine as cv_module
@@ -122,6 +126,7 @@ class ComicVineProvider(BaseProvider):
             )
         except Exception as e:
             app_logger.error(f"ComicVine get_series failed: {e}")
+            mark_lookup_failed()
             return None
 
     def get_issues(self, series_id: str) -> List[IssueResult]:
@@ -129,6 +134,7 @@ class ComicVineProvider(BaseProvider):
         try:
             cv = self._get_client()
             if not cv:
+                mark_lookup_failed()
                 return []
 
             # Get volume issues through API
@@ -167,6 +173,7 @@ class ComicVineProvider(BaseProvider):
             return results
         except Exception as e:
             app_logger.error(f"ComicVine get_issues failed: {e}")
+            mark_lookup_failed()
             return []
 
     def get_issue(self, issue_id: str) -> Optional[IssueResult]:
@@ -174,6 +181,7 @@ class ComicVineProvider(BaseProvider):
         try:
             cv = self._get_client()
             if not cv:
+                mark_lookup_failed()
                 return None
 
             issue = cv.issue(int(issue_id))
@@ -209,6 +217,7 @@ class ComicVineProvider(BaseProvider):
             )
         except Exception as e:
             app_logger.error(f"ComicVine get_issue failed: {e}")
+            mark_lookup_failed()
             return None
 
     def get_issue_metadata(self, volume_id: str, issue_number: str, start_year: Optional[int] = None) -> Optional[Dict[str, Any]]:
@@ -8,6 +8,7 @@ from typing import Optional, List, Dict, Any
 from app_logging import app_logger
 from .base import BaseProvider, ProviderType, ProviderCredentials, SearchResult, IssueResult
 from . import register_provider
+from .cache import mark_lookup_failed
 
 
 @register_provider
@@ -19,6 +20,8 @@ class GCDProvider(BaseProvider):
     requires_auth = True
     auth_fields = ["host", "port", "database", "username", "password"]
     rate_limit = 1000  # Local database, high rate limit
+    # The GCD dump only changes when it is re-imported
+    cache_ttl = {key: 30 * 24 * 3600 for key in BaseProvider.cache_ttl}
 
     def __init__(self, credentials: Optional[ProviderCredentials] = None):
         super().__init__(credentials)
@@ -52,6 +55,7 @@ class GCDProvider(BaseProvider):
         """Search for series in GCD database."""
         try:
             if not self._is_configured():
+                mark_lookup_failed()
                 return []
 
             from models import gcd as gcd_module
@@ -73,17 +77,20 @@ class GCDProvider(BaseProvider):
             )]
         except Exception as e:
             app_logger.error(f"GCD search_series failed: {e}")
+            mark_lookup_failed()
             return []
 
     def get_series(self, series_id: str) -> Optional[SearchResult]:
         """Get series details by GCD series ID."""
         try:
             if not self._is_configured():
+                mark_lookup_failed()
                 return None
 
             from models import gcd as gcd_module
             conn = gcd_module.get_connection()
             if not conn:
+                mark_lookup_failed()
                 return None
 
             try:
@@ -121,17 +128,20 @@ class GCDProvider(BaseProvider):
                 conn.close()
         except Exception as e:
             app_logger.error(f"GCD get_series failed: {e}")
+            mark_lookup_failed()
             return None
 
     def get_issues(self, series_id: str) -> List[IssueResult]:
         """Get all issues for a GCD series."""
         try:
             if not self._is_configured():
+                mark_lookup_failed()
                 return []
 
             from models import gcd as gcd_module
             conn = gcd_module.get_connection()
             if not conn:
+                mark_lookup_failed()
                 return []
 
             try:
@@ -179,17 +189,20 @@ class GCDProvider(BaseProvider):
                 conn.close()
         except Exception as e:
             app_logger.error(f"GCD get_issues failed: {e}")
+            mark_lookup_failed()
             return []
 
     def get_issue(self, issue_id: str) -> Optional[IssueResult]:
         """Get issue details by GCD issue ID."""
         try:
             if not self._is_configured():
+                mark_lookup_failed()
                 return None
 
             from models import gcd as gcd_module
             conn = gcd_module.get_connection()
             if not conn:
+                mark_lookup_failed()
                 return None
 
             try:
@@ -231,6 +244,7 @@ class GCDProvider(BaseProvider):
                 conn.close()
         except Exception as e:
             app_logger.error(f"GCD get_issue failed: {e}")
+            mark_lookup_failed()
             return None
 
     def get_issue_metadata(self, series_id: str, issue_number: str) -> Optional[Dict[str, Any]]:
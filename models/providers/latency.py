@@ -0,0 +1,80 @@
+"""
+Latency histograms for metadata provider lookups.
+
+The single-file metadata search queries providers concurrently and gives up
+on a provider at its deadline, so how long each provider takes decides what
+the deadlines should be. Each lookup is recorded here:
+1. Durations go into fixed buckets (LATENCY_BUCKETS, in seconds) per provider,
+   cumulative like a Prometheus histogram
+2. Outcomes are counted per provider: hit, miss, error, timeout (deadline
+   passed before an answer) and cancelled (a higher-priority provider answered
+   first)
+3. get_provider_latency_stats() reports both since startup
+"""
+import threading
+from typing import Any, Dict
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+OUTCOMES = ("hit", "miss", "error", "timeout", "cancelled")
+
+_lock = threading.Lock()
+_stats: Dict[str, Dict[str, Any]] = {}
+
+
+def _provider_stats(provider_type: str) -> Dict[str, Any]:
+    stats = _stats.get(provider_type)
+    if stats is None:
+        stats = _stats[provider_type] = {
+            "count": 0,
+            "total_seconds": 0.0,
+            "max_seconds": 0.0,
+            "buckets": [0] * len(LATENCY_BUCKETS),
+            "outcomes": dict.fromkeys(OUTCOMES, 0),
+        }
+    return stats
+
+
+def record_provider_latency(provider_type: str, seconds: float, outcome: str):
+    """Record a finished lookup and its outcome ('hit', 'miss' or 'error')."""
+    with _lock:
+        stats = _provider_stats(provider_type)
+        stats["count"] += 1
+        stats["total_seconds"] += seconds
+        stats["max_seconds"] = max(stats["max_seconds"], seconds)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                stats["buckets"][i] += 1
+                break
+        stats["outcomes"][outcome] += 1
+
+
+def record_provider_outcome(provider_type: str, outcome: str):
+    """Count a lookup that produced no duration ('timeout' or 'cancelled')."""
+    with _lock:
+        _provider_stats(provider_type)["outcomes"][outcome] += 1
+
+
+def get_provider_latency_stats() -> Dict[str, Any]:
+    """Cumulative latency buckets, mean/max and outcome counts per provider."""
+    with _lock:
+        providers = {}
+        for name, stats in _stats.items():
+            buckets = {}
+            running = 0
+            for bound, count in zip(LATENCY_BUCKETS, stats["buckets"]):
+                running += count
+                buckets[f"le_{bound:g}"] = running
+            buckets["le_inf"] = stats["count"]
+            providers[name] = {
+                "count": stats["count"],
+                "mean_ms": round(stats["total_seconds"] / stats["count"] * 1000) if stats["count"] else 0,
+                "max_ms": round(stats["max_seconds"] * 1000),
+                "buckets": buckets,
+                "outcomes": dict(stats["outcomes"]),
+            }
+    return {"bucket_seconds": list(LATENCY_BUCKETS), "providers": providers}
+
+
+def reset_provider_latency_stats():
+    with _lock:
+        _stats.clear()
@@ -10,6 +10,7 @@ from typing import Optional, List, Dict, Any
 from app_logging import app_logger
 from .base import BaseProvider, ProviderType, ProviderCredentials, SearchResult, IssueResult
 from . import register_provider
+from .cache import mark_lookup_failed
 
 
 @register_provider
@@ -97,6 +98,7 @@ class MangaDexProvider(BaseProvider):
         try:
             manga_api = self._get_manga_api()
             if not manga_api:
+                mark_lookup_failed()
                 return []
 
             # Search with title query
@@ -169,6 +171,7 @@ class MangaDexProvider(BaseProvider):
             return search_results
         except Exception as e:
             app_logger.error(f"MangaDex search failed: {e}")
+            mark_lookup_failed()
             return []
 
     def get_series(self, series_id: str) -> Optional[SearchResult]:
@@ -176,6 +179,7 @@ class MangaDexProvider(BaseProvider):
         try:
             manga_api = self._get_manga_api()
             if not manga_api:
+                mark_lookup_failed()
                 return None
 
             manga = manga_api.view_manga_by_id(series_id)
@@ -227,6 +231,7 @@ class MangaDexProvider(BaseProvider):
             )
         except Exception as e:
             app_logger.error(f"MangaDex get_series failed: {e}")
+            mark_lookup_failed()
             return None
 
     def get_issues(self, series_id: str) -> List[IssueResult]:
@@ -234,6 +239,7 @@ class MangaDexProvider(BaseProvider):
         try:
             manga_api = self._get_manga_api()
             if not manga_api:
+                mark_lookup_failed()
                 return []
 
             # Get volumes and chapters for the manga
@@ -284,6 +290,7 @@ class MangaDexProvider(BaseProvider):
             return results
         except Exception as e:
             app_logger.error(f"MangaDex get_issues failed: {e}")
+            mark_lookup_failed()
             return []
 
     def get_issue(self, issue_id: str) -> Optional[IssueResult]:
@@ -291,6 +298,7 @@ class MangaDexProvider(BaseProvider):
         try:
             chapter_api = self._get_chapter_api()
             if not chapter_api:
+                mark_lookup_failed()
                 return None
 
             chapter = chapter_api.get_chapter(issue_id)
@@ -327,6 +335,7 @@ class MangaDexProvider(BaseProvider):
             )
         except Exception as e:
             app_logger.error(f"MangaDex get_issue failed: {e}")
+            mark_lookup_failed()
             return None
 
     def get_issue_metadata(self, series_id: str, issue_number: str) -> Optional[Dict[str, Any]]:
@@ -8,6 +8,7 @@ from typing import Optional, List, Dict, Any
 from app_logging import app_logger
 from .base import BaseProvider, ProviderType, ProviderCredentials, SearchResult, IssueResult
 from . import register_provider
+from .cache import mark_lookup_failed
 
 
 @register_provider
@@ -19,6 +20,8 @@ class MetronProvider(BaseProvider):
     requires_auth = True
     auth_fields = ["username", "password"]
     rate_limit = 30  # Metron rate limit
+    # New issues are added weekly ahead of release
+    cache_ttl = {**BaseProvider.cache_ttl, "issues": 12 * 3600}
 
     def __init__(self, credentials: Optional[ProviderCredentials] = None):
         super().__init__(credentials)
@@ -63,6 +66,7 @@ class MetronProvider(BaseProvider):
         try:
             api = self._get_api()
             if not api:
+                mark_lookup_failed()
                 return []
 
             from models import metron as metron_module
@@ -85,6 +89,7 @@ class MetronProvider(BaseProvider):
             )]
         except Exception as e:
             app_logger.error(f"Metron search_series failed: {e}")
+            mark_lookup_failed()
             return []
 
     def get_series(self, series_id: str) -> Optional[SearchResult]:
@@ -92,6 +97,7 @@ class MetronProvider(BaseProvider):
         try:
             api = self._get_api()
             if not api:
+                mark_lookup_failed()
                 return None
 
             from models import metron as metron_module
@@ -112,6 +118,7 @@ class MetronProvider(BaseProvider):
             )
         except Exception as e:
             app_logger.error(f"Metron get_series failed: {e}")
+            mark_lookup_failed()
             return None
 
     def get_issues(self, series_id: str) -> List[IssueResult]:
@@ -119,6 +126,7 @@ class MetronProvider(BaseProvider):
         try:
             api = self._get_api()
             if not api:
+                mark_lookup_failed()
                 return []
 
             from models import metron as metron_module
@@ -166,6 +174,7 @@ class MetronProvider(BaseProvider):
             return results
         except Exception as e:
             app_logger.error(f"Metron get_issues failed: {e}")
+            mark_lookup_failed()
             return []
 
     def get_issue(self, issue_id: str) -> Optional[IssueResult]:
@@ -173,6 +182,7 @@ class MetronProvider(BaseProvider):
         try:
             api = self._get_api()
             if not api:
+                mark_lookup_failed()
                 return None
 
             # Fetch issue directly
@@ -195,6 +205,7 @@ class MetronProvider(BaseProvider):
             )
         except Exception as e:
             app_logger.error(f"Metron get_issue failed: {e}")
+            mark_lookup_failed()
             return None
 
     def get_issue_metadata(self, series_id: str, issue_number: str) -> Optional[Dict[str, Any]]:
@@ -0,0 +1,129 @@
+"""
+Shared request budgets for metadata providers.
+
+Batch tagging used to sleep a fixed time between files, and a rate-limited
+Metron call slept only the thread that hit the limit while other callers kept
+sending requests. Each provider now has one token bucket per process:
+1. The bucket refills at the provider's rate_limit (requests per minute) and
+   holds a burst of PROVIDER_RATE_BURST_SECONDS worth of requests, so callers
+   on any number of threads stay within the provider's budget together
+2. pause(seconds) empties the bucket and blocks every caller until the
+   provider's Retry-After has passed, instead of each thread finding out with
+   its own 429
+3. acquire() blocks until a request may be sent; with a timeout it returns
+   False instead of waiting longer
+"""
+import threading
+import time
+from typing import Dict, Optional
+
+from app_logging import app_logger
+from config import config
+
+DEFAULT_RATE_LIMIT = 30
+DEFAULT_BURST_SECONDS = 5
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at rate_per_minute."""
+
+    def __init__(self, name: str, rate_per_minute: float, burst: Optional[int] = None):
+        self.name = name
+        self.rate_per_minute = max(1.0, float(rate_per_minute))
+        self.capacity = max(1, burst if burst is not None else int(self.rate_per_minute / 60 * DEFAULT_BURST_SECONDS))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def _per_second(self) -> float:
+        return self.rate_per_minute / 60
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self._per_second)
+        self._updated = now
+
+    def _reserve(self) -> float:
+        """Take a token if one is available; otherwise return seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self._per_second
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for a token.
+
+        Args:
+            timeout: Seconds to wait at most (None waits as long as needed)
+
+        Returns:
+            True when a request may be sent, False if the timeout ran out
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._reserve()
+            if wait <= 0:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for seconds (e.g. a Retry-After header)."""
+        with self._lock:
+            now = time.monotonic()
+            until = now + max(0.0, seconds)
+            if until > self._paused_until:
+                self._paused_until = until
+                self._tokens = 0.0
+                self._updated = until
+                app_logger.info(f"{self.name} requests paused for {seconds:.0f}s")
+
+    def paused_for(self) -> float:
+        """Seconds left in the current pause, 0 if not paused."""
+        with self._lock:
+            return max(0.0, self._paused_until - time.monotonic())
+
+
+_limiters_lock = threading.Lock()
+_limiters: Dict[str, TokenBucket] = {}
+
+
+def _provider_rate_limit(provider_type: str) -> int:
+    from models.providers import ProviderType, get_provider_class
+
+    try:
+        provider_class = get_provider_class(ProviderType(provider_type))
+    except ValueError:
+        provider_class = None
+    return getattr(provider_class, "rate_limit", DEFAULT_RATE_LIMIT)
+
+
+def get_rate_limiter(provider_type: str) -> TokenBucket:
+    """The process-wide token bucket for a provider ('metron', 'comicvine', ...)."""
+    with _limiters_lock:
+        limiter = _limiters.get(provider_type)
+        if limiter is None:
+            burst_seconds = max(1, config.getint("SETTINGS", "PROVIDER_RATE_BURST_SECONDS",
+                                                 fallback=DEFAULT_BURST_SECONDS))
+            rate = _provider_rate_limit(provider_type)
+            limiter = _limiters[provider_type] = TokenBucket(
+                provider_type, rate, burst=max(1, int(rate / 60 * burst_seconds)),
+            )
+        return limiter
+
+
+def reset_rate_limiters():
+    """Forget all buckets (tests, or after changing provider rate limits)."""
+    with _limiters_lock:
+        _limiters.clear()
@@ -0,0 +1,258 @@
+"""
+page_cache.py - Prefetching page cache for the web reader
+
+Every page turn used to cold-read and decompress its page from the archive.
+This module keeps recently read pages in memory and reads ahead:
+1. Pages are cached by (path, mtime, size, page) in an LRU bounded by
+   READER_PAGE_CACHE_MB, so a rewritten archive never serves stale pages
+2. Serving page N queues pages N+1..N+K (READER_PREFETCH_PAGES) on a small
+   background pool, skipping pages already cached or in flight
+3. get_page_etag() gives a validator for ETag/If-None-Match revalidation
+4. Counters are kept globally and per reading session (client + comic), and
+   show how many served pages were already prefetched
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from app_logging import app_logger
+from archive_toc import read_toc_page
+from config import config
+
+DEFAULT_CACHE_MB = 128
+DEFAULT_PREFETCH_PAGES = 3
+DEFAULT_PREFETCH_THREADS = 2
+
+# Reading sessions idle longer than this are dropped from the counters
+SESSION_IDLE_SECONDS = 1800
+MAX_SESSIONS = 256
+
+
+def get_page_etag(toc, page_num):
+    """ETag value (unquoted) for a page; changes whenever the archive does."""
+    return f"{toc.mtime_ns:x}-{toc.size:x}-{page_num}"
+
+
+class _Entry:
+    __slots__ = ('data', 'mime_type', 'prefetched')
+
+    def __init__(self, data, mime_type, prefetched):
+        self.data = data
+        self.mime_type = mime_type
+        self.prefetched = prefetched
+
+
+class PageCache:
+    """Thread-safe LRU of page bytes with read-ahead."""
+
+    def __init__(self, max_bytes=None, prefetch_pages=None, workers=None):
+        self._max_bytes = max_bytes
+        self._prefetch_pages = prefetch_pages
+        self._workers = workers
+        self._executor = None
+
+        self._entries = OrderedDict()  # (path, mtime_ns, size, page) -> _Entry
+        self._bytes = 0
+        self._in_flight = set()
+        self._sessions = OrderedDict()  # (client, path) -> counters
+        self._lock = threading.Lock()
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'prefetched': 0,
+            'prefetch_hits': 0,
+            'prefetch_wasted': 0,
+            'prefetch_errors': 0,
+            'evictions': 0,
+        }
+
+    @property
+    def max_bytes(self):
+        if self._max_bytes is None:
+            return config.getint("SETTINGS", "READER_PAGE_CACHE_MB", fallback=DEFAULT_CACHE_MB) * 1024 * 1024
+        return self._max_bytes
+
+    @property
+    def prefetch_pages(self):
+        if self._prefetch_pages is None:
+            return config.getint("SETTINGS", "READER_PREFETCH_PAGES", fallback=DEFAULT_PREFETCH_PAGES)
+        return self._prefetch_pages
+
+    def get_page(self, toc, page_num, session_key=None):
+        """
+        Get a page's bytes, reading it from the archive on a miss, and queue
+        prefetching of the pages that follow.
+
+        Args:
+            toc: ArchiveToc of the comic
+            page_num: 0-based page index
+            session_key: Optional (client, path) tuple for per-session counters
+
+        Returns:
+            Tuple of (image bytes, mime type)
+
+        Raises:
+            IndexError: page_num is out of range
+        """
+        key = (toc.path, toc.mtime_ns, toc.size, page_num)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                prefetch_hit = entry.prefetched
+                entry.prefetched = False
+                self.stats['hits'] += 1
+                if prefetch_hit:
+                    self.stats['prefetch_hits'] += 1
+                self._count_session(session_key, hit=True, prefetch_hit=prefetch_hit)
+
+        if entry is None:
+            data, page = read_toc_page(toc, page_num)
+            entry = _Entry(data, page.mime_type, prefetched=False)
+            self._store(key, entry)
+            with self._lock:
+                self.stats['misses'] += 1
+                self._count_session(session_key, hit=False, prefetch_hit=False)
+
+        self.prefetch(toc, page_num)
+        return entry.data, entry.mime_type
+
+    def prefetch(self, toc, page_num):
+        """Queue the pages after page_num that are not cached or already loading."""
+        count = self.prefetch_pages
+        if count <= 0:
+            return
+
+        to_load = []
+        with self._lock:
+            for n in range(page_num + 1, min(page_num + 1 + count, len(toc.pages))):
+                key = (toc.path, toc.mtime_ns, toc.size, n)
+                if key in self._entries:
+                    # Keep pages about to be read from being evicted first
+                    self._entries.move_to_end(key)
+                elif key not in self._in_flight:
+                    self._in_flight.add(key)
+                    to_load.append((key, n))
+
+        if not to_load:
+            return
+        executor = self._get_executor()
+        for key, n in to_load:
+            executor.submit(self._load, toc, n, key)
+
+    def clear(self):
+        """Drop all cached pages."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self):
+        """Global counters plus per-session read-ahead effectiveness."""
+        now = time.time()
+        with self._lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+            stats['in_flight'] = len(self._in_flight)
+            sessions = [
+                dict(counters, client=client, comic=path, idle_seconds=round(now - counters['last_seen']))
+                for (client, path), counters in self._sessions.items()
+            ]
+        stats['max_bytes'] = self.max_bytes
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        stats['prefetch_hit_rate'] = (
+            round(stats['prefetch_hits'] / stats['prefetched'], 3) if stats['prefetched'] else 0.0
+        )
+        for session in sessions:
+            session['hit_rate'] = round(session['hits'] / session['pages'], 3) if session['pages'] else 0.0
+            del session['last_seen']
+        stats['sessions'] = sessions
+        return stats
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    workers = self._workers or config.getint(
+                        "SETTINGS", "READER_PREFETCH_THREADS", fallback=DEFAULT_PREFETCH_THREADS
+                    )
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=max(1, workers), thread_name_prefix="PagePrefetch"
+                    )
+        return self._executor
+
+    def _load(self, toc, page_num, key):
+        try:
+            data, page = read_toc_page(toc, page_num)
+            self._store(key, _Entry(data, page.mime_type, prefetched=True))
+            with self._lock:
+                self.stats['prefetched'] += 1
+        except Exception as e:
+            app_logger.debug(f"Prefetch of page {page_num} from {toc.path} failed: {e}")
+            with self._lock:
+                self.stats['prefetch_errors'] += 1
+        finally:
+            with self._lock:
+                self._in_flight.discard(key)
+
+    def _store(self, key, entry):
+        size = len(entry.data)
+        budget = self.max_bytes
+        if size > budget:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.data)
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > budget and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.data)
+                self.stats['evictions'] += 1
+                if evicted.prefetched:
+                    self.stats['prefetch_wasted'] += 1
+
+    def _count_session(self, session_key, hit, prefetch_hit):
+        """Update per-session counters (caller holds the lock)."""
+        if session_key is None:
+            return
+        counters = self._sessions.pop(session_key, None)
+        if counters is None:
+            counters = {'pages': 0, 'hits': 0, 'prefetch_hits': 0, 'misses': 0, 'started_at': time.time()}
+        counters['pages'] += 1
+        counters['hits' if hit else 'misses'] += 1
+        if prefetch_hit:
+            counters['prefetch_hits'] += 1
+        counters['last_seen'] = time.time()
+        self._sessions[session_key] = counters
+
+        cutoff = counters['last_seen'] - SESSION_IDLE_SECONDS
+        while self._sessions:
+            oldest_key, oldest = next(iter(self._sessions.items()))
+            if len(self._sessions) <= MAX_SESSIONS and oldest['last_seen'] >= cutoff:
+                break
+            del self._sessions[oldest_key]
+
+
+# Process-wide cache used by the reader page endpoint
+page_cache = PageCache()
+
+
+def get_reader_page(toc, page_num, session_key=None):
+    """Get a page through the shared page cache (see PageCache.get_page)."""
+    return page_cache.get_page(toc, page_num, session_key)
+
+
+def prefetch_reader_pages(toc, page_num):
+    """Queue read-ahead after page_num without serving a page (e.g. on 304)."""
+    page_cache.prefetch(toc, page_num)
+
+
+def get_page_cache_stats():
+    """Counters of the shared page cache, including per-session prefetch hits."""
+    return page_cache.get_stats()
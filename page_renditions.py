@@ -0,0 +1,306 @@
+"""
+page_renditions.py - Resized and re-encoded page variants for the reader
+
+Pages are stored at whatever size the scanner produced (often 4K PNGs). The
+reader page endpoint accepts query parameters to get a lighter variant:
+1. w / h      - maximum width / height in pixels (aspect ratio is kept, never upscaled)
+2. fmt        - output format, 'webp' or 'jpeg' (default 'jpeg')
+3. q          - encoder quality 1-100 (default 80)
+4. gray       - 1 to convert to grayscale
+
+Generated renditions are stored under CACHE_DIR/renditions, keyed by the
+archive's path, mtime and size, the page number and the parameters. The
+directory is capped at READER_RENDITION_CACHE_MB; when it grows past the cap
+the least recently used files are removed.
+"""
+
+import hashlib
+import io
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+from PIL import Image
+
+from app_logging import app_logger
+from config import config
+
+# fmt parameter -> (PIL format, mime type, file extension)
+RENDITION_FORMATS = {
+    'webp': ('WEBP', 'image/webp', '.webp'),
+    'jpeg': ('JPEG', 'image/jpeg', '.jpg'),
+    'jpg': ('JPEG', 'image/jpeg', '.jpg'),
+}
+
+DEFAULT_FORMAT = 'jpeg'
+DEFAULT_QUALITY = 80
+DEFAULT_CACHE_MB = 1024
+MAX_DIMENSION = 8192
+
+# Prune down to this fraction of the cap so pruning doesn't run on every store
+_PRUNE_TARGET = 0.9
+
+
+@dataclass(frozen=True)
+class RenditionSpec:
+    """Requested page variant. A width or height of 0 means unconstrained."""
+    width: int = 0
+    height: int = 0
+    fmt: str = DEFAULT_FORMAT
+    quality: int = DEFAULT_QUALITY
+    grayscale: bool = False
+
+    @property
+    def key(self):
+        """Short string identifying the variant (used in ETags and cache keys)."""
+        return f"w{self.width}h{self.height}-{RENDITION_FORMATS[self.fmt][2][1:]}-q{self.quality}{'-g' if self.grayscale else ''}"
+
+    @property
+    def mime_type(self):
+        return RENDITION_FORMATS[self.fmt][1]
+
+
+def _parse_int(args, name, low, high):
+    value = args.get(name)
+    if value in (None, ''):
+        return 0
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{name}' must be an integer")
+    if number < low or number > high:
+        raise ValueError(f"'{name}' must be between {low} and {high}")
+    return number
+
+
+def parse_rendition_args(args):
+    """
+    Build a RenditionSpec from request query parameters.
+
+    Args:
+        args: Mapping such as request.args
+
+    Returns:
+        RenditionSpec, or None when no rendition parameter is present
+
+    Raises:
+        ValueError: A parameter is out of range or unknown
+    """
+    if not any(args.get(name) not in (None, '') for name in ('w', 'h', 'fmt', 'q', 'gray')):
+        return None
+
+    fmt = (args.get('fmt') or DEFAULT_FORMAT).lower()
+    if fmt not in RENDITION_FORMATS:
+        raise ValueError(f"'fmt' must be one of: {', '.join(sorted(RENDITION_FORMATS))}")
+
+    quality = _parse_int(args, 'q', 1, 100) or DEFAULT_QUALITY
+    grayscale = str(args.get('gray', '')).lower() in ('1', 'true', 'yes')
+
+    return RenditionSpec(
+        width=_parse_int(args, 'w', 16, MAX_DIMENSION),
+        height=_parse_int(args, 'h', 16, MAX_DIMENSION),
+        fmt=fmt,
+        quality=quality,
+        grayscale=grayscale,
+    )
+
+
+def render_page(data, spec):
+    """
+    Resize/re-encode one page image.
+
+    Args:
+        data: Original image bytes
+        spec: RenditionSpec
+
+    Returns:
+        Encoded image bytes
+    """
+    img = Image.open(io.BytesIO(data))
+    bounds = (spec.width or MAX_DIMENSION, spec.height or MAX_DIMENSION)
+
+    # JPEG can decode at a reduced scale directly, much cheaper than a full decode
+    if img.format == 'JPEG' and (spec.width or spec.height):
+        img.draft('L' if spec.grayscale else 'RGB', bounds)
+
+    if spec.grayscale:
+        img = img.convert('L')
+    elif img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+
+    if img.width > bounds[0] or img.height > bounds[1]:
+        img.thumbnail(bounds, Image.Resampling.LANCZOS)
+
+    pil_format = RENDITION_FORMATS[spec.fmt][0]
+    out = io.BytesIO()
+    if pil_format == 'WEBP':
+        img.save(out, format='WEBP', quality=spec.quality, method=4)
+    else:
+        img.save(out, format='JPEG', quality=spec.quality, optimize=True, progressive=True)
+    return out.getvalue()
+
+
+class RenditionCache:
+    """Disk cache of generated renditions with a size cap and LRU eviction."""
+
+    def __init__(self, root=None, max_bytes=None):
+        self._root = root
+        self._max_bytes = max_bytes
+        self._total_bytes = None  # Lazily measured on first store
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'errors': 0,
+            'source_bytes': 0,
+            'output_bytes': 0,
+            'render_time': 0.0,
+        }
+
+    @property
+    def root(self):
+        if self._root is None:
+            return os.path.join(config.get("SETTINGS", "CACHE_DIR", fallback="/cache"), "renditions")
+        return self._root
+
+    @property
+    def max_bytes(self):
+        if self._max_bytes is None:
+            return config.getint("SETTINGS", "READER_RENDITION_CACHE_MB", fallback=DEFAULT_CACHE_MB) * 1024 * 1024
+        return self._max_bytes
+
+    def path_for(self, toc, page_num, spec):
+        """Cache file path of a rendition."""
+        raw = f"{toc.path}|{toc.mtime_ns}|{toc.size}|{page_num}|{spec.key}"
+        digest = hashlib.sha1(raw.encode('utf-8'), usedforsecurity=False).hexdigest()
+        return os.path.join(self.root, digest[:2], digest + RENDITION_FORMATS[spec.fmt][2])
+
+    def get(self, toc, page_num, spec, load_source):
+        """
+        Get a rendition, generating and storing it on a miss.
+
+        Args:
+            toc: ArchiveToc of the comic
+            page_num: 0-based page index
+            spec: RenditionSpec
+            load_source: Callable returning the original page bytes
+
+        Returns:
+            Rendition bytes
+        """
+        path = self.path_for(toc, page_num, spec)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            # Bump mtime so eviction sees this rendition as recently used
+            os.utime(path)
+            with self._lock:
+                self.stats['hits'] += 1
+            return data
+        except FileNotFoundError:
+            pass
+
+        source = load_source()
+        start = time.perf_counter()
+        data = render_page(source, spec)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.stats['misses'] += 1
+            self.stats['source_bytes'] += len(source)
+            self.stats['output_bytes'] += len(data)
+            self.stats['render_time'] += elapsed
+
+        try:
+            self._store(path, data)
+        except OSError as e:
+            app_logger.warning(f"Could not cache page rendition {path}: {e}")
+            with self._lock:
+                self.stats['errors'] += 1
+        return data
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['bytes'] = self._total_bytes
+        stats['max_bytes'] = self.max_bytes
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        stats['avg_render_ms'] = round(stats.pop('render_time') * 1000 / stats['misses'], 1) if stats['misses'] else 0.0
+        stats['size_ratio'] = (
+            round(stats['output_bytes'] / stats['source_bytes'], 3) if stats['source_bytes'] else 0.0
+        )
+        return stats
+
+    def _store(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, _, size in self._scan())
+            else:
+                self._total_bytes += len(data)
+            if self._total_bytes > self.max_bytes:
+                self._prune()
+
+    def _scan(self):
+        """Yield (mtime, path, size) of every cached rendition."""
+        try:
+            shards = list(os.scandir(self.root))
+        except FileNotFoundError:
+            return
+        for shard in shards:
+            if not shard.is_dir():
+                continue
+            try:
+                with os.scandir(shard.path) as it:
+                    for entry in it:
+                        if entry.name.endswith('.tmp'):
+                            continue
+                        try:
+                            st = entry.stat()
+                        except OSError:
+                            continue
+                        yield st.st_mtime, entry.path, st.st_size
+            except OSError:
+                continue
+
+    def _prune(self):
+        """Delete least recently used renditions until under the cap (caller holds the lock)."""
+        files = sorted(self._scan())
+        total = sum(size for _, _, size in files)
+        target = self.max_bytes * _PRUNE_TARGET
+        removed = 0
+        for _, path, size in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                continue
+        self._total_bytes = total
+        self.stats['evictions'] += removed
+        if removed:
+            app_logger.info(f"Pruned {removed} page renditions ({total / 1024 / 1024:.1f}MB remain)")
+
+
+# Process-wide rendition cache used by the reader page endpoint
+rendition_cache = RenditionCache()
+
+
+def get_page_rendition(toc, page_num, spec, load_source):
+    """Get a page rendition through the shared disk cache (see RenditionCache.get)."""
+    return rendition_cache.get(toc, page_num, spec, load_source)
+
+
+def get_rendition_cache_stats():
+    """Counters of the shared rendition cache."""
+    return rendition_cache.get_stats()
@@ -28,6 +28,7 @@ from database import (
     invalidate_browse_cache, add_file_index_entry, delete_file_index_entry,
     search_file_index, get_user_preference
 )
+from directory_cache import list_directory
 
 collection_bp = Blueprint('collection', __name__)
 
@@ -401,16 +402,18 @@ def api_scan_directory():
 
                 full_path = os.path.join(root, f)
                 try:
-                    size = os.path.getsize(full_path)
+                    file_stat = os.stat(full_path)
+                    size, mtime = file_stat.st_size, file_stat.st_mtime
                 except (OSError, IOError):
-                    size = 0
+                    size, mtime = 0, None
 
                 add_file_index_entry(
                     name=f,
                     path=full_path,
                     entry_type='file',
                     parent=root,
-                    size=size
+                    size=size,
+                    modified_at=mtime
                 )
                 file_count += 1
 
@@ -692,9 +695,7 @@ def serve_folder_thumbnail():
 @collection_bp.route('/list-directories', methods=['GET'])
 def list_directories():
     """List directories and files in the given path."""
-    from app import (DATA_DIR, directory_cache, cache_lock, cache_timestamps,
-                     cache_stats, MAX_CACHE_SIZE, cleanup_cache, is_cache_valid,
-                     get_directory_listing)
+    from app import DATA_DIR
 
     current_path = request.args.get('path', '')
 
@@ -724,30 +725,7 @@ def list_directories():
         return os.path.dirname(path)
 
     try:
-        cleanup_cache()
-
-        if is_cache_valid(current_path):
-            cached_data = directory_cache[current_path]
-            parent_dir = get_parent_dir(current_path)
-
-            return jsonify({
-                "current_path": current_path,
-                "directories": cached_data["directories"],
-                "files": cached_data["files"],
-                "parent": parent_dir,
-                "cached": True
-            })
-
-        listing_data = get_directory_listing(current_path)
-
-        with cache_lock:
-            cache_stats['misses'] += 1
-            directory_cache[current_path] = listing_data
-            cache_timestamps[current_path] = time.time()
-
-            if len(directory_cache) > MAX_CACHE_SIZE:
-                cleanup_cache()
-
+        listing_data, cached = list_directory(current_path)
         parent_dir = get_parent_dir(current_path)
 
         return jsonify({
@@ -755,7 +733,7 @@ def list_directories():
             "directories": listing_data["directories"],
             "files": listing_data["files"],
             "parent": parent_dir,
-            "cached": False
+            "cached": cached
         })
     except Exception as e:
         app_logger.error(f"Error in list_directories for {current_path}: {e}")
@@ -860,9 +838,7 @@ def list_new_files():
 @collection_bp.route('/list-downloads', methods=['GET'])
 def list_downloads():
     """List directories and files in the downloads/target path."""
-    from app import (TARGET_DIR, directory_cache, cache_lock, cache_timestamps,
-                     cache_stats, MAX_CACHE_SIZE, cleanup_cache, is_cache_valid,
-                     get_directory_listing)
+    from app import TARGET_DIR
 
     current_path = request.args.get('path', TARGET_DIR)
 
@@ -870,30 +846,7 @@ def list_downloads():
         return jsonify({"error": "Directory not found"}), 404
 
     try:
-        cleanup_cache()
-
-        if is_cache_valid(current_path):
-            cached_data = directory_cache[current_path]
-            parent_dir = os.path.dirname(current_path) if current_path != TARGET_DIR else None
-
-            return jsonify({
-                "current_path": current_path,
-                "directories": cached_data["directories"],
-                "files": cached_data["files"],
-                "parent": parent_dir,
-                "cached": True
-            })
-
-        listing_data = get_directory_listing(current_path)
-
-        with cache_lock:
-            cache_stats['misses'] += 1
-            directory_cache[current_path] = listing_data
-            cache_timestamps[current_path] = time.time()
-
-            if len(directory_cache) > MAX_CACHE_SIZE:
-                cleanup_cache()
-
+        listing_data, cached = list_directory(current_path)
         parent_dir = os.path.dirname(current_path) if current_path != TARGET_DIR else None
 
         return jsonify({
@@ -901,7 +854,7 @@ def list_downloads():
             "directories": listing_data["directories"],
             "files": listing_data["files"],
             "parent": parent_dir,
-            "cached": False
+            "cached": cached
         })
     except Exception as e:
         app_logger.error(f"Error in list_downloads for {current_path}: {e}")
@@ -9,11 +9,11 @@ Provides routes for:
 """
 
 import uuid
-import threading
 from datetime import datetime, timedelta
 from flask import Blueprint, request, jsonify, render_template
 import app_state
 from app_logging import app_logger
+from job_queue import enqueue_job
 
 downloads_bp = Blueprint('downloads', __name__)
 
@@ -275,12 +275,10 @@ def api_save_getcomics_schedule():
 def api_run_getcomics_now():
     """Manually trigger GetComics auto-download immediately."""
     try:
-        from app import scheduled_getcomics_download
-
-        # Run in a background thread to not block the request
-        threading.Thread(target=scheduled_getcomics_download, daemon=True).start()
+        job_id, _ = enqueue_job('getcomics_download', concurrency_key='getcomics_download')
         return jsonify({
             "success": True,
+            "job_id": job_id,
             "message": "GetComics auto-download started in background"
         })
     except Exception as e:
@@ -413,12 +411,10 @@ def api_save_weekly_packs_config():
 def api_run_weekly_packs_now():
     """Manually trigger Weekly Packs download immediately."""
     try:
-        from app import scheduled_weekly_packs_download
-
-        # Run in a background thread to not block the request
-        threading.Thread(target=scheduled_weekly_packs_download, daemon=True).start()
+        job_id, _ = enqueue_job('weekly_packs_download', concurrency_key='weekly_packs_download')
         return jsonify({
             "success": True,
+            "job_id": job_id,
             "message": "Weekly packs download check started in background"
         })
     except Exception as e:
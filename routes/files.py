@@ -21,11 +21,12 @@ import threading
 import zipfile
 from flask import Blueprint, request, jsonify, render_template_string, Response, stream_with_context
 from app_logging import app_logger
+from compression_policy import get_policy
 from helpers.library import is_critical_path, get_critical_path_error_message, is_valid_library_path
 from helpers import is_hidden
 from config import config
 from cbz_ops.edit import cropCenter, cropLeft, cropRight, cropFreeForm, get_image_data_url, modal_body_template
-from database import add_file_index_entry
+from database import add_file_index_entry, get_folder_stats
 from memory_utils import memory_context
 
 files_bp = Blueprint('files', __name__)
@@ -313,7 +314,15 @@ def folder_size():
                     pass
         return total_size, comic_count, magazine_count
 
-    size, comic_count, magazine_count = get_directory_stats(path)
+    # Indexed folders are answered from the materialized folder_stats rows;
+    # anything outside the libraries (WATCH, TARGET...) is walked on disk
+    stats = get_folder_stats(path)
+    if stats:
+        size = stats["total_size"]
+        comic_count = stats["comic_count"]
+        magazine_count = stats["magazine_count"]
+    else:
+        size, comic_count, magazine_count = get_directory_stats(path)
     return jsonify({
         "size": size,
         "comic_count": comic_count,
@@ -545,14 +554,15 @@ def combine_cbz():
             counter += 1
 
         # Compress temp dir to CBZ
-        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        policy = get_policy(output_path)
+        with zipfile.ZipFile(output_path, 'w') as zf:
             extracted_files = sorted(os.listdir(temp_dir))
             for filename in extracted_files:
                 file_path_full = os.path.join(temp_dir, filename)
-                zf.write(file_path_full, filename)
+                zf.write(file_path_full, filename, **policy.options(filename))
             # Include ComicInfo.xml if found in any source file
             if comicinfo_content:
-                zf.writestr('ComicInfo.xml', comicinfo_content)
+                zf.writestr('ComicInfo.xml', comicinfo_content, **policy.options('ComicInfo.xml'))
 
         # Cleanup temp directory
         shutil.rmtree(temp_dir)
@@ -560,12 +570,14 @@ def combine_cbz():
 
         # Add combined file to index so it appears immediately in the UI
         try:
+            file_stat = os.stat(output_path)
             add_file_index_entry(
                 name=os.path.basename(output_path),
                 path=output_path,
                 entry_type='file',
-                size=os.path.getsize(output_path),
-                parent=directory
+                size=file_stat.st_size,
+                parent=directory,
+                modified_at=file_stat.st_mtime
             )
         except Exception as index_error:
             app_logger.warning(f"Failed to add combined file to index: {index_error}")
@@ -712,7 +724,7 @@ def rename():
 
 @files_bp.route('/rename-directory', methods=['POST'])
 def rename_directory():
-    """Rename all files in a directory using rename.py patterns"""
+    """Rename all files in a directory using rename.py patterns (dry_run: only list them)"""
     try:
         data = request.get_json()
         directory_path = data.get('directory')
@@ -737,7 +749,12 @@ def rename_directory():
             return jsonify({"error": get_critical_path_error_message(directory_path, "rename files in")}), 403
 
         # Import and call the rename_files function from rename.py
-        from cbz_ops.rename import rename_files
+        from cbz_ops.rename import rename_files, plan_renames
+
+        if data.get('dry_run'):
+            # Show what would be renamed without touching any file
+            plans = [plan for plan in plan_renames(directory_path) if plan['status'] == 'rename']
+            return jsonify({"success": True, "dry_run": True, "renames": plans})
 
         # Call the rename function
         rename_files(directory_path)
@@ -0,0 +1,103 @@
+"""
+Jobs Blueprint
+
+Provides routes for:
+- Listing background jobs and their progress
+- Starting directory operations (rebuild, convert, enhance, PDF) as jobs
+- Starting other registered jobs (wanted refresh, syncs, downloads)
+- Cancelling jobs
+"""
+
+import json
+import os
+from flask import Blueprint, request, jsonify
+from app_logging import app_logger
+from config import config
+from helpers.library import is_valid_library_path
+from job_queue import (DIRECTORY_JOB_TYPES, cancel_job, directory_job_key, enqueue_job,
+                       get_job_types)
+
+jobs_bp = Blueprint('jobs', __name__)
+
+
+def _job_to_json(job):
+    """Job row with its JSON columns decoded."""
+    for field in ('params', 'checkpoint', 'result'):
+        if job.get(field):
+            try:
+                job[field] = json.loads(job[field])
+            except ValueError:
+                pass
+    job['cancel_requested'] = bool(job.get('cancel_requested'))
+    return job
+
+
+@jobs_bp.route('/api/jobs', methods=['GET'])
+def api_list_jobs():
+    """List background jobs, newest first (?status=, ?type=, ?limit=)."""
+    from database import list_jobs
+
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+    jobs = list_jobs(status=request.args.get('status'), job_type=request.args.get('type'), limit=limit)
+    return jsonify({"success": True, "jobs": [_job_to_json(job) for job in jobs]})
+
+
+@jobs_bp.route('/api/jobs/<job_id>', methods=['GET'])
+def api_get_job(job_id):
+    """Get one background job."""
+    from database import get_job
+
+    job = get_job(job_id)
+    if not job:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+    return jsonify({"success": True, "job": _job_to_json(job)})
+
+
+@jobs_bp.route('/api/jobs', methods=['POST'])
+def api_start_job():
+    """
+    Start a job.
+
+    Body: {"type": "<job type>", "directory": "<path>"} - directory is
+    required for rebuild, convert, enhance_dir and pdf. Starting a job that
+    is already queued or running returns the existing job with created=false.
+    """
+    data = request.get_json() or {}
+    job_type = (data.get('type') or '').strip()
+
+    if job_type not in get_job_types():
+        return jsonify({"success": False, "error": f"Unknown job type: {job_type}"}), 400
+
+    params = {}
+    concurrency_key = job_type
+    if job_type in DIRECTORY_JOB_TYPES:
+        directory = data.get('directory')
+        if not directory:
+            return jsonify({"success": False, "error": "Missing directory"}), 400
+        directory = os.path.normpath(directory)
+        target_dir = config.get("SETTINGS", "TARGET", fallback="/processed")
+        if not (is_valid_library_path(directory) or directory.startswith(os.path.normpath(target_dir))):
+            return jsonify({"success": False, "error": "Access denied"}), 403
+        if not os.path.isdir(directory):
+            return jsonify({"success": False, "error": "Directory not found"}), 404
+        params['directory'] = directory
+        concurrency_key = directory_job_key(job_type, directory)
+
+    try:
+        job_id, created = enqueue_job(job_type, params, concurrency_key=concurrency_key)
+    except Exception as e:
+        app_logger.error(f"Failed to start job {job_type}: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+    if not job_id:
+        return jsonify({"success": False, "error": "Failed to queue job"}), 500
+
+    return jsonify({"success": True, "job_id": job_id, "created": created})
+
+
+@jobs_bp.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def api_cancel_job(job_id):
+    """Cancel a queued job, or ask a running job to stop."""
+    status = cancel_job(job_id)
+    if status is None:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+    return jsonify({"success": True, "status": status})
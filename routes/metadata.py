@@ -17,20 +17,36 @@ import json
 import time
 import shutil
 import zipfile
+import threading
 import traceback
 import xml.etree.ElementTree as ET
 import mysql.connector
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from datetime import datetime
 from flask import (Blueprint, request, jsonify, Response,
                    stream_with_context, current_app)
 from app_logging import app_logger
+from archive_rewrite import write_zip_member
 from config import config
 from helpers.library import is_valid_library_path
 from models import gcd, metron, comicvine
 from models.gcd import STOPWORDS
+from models.providers.latency import record_provider_latency, record_provider_outcome
+from models.providers.rate_limit import get_rate_limiter
 
 metadata_bp = Blueprint('metadata', __name__)
 
+# Concurrent provider lookups and archive writes in batch_metadata
+DEFAULT_BATCH_LOOKUP_WORKERS = 4
+DEFAULT_BATCH_WRITE_WORKERS = 2
+
+# Single-file search fan-out: seconds each provider may take before the next
+# provider's answer is used instead
+DEFAULT_SEARCH_DEADLINES = {'metron': 15, 'comicvine': 20, 'gcd': 10}
+DEFAULT_SEARCH_DEADLINE = 20
+DEFAULT_SEARCH_WORKERS = 8
+
 
 # =============================================================================
 # Helper Functions (used by multiple routes)
@@ -128,9 +144,10 @@ def generate_comicinfo_xml(issue_data, series_data=None):
 def add_comicinfo_to_cbz(file_path, comicinfo_xml_bytes):
     """
     Writes ComicInfo.xml at the ROOT of the CBZ.
-    - Removes any existing ComicInfo.xml (case-insensitive)
+    - Drops any existing ComicInfo.xml (case-insensitive, any folder)
     - Uses UTF-8 bytes for content
-    - Rebuilds the entire ZIP by extracting and recompressing (matches single_file.py approach)
+    - Appends the new entry and rewrites only the central directory; pages are
+      never extracted or recompressed (see archive_rewrite.write_zip_member)
     - Handles RAR files incorrectly named as CBZ
     """
     from cbz_ops.single_file import convert_single_rar_file
@@ -139,98 +156,20 @@ def add_comicinfo_to_cbz(file_path, comicinfo_xml_bytes):
     if isinstance(comicinfo_xml_bytes, str):
         comicinfo_xml_bytes = comicinfo_xml_bytes.encode("utf-8")
 
-    # Create temp directory and file in the same directory as the source file
     file_dir = os.path.dirname(file_path) or '.'
     base_name = os.path.splitext(os.path.basename(file_path))[0]
 
-    # Create temporary extraction directory
-    temp_extract_dir = os.path.join(file_dir, f".tmp_extract_{base_name}_{os.getpid()}")
-    temp_zip_path = os.path.join(file_dir, f".tmp_{base_name}_{os.getpid()}.cbz")
-
     try:
-        # Step 1: Extract all files to temporary directory
-        os.makedirs(temp_extract_dir, exist_ok=True)
-        corrupted_files = []
-
-        with zipfile.ZipFile(file_path, 'r') as src:
-            for filename in src.namelist():
-                # Skip any existing ComicInfo.xml
-                if os.path.basename(filename).lower() == "comicinfo.xml":
-                    continue
-                try:
-                    src.extract(filename, temp_extract_dir)
-                except zipfile.BadZipFile as crc_error:
-                    # Handle corrupted files with bad CRC
-                    app_logger.warning(f"Corrupted file in archive (bad CRC): {filename} - attempting raw copy")
-                    corrupted_files.append(filename)
-                    try:
-                        # Try to copy the file data without CRC verification
-                        # Get the ZipInfo object
-                        info = src.getinfo(filename)
-                        # Create the target path
-                        target_path = os.path.join(temp_extract_dir, filename)
-                        os.makedirs(os.path.dirname(target_path), exist_ok=True)
-                        # Read raw data (may be corrupted but we'll preserve what we can)
-                        with src.open(filename) as zf:
-                            # Read in chunks to handle large files
-                            with open(target_path, 'wb') as out:
-                                while True:
-                                    try:
-                                        chunk = zf.read(8192)
-                                        if not chunk:
-                                            break
-                                        out.write(chunk)
-                                    except zipfile.BadZipFile:
-                                        # Write what we have and stop
-                                        app_logger.warning(f"Partial extraction for corrupted file: {filename}")
-                                        break
-                    except Exception as copy_error:
-                        app_logger.error(f"Failed to copy corrupted file {filename}: {copy_error}")
-                        # Skip this file entirely
-                        continue
-
-        if corrupted_files:
-            app_logger.warning(f"Archive had {len(corrupted_files)} corrupted file(s), processed with best effort")
-
-        # Step 2: Write ComicInfo.xml to temp directory
-        comicinfo_path = os.path.join(temp_extract_dir, "ComicInfo.xml")
-        with open(comicinfo_path, 'wb') as f:
-            f.write(comicinfo_xml_bytes)
-
-        # Step 3: Recompress everything into new CBZ (sorted for consistency)
-        with zipfile.ZipFile(temp_zip_path, 'w', zipfile.ZIP_DEFLATED) as dst:
-            # Get all files and sort them
-            all_files = []
-            for root_dir, dirs, files in os.walk(temp_extract_dir):
-                for file in files:
-                    file_path_full = os.path.join(root_dir, file)
-                    arcname = os.path.relpath(file_path_full, temp_extract_dir)
-                    all_files.append((file_path_full, arcname))
-
-            # Sort by arcname for consistent ordering
-            all_files.sort(key=lambda x: x[1])
-
-            # Write all files
-            for file_path_full, arcname in all_files:
-                dst.write(file_path_full, arcname)
-
-        # Step 4: Replace original file
-        os.replace(temp_zip_path, file_path)
+        write_zip_member(
+            file_path, "ComicInfo.xml", comicinfo_xml_bytes,
+            replaces=lambda info: os.path.basename(info.filename).lower() == "comicinfo.xml"
+        )
 
     except zipfile.BadZipFile as e:
         # Handle the case where a .cbz file is actually a RAR file
         if "File is not a zip file" in str(e) or "BadZipFile" in str(e):
             app_logger.warning(f"Detected that {os.path.basename(file_path)} is not a valid ZIP file. Attempting to convert from RAR...")
 
-            # Clean up any partial extraction
-            if os.path.exists(temp_extract_dir):
-                shutil.rmtree(temp_extract_dir, ignore_errors=True)
-            if os.path.exists(temp_zip_path):
-                try:
-                    os.unlink(temp_zip_path)
-                except:
-                    pass
-
             # Rename to .rar for conversion
             rar_file = os.path.join(file_dir, base_name + ".rar")
             shutil.move(file_path, rar_file)
@@ -261,17 +200,6 @@ def add_comicinfo_to_cbz(file_path, comicinfo_xml_bytes):
         else:
             raise
 
-    finally:
-        # Clean up temp directory
-        if os.path.exists(temp_extract_dir):
-            shutil.rmtree(temp_extract_dir, ignore_errors=True)
-        # Clean up temp zip if it still exists
-        if os.path.exists(temp_zip_path):
-            try:
-                os.unlink(temp_zip_path)
-            except:
-                pass
-
 
 # =============================================================================
 # CBZ Metadata
@@ -486,7 +414,7 @@ def get_provider_creds(provider_type):
 def save_provider_creds(provider_type):
     """Save credentials for a provider."""
     try:
-        from database import save_provider_credentials
+        from database import save_provider_credentials, clear_provider_cache
         from models.providers import ProviderType
 
         # Validate provider type
@@ -502,6 +430,8 @@ def save_provider_creds(provider_type):
         # Save credentials
         success = save_provider_credentials(provider_type, data)
         if success:
+            # Lookups that came back empty may have failed on the old credentials
+            clear_provider_cache(provider_type, negative_only=True)
             # Refresh Flask app.config with new DB credentials
             try:
                 from config import load_flask_config
@@ -578,6 +508,41 @@ def test_provider_connection(provider_type):
         return jsonify({"error": str(e)}), 500
 
 
+@metadata_bp.route('/api/providers/cache', methods=['GET'])
+def get_provider_cache_status():
+    """Get provider cache hit rates and entry counts."""
+    try:
+        from models.providers.cache import get_provider_cache_stats
+        return jsonify({"success": True, **get_provider_cache_stats()})
+    except Exception as e:
+        app_logger.error(f"Error getting provider cache stats: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@metadata_bp.route('/api/providers/cache', methods=['DELETE'])
+def clear_provider_cache_entries():
+    """Clear cached provider lookups (?provider=<type> for a single provider)."""
+    try:
+        from database import clear_provider_cache
+
+        deleted = clear_provider_cache(request.args.get('provider') or None)
+        return jsonify({"success": True, "deleted": deleted})
+    except Exception as e:
+        app_logger.error(f"Error clearing provider cache: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@metadata_bp.route('/api/providers/latency', methods=['GET'])
+def get_provider_latency():
+    """Get single-file search latency histograms and outcomes per provider."""
+    try:
+        from models.providers.latency import get_provider_latency_stats
+        return jsonify({"success": True, **get_provider_latency_stats()})
+    except Exception as e:
+        app_logger.error(f"Error getting provider latency stats: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
 @metadata_bp.route('/api/libraries/<int:library_id>/providers', methods=['GET'])
 def get_library_provider_config(library_id):
     """Get provider configuration for a library."""
@@ -787,6 +752,9 @@ def batch_metadata():
     4. Read/fetch start_year for Volume field from cvinfo
     5. For each CBZ/CBR without ComicInfo.xml:
        - Try Metron first, then ComicVine, then GCD
+       - Lookups run concurrently (BATCH_METADATA_WORKERS), each provider
+         paced by its shared rate limiter; ComicInfo.xml is written on a
+         separate pool (BATCH_METADATA_WRITE_WORKERS) while lookups continue
     """
     from comicinfo import read_comicinfo_from_zip
     from app import TARGET_DIR
@@ -847,7 +815,7 @@ def batch_metadata():
 
         # Step 1: Get list of comic files (needed for year extraction)
         comic_files = []
-        for item in os.listdir(directory):
+        for item in sorted(os.listdir(directory)):
             item_path = os.path.join(directory, item)
             if os.path.isfile(item_path) and item.lower().endswith(('.cbz', '.cbr')):
                 comic_files.append(item_path)
@@ -1032,8 +1000,217 @@ def batch_metadata():
         # Store year for GCD lookups
         gcd_year = extracted_year or cvinfo_start_year
 
+        def lookup_file(file_path):
+            """
+            Find metadata for one file (runs on the lookup pool).
+
+            Returns:
+                (status, detail): ('found', (metadata, source)), or
+                ('skipped' | 'error', reason)
+            """
+            filename = os.path.basename(file_path)
+
+            # Check if already has ComicInfo.xml
+            if file_path.lower().endswith('.cbz'):
+                existing = read_comicinfo_from_zip(file_path)
+                existing_notes = existing.get('Notes', '').strip() if existing else ''
+
+                # Skip if has metadata, unless it's just Amazon scraped data
+                if existing_notes and 'Scraped metadata from Amazon' not in existing_notes:
+                    app_logger.debug(f"Skipping {filename} - already has metadata")
+                    return 'skipped', 'has metadata'
+            elif file_path.lower().endswith('.cbr'):
+                # Skip CBR files - we can't check or modify them without conversion
+                app_logger.debug(f"Skipping {filename} - CBR format not supported for metadata")
+                return 'skipped', 'CBR format'
+
+            # Extract issue/volume number from filename
+            issue_number = comicvine.extract_issue_number(filename)
+
+            # For manga, also try to extract volume number (v01, v02, etc.)
+            volume_number = None
+            volume_match = re.search(r'\bv(\d+)', filename, re.IGNORECASE)
+            if volume_match:
+                volume_number = volume_match.group(1).lstrip('0') or '1'
+
+            # Use volume number for manga providers (AniList, MangaDex), issue number for comics
+            if (anilist_available or mangadex_available) and volume_number:
+                issue_number = volume_number
+                app_logger.info(f"Using volume number {volume_number} for manga: {filename}")
+            elif not issue_number:
+                app_logger.warning(f"Could not extract issue number from {filename}")
+                return 'error', 'no issue number'
+
+            app_logger.info(f"Processing {filename} (issue/vol #{issue_number})")
+
+            # Try sources based on volume year
+            metadata = None
+            source = None
+
+            def call(provider_type, fn, *args, **kwargs):
+                # Wait for the provider's shared request budget instead of sleeping per file.
+                # Metron helpers take their own tokens (per HTTP request, or per attempt)
+                if provider_type != 'metron':
+                    get_rate_limiter(provider_type).acquire()
+                return fn(*args, **kwargs)
+
+            # Helper function for GCD lookup
+            def try_gcd():
+                nonlocal metadata, source
+                if not gcd_available:
+                    return False
+                try:
+                    # Get series name from directory
+                    gcd_series_name = os.path.basename(directory)
+                    # Clean up series name
+                    gcd_series_name = re.sub(r'\s*\(\d{4}\).*$', '', gcd_series_name)
+                    gcd_series_name = re.sub(r'\s*v\d+.*$', '', gcd_series_name)
+
+                    # Use gcd_year (from filename/folder or cvinfo)
+                    gcd_series = call('gcd', gcd.search_series, gcd_series_name, gcd_year)
+                    if gcd_series:
+                        metadata = call('gcd', gcd.get_issue_metadata, gcd_series['id'], issue_number)
+                        if metadata:
+                            source = 'GCD'
+                            app_logger.info(f"Found metadata from GCD for {filename}")
+                            return True
+                except Exception as e:
+                    app_logger.warning(f"GCD lookup failed for {filename}: {e}")
+                return False
+
+            # Helper function for ComicVine lookup
+            def try_comicvine():
+                nonlocal metadata, source
+                if not (comicvine_available and cv_volume_id):
+                    return False
+                try:
+                    metadata = call('comicvine', comicvine.get_metadata_by_volume_id,
+                                    comicvine_api_key, cv_volume_id, issue_number, start_year=cvinfo_start_year)
+                    if metadata:
+                        source = 'ComicVine'
+                        app_logger.info(f"Found metadata from ComicVine for {filename}")
+                        return True
+                except Exception as e:
+                    app_logger.warning(f"ComicVine lookup failed for {filename}: {e}")
+                return False
+
+            # Helper function for Metron lookup
+            def try_metron():
+                nonlocal metadata, source
+                if not (metron_available and metron_api and series_id):
+                    return False
+                try:
+                    metadata = call('metron', metron.get_issue_comicinfo, metron_api, series_id, issue_number)
+                    if metadata:
+                        source = 'Metron'
+                        app_logger.info(f"Found metadata from Metron for {filename}")
+                        return True
+                except Exception as e:
+                    app_logger.warning(f"Metron lookup failed for {filename}: {e}")
+                return False
+
+            # Helper function for AniList lookup (manga)
+            def try_anilist():
+                nonlocal metadata, source
+                if not anilist_available:
+                    return False
+                try:
+                    from models.providers.anilist_provider import AniListProvider
+                    anilist = AniListProvider()
+
+                    # Get series name from directory
+                    series_name = os.path.basename(directory)
+                    series_name = re.sub(r'\s*\(\d{4}\).*$', '', series_name)
+                    series_name = re.sub(r'\s*v\d+.*$', '', series_name)
+
+                    # Search for the manga
+                    results = call('anilist', anilist.search_series, series_name, gcd_year)
+                    if results:
+                        series = results[0]  # Take first/best match
+                        metadata = call('anilist', anilist.get_issue_metadata, series.id, issue_number)
+                        if metadata:
+                            source = 'AniList'
+                            app_logger.info(f"Found metadata from AniList for {filename}")
+                            return True
+                except Exception as e:
+                    app_logger.warning(f"AniList lookup failed for {filename}: {e}")
+                return False
+
+            # Helper function for MangaDex lookup (manga)
+            def try_mangadex():
+                nonlocal metadata, source
+                if not mangadex_available:
+                    return False
+                try:
+                    from models.providers.mangadex_provider import MangaDexProvider
+                    mangadex = MangaDexProvider()
+
+                    # Get series name from directory
+                    series_name = os.path.basename(directory)
+                    series_name = re.sub(r'\s*\(\d{4}\).*$', '', series_name)
+                    series_name = re.sub(r'\s*v\d+.*$', '', series_name)
+
+                    # Search for the manga
+                    results = call('mangadex', mangadex.search_series, series_name, gcd_year)
+                    if results:
+                        series = results[0]  # Take first/best match
+                        metadata = call('mangadex', mangadex.get_issue_metadata, series.id, issue_number)
+                        if metadata:
+                            source = 'MangaDex'
+                            app_logger.info(f"Found metadata from MangaDex for {filename}")
+                            return True
+                except Exception as e:
+                    app_logger.warning(f"MangaDex lookup failed for {filename}: {e}")
+                return False
+
+            # Use providers in library-configured priority order
+            provider_try_fns = {
+                'metron': try_metron,
+                'comicvine': try_comicvine,
+                'gcd': try_gcd,
+                'anilist': try_anilist,
+                'mangadex': try_mangadex,
+            }
+
+            if library_id and library_providers:
+                # Use library-configured priority order
+                for provider_config in library_providers:
+                    if provider_config.get('enabled', True):
+                        try_fn = provider_try_fns.get(provider_config['provider_type'])
+                        if try_fn and try_fn():
+                            break
+            else:
+                # Fallback for no library_id: try all available providers
+                for name, try_fn in provider_try_fns.items():
+                    if try_fn():
+                        break
+
+            if not metadata:
+                app_logger.warning(f"No metadata found for {filename}")
+                return 'error', 'not found'
+            return 'found', (metadata, source)
+
+        def write_file(file_path, metadata):
+            """Generate and add ComicInfo.xml (runs on the write pool)."""
+            from database import set_has_comicinfo
+
+            xml_bytes = comicvine.generate_comicinfo_xml(metadata)
+            add_comicinfo_to_cbz(file_path, xml_bytes)
+            set_has_comicinfo(file_path)
+
+        lookup_workers = max(1, config.getint("SETTINGS", "BATCH_METADATA_WORKERS",
+                                              fallback=DEFAULT_BATCH_LOOKUP_WORKERS))
+        write_workers = max(1, config.getint("SETTINGS", "BATCH_METADATA_WRITE_WORKERS",
+                                             fallback=DEFAULT_BATCH_WRITE_WORKERS))
+
         def generate():
-            """Generator for SSE streaming."""
+            """
+            Generator for SSE streaming.
+
+            Lookups run on one pool, paced by the providers' rate limiters;
+            each match is handed to a second pool that writes the archive
+            while the next lookups are on the network.
+            """
             result = {
                 'cvinfo_created': cvinfo_created,
                 'metron_id_added': metron_id_added,
@@ -1045,213 +1222,60 @@ def batch_metadata():
             }
 
             total_files = len(comic_files)
+            details = {}
+            completed = 0
+
+            def record(index, filename, status, reason=None, source=None):
+                detail = {'file': filename, 'status': status}
+                if reason is not None:
+                    detail['reason'] = reason
+                if source is not None:
+                    detail['source'] = source
+                details[index] = detail
+                result[{'success': 'processed', 'skipped': 'skipped'}.get(status, 'errors')] += 1
 
             # Emit initial progress
             yield f"data: {json.dumps({'type': 'progress', 'current': 0, 'total': total_files, 'file': 'Starting...'})}\n\n"
 
-            # Step 4: Process each comic file
-            for i, file_path in enumerate(comic_files):
-                filename = os.path.basename(file_path)
-
-                # Emit progress event
-                yield f"data: {json.dumps({'type': 'progress', 'current': i + 1, 'total': total_files, 'file': filename})}\n\n"
-
-                try:
-                    # Check if already has ComicInfo.xml
-                    if file_path.lower().endswith('.cbz'):
-                        existing = read_comicinfo_from_zip(file_path)
-                        existing_notes = existing.get('Notes', '').strip() if existing else ''
-
-                        # Skip if has metadata, unless it's just Amazon scraped data
-                        if existing_notes and 'Scraped metadata from Amazon' not in existing_notes:
-                            app_logger.debug(f"Skipping {filename} - already has metadata")
-                            result['skipped'] += 1
-                            result['details'].append({'file': filename, 'status': 'skipped', 'reason': 'has metadata'})
-                            continue
-                    elif file_path.lower().endswith('.cbr'):
-                        # Skip CBR files - we can't check or modify them without conversion
-                        app_logger.debug(f"Skipping {filename} - CBR format not supported for metadata")
-                        result['skipped'] += 1
-                        result['details'].append({'file': filename, 'status': 'skipped', 'reason': 'CBR format'})
-                        continue
-
-                    # Extract issue/volume number from filename
-                    issue_number = comicvine.extract_issue_number(filename)
-
-                    # For manga, also try to extract volume number (v01, v02, etc.)
-                    volume_number = None
-                    volume_match = re.search(r'\bv(\d+)', filename, re.IGNORECASE)
-                    if volume_match:
-                        volume_number = volume_match.group(1).lstrip('0') or '1'
-
-                    # Use volume number for manga providers (AniList, MangaDex), issue number for comics
-                    if (anilist_available or mangadex_available) and volume_number:
-                        issue_number = volume_number
-                        app_logger.info(f"Using volume number {volume_number} for manga: {filename}")
-                    elif not issue_number:
-                        app_logger.warning(f"Could not extract issue number from {filename}")
-                        result['errors'] += 1
-                        result['details'].append({'file': filename, 'status': 'error', 'reason': 'no issue number'})
-                        continue
-
-                    app_logger.info(f"Processing {filename} (issue/vol #{issue_number})")
-
-                    # Try sources based on volume year
-                    metadata = None
-                    source = None
-
-                    # Helper function for GCD lookup
-                    def try_gcd():
-                        nonlocal metadata, source
-                        if not gcd_available:
-                            return False
-                        try:
-                            # Get series name from directory
-                            gcd_series_name = os.path.basename(directory)
-                            # Clean up series name
-                            gcd_series_name = re.sub(r'\s*\(\d{4}\).*$', '', gcd_series_name)
-                            gcd_series_name = re.sub(r'\s*v\d+.*$', '', gcd_series_name)
-
-                            # Use gcd_year (from filename/folder or cvinfo)
-                            gcd_series = gcd.search_series(gcd_series_name, gcd_year)
-                            if gcd_series:
-                                metadata = gcd.get_issue_metadata(gcd_series['id'], issue_number)
-                                if metadata:
-                                    source = 'GCD'
-                                    app_logger.info(f"Found metadata from GCD for {filename}")
-                                    return True
-                        except Exception as e:
-                            app_logger.warning(f"GCD lookup failed for {filename}: {e}")
-                        return False
-
-                    # Helper function for ComicVine lookup
-                    def try_comicvine():
-                        nonlocal metadata, source
-                        if not (comicvine_available and cv_volume_id):
-                            return False
-                        try:
-                            metadata = comicvine.get_metadata_by_volume_id(comicvine_api_key, cv_volume_id, issue_number, start_year=cvinfo_start_year)
-                            if metadata:
-                                source = 'ComicVine'
-                                app_logger.info(f"Found metadata from ComicVine for {filename}")
-                                return True
-                        except Exception as e:
-                            app_logger.warning(f"ComicVine lookup failed for {filename}: {e}")
-                        return False
-
-                    # Helper function for Metron lookup
-                    def try_metron():
-                        nonlocal metadata, source
-                        if not (metron_available and metron_api and series_id):
-                            return False
-                        try:
-                            issue_data = metron.get_issue_metadata(metron_api, series_id, issue_number)
-                            if issue_data:
-                                metadata = metron.map_to_comicinfo(issue_data)
-                                source = 'Metron'
-                                app_logger.info(f"Found metadata from Metron for {filename}")
-                                return True
-                        except Exception as e:
-                            app_logger.warning(f"Metron lookup failed for {filename}: {e}")
-                        return False
-
-                    # Helper function for AniList lookup (manga)
-                    def try_anilist():
-                        nonlocal metadata, source
-                        if not anilist_available:
-                            return False
-                        try:
-                            from models.providers.anilist_provider import AniListProvider
-                            anilist = AniListProvider()
-
-                            # Get series name from directory
-                            series_name = os.path.basename(directory)
-                            series_name = re.sub(r'\s*\(\d{4}\).*$', '', series_name)
-                            series_name = re.sub(r'\s*v\d+.*$', '', series_name)
-
-                            # Search for the manga
-                            results = anilist.search_series(series_name, gcd_year)
-                            if results:
-                                series = results[0]  # Take first/best match
-                                metadata = anilist.get_issue_metadata(series.id, issue_number)
-                                if metadata:
-                                    source = 'AniList'
-                                    app_logger.info(f"Found metadata from AniList for {filename}")
-                                    return True
-                        except Exception as e:
-                            app_logger.warning(f"AniList lookup failed for {filename}: {e}")
-                        return False
-
-                    # Helper function for MangaDex lookup (manga)
-                    def try_mangadex():
-                        nonlocal metadata, source
-                        if not mangadex_available:
-                            return False
+            lookup_pool = ThreadPoolExecutor(max_workers=lookup_workers, thread_name_prefix="BatchLookup")
+            write_pool = ThreadPoolExecutor(max_workers=write_workers, thread_name_prefix="BatchWrite")
+            pending = {
+                lookup_pool.submit(lookup_file, file_path): ('lookup', index, file_path, None)
+                for index, file_path in enumerate(comic_files)
+            }
+            try:
+                while pending:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        stage, index, file_path, source = pending.pop(future)
+                        filename = os.path.basename(file_path)
                         try:
-                            from models.providers.mangadex_provider import MangaDexProvider
-                            mangadex = MangaDexProvider()
-
-                            # Get series name from directory
-                            series_name = os.path.basename(directory)
-                            series_name = re.sub(r'\s*\(\d{4}\).*$', '', series_name)
-                            series_name = re.sub(r'\s*v\d+.*$', '', series_name)
-
-                            # Search for the manga
-                            results = mangadex.search_series(series_name, gcd_year)
-                            if results:
-                                series = results[0]  # Take first/best match
-                                metadata = mangadex.get_issue_metadata(series.id, issue_number)
-                                if metadata:
-                                    source = 'MangaDex'
-                                    app_logger.info(f"Found metadata from MangaDex for {filename}")
-                                    return True
+                            outcome = future.result()
                         except Exception as e:
-                            app_logger.warning(f"MangaDex lookup failed for {filename}: {e}")
-                        return False
-
-                    # Use providers in library-configured priority order
-                    provider_try_fns = {
-                        'metron': try_metron,
-                        'comicvine': try_comicvine,
-                        'gcd': try_gcd,
-                        'anilist': try_anilist,
-                        'mangadex': try_mangadex,
-                    }
-
-                    if library_id and library_providers:
-                        # Use library-configured priority order
-                        for provider_config in library_providers:
-                            if provider_config.get('enabled', True):
-                                try_fn = provider_try_fns.get(provider_config['provider_type'])
-                                if try_fn and try_fn():
-                                    break
-                    else:
-                        # Fallback for no library_id: try all available providers
-                        for name, try_fn in provider_try_fns.items():
-                            if try_fn():
-                                break
-
-                    if metadata:
-                        # Generate and add ComicInfo.xml
-                        xml_bytes = comicvine.generate_comicinfo_xml(metadata)
-                        add_comicinfo_to_cbz(file_path, xml_bytes)
-                        from database import set_has_comicinfo
-                        set_has_comicinfo(file_path)
-                        result['processed'] += 1
-                        result['details'].append({'file': filename, 'status': 'success', 'source': source})
-                        app_logger.info(f"Added metadata to {filename} from {source}")
-                    else:
-                        result['errors'] += 1
-                        result['details'].append({'file': filename, 'status': 'error', 'reason': 'not found'})
-                        app_logger.warning(f"No metadata found for {filename}")
-
-                    # Rate limiting - wait between API calls
-                    time.sleep(0.5)
-
-                except Exception as e:
-                    app_logger.error(f"Error processing {filename}: {e}")
-                    result['errors'] += 1
-                    result['details'].append({'file': filename, 'status': 'error', 'reason': str(e)})
+                            app_logger.error(f"Error processing {filename}: {e}")
+                            record(index, filename, 'error', reason=str(e))
+                        else:
+                            if stage == 'lookup':
+                                status, detail = outcome
+                                if status == 'found':
+                                    metadata, source = detail
+                                    write = write_pool.submit(write_file, file_path, metadata)
+                                    pending[write] = ('write', index, file_path, source)
+                                    continue
+                                record(index, filename, status, reason=detail)
+                            else:
+                                record(index, filename, 'success', source=source)
+                                app_logger.info(f"Added metadata to {filename} from {source}")
+
+                        completed += 1
+                        yield f"data: {json.dumps({'type': 'progress', 'current': completed, 'total': total_files, 'file': filename})}\n\n"
+            finally:
+                # A closed stream drops the lookups not started yet; archive
+                # writes already running are finished
+                lookup_pool.shutdown(wait=False, cancel_futures=True)
+                write_pool.shutdown(wait=True)
+
+            result['details'] = [details[index] for index in sorted(details)]
 
             # Emit final complete event
             yield f"data: {json.dumps({'type': 'complete', 'result': result})}\n\n"
@@ -2633,6 +2657,99 @@ def _try_gcd_single(series_name, issue_number, year):
         return None, None, None
 
 
+def _lookup_single_provider(provider_type, cvinfo_path, series_name, issue_number, year):
+    """
+    Query one provider for search_metadata.
+
+    Returns:
+        (metadata, img_url, volume_data, selection_data), all None when the
+        provider found nothing
+    """
+    if provider_type == 'metron':
+        metadata, img_url = _try_metron_single(cvinfo_path, issue_number)
+        return metadata, img_url, None, None
+    if provider_type == 'comicvine':
+        return _try_comicvine_single(cvinfo_path, series_name, issue_number, year)
+    if provider_type == 'gcd':
+        metadata, _, selection_data = _try_gcd_single(series_name, issue_number, year)
+        return metadata, None, None, selection_data
+    return None, None, None, None
+
+
+def _timed_lookup(provider_type, lookup):
+    """Run lookup(provider_type) and record its latency and outcome."""
+    start = time.monotonic()
+    try:
+        outcome = lookup(provider_type)
+    except Exception as e:
+        record_provider_latency(provider_type, time.monotonic() - start, 'error')
+        app_logger.warning(f"[search-metadata] {provider_type} lookup failed: {e}")
+        return None, None, None, None
+    found = outcome[0] or outcome[3]
+    record_provider_latency(provider_type, time.monotonic() - start, 'hit' if found else 'miss')
+    return outcome
+
+
+_search_pool = None
+_search_pool_lock = threading.Lock()
+
+
+def _get_search_pool():
+    global _search_pool
+    with _search_pool_lock:
+        if _search_pool is None:
+            workers = max(1, config.getint("SETTINGS", "METADATA_SEARCH_WORKERS", fallback=DEFAULT_SEARCH_WORKERS))
+            _search_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="MetadataSearch")
+        return _search_pool
+
+
+def _provider_deadline(provider_type):
+    return config.getint("SETTINGS", f"METADATA_SEARCH_DEADLINE_{provider_type.upper()}",
+                         fallback=DEFAULT_SEARCH_DEADLINES.get(provider_type, DEFAULT_SEARCH_DEADLINE))
+
+
+def _search_providers_in_order(provider_types, lookup):
+    """Query providers one after another, yielding (provider_type, outcome)."""
+    for provider_type in provider_types:
+        app_logger.info(f"[search-metadata] Trying provider: {provider_type}")
+        yield provider_type, _timed_lookup(provider_type, lookup)
+
+
+def _search_providers_fan_out(provider_types, lookup):
+    """
+    Query all providers at once, yielding (provider_type, outcome) in priority order.
+
+    Each provider's deadline counts from the start of the fan-out; a provider
+    that misses it is treated as having found nothing. When the caller stops
+    iterating, lookups that have not started are cancelled; running ones
+    finish in the background and only update the latency stats.
+    """
+    app = current_app._get_current_object()
+
+    def run(provider_type):
+        with app.app_context():
+            return _timed_lookup(provider_type, lookup)
+
+    pool = _get_search_pool()
+    started = time.monotonic()
+    submitted = [(provider_type, pool.submit(run, provider_type), started + _provider_deadline(provider_type))
+                 for provider_type in provider_types]
+    try:
+        for provider_type, future, deadline in submitted:
+            try:
+                outcome = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FuturesTimeoutError:
+                record_provider_outcome(provider_type, 'timeout')
+                app_logger.warning(f"[search-metadata] {provider_type} missed its "
+                                   f"{_provider_deadline(provider_type)}s deadline")
+                outcome = (None, None, None, None)
+            yield provider_type, outcome
+    finally:
+        for provider_type, future, _ in submitted:
+            if future.cancel():
+                record_provider_outcome(provider_type, 'cancelled')
+
+
 @metadata_bp.route('/api/search-metadata', methods=['POST'])
 def search_metadata():
     """
@@ -2640,6 +2757,10 @@ def search_metadata():
 
     Input: {file_path, file_name, library_id}
     Or for selection follow-up: {file_path, file_name, library_id, selected_match: {provider, volume_id, ...}}
+
+    With METADATA_SEARCH_FANOUT (default on) all providers are queried at once
+    and the highest-priority answer is used as soon as every provider above it
+    has answered or missed its deadline.
     """
     from app import log_file_if_in_data, invalidate_cache_for_path, update_index_on_move
     from database import get_library_providers, set_has_comicinfo
@@ -2795,23 +2916,26 @@ def search_metadata():
 
         app_logger.info(f"[search-metadata] Provider order: {provider_order}")
 
-        # Try each provider in priority order
+        searchable = []
         for provider_type in provider_order:
-            app_logger.info(f"[search-metadata] Trying provider: {provider_type} for {file_name}")
+            if provider_type in ('anilist', 'mangadex'):
+                # Not yet implemented for single-file cascade
+                app_logger.info(f"[search-metadata] {provider_type} not yet implemented for single-file search")
+            elif provider_type != 'metron' or cvinfo_path:
+                searchable.append(provider_type)
 
-            metadata = None
-            img_url = None
-            volume_data = None
-            selection_data = None
+        def lookup(provider_type):
+            return _lookup_single_provider(provider_type, cvinfo_path, series_name, issue_number, year)
 
-            if provider_type == 'metron':
-                if cvinfo_path:
-                    metadata, img_url = _try_metron_single(cvinfo_path, issue_number)
+        if len(searchable) > 1 and config.getboolean("SETTINGS", "METADATA_SEARCH_FANOUT", fallback=True):
+            app_logger.info(f"[search-metadata] Querying {searchable} concurrently for {file_name}")
+            answers = _search_providers_fan_out(searchable, lookup)
+        else:
+            answers = _search_providers_in_order(searchable, lookup)
 
-            elif provider_type == 'comicvine':
-                metadata, img_url, volume_data, selection_data = _try_comicvine_single(
-                    cvinfo_path, series_name, issue_number, year
-                )
+        # Use the answers in provider priority order
+        try:
+            for provider_type, (metadata, img_url, volume_data, selection_data) in answers:
                 if selection_data:
                     # Pause cascade - need user selection
                     selection_data["parsed_filename"] = {
@@ -2822,61 +2946,48 @@ def search_metadata():
                     app_logger.info(f"[search-metadata] {provider_type} requires selection for {file_name}")
                     return jsonify(selection_data)
 
-            elif provider_type == 'gcd':
-                metadata, _, selection_data = _try_gcd_single(series_name, issue_number, year)
-                if selection_data:
-                    selection_data["parsed_filename"] = {
-                        "series_name": series_name,
-                        "issue_number": issue_number,
-                        "year": year
-                    }
-                    app_logger.info(f"[search-metadata] {provider_type} requires selection for {file_name}")
-                    return jsonify(selection_data)
-
-            elif provider_type in ('anilist', 'mangadex'):
-                # Not yet implemented for single-file cascade
-                app_logger.info(f"[search-metadata] {provider_type} not yet implemented for single-file search")
-                continue
-
-            if metadata:
-                app_logger.info(f"[search-metadata] {provider_type} returned metadata for {file_name}")
+                if metadata:
+                    app_logger.info(f"[search-metadata] {provider_type} returned metadata for {file_name}")
 
-                # Apply metadata to file
-                comicinfo_xml = generate_comicinfo_xml(metadata)
-                add_comicinfo_to_cbz(file_path, comicinfo_xml)
-                set_has_comicinfo(file_path)
+                    # Apply metadata to file
+                    comicinfo_xml = generate_comicinfo_xml(metadata)
+                    add_comicinfo_to_cbz(file_path, comicinfo_xml)
+                    set_has_comicinfo(file_path)
 
-                # Auto-move if enabled and we have volume data
-                new_file_path = None
-                if volume_data:
-                    try:
-                        new_file_path = comicvine.auto_move_file(file_path, volume_data, current_app.config)
-                    except Exception as move_error:
-                        app_logger.error(f"[search-metadata] Auto-move failed: {move_error}")
+                    # Auto-move if enabled and we have volume data
+                    new_file_path = None
+                    if volume_data:
+                        try:
+                            new_file_path = comicvine.auto_move_file(file_path, volume_data, current_app.config)
+                        except Exception as move_error:
+                            app_logger.error(f"[search-metadata] Auto-move failed: {move_error}")
 
-                response_data = {
-                    "success": True,
-                    "source": provider_type,
-                    "metadata": metadata,
-                    "image_url": img_url,
-                    "rename_config": {
-                        "enabled": current_app.config.get("ENABLE_CUSTOM_RENAME", False),
-                        "pattern": current_app.config.get("CUSTOM_RENAME_PATTERN", ""),
-                        "auto_rename": current_app.config.get("ENABLE_AUTO_RENAME", False)
+                    response_data = {
+                        "success": True,
+                        "source": provider_type,
+                        "metadata": metadata,
+                        "image_url": img_url,
+                        "rename_config": {
+                            "enabled": current_app.config.get("ENABLE_CUSTOM_RENAME", False),
+                            "pattern": current_app.config.get("CUSTOM_RENAME_PATTERN", ""),
+                            "auto_rename": current_app.config.get("ENABLE_AUTO_RENAME", False)
+                        }
                     }
-                }
 
-                if new_file_path:
-                    response_data["moved"] = True
-                    response_data["new_file_path"] = new_file_path
-                    log_file_if_in_data(new_file_path)
-                    invalidate_cache_for_path(os.path.dirname(file_path))
-                    invalidate_cache_for_path(os.path.dirname(new_file_path))
-                    update_index_on_move(file_path, new_file_path)
+                    if new_file_path:
+                        response_data["moved"] = True
+                        response_data["new_file_path"] = new_file_path
+                        log_file_if_in_data(new_file_path)
+                        invalidate_cache_for_path(os.path.dirname(file_path))
+                        invalidate_cache_for_path(os.path.dirname(new_file_path))
+                        update_index_on_move(file_path, new_file_path)
 
-                return jsonify(response_data)
+                    return jsonify(response_data)
 
-            app_logger.info(f"[search-metadata] {provider_type} found no results, trying next provider")
+                app_logger.info(f"[search-metadata] {provider_type} found no results, trying next provider")
+        finally:
+            # Cancels the fan-out lookups still waiting to start
+            answers.close()
 
         # All providers exhausted
         app_logger.info(f"[search-metadata] No metadata found from any provider for {file_name}")
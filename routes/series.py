@@ -12,7 +12,6 @@ Provides routes for:
 
 import os
 import re
-import threading
 import time
 from datetime import datetime, timedelta
 from flask import Blueprint, request, jsonify, render_template, redirect, url_for, flash, current_app
@@ -26,6 +25,8 @@ from database import (
     get_series_needing_sync, get_wanted_issues, get_libraries
 )
 from helpers.library import get_library_for_path
+from job_queue import enqueue_job
+from wanted_cache import mark_series_dirty
 
 series_bp = Blueprint('series', __name__)
 
@@ -126,7 +127,6 @@ def wanted():
     Fast load from database cache, refresh via API endpoint.
     """
     from database import get_cached_wanted_issues, get_wanted_cache_age
-    from app import refresh_wanted_cache_background
 
     # Load from cache (fast - no file I/O)
     cached = get_cached_wanted_issues()
@@ -136,7 +136,7 @@ def wanted():
     # But skip if we just refreshed recently (prevents infinite reload when no wanted issues exist)
     recently_refreshed = (time.time() - app_state.wanted_last_refresh_time) < 60
     if not cached and not app_state.wanted_refresh_in_progress and not recently_refreshed:
-        threading.Thread(target=refresh_wanted_cache_background, daemon=True).start()
+        enqueue_job('wanted_refresh', concurrency_key='wanted_refresh')
         return render_template('wanted.html',
                              upcoming=[],
                              missing=[],
@@ -809,6 +809,7 @@ def set_issue_manual_status(series_id, issue_number):
 
     success = set_manual_status(series_id, issue_number, status, notes)
     if success:
+        mark_series_dirty([series_id], 'manual_status')
         return jsonify({'success': True, 'status': status, 'notes': notes})
     else:
         return jsonify({'error': 'Failed to set manual status'}), 500
@@ -821,6 +822,7 @@ def delete_issue_manual_status(series_id, issue_number):
 
     success = clear_manual_status(series_id, issue_number)
     if success:
+        mark_series_dirty([series_id], 'manual_status')
         return jsonify({'success': True})
     else:
         return jsonify({'error': 'Failed to clear manual status'}), 500
@@ -844,6 +846,7 @@ def set_bulk_manual_status(series_id):
 
     count = bulk_set_manual_status(series_id, issue_numbers, status, notes)
     if count >= 0:
+        mark_series_dirty([series_id], 'manual_status')
         return jsonify({'success': True, 'count': count, 'status': status})
     else:
         return jsonify({'error': 'Failed to set bulk manual status'}), 500
@@ -862,6 +865,7 @@ def delete_bulk_manual_status(series_id):
 
     count = bulk_clear_manual_status(series_id, issue_numbers)
     if count >= 0:
+        mark_series_dirty([series_id], 'manual_status')
         return jsonify({'success': True, 'count': count})
     else:
         return jsonify({'error': 'Failed to clear bulk manual status'}), 500
@@ -874,7 +878,7 @@ def delete_bulk_manual_status(series_id):
 @series_bp.route('/api/sync/series/<int:series_id>', methods=['POST'])
 def sync_series(series_id):
     """Force sync a specific series from Metron API"""
-    from database import clear_wanted_cache_for_series, get_series_mapping, update_series_desc
+    from database import get_series_mapping, update_series_desc
 
     metron_username = current_app.config.get("METRON_USERNAME", "").strip()
     metron_password = current_app.config.get("METRON_PASSWORD", "").strip()
@@ -907,7 +911,7 @@ def sync_series(series_id):
         save_issues_bulk(all_issues, series_id)
         update_series_sync_time(series_id, len(all_issues))
 
-        clear_wanted_cache_for_series(series_id)
+        mark_series_dirty([series_id], 'sync')
 
         issue_status = {}
         found_count = 0
@@ -1030,8 +1034,6 @@ def api_scan_downloads():
 @series_bp.route('/api/refresh-wanted', methods=['POST'])
 def api_refresh_wanted():
     """Trigger wanted issues cache refresh in background."""
-    from app import refresh_wanted_cache_background
-
     try:
         if app_state.wanted_refresh_in_progress:
             return jsonify({
@@ -1039,9 +1041,10 @@ def api_refresh_wanted():
                 "message": "Refresh already in progress"
             })
 
-        threading.Thread(target=refresh_wanted_cache_background, daemon=True).start()
+        job_id, _ = enqueue_job('wanted_refresh', concurrency_key='wanted_refresh')
         return jsonify({
             "success": True,
+            "job_id": job_id,
             "message": "Wanted issues refresh started"
         })
     except Exception as e:
@@ -1094,8 +1097,6 @@ def api_get_libraries():
 def api_add_library():
     """Add a new library."""
     from database import add_library
-    from app import invalidate_file_index, scan_filesystem_for_sync
-    from database import sync_file_index_incremental, invalidate_browse_cache
 
     data = request.get_json() or {}
     name = data.get('name', '').strip()
@@ -1114,17 +1115,8 @@ def api_add_library():
     try:
         library_id = add_library(name, path)
         if library_id:
-            def rebuild_index_for_new_library():
-                try:
-                    app_logger.info(f"Rebuilding file index after adding library: {name}")
-                    filesystem_entries = scan_filesystem_for_sync()
-                    sync_file_index_incremental(filesystem_entries)
-                    app_logger.info(f"File index rebuilt successfully for new library: {name}")
-                except Exception as e:
-                    app_logger.error(f"Error rebuilding index for new library: {e}")
-
-            thread = threading.Thread(target=rebuild_index_for_new_library, daemon=True)
-            thread.start()
+            app_logger.info(f"Rebuilding file index after adding library: {name}")
+            enqueue_job('file_index_sync', concurrency_key='file_index_sync')
 
             return jsonify({
                 "success": True,
@@ -1151,6 +1143,17 @@ def api_update_library(library_id):
     name = data.get('name')
     path = data.get('path')
     enabled = data.get('enabled')
+    compression_policy = data.get('compression_policy')
+
+    if compression_policy is not None:
+        from compression_policy import POLICIES
+        compression_policy = str(compression_policy).strip().lower()
+        if compression_policy and compression_policy not in POLICIES:
+            return jsonify({
+                "success": False,
+                "error": f"Unknown compression policy: {compression_policy}. "
+                         f"Expected one of: {', '.join(POLICIES)}"
+            }), 400
 
     if path:
         path = path.strip()
@@ -1160,7 +1163,8 @@ def api_update_library(library_id):
             return jsonify({"success": False, "error": f"Path is not a directory: {path}"}), 400
 
     try:
-        if update_library(library_id, name=name, path=path, enabled=enabled):
+        if update_library(library_id, name=name, path=path, enabled=enabled,
+                          compression_policy=compression_policy):
             return jsonify({
                 "success": True,
                 "message": "Library updated successfully"
@@ -1172,6 +1176,31 @@ def api_update_library(library_id):
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+@series_bp.route('/api/libraries/<int:library_id>/compression-benchmark', methods=['GET'])
+def api_library_compression_benchmark(library_id):
+    """Compare CPU time and bytes saved of each compression policy on a sample of the library."""
+    from database import get_library_by_id
+    from compression_policy import benchmark_library, get_policy, DEFAULT_SAMPLE_SIZE
+
+    library = get_library_by_id(library_id)
+    if not library:
+        return jsonify({"success": False, "error": "Library not found"}), 404
+
+    sample_size = request.args.get('sample', DEFAULT_SAMPLE_SIZE, type=int)
+    sample_size = max(1, min(sample_size, 500))
+
+    try:
+        report = benchmark_library(library['path'], sample_size)
+        return jsonify({
+            "success": True,
+            "current_policy": get_policy(library['path']).name,
+            **report
+        })
+    except Exception as e:
+        app_logger.error(f"Error running compression benchmark: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
 @series_bp.route('/api/libraries/<int:library_id>', methods=['DELETE'])
 def api_delete_library(library_id):
     """Delete a library."""
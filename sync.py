@@ -5,6 +5,18 @@ Background sync job for comic-utils series data.
 This script syncs all mapped series from the Metron API to the local database.
 It can be run via Windows Task Scheduler or cron for periodic updates.
 
+sync_series_batch() is also used by the scheduled sync in app.py:
+1. A series synced before only asks Metron for issues modified since its last
+   sync started (one small request instead of every page of its issue list);
+   new series, forced syncs and series without a full sync in the last
+   METRON_FULL_SYNC_DAYS days fetch the full list, which also drops issues
+   deleted on Metron
+2. Series are synced on METRON_SYNC_WORKERS threads, all sharing the Metron
+   rate limiter; once Metron refuses further requests (daily limit) the
+   remaining series are skipped and keep their old sync time
+3. Results are saved METRON_SYNC_BATCH_SIZE series per transaction
+4. Each result carries the seconds spent on the series; the slowest are logged
+
 Usage:
     python sync.py              # Sync all stale series (>24h since last sync)
     python sync.py --hours 12   # Sync series not updated in 12 hours
@@ -14,16 +26,29 @@ Usage:
 
 import argparse
 import sys
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from mokkari.exceptions import RateLimitError
 from app_logging import app_logger
 from models import metron
 from config import config
 from database import (
     init_db, get_series_needing_sync, get_all_mapped_series, get_series_by_id,
     save_issues_bulk, update_series_sync_time, delete_issues_for_series,
-    invalidate_collection_status_for_series
+    invalidate_collection_status_for_series, save_series_sync_batch
 )
 
+DEFAULT_SYNC_WORKERS = 4
+DEFAULT_FULL_SYNC_DAYS = 7
+DEFAULT_SYNC_BATCH_SIZE = 25
+
+# Delta requests reach back a little further than the last sync, in case
+# Metron's clock runs behind ours
+DELTA_OVERLAP = timedelta(minutes=10)
+
+_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
 
 def get_metron_api():
     """Get Metron API client using credentials from config."""
@@ -100,6 +125,172 @@ def sync_series_from_api(api, series_id: int) -> dict:
         }
 
 
+def _parse_timestamp(value):
+    """Parse a SQLite CURRENT_TIMESTAMP value (UTC); None if unset or invalid."""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(str(value)[:19], _TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def needs_full_sync(series: dict, now: datetime, full_days: int) -> bool:
+    """Whether a series must fetch its full issue list instead of a delta."""
+    last_synced = _parse_timestamp(series.get('last_synced_at'))
+    last_full = _parse_timestamp(series.get('last_full_synced_at'))
+    if last_synced is None or last_full is None:
+        return True
+    return now - last_full >= timedelta(days=full_days)
+
+
+def fetch_series_changes(api, series: dict, full: bool, abort: threading.Event) -> dict:
+    """
+    Fetch the issues of one series that changed since its last sync.
+
+    Args:
+        api: Mokkari API client
+        series: Series row (id, name, last_synced_at)
+        full: Fetch the complete issue list instead of a delta
+        abort: Set once Metron refuses further requests; checked before asking
+
+    Returns:
+        dict with series_id, series_name, success, full, issues (the fetched
+        issues), issue_count, seconds and error on failure
+    """
+    series_id = series['id']
+    result = {
+        'series_id': series_id,
+        'series_name': series.get('name') or f'Series {series_id}',
+        'success': False,
+        'full': full,
+        'issues': [],
+        'issue_count': 0,
+    }
+    started = time.monotonic()
+    try:
+        if abort.is_set():
+            result['error'] = 'Skipped: Metron rate limit reached'
+            return result
+
+        if full:
+            series_info = metron.rate_limited_call(lambda: api.series(series_id), f"syncing series {series_id}")
+            if not series_info:
+                result['error'] = 'Series not found in Metron API'
+                return result
+            params = {"series_id": series_id}
+        else:
+            since = _parse_timestamp(series.get('last_synced_at')) - DELTA_OVERLAP
+            params = {"series_id": series_id, "modified_gt": since.isoformat()}
+
+        issues = metron.rate_limited_call(lambda: api.issues_list(params), f"syncing series {series_id}")
+        result['issues'] = list(issues) if issues else []
+        result['issue_count'] = len(result['issues'])
+        result['success'] = True
+
+    except RateLimitError as e:
+        abort.set()
+        result['error'] = 'Metron rate limit reached'
+        app_logger.warning(f"Metron rate limit reached syncing series {series_id}, skipping remaining series: {e}")
+    except Exception as e:
+        result['error'] = 'Metron is currently unavailable' if metron.is_connection_error(e) else str(e)
+        log = app_logger.warning if metron.is_connection_error(e) else app_logger.error
+        log(f"Error syncing series {series_id}: {e}")
+    finally:
+        result['seconds'] = round(time.monotonic() - started, 3)
+    return result
+
+
+def sync_series_batch(api, series_list, force: bool = False) -> list:
+    """
+    Sync several series concurrently, fetching only changes where possible.
+
+    Args:
+        api: Mokkari API client
+        series_list: Series rows from get_all_mapped_series / get_series_needing_sync
+        force: Fetch every series' full issue list
+
+    Returns:
+        List of result dicts (see fetch_series_changes, without issues) in the
+        order of series_list; 'changed' tells whether the series' issues changed
+    """
+    from job_runner import run_jobs
+
+    series_list = list(series_list)
+    if not series_list:
+        return []
+
+    workers = max(1, config.getint("SETTINGS", "METRON_SYNC_WORKERS", fallback=DEFAULT_SYNC_WORKERS))
+    full_days = max(1, config.getint("SETTINGS", "METRON_FULL_SYNC_DAYS", fallback=DEFAULT_FULL_SYNC_DAYS))
+    batch_size = max(1, config.getint("SETTINGS", "METRON_SYNC_BATCH_SIZE", fallback=DEFAULT_SYNC_BATCH_SIZE))
+
+    now = datetime.now(timezone.utc)
+    synced_at = now.strftime(_TIMESTAMP_FORMAT)
+    abort = threading.Event()
+    pending = []
+    pending_lock = threading.Lock()
+
+    def save(results):
+        entries = [{'series_id': r['series_id'], 'issues': r.pop('issues'), 'full': r['full']} for r in results]
+        saved = save_series_sync_batch(entries, synced_at)
+        for r in results:
+            r['success'] = saved >= 0
+            r['changed'] = saved >= 0 and (r['full'] or r['issue_count'] > 0)
+            if saved < 0:
+                r['error'] = 'Failed to save issues'
+
+    def sync_one(series):
+        full = force or needs_full_sync(series, now, full_days)
+        result = fetch_series_changes(api, series, full, abort)
+        if not result['success']:
+            result.pop('issues')
+            result['changed'] = False
+            return result
+
+        ready = None
+        with pending_lock:
+            pending.append(result)
+            if len(pending) >= batch_size:
+                ready = pending[:]
+                pending.clear()
+        if ready:
+            save(ready)
+        return result
+
+    started = time.monotonic()
+    results = run_jobs(
+        sync_one, series_list, name='series_sync',
+        key=lambda series: str(series['id']), label=lambda series: series.get('name') or str(series['id']),
+        workers=workers, use_processes=False, resume=False,
+    )
+    if pending:
+        save(pending)
+
+    results = [
+        r if r is not None else {'series_id': s['id'], 'series_name': s.get('name'), 'success': False,
+                                 'changed': False, 'full': False, 'issue_count': 0, 'seconds': 0.0,
+                                 'error': 'Sync failed'}
+        for s, r in zip(series_list, results)
+    ]
+
+    for r in results:
+        if r['changed']:
+            # Force a re-scan of the collection with the new issue data
+            invalidate_collection_status_for_series(r['series_id'])
+
+    full_count = sum(1 for r in results if r['success'] and r['full'])
+    changed_count = sum(1 for r in results if r['changed'])
+    app_logger.info(
+        f"Synced {len(series_list)} series in {time.monotonic() - started:.1f}s "
+        f"({full_count} full, {len(series_list) - full_count} delta, {changed_count} changed)"
+    )
+    slowest = sorted(results, key=lambda r: r['seconds'], reverse=True)[:5]
+    app_logger.debug("Slowest series syncs: " + ", ".join(
+        f"{r['series_name']} {r['seconds']:.2f}s" for r in slowest
+    ))
+    return results
+
+
 def sync_all_mapped_series(hours: int = 24, force: bool = False):
     """
     Sync all mapped series that need updating.
@@ -129,12 +320,7 @@ def sync_all_mapped_series(hours: int = 24, force: bool = False):
         app_logger.info("No series need syncing")
         return True
 
-    # Sync each series
-    results = []
-    for series in series_list:
-        series_id = series['id']
-        result = sync_series_from_api(api, series_id)
-        results.append(result)
+    results = sync_series_batch(api, series_list, force=force)
 
     # Summary
     success_count = sum(1 for r in results if r['success'])
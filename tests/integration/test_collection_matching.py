@@ -0,0 +1,96 @@
+"""Tests for helpers/collection.match_issues_to_collection backed by file_index."""
+from unittest.mock import patch
+
+import pytest
+
+from tests.factories.db_factories import (
+    create_directory_entry,
+    create_file_index_entry,
+    create_issue,
+    create_series,
+    create_user_preference,
+)
+
+SERIES_DIR = "/data/DC Comics/Batman"
+
+
+def _issues(*numbers):
+    return [{"id": None, "number": number} for number in numbers]
+
+
+@pytest.fixture
+def indexed_series(db_connection):
+    create_directory_entry(name="Batman", path=SERIES_DIR, parent="/data/DC Comics")
+    for name in ("Batman 001 (2020).cbz", "Batman 002 (2020).cbz", "Batman 011 (2020).cbz", "notes.txt"):
+        create_file_index_entry(name=name, parent=SERIES_DIR, modified_at=1000.0)
+    create_user_preference(key="custom_rename_pattern", value="{series_name} {issue_number} ({year})")
+    return db_connection
+
+
+class TestMatchFromIndex:
+
+    def test_matches_without_listing_or_opening_files(self, indexed_series):
+        from helpers.collection import match_issues_to_collection
+
+        with patch("helpers.collection.os.listdir", side_effect=AssertionError("listed folder")), \
+             patch("helpers.collection.extract_comicinfo", return_value=None) as extract:
+            results = match_issues_to_collection(SERIES_DIR, _issues("1", "2", "3", "11"), {"name": "Batman"})
+
+        assert results["1"] == {"found": True, "file_path": f"{SERIES_DIR}/Batman 001 (2020).cbz"}
+        assert results["11"]["file_path"] == f"{SERIES_DIR}/Batman 011 (2020).cbz"
+        assert results["3"] == {"found": False, "file_path": None}
+        # Issue 3 needed ComicInfo; only the unscanned archives were read, once each
+        assert extract.call_count == 3
+
+    def test_uses_scanned_comicinfo_columns(self, indexed_series):
+        from helpers.collection import match_issues_to_collection
+
+        create_file_index_entry(name="scan_0042.cbz", parent=SERIES_DIR, modified_at=1000.0)
+        indexed_series.execute(
+            "UPDATE file_index SET ci_series = 'Batman', ci_number = '42', metadata_scanned_at = ? WHERE path = ?",
+            (2000.0, f"{SERIES_DIR}/scan_0042.cbz"),
+        )
+        indexed_series.commit()
+
+        with patch("helpers.collection.extract_comicinfo", return_value=None):
+            results = match_issues_to_collection(SERIES_DIR, _issues("42"), {"name": "Batman"})
+
+        assert results["42"]["file_path"] == f"{SERIES_DIR}/scan_0042.cbz"
+
+    def test_cache_checked_against_index(self, indexed_series):
+        from helpers.collection import match_issues_to_collection
+
+        series_id = create_series(series_id=100, name="Batman", mapped_path=SERIES_DIR)
+        issue_id = create_issue(issue_id=3001, series_id=series_id, number="1")
+        issues = [{"id": issue_id, "number": "1"}]
+        series = {"id": series_id, "name": "Batman"}
+
+        assert match_issues_to_collection(SERIES_DIR, issues, series)["1"]["found"] is True
+
+        with patch("helpers.collection.os.path.getmtime", side_effect=AssertionError("stat")), \
+             patch("helpers.collection._build_issue_maps") as rescan:
+            match_issues_to_collection(SERIES_DIR, issues, series)
+        rescan.assert_not_called()
+
+        # Changed in the index -> matched again
+        indexed_series.execute("UPDATE file_index SET modified_at = 5000 WHERE name = 'Batman 001 (2020).cbz'")
+        indexed_series.commit()
+        with patch("helpers.collection._build_issue_maps", return_value=({}, {})) as rescan:
+            match_issues_to_collection(SERIES_DIR, issues, series)
+        rescan.assert_called_once()
+
+
+class TestMatchFromDisk:
+
+    def test_unindexed_folder_is_listed(self, db_connection, tmp_path):
+        from helpers.collection import match_issues_to_collection
+
+        for name in ("Saga 001.cbz", "Saga #2.cbr", "Saga 1.MU.cbz"):
+            (tmp_path / name).write_bytes(b"")
+
+        results = match_issues_to_collection(str(tmp_path), _issues("1", "2", "1.MU", "4"), {"name": "Saga"})
+
+        assert results["1"]["file_path"] == str(tmp_path / "Saga 001.cbz")
+        assert results["2"]["file_path"] == str(tmp_path / "Saga #2.cbr")
+        assert results["1.MU"]["file_path"] == str(tmp_path / "Saga 1.MU.cbz")
+        assert results["4"]["found"] is False
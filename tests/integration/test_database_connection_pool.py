@@ -0,0 +1,178 @@
+"""Tests for the pooled connections -- reuse, isolation, writer serialization, stats."""
+import sqlite3
+import threading
+import time
+
+import pytest
+
+
+class TestGetDbConnection:
+
+    def test_closed_connection_is_reused(self, db_connection):
+        from database import get_db_connection, get_db_pool_stats
+
+        conn = get_db_connection()
+        raw = conn._connection()
+        conn.close()
+
+        before = get_db_pool_stats()["hits"]
+        again = get_db_connection()
+        assert again._connection() is raw
+        assert get_db_pool_stats()["hits"] == before + 1
+        again.close()
+
+    def test_nested_connections_are_separate(self, db_connection):
+        from database import get_db_connection
+
+        outer = get_db_connection()
+        inner = get_db_connection()
+        assert outer._connection() is not inner._connection()
+        inner.close()
+        outer.close()
+
+    def test_close_discards_uncommitted_writes(self, db_connection):
+        from database import get_db_connection
+
+        conn = get_db_connection()
+        conn.execute("INSERT INTO user_preferences (key, value) VALUES ('pool_test', '1')")
+        conn.close()
+
+        conn = get_db_connection()
+        row = conn.execute("SELECT value FROM user_preferences WHERE key = 'pool_test'").fetchone()
+        assert row is None
+        assert conn.in_transaction is False
+        conn.close()
+
+    def test_use_after_close_raises(self, db_connection):
+        from database import get_db_connection
+
+        conn = get_db_connection()
+        conn.close()
+        conn.close()  # closing twice is harmless
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+    def test_row_factory_restored(self, db_connection):
+        from database import get_db_connection
+
+        conn = get_db_connection()
+        conn.row_factory = None
+        conn.close()
+
+        conn = get_db_connection()
+        assert conn.row_factory is sqlite3.Row
+        conn.close()
+
+    def test_pragmas_applied(self, db_connection):
+        from database import get_db_connection
+
+        conn = get_db_connection()
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+        assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+        conn.close()
+
+    def test_new_database_path_drops_pool(self, db_connection, tmp_path):
+        from unittest.mock import patch
+        from database import get_db_connection
+
+        conn = get_db_connection()
+        raw = conn._connection()
+        conn.close()
+
+        with patch("database.get_db_path", return_value=str(tmp_path / "other.db")):
+            other = get_db_connection()
+            assert other._connection() is not raw
+            other.close()
+
+
+class TestGetDbWriteConnection:
+
+    def test_writer_is_serialized(self, db_connection):
+        from database import get_db_write_connection, get_db_pool_stats
+
+        writer = get_db_write_connection()
+        acquired = threading.Event()
+
+        def other_writer():
+            conn = get_db_write_connection()
+            acquired.set()
+            conn.close()
+
+        thread = threading.Thread(target=other_writer)
+        thread.start()
+        time.sleep(0.05)
+        assert not acquired.is_set()
+
+        writer.close()
+        thread.join(timeout=5)
+        assert acquired.is_set()
+        assert get_db_pool_stats()["writer_waits"] >= 1
+
+    def test_nested_writer_reuses_the_connection(self, db_connection):
+        from database import get_db_write_connection, get_db_connection
+
+        outer = get_db_write_connection()
+        outer.execute("INSERT INTO user_preferences (key, value) VALUES ('pool_test', '1')")
+        start = time.perf_counter()
+        inner = get_db_write_connection()
+        assert inner._connection() is outer._connection()
+        # Sees (and would otherwise wait on) the outer transaction
+        inner.execute("UPDATE user_preferences SET value = '2' WHERE key = 'pool_test'")
+        inner.close()
+        assert outer.in_transaction
+        outer.commit()
+        outer.close()
+        assert time.perf_counter() - start < 5
+
+        conn = get_db_connection()
+        row = conn.execute("SELECT value FROM user_preferences WHERE key = 'pool_test'").fetchone()
+        assert row["value"] == "2"
+        conn.close()
+
+    def test_writer_released_after_outermost_close(self, db_connection):
+        from database import get_db_write_connection
+
+        outer = get_db_write_connection()
+        get_db_write_connection().close()
+        acquired = threading.Event()
+
+        def other_writer():
+            get_db_write_connection().close()
+            acquired.set()
+
+        thread = threading.Thread(target=other_writer)
+        thread.start()
+        time.sleep(0.05)
+        assert not acquired.is_set()
+        outer.close()
+        thread.join(timeout=5)
+        assert acquired.is_set()
+
+    def test_writer_commits_are_visible(self, db_connection):
+        from database import get_db_write_connection, get_db_connection
+
+        writer = get_db_write_connection()
+        writer.execute("INSERT INTO user_preferences (key, value) VALUES ('pool_test', '1')")
+        writer.commit()
+        writer.close()
+
+        conn = get_db_connection()
+        row = conn.execute("SELECT value FROM user_preferences WHERE key = 'pool_test'").fetchone()
+        assert row["value"] == "1"
+        conn.close()
+
+
+class TestBenchmarkConnectionPool:
+
+    def test_reports_both_modes(self, db_connection):
+        from database import benchmark_connection_pool
+        from tests.factories.db_factories import create_file_index_entry
+
+        for n in range(3):
+            create_file_index_entry(name=f"{n}.cbz", path=f"/data/S/{n}.cbz", parent="/data/S")
+
+        report = benchmark_connection_pool(calls=20)
+        assert report["parent"] == "/data/S"
+        assert report["per_call_connection_us"] > 0 and report["pooled_us"] > 0
+        assert report["pool_hit_rate"] == 1.0
@@ -1,4 +1,5 @@
 """Tests for file_index CRUD -- add, search, sync, directory children, path counts."""
+import os
 import pytest
 import time
 from tests.factories.db_factories import create_file_index_entry, create_directory_entry
@@ -178,6 +179,68 @@ class TestSearchFileIndex:
         assert "parent" in r
 
 
+    def test_issue_number_padding_normalized(self, db_connection):
+        from database import search_file_index
+
+        create_file_index_entry(name="Batman 001 (2020).cbz")
+        create_file_index_entry(name="Batman 018 (2021).cbz")
+
+        assert [r["name"] for r in search_file_index("Batman 1")] == ["Batman 001 (2020).cbz"]
+        assert [r["name"] for r in search_file_index("Batman #18")] == ["Batman 018 (2021).cbz"]
+
+    def test_prefix_match(self, db_connection):
+        from database import search_file_index
+
+        create_file_index_entry(name="Batman 001.cbz")
+        results = search_file_index("bat")
+        assert len(results) == 1
+
+    def test_matches_comicinfo_series(self, db_connection):
+        from database import search_file_index, update_file_metadata, get_db_connection
+
+        path = create_file_index_entry(name="bm_001.cbz")
+        conn = get_db_connection()
+        file_id = conn.execute("SELECT id FROM file_index WHERE path = ?", (path,)).fetchone()[0]
+        conn.close()
+        update_file_metadata(file_id, {"ci_series": "Detective Comics"}, scanned_at=1000.0)
+
+        results = search_file_index("detective")
+        assert [r["path"] for r in results] == [path]
+
+    def test_index_follows_rename_and_delete(self, db_connection):
+        from database import search_file_index, move_file_index_entry, delete_file_index_entry
+
+        old = create_file_index_entry(name="Saga 001.cbz", parent="/data/Image")
+        move_file_index_entry(old, "/data/Image/Paper Girls 001.cbz")
+        assert search_file_index("Saga") == []
+        assert len(search_file_index("Paper Girls")) == 1
+
+        delete_file_index_entry("/data/Image/Paper Girls 001.cbz")
+        assert search_file_index("Paper Girls") == []
+
+    def test_batch_rename(self, db_connection):
+        from database import search_file_index, rename_file_index_entries
+
+        saga = create_file_index_entry(name="Saga 001 (digital).cbz", parent="/data/Image")
+        monstress = create_file_index_entry(name="Monstress 001 (digital).cbz", parent="/data/Image")
+
+        updated = rename_file_index_entries([
+            (saga, "/data/Image/Saga 001.cbz"),
+            (monstress, "/data/Image/Monstress 001.cbz"),
+            ("/data/Image/not indexed.cbz", "/data/Image/Not Indexed.cbz"),
+        ])
+
+        assert updated == 2
+        assert [r["path"] for r in search_file_index("Saga")] == ["/data/Image/Saga 001.cbz"]
+        assert [r["name"] for r in search_file_index("Monstress")] == ["Monstress 001.cbz"]
+
+    def test_build_fts_query(self):
+        from database import build_fts_query
+
+        assert build_fts_query("Saga 1") == build_fts_query("saga #001")
+        assert build_fts_query("!!! ---") is None
+
+
 class TestGetDirectoryChildren:
 
     def test_returns_dirs_and_files(self, db_connection):
@@ -245,11 +308,12 @@ class TestSyncFileIndexIncremental:
     def test_preserves_existing_entries(self, db_connection):
         from database import sync_file_index_incremental
 
-        create_file_index_entry(name="Keep.cbz", path="/data/Keep.cbz", parent="/data")
+        create_file_index_entry(name="Keep.cbz", path="/data/Keep.cbz", parent="/data",
+                                size=100, modified_at=1000.0)
 
         entries = [
             {"name": "Keep.cbz", "path": "/data/Keep.cbz", "type": "file",
-             "size": 100, "parent": "/data", "has_thumbnail": 0, "modified_at": time.time()},
+             "size": 100, "parent": "/data", "has_thumbnail": 0, "modified_at": 1000.0},
         ]
 
         result = sync_file_index_incremental(entries)
@@ -260,12 +324,13 @@ class TestSyncFileIndexIncremental:
     def test_mixed_add_remove_keep(self, db_connection):
         from database import sync_file_index_incremental
 
-        create_file_index_entry(name="Keep.cbz", path="/data/Keep.cbz", parent="/data")
+        create_file_index_entry(name="Keep.cbz", path="/data/Keep.cbz", parent="/data",
+                                size=100, modified_at=1000.0)
         create_file_index_entry(name="Remove.cbz", path="/data/Remove.cbz", parent="/data")
 
         entries = [
             {"name": "Keep.cbz", "path": "/data/Keep.cbz", "type": "file",
-             "size": 100, "parent": "/data", "has_thumbnail": 0, "modified_at": time.time()},
+             "size": 100, "parent": "/data", "has_thumbnail": 0, "modified_at": 1000.0},
             {"name": "New.cbz", "path": "/data/New.cbz", "type": "file",
              "size": 300, "parent": "/data", "has_thumbnail": 0, "modified_at": time.time()},
         ]
@@ -275,6 +340,118 @@ class TestSyncFileIndexIncremental:
         assert result["removed"] == 1
         assert result["unchanged"] == 1
 
+    def test_accepts_streaming_generator(self, db_connection):
+        from database import sync_file_index_incremental
+
+        def stream():
+            for name in ("A.cbz", "B.cbz"):
+                yield {"name": name, "path": f"/data/{name}", "type": "file",
+                       "size": 100, "parent": "/data", "has_thumbnail": 0, "modified_at": time.time()}
+
+        result = sync_file_index_incremental(stream())
+        assert result["added"] == 2
+        assert sorted(result["new_paths"]) == ["/data/A.cbz", "/data/B.cbz"]
+
+    def test_detects_size_and_mtime_changes(self, db_connection):
+        from database import sync_file_index_incremental, update_file_metadata
+
+        create_file_index_entry(name="Grown.cbz", path="/data/Grown.cbz", parent="/data",
+                                size=100, modified_at=1000.0)
+        file_id = db_connection.execute(
+            "SELECT id FROM file_index WHERE path = ?", ("/data/Grown.cbz",)
+        ).fetchone()[0]
+        update_file_metadata(file_id, {"ci_series": "Grown"}, time.time(), has_comicinfo=1)
+
+        entries = [
+            {"name": "Grown.cbz", "path": "/data/Grown.cbz", "type": "file",
+             "size": 250, "parent": "/data", "has_thumbnail": 0, "modified_at": 2000.0},
+        ]
+
+        result = sync_file_index_incremental(entries)
+        assert result["changed"] == 1
+        assert result["unchanged"] == 0
+        assert result["changed_paths"] == ["/data/Grown.cbz"]
+
+        row = db_connection.execute(
+            "SELECT size, modified_at, metadata_scanned_at, has_comicinfo, ci_series "
+            "FROM file_index WHERE path = ?", ("/data/Grown.cbz",)
+        ).fetchone()
+        assert row["size"] == 250
+        assert row["modified_at"] == 2000.0
+        # Flagged for re-scan, existing metadata kept until then
+        assert row["metadata_scanned_at"] is None
+        assert row["has_comicinfo"] is None
+        assert row["ci_series"] == "Grown"
+
+    def test_backfills_missing_mtime_without_rescan(self, db_connection):
+        from database import add_file_index_entry, sync_file_index_incremental, update_file_metadata
+
+        # Added by a caller that did not pass modified_at
+        add_file_index_entry("Tagged.cbz", "/data/Tagged.cbz", "file", size=100, parent="/data")
+        file_id = db_connection.execute(
+            "SELECT id FROM file_index WHERE path = ?", ("/data/Tagged.cbz",)
+        ).fetchone()[0]
+        scanned_at = time.time()
+        update_file_metadata(file_id, {"ci_series": "Tagged"}, scanned_at, has_comicinfo=1)
+
+        entries = [
+            {"name": "Tagged.cbz", "path": "/data/Tagged.cbz", "type": "file",
+             "size": 100, "parent": "/data", "has_thumbnail": 0, "modified_at": 1500.0},
+        ]
+
+        result = sync_file_index_incremental(entries)
+        assert result["changed"] == 0
+        assert result["unchanged"] == 1
+        assert result["changed_paths"] == []
+
+        row = db_connection.execute(
+            "SELECT modified_at, metadata_scanned_at, has_comicinfo FROM file_index WHERE path = ?",
+            ("/data/Tagged.cbz",)
+        ).fetchone()
+        assert row["modified_at"] == 1500.0
+        assert row["metadata_scanned_at"] == scanned_at
+        assert row["has_comicinfo"] == 1
+
+    def test_directory_thumbnail_change(self, db_connection):
+        from database import sync_file_index_incremental
+
+        create_directory_entry(name="Series", path="/data/Series", parent="/data")
+
+        entries = [
+            {"name": "Series", "path": "/data/Series", "type": "directory",
+             "size": None, "parent": "/data", "has_thumbnail": 1, "modified_at": None},
+        ]
+
+        result = sync_file_index_incremental(entries)
+        assert result["changed"] == 1
+        assert result["changed_paths"] == []
+        row = db_connection.execute(
+            "SELECT has_thumbnail FROM file_index WHERE path = ?", ("/data/Series",)
+        ).fetchone()
+        assert row[0] == 1
+
+    def test_applies_in_chunks_with_progress(self, db_connection):
+        from database import sync_file_index_incremental
+
+        for i in range(3):
+            create_file_index_entry(name=f"Old {i}.cbz", path=f"/data/Old {i}.cbz", parent="/data")
+        entries = [
+            {"name": f"New {i}.cbz", "path": f"/data/New {i}.cbz", "type": "file",
+             "size": 10, "parent": "/data", "has_thumbnail": 0, "modified_at": 1.0}
+            for i in range(5)
+        ]
+        progress = []
+
+        result = sync_file_index_incremental(
+            entries, chunk_size=2, progress_callback=lambda *args: progress.append(args)
+        )
+        assert result["added"] == 5
+        assert result["removed"] == 3
+        assert [p for p in progress if p[0] == "add"] == [("add", 2, 5), ("add", 4, 5), ("add", 5, 5)]
+        assert [p for p in progress if p[0] == "remove"] == [("remove", 2, 3), ("remove", 3, 3)]
+        assert [p for p in progress if p[0] == "stage"] == [("stage", 2, None), ("stage", 4, None), ("stage", 5, None)]
+        assert set(result["timings"]) == {"stage", "diff", "apply"}
+
 
 class TestGetPathCounts:
 
@@ -308,6 +485,191 @@ class TestGetPathCounts:
         assert result["/data/B"] == (0, 1)
 
 
+class TestFolderStats:
+
+    def _stats(self, path):
+        from database import get_folder_stats
+        return get_folder_stats(path)
+
+    def test_add_updates_all_ancestors(self, db_connection):
+        create_directory_entry(name="Batman", path="/data/DC/Batman", parent="/data/DC")
+        create_file_index_entry(name="A.cbz", path="/data/DC/Batman/A.cbz",
+                                parent="/data/DC/Batman", size=100)
+        create_file_index_entry(name="B.pdf", path="/data/DC/Batman/B.pdf",
+                                parent="/data/DC/Batman", size=50)
+
+        assert self._stats("/data/DC") == {
+            "folder_count": 1, "file_count": 2, "comic_count": 1,
+            "magazine_count": 1, "total_size": 150,
+        }
+        assert self._stats("/data")["file_count"] == 2
+        assert self._stats("/data/DC/Batman")["folder_count"] == 0
+
+    def test_upsert_applies_size_delta(self, db_connection):
+        create_file_index_entry(name="A.cbz", path="/data/X/A.cbz", parent="/data/X", size=100)
+        create_file_index_entry(name="A.cbz", path="/data/X/A.cbz", parent="/data/X", size=300)
+
+        stats = self._stats("/data/X")
+        assert stats["file_count"] == 1
+        assert stats["total_size"] == 300
+
+    def test_delete_directory_subtracts_subtree(self, db_connection):
+        from database import delete_file_index_entry
+
+        create_directory_entry(name="Series", path="/data/Pub/Series", parent="/data/Pub")
+        create_file_index_entry(name="A.cbz", path="/data/Pub/Series/A.cbz",
+                                parent="/data/Pub/Series", size=10)
+        create_file_index_entry(name="Keep.cbz", path="/data/Pub/Keep.cbz",
+                                parent="/data/Pub", size=5)
+
+        delete_file_index_entry("/data/Pub/Series")
+
+        assert self._stats("/data/Pub/Series") is None
+        assert self._stats("/data/Pub") == {
+            "folder_count": 0, "file_count": 1, "comic_count": 1,
+            "magazine_count": 0, "total_size": 5,
+        }
+
+    def test_batch_delete_with_directories(self, db_connection):
+        from database import delete_file_index_entries
+
+        create_directory_entry(name="S", path="/data/P/S", parent="/data/P")
+        create_file_index_entry(name="a.cbz", path="/data/P/S/a.cbz", parent="/data/P/S")
+        create_file_index_entry(name="b.cbz", path="/data/P/b.cbz", parent="/data/P")
+
+        delete_file_index_entries(["/data/P/S", "/data/P/b.cbz"], dir_paths=["/data/P/S"])
+
+        assert self._stats("/data/P") is None
+        assert self._stats("/data") is None
+
+    def test_update_entry_moves_file_between_folders(self, db_connection):
+        from database import update_file_index_entry
+
+        create_file_index_entry(name="A.cbz", path="/data/Old/A.cbz", parent="/data/Old", size=40)
+
+        ok = update_file_index_entry("/data/Old/A.cbz", name="A.cbz",
+                                     new_path="/data/New/A.cbz", parent="/data/New",
+                                     modified_at=123.0)
+        assert ok is True
+        assert self._stats("/data/Old") is None
+        assert self._stats("/data/New")["total_size"] == 40
+        assert self._stats("/data")["file_count"] == 1
+
+    def test_move_directory_with_children(self, db_connection):
+        from database import move_file_index_entry, get_file_index_entry_by_path
+
+        create_directory_entry(name="Batman", path="/data/DC/Batman", parent="/data/DC")
+        create_directory_entry(name="v1", path="/data/DC/Batman/v1", parent="/data/DC/Batman")
+        create_file_index_entry(name="A.cbz", path="/data/DC/Batman/v1/A.cbz",
+                                parent="/data/DC/Batman/v1", size=7)
+
+        rows = move_file_index_entry("/data/DC/Batman", "/data/Archive/Batman")
+        assert rows == 3
+
+        assert get_file_index_entry_by_path("/data/Archive/Batman/v1/A.cbz") is not None
+        assert self._stats("/data/DC") is None
+        assert self._stats("/data/Archive") == {
+            "folder_count": 2, "file_count": 1, "comic_count": 1,
+            "magazine_count": 0, "total_size": 7,
+        }
+        assert self._stats("/data/Archive/Batman")["folder_count"] == 1
+        assert self._stats("/data/Archive/Batman/v1")["file_count"] == 1
+        assert self._stats("/data")["folder_count"] == 2
+
+    def _wildcard_siblings(self):
+        for folder in ("/data/X_Men", "/data/XaMen", "/data/x_men"):
+            create_directory_entry(name=os.path.basename(folder), path=folder, parent="/data")
+            create_file_index_entry(name="A.cbz", path=f"{folder}/A.cbz", parent=folder, size=3)
+
+    def test_move_directory_leaves_lookalike_siblings(self, db_connection):
+        from database import move_file_index_entry, get_file_index_entry_by_path
+
+        self._wildcard_siblings()
+        assert move_file_index_entry("/data/X_Men", "/data/X-Men") == 2
+
+        assert get_file_index_entry_by_path("/data/XaMen/A.cbz") is not None
+        assert get_file_index_entry_by_path("/data/x_men/A.cbz") is not None
+        assert self._stats("/data/XaMen")["file_count"] == 1
+        assert self._stats("/data/x_men")["file_count"] == 1
+        assert self._stats("/data/X-Men")["file_count"] == 1
+
+    def test_delete_directory_leaves_lookalike_siblings(self, db_connection):
+        from database import delete_file_index_entry, get_file_index_entry_by_path
+
+        self._wildcard_siblings()
+        delete_file_index_entry("/data/X_Men")
+
+        assert get_file_index_entry_by_path("/data/X_Men/A.cbz") is None
+        assert get_file_index_entry_by_path("/data/XaMen/A.cbz") is not None
+        assert get_file_index_entry_by_path("/data/x_men/A.cbz") is not None
+        assert self._stats("/data/XaMen")["total_size"] == 3
+        assert self._stats("/data")["file_count"] == 2
+
+    def test_sync_keeps_stats_in_step(self, db_connection):
+        from database import sync_file_index_incremental
+
+        create_file_index_entry(name="Gone.cbz", path="/data/S/Gone.cbz", parent="/data/S", size=9)
+        create_file_index_entry(name="Grow.cbz", path="/data/S/Grow.cbz", parent="/data/S",
+                                size=10, modified_at=1.0)
+        entries = [
+            {"name": "S", "path": "/data/S", "type": "directory",
+             "size": None, "parent": "/data", "has_thumbnail": 0, "modified_at": None},
+            {"name": "Grow.cbz", "path": "/data/S/Grow.cbz", "type": "file",
+             "size": 25, "parent": "/data/S", "has_thumbnail": 0, "modified_at": 2.0},
+            {"name": "New.cbr", "path": "/data/S/New.cbr", "type": "file",
+             "size": 5, "parent": "/data/S", "has_thumbnail": 0, "modified_at": 2.0},
+        ]
+
+        sync_file_index_incremental(entries, chunk_size=1)
+
+        assert self._stats("/data/S") == {
+            "folder_count": 0, "file_count": 2, "comic_count": 2,
+            "magazine_count": 0, "total_size": 30,
+        }
+        assert self._stats("/data")["folder_count"] == 1
+
+    def test_save_bulk_rebuilds_stats(self, db_connection):
+        from database import save_file_index_to_db
+
+        save_file_index_to_db([
+            {"name": "S", "path": "/data/S", "type": "directory", "parent": "/data"},
+            {"name": "a.cbz", "path": "/data/S/a.cbz", "type": "file", "size": 3, "parent": "/data/S"},
+        ])
+
+        assert self._stats("/data") == {
+            "folder_count": 1, "file_count": 1, "comic_count": 1,
+            "magazine_count": 0, "total_size": 3,
+        }
+
+    def test_init_db_builds_missing_stats(self, db_path, db_connection):
+        from unittest.mock import patch
+
+        create_file_index_entry(name="a.cbz", path="/data/S/a.cbz", parent="/data/S", size=4)
+        db_connection.execute("DROP TABLE folder_stats")
+        db_connection.commit()
+
+        with patch("database.get_db_path", return_value=db_path):
+            from database import init_db
+            assert init_db() is True
+
+        assert self._stats("/data/S")["total_size"] == 4
+
+    def test_matches_recursive_scan(self, db_connection):
+        from database import get_path_counts_batch
+
+        create_directory_entry(name="A", path="/data/A", parent="/data")
+        create_directory_entry(name="B", path="/data/A/B", parent="/data/A")
+        for i in range(3):
+            create_file_index_entry(name=f"{i}.cbz", path=f"/data/A/B/{i}.cbz", parent="/data/A/B")
+        create_file_index_entry(name="x.cbz", path="/data/AB/x.cbz", parent="/data/AB")
+
+        counts = get_path_counts_batch(["/data/A", "/data/A/B", "/data/AB", "/data/A/"])
+        assert counts["/data/A"] == (1, 3)
+        assert counts["/data/A/B"] == (0, 3)
+        assert counts["/data/AB"] == (0, 1)
+        assert counts["/data/A/"] == (1, 3)
+
+
 class TestClearFileIndex:
 
     def test_clears_all(self, db_connection):
@@ -386,3 +748,30 @@ class TestFileMetadata:
         assert row[1] == "Tom King"
         assert row[2] == "DC"
         assert row[3] == 1
+
+
+class TestMetadataScanQueue:
+
+    def test_pages_by_id_and_includes_rar(self, db_connection):
+        from database import get_files_needing_metadata_scan, count_files_needing_metadata_scan
+
+        for name in ("a.cbz", "b.cbr", "c.pdf", "d.zip", "e.rar"):
+            create_file_index_entry(name=name)
+
+        first = get_files_needing_metadata_scan(limit=2)
+        rest = get_files_needing_metadata_scan(limit=10, after_id=first[-1]["id"])
+        names = [f["path"].rsplit("/", 1)[1] for f in first + rest]
+
+        assert names == ["a.cbz", "b.cbr", "d.zip", "e.rar"]
+        assert count_files_needing_metadata_scan() == 4
+
+    def test_scanned_files_excluded(self, db_connection):
+        from database import get_files_needing_metadata_scan, get_metadata_scan_stats, update_file_metadata
+
+        create_file_index_entry(name="a.cbz", modified_at=1000)
+        create_file_index_entry(name="b.cbr", modified_at=1000)
+        file_id = get_files_needing_metadata_scan()[0]["id"]
+        update_file_metadata(file_id, {"ci_series": "Batman"}, 2000, 1)
+
+        assert [f["path"].rsplit("/", 1)[1] for f in get_files_needing_metadata_scan()] == ["b.cbr"]
+        assert get_metadata_scan_stats() == {"total": 2, "scanned": 1, "pending": 1}
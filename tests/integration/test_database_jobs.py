@@ -0,0 +1,123 @@
+"""Tests for the background jobs table -- dedupe, claiming, cancel, retry and recovery."""
+import time
+
+
+class TestCreateJob:
+
+    def test_create_and_get(self, db_connection):
+        from database import create_job, get_job
+
+        job_id, created = create_job("job-1", "rebuild", '{"directory": "/data"}', "rebuild:/data", 3)
+        assert (job_id, created) == ("job-1", True)
+
+        job = get_job("job-1")
+        assert job["status"] == "queued"
+        assert job["max_attempts"] == 3
+        assert job["attempts"] == 0
+
+    def test_duplicate_key_returns_active_job(self, db_connection):
+        from database import create_job
+
+        create_job("job-1", "rebuild", "{}", "rebuild:/data")
+        assert create_job("job-2", "rebuild", "{}", "rebuild:/data") == ("job-1", False)
+
+    def test_key_free_after_finish(self, db_connection):
+        from database import create_job, finish_job
+
+        create_job("job-1", "rebuild", "{}", "rebuild:/data")
+        finish_job("job-1", "completed")
+        assert create_job("job-2", "rebuild", "{}", "rebuild:/data") == ("job-2", True)
+
+    def test_jobs_without_key_never_dedupe(self, db_connection):
+        from database import create_job
+
+        assert create_job("job-1", "convert", "{}")[1] is True
+        assert create_job("job-2", "convert", "{}")[1] is True
+
+
+class TestClaimJob:
+
+    def test_claims_oldest_first(self, db_connection):
+        from database import create_job, claim_next_job
+
+        create_job("job-1", "convert", "{}")
+        create_job("job-2", "convert", "{}")
+
+        job = claim_next_job()
+        assert job["id"] == "job-1"
+        assert job["status"] == "running"
+        assert job["attempts"] == 1
+        assert claim_next_job()["id"] == "job-2"
+        assert claim_next_job() is None
+
+    def test_waits_for_run_after(self, db_connection):
+        from database import create_job, claim_next_job, retry_job
+
+        create_job("job-1", "convert", "{}")
+        claim_next_job()
+        retry_job("job-1", "boom", time.time() + 60)
+
+        assert claim_next_job() is None
+        job = claim_next_job(now=time.time() + 120)
+        assert job["id"] == "job-1"
+        assert job["attempts"] == 2
+
+    def test_skips_excluded_types(self, db_connection):
+        from database import create_job, claim_next_job
+
+        create_job("job-1", "rebuild", "{}")
+        create_job("job-2", "wanted_refresh", "{}")
+
+        assert claim_next_job(exclude_types=["rebuild", "convert"])["id"] == "job-2"
+        assert claim_next_job(exclude_types=["rebuild"]) is None
+        assert claim_next_job()["id"] == "job-1"
+
+
+class TestCancelJob:
+
+    def test_cancel_queued(self, db_connection):
+        from database import create_job, request_job_cancel, claim_next_job
+
+        create_job("job-1", "convert", "{}")
+        assert request_job_cancel("job-1") == "cancelled"
+        assert claim_next_job() is None
+
+    def test_cancel_running_sets_flag(self, db_connection):
+        from database import create_job, claim_next_job, request_job_cancel, update_job_progress
+
+        create_job("job-1", "convert", "{}")
+        claim_next_job()
+        assert update_job_progress("job-1", 1, 10) is False
+        assert request_job_cancel("job-1") == "running"
+        assert update_job_progress("job-1", 2, 10) is True
+
+    def test_cancel_missing(self, db_connection):
+        from database import request_job_cancel
+
+        assert request_job_cancel("nope") is None
+
+
+class TestJobRecovery:
+
+    def test_requeue_interrupted(self, db_connection):
+        from database import create_job, claim_next_job, requeue_interrupted_jobs, get_job
+
+        create_job("job-1", "rebuild", "{}", "rebuild:/data")
+        claim_next_job()
+
+        assert requeue_interrupted_jobs() == 1
+        assert get_job("job-1")["status"] == "queued"
+        assert claim_next_job()["attempts"] == 2
+
+    def test_list_and_prune(self, db_connection):
+        from database import create_job, finish_job, list_jobs, prune_finished_jobs
+
+        create_job("job-1", "rebuild", "{}")
+        create_job("job-2", "convert", "{}")
+        finish_job("job-1", "completed")
+        db_connection.execute("UPDATE jobs SET finished_at = datetime('now', '-30 days') WHERE id = 'job-1'")
+        db_connection.commit()
+
+        assert [j["id"] for j in list_jobs(job_type="convert")] == ["job-2"]
+        assert prune_finished_jobs(7) == 1
+        assert [j["id"] for j in list_jobs()] == ["job-2"]
@@ -280,6 +280,18 @@ class TestLibraryCRUD:
         libs = get_libraries(enabled_only=False)
         assert any(l["id"] == lib_id for l in libs)
 
+    def test_update_compression_policy(self, db_connection):
+        from database import add_library, update_library, get_library_by_id
+
+        lib_id = add_library("Comics", "/data/comics")
+        assert get_library_by_id(lib_id)["compression_policy"] is None
+
+        assert update_library(lib_id, compression_policy="store") is True
+        assert get_library_by_id(lib_id)["compression_policy"] == "store"
+
+        assert update_library(lib_id, compression_policy="") is True
+        assert get_library_by_id(lib_id)["compression_policy"] is None
+
     def test_get_by_id(self, db_connection):
         from database import add_library, get_library_by_id
 
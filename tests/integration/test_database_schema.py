@@ -40,6 +40,7 @@ class TestTablesExist:
         "weekly_packs_config",
         "weekly_packs_history",
         "wanted_issues",
+        "wanted_dirty_series",
         "browse_cache",
         "favorite_series",
         "reading_lists",
@@ -313,6 +313,56 @@ class TestWantedIssues:
         clear_wanted_cache_all()
         assert get_cached_wanted_issues() == []
 
+    def test_prune_keeps_listed_series(self, db_connection):
+        from database import save_wanted_issues_for_series, prune_wanted_cache, get_cached_wanted_issues
+
+        pub_id = create_publisher()
+        keep_id = create_series(publisher_id=pub_id)
+        drop_id = create_series(publisher_id=pub_id)
+        for series_id, issue_id in ((keep_id, 9001), (drop_id, 9002)):
+            save_wanted_issues_for_series(series_id, "X", 2020, [
+                {"id": issue_id, "number": "1", "name": "X",
+                 "store_date": None, "cover_date": None, "image": None},
+            ])
+
+        assert prune_wanted_cache([keep_id]) == 1
+        assert {item["series_id"] for item in get_cached_wanted_issues()} == {keep_id}
+
+
+class TestWantedDirtySeries:
+
+    def test_mark_and_get(self, db_connection):
+        from database import mark_wanted_series_dirty, get_wanted_dirty_series
+
+        assert mark_wanted_series_dirty([1, 2, 2], "sync") == 2
+        assert set(get_wanted_dirty_series()) == {1, 2}
+
+    def test_clear_keeps_marks_made_later(self, db_connection):
+        from database import mark_wanted_series_dirty, get_wanted_dirty_series, clear_wanted_dirty_series
+
+        mark_wanted_series_dirty([1, 2], "sync")
+        marks = get_wanted_dirty_series()
+        # Series 2 is marked again while a refresh works on the first marks
+        marks[2] -= 1
+
+        clear_wanted_dirty_series(marks)
+        assert set(get_wanted_dirty_series()) == {2}
+
+    def test_series_ids_for_paths(self, db_connection):
+        from database import get_series_ids_for_paths
+
+        pub_id = create_publisher()
+        series_id = create_series(publisher_id=pub_id, mapped_path="/data/DC/Batman")
+        other_id = create_series(publisher_id=pub_id, mapped_path="/data/DC/Superman")
+
+        assert get_series_ids_for_paths(["/data/DC/Batman/Batman 001.cbz"]) == {series_id}
+        assert get_series_ids_for_paths(["/data/DC/Batman"]) == {series_id}
+        assert get_series_ids_for_paths(["/data/Marvel/X-Men 001.cbz"]) == set()
+        assert get_series_ids_for_paths([
+            "/data/DC/Batman/Batman 001.cbz", "/data/DC/Batman/Batman 002.cbz",
+            "/data/DC/Superman/Superman 001.cbz", "/data/Marvel/X-Men 001.cbz",
+        ]) == {series_id, other_id}
+
 
 class TestManualIssueStatus:
 
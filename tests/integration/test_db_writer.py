@@ -0,0 +1,172 @@
+"""Tests for db_writer.py -- batching, coalescing, backpressure, flush and shutdown."""
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def write_queue(db_connection):
+    from db_writer import WriteQueue
+
+    queue = WriteQueue(batch_size=50, flush_ms=20, max_pending=100)
+    queue.start()
+    yield queue
+    queue.stop()
+
+
+def _position(comic_path):
+    from database import get_reading_position
+    return get_reading_position(comic_path)
+
+
+def _save(c, comic_path, page):
+    from database import _save_reading_position
+    _save_reading_position(c, comic_path, page)
+
+
+class TestWriteQueue:
+
+    def test_writes_synchronously_when_not_started(self, db_connection):
+        from db_writer import WriteQueue
+
+        queue = WriteQueue()
+        queue.submit(_save, "/data/a.cbz", 3)
+        assert _position("/data/a.cbz")["page_number"] == 3
+
+    def test_groups_writes_into_batches(self, write_queue):
+        for i in range(120):
+            write_queue.submit(_save, f"/data/{i}.cbz", i)
+        assert write_queue.flush(timeout=5)
+
+        stats = write_queue.get_stats()
+        assert stats["written"] == 120
+        assert stats["batches"] < 120
+        assert _position("/data/119.cbz")["page_number"] == 119
+
+    def test_same_key_is_coalesced(self, write_queue):
+        write_queue.flush_ms = 60000  # nothing is written between the submits
+        for page in range(10):
+            write_queue.submit(_save, "/data/a.cbz", page, key=("pos", "/data/a.cbz"))
+        write_queue.flush(timeout=5)
+
+        assert _position("/data/a.cbz")["page_number"] == 9
+        assert write_queue.get_stats()["coalesced"] >= 1
+
+    def test_written_after_flush_interval(self, write_queue):
+        write_queue.submit(_save, "/data/a.cbz", 1)
+        deadline = time.time() + 5
+        while _position("/data/a.cbz") is None and time.time() < deadline:
+            time.sleep(0.01)
+        assert _position("/data/a.cbz")["page_number"] == 1
+
+    def test_failing_operation_does_not_lose_batch(self, write_queue):
+        def bad(c):
+            c.execute("INSERT INTO no_such_table VALUES (1)")
+
+        write_queue.submit(_save, "/data/a.cbz", 1)
+        write_queue.submit(bad)
+        write_queue.submit(_save, "/data/b.cbz", 2)
+        write_queue.flush(timeout=5)
+
+        assert _position("/data/a.cbz")["page_number"] == 1
+        assert _position("/data/b.cbz")["page_number"] == 2
+        assert write_queue.get_stats()["errors"] == 1
+
+    def test_producers_block_when_full(self, db_connection):
+        from db_writer import WriteQueue
+
+        release = threading.Event()
+
+        def slow(c):
+            release.wait(5)
+
+        queue = WriteQueue(batch_size=1, flush_ms=1, max_pending=1)
+        queue.start()
+        try:
+            queue.submit(slow)        # taken by the writer, blocks it
+            time.sleep(0.05)
+            queue.submit(_save, "/data/a.cbz", 1)  # fills the queue
+
+            done = threading.Event()
+
+            def producer():
+                queue.submit(_save, "/data/b.cbz", 2)
+                done.set()
+
+            threading.Thread(target=producer).start()
+            time.sleep(0.05)
+            assert not done.is_set()
+
+            release.set()
+            assert done.wait(5)
+            assert queue.get_stats()["producer_waits"] >= 1
+        finally:
+            release.set()
+            queue.stop()
+
+    def test_stop_flushes_pending(self, db_connection):
+        from db_writer import WriteQueue
+
+        queue = WriteQueue(batch_size=1000, flush_ms=60000, max_pending=1000)
+        queue.start()
+        queue.submit(_save, "/data/a.cbz", 7)
+        queue.stop()
+
+        assert _position("/data/a.cbz")["page_number"] == 7
+        assert not queue.is_running()
+
+
+class TestQueuedHelpers:
+
+    def test_queue_file_index_entry_and_metadata(self, db_connection):
+        from db_writer import queue_file_index_entry, queue_file_metadata
+        from database import get_file_index_entry_by_path, search_file_index
+
+        queue_file_index_entry("Saga 001.cbz", "/data/Image/Saga 001.cbz", "file", size=10, parent="/data/Image")
+        entry = get_file_index_entry_by_path("/data/Image/Saga 001.cbz")
+        assert entry is not None
+
+        queue_file_metadata(entry["id"], {"ci_writer": "Vaughan"}, 1000.0, has_comicinfo=1)
+        assert [r["path"] for r in search_file_index("Vaughan")] == ["/data/Image/Saga 001.cbz"]
+
+    def test_thumbnail_status_not_lost_to_coalescing(self, db_connection):
+        from db_writer import WriteQueue
+        from database import _set_thumbnail_job_status, get_db_connection
+
+        queue = WriteQueue(batch_size=1000, flush_ms=60000, max_pending=1000)
+        queue.start()
+        try:
+            # Mirrors queue_thumbnail_status(): creation is unkeyed, status updates are keyed
+            queue.submit(_set_thumbnail_job_status, "/data/a.cbz", "processing", 123.0)
+            queue.submit(_set_thumbnail_job_status, "/data/a.cbz", "completed", None, key=("thumbnail_job", "/data/a.cbz"))
+            queue.flush(timeout=5)
+        finally:
+            queue.stop()
+
+        conn = get_db_connection()
+        row = conn.execute("SELECT status, file_mtime FROM thumbnail_jobs WHERE path = ?", ("/data/a.cbz",)).fetchone()
+        conn.close()
+        assert row["status"] == "completed"
+        assert row["file_mtime"] == 123.0
+
+    def test_scanned_at_does_not_replace_queued_metadata(self, db_connection):
+        import db_writer
+        from db_writer import WriteQueue, queue_file_metadata, queue_metadata_scanned_at
+        from database import get_file_index_entry_by_path, search_file_index
+
+        db_writer.queue_file_index_entry("Saga 001.cbz", "/data/Image/Saga 001.cbz", "file", parent="/data/Image")
+        file_id = get_file_index_entry_by_path("/data/Image/Saga 001.cbz")["id"]
+
+        queue = WriteQueue(batch_size=1000, flush_ms=60000, max_pending=1000)
+        queue.start()
+        try:
+            with pytest.MonkeyPatch.context() as mp:
+                mp.setattr(db_writer, "write_queue", queue)
+                queue_file_metadata(file_id, {"ci_writer": "Vaughan"}, 1000.0, has_comicinfo=1)
+                queue_metadata_scanned_at(file_id, 2000.0)
+                queue.flush(timeout=5)
+        finally:
+            queue.stop()
+
+        assert [r["path"] for r in search_file_index("Vaughan")] == ["/data/Image/Saga 001.cbz"]
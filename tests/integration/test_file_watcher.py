@@ -0,0 +1,183 @@
+"""Tests for file_watcher.DebouncedFileHandler -- batched event pipeline."""
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+from watchdog.events import (
+    DirCreatedEvent,
+    DirDeletedEvent,
+    DirMovedEvent,
+    FileCreatedEvent,
+    FileModifiedEvent,
+    FileMovedEvent,
+)
+
+
+@pytest.fixture
+def handler(db_connection):
+    from file_watcher import DebouncedFileHandler
+
+    handler = DebouncedFileHandler(debounce_seconds=60)
+    with patch("file_watcher.queue_files_for_scan") as scan, \
+         patch("file_watcher.mark_paths_dirty") as mark_dirty:
+        handler.scan = scan
+        handler.mark_dirty = mark_dirty
+        yield handler
+    if handler.debounce_timer:
+        handler.debounce_timer.cancel()
+
+
+def _comic(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"PK")
+    return path
+
+
+def _indexed(path):
+    from database import get_file_index_entry_by_path
+
+    return get_file_index_entry_by_path(path) is not None
+
+
+class TestBurst:
+
+    def test_files_and_new_folder_in_one_write(self, handler, tmp_path):
+        loose = _comic(str(tmp_path / "Saga 001.cbz"))
+        pack = tmp_path / "Pack"
+        nested = [_comic(str(pack / "Batman" / f"Batman {n:03d}.cbz")) for n in range(1, 4)]
+        (pack / "cover.jpg").write_bytes(b"x")
+
+        handler.on_created(FileCreatedEvent(loose))
+        handler.on_modified(FileModifiedEvent(loose))
+        handler.on_created(DirCreatedEvent(str(pack)))
+
+        with patch("file_watcher.queue_file_index_batch",
+                   wraps=__import__("db_writer").queue_file_index_batch) as write:
+            handler.flush()
+
+        write.assert_called_once()
+        assert all(_indexed(p) for p in [loose, str(pack), str(pack / "Batman"), *nested])
+        assert not _indexed(str(pack / "cover.jpg"))
+        handler.scan.assert_called_once()
+        assert len(handler.scan.call_args[0][0]) == 4
+
+    def test_created_then_moved_indexes_destination_only(self, handler, tmp_path):
+        src = _comic(str(tmp_path / "download.cbz"))
+        dest = str(tmp_path / "Saga 001.cbz")
+        handler.on_created(FileCreatedEvent(src))
+        os.rename(src, dest)
+        handler.on_moved(FileMovedEvent(src, dest))
+
+        handler.flush()
+
+        assert _indexed(dest)
+        assert not _indexed(src)
+
+    def test_modified_then_moved_moves_indexed_row(self, handler, tmp_path):
+        from database import get_file_index_entry_by_path
+
+        src = _comic(str(tmp_path / "Saga 001.cbz"))
+        handler.on_created(FileCreatedEvent(src))
+        handler.flush()
+        row_id = get_file_index_entry_by_path(src)["id"]
+
+        with open(src, "ab") as f:
+            f.write(b"more")
+        os.utime(src, (time.time() + 10, time.time() + 10))
+        dest = str(tmp_path / "Saga (2012) 001.cbz")
+        handler.on_modified(FileModifiedEvent(src))
+        os.rename(src, dest)
+        handler.on_moved(FileMovedEvent(src, dest))
+        handler.scan.reset_mock()
+        handler.flush()
+
+        assert not _indexed(src)
+        moved = get_file_index_entry_by_path(dest)
+        assert moved["id"] == row_id
+        assert moved["modified_at"] == os.path.getmtime(dest)
+        handler.scan.assert_called_once()
+
+
+class TestDirectories:
+
+    def test_folder_move_keeps_rows_and_children(self, handler, tmp_path):
+        old_dir = tmp_path / "Batman"
+        files = [_comic(str(old_dir / f"Batman {n:03d}.cbz")) for n in (1, 2)]
+        handler.on_created(DirCreatedEvent(str(old_dir)))
+        handler.flush()
+
+        new_dir = tmp_path / "Batman (2016)"
+        os.rename(old_dir, new_dir)
+        handler.on_moved(DirMovedEvent(str(old_dir), str(new_dir)))
+        for path in files:
+            handler.on_moved(FileMovedEvent(path, path.replace(str(old_dir), str(new_dir))))
+        handler.scan.reset_mock()
+        handler.flush()
+
+        assert _indexed(str(new_dir))
+        assert all(_indexed(p.replace(str(old_dir), str(new_dir))) for p in files)
+        assert not any(_indexed(p) for p in [str(old_dir), *files])
+        handler.scan.assert_not_called()
+
+    def test_folder_delete_removes_children(self, handler, tmp_path):
+        folder = tmp_path / "Saga"
+        files = [_comic(str(folder / f"Saga {n:03d}.cbz")) for n in (1, 2)]
+        handler.on_created(DirCreatedEvent(str(folder)))
+        handler.flush()
+
+        from directory_cache import directory_cache, list_directory
+        list_directory(str(tmp_path))
+        list_directory(str(folder))
+
+        handler.on_deleted(DirDeletedEvent(str(folder)))
+        handler.flush()
+
+        assert not any(_indexed(p) for p in [str(folder), *files])
+        assert not directory_cache.contains(str(tmp_path))
+        assert not directory_cache.contains(str(folder))
+        handler.mark_dirty.assert_called_with([str(folder)])
+
+
+class TestDirectoryListings:
+
+    @pytest.mark.parametrize("name", ["Saga.pdf", "Saga.zip", "notes.txt", "missing.txt"])
+    def test_non_comic_files_invalidate_listing(self, handler, tmp_path, name):
+        from directory_cache import directory_cache, list_directory
+
+        list_directory(str(tmp_path))
+        (tmp_path / name).write_text("x")
+        handler.on_created(FileCreatedEvent(str(tmp_path / name)))
+        handler.flush()
+
+        assert not directory_cache.contains(str(tmp_path))
+        assert not _indexed(str(tmp_path / name))
+        handler.scan.assert_not_called()
+
+    def test_hidden_files_keep_listing(self, handler, tmp_path):
+        from directory_cache import directory_cache, list_directory
+
+        list_directory(str(tmp_path))
+        (tmp_path / ".DS_Store").write_text("x")
+        handler.on_created(FileCreatedEvent(str(tmp_path / ".DS_Store")))
+        handler.flush()
+
+        assert directory_cache.contains(str(tmp_path))
+
+    def test_watcher_dying_without_stop_expires_listings(self, tmp_path):
+        from directory_cache import directory_cache, list_directory
+        from file_watcher import FileWatcher
+
+        watcher = FileWatcher(str(tmp_path))
+        assert watcher.start()
+        try:
+            list_directory(str(tmp_path))
+            assert directory_cache.get(str(tmp_path)) is not None
+
+            # Observer thread ends without FileWatcher.stop() running
+            watcher.observer.stop()
+            watcher.observer.join(timeout=5)
+            assert directory_cache.get(str(tmp_path)) is None
+        finally:
+            directory_cache.remove_watched_root(str(tmp_path))
@@ -0,0 +1,123 @@
+"""Tests for sync.sync_series_batch -- concurrent delta sync of mapped series."""
+import threading
+from unittest.mock import patch
+
+import pytest
+from mokkari.exceptions import RateLimitError
+
+from tests.factories.db_factories import create_issue, create_publisher, create_series
+
+
+class FakeMetron:
+    """Minimal Mokkari client: series() and issues_list() from dicts."""
+
+    def __init__(self, issues_by_series, daily_limit_for=()):
+        self.issues_by_series = issues_by_series
+        self.daily_limit_for = set(daily_limit_for)
+        self.series_calls = []
+        self.issues_calls = []
+        self._lock = threading.Lock()
+
+    def series(self, series_id):
+        with self._lock:
+            self.series_calls.append(series_id)
+        return {"id": series_id}
+
+    def issues_list(self, params):
+        with self._lock:
+            self.issues_calls.append(dict(params))
+        if params["series_id"] in self.daily_limit_for:
+            raise RateLimitError("daily limit", retry_after=86400)
+        return list(self.issues_by_series.get(params["series_id"], []))
+
+
+def _issue(issue_id, number):
+    return {"id": issue_id, "number": number, "name": None, "cover_date": None,
+            "store_date": None, "image": None, "resource_url": None, "cv_id": None}
+
+
+@pytest.fixture(autouse=True)
+def _unthrottled_metron():
+    from models.providers.rate_limit import TokenBucket
+
+    bucket = TokenBucket("metron", 6000)
+    with patch("models.providers.rate_limit.get_rate_limiter", return_value=bucket):
+        yield
+
+
+@pytest.fixture
+def mapped_series(db_connection):
+    pub_id = create_publisher()
+    return [
+        create_series(series_id=100, name="Batman", publisher_id=pub_id, mapped_path="/data/Batman"),
+        create_series(series_id=200, name="Superman", publisher_id=pub_id, mapped_path="/data/Superman"),
+    ]
+
+
+def _series_row(series_id):
+    from database import get_series_by_id
+
+    return get_series_by_id(series_id)
+
+
+class TestSyncSeriesBatch:
+
+    def test_first_sync_fetches_full_lists(self, mapped_series):
+        from database import get_all_mapped_series, get_issues_for_series
+        from sync import sync_series_batch
+
+        api = FakeMetron({100: [_issue(1, "1"), _issue(2, "2")], 200: [_issue(3, "1")]})
+        results = sync_series_batch(api, get_all_mapped_series())
+
+        assert [r["series_id"] for r in results] == [100, 200]
+        assert all(r["success"] and r["full"] and r["changed"] for r in results)
+        assert all("seconds" in r for r in results)
+        assert sorted(api.series_calls) == [100, 200]
+        assert all("modified_gt" not in params for params in api.issues_calls)
+        assert [i["id"] for i in get_issues_for_series(100)] == [1, 2]
+        assert _series_row(100)["issue_count"] == 2
+        assert _series_row(100)["last_full_synced_at"] is not None
+
+    def test_next_sync_asks_only_for_changes(self, mapped_series):
+        from database import get_all_mapped_series, get_issues_for_series
+        from sync import sync_series_batch
+
+        sync_series_batch(FakeMetron({100: [_issue(1, "1")], 200: []}), get_all_mapped_series())
+
+        api = FakeMetron({100: [_issue(2, "2")], 200: []})
+        results = sync_series_batch(api, get_all_mapped_series())
+
+        assert api.series_calls == []
+        assert all("modified_gt" in params for params in api.issues_calls)
+        assert {r["series_id"]: (r["full"], r["changed"]) for r in results} == {
+            100: (False, True), 200: (False, False),
+        }
+        # Delta results are added to the cached list, not replacing it
+        assert [i["id"] for i in get_issues_for_series(100)] == [1, 2]
+        assert _series_row(100)["issue_count"] == 2
+
+    def test_force_drops_issues_deleted_on_metron(self, mapped_series):
+        from database import get_all_mapped_series, get_issues_for_series
+        from sync import sync_series_batch
+
+        create_issue(issue_id=9, series_id=100, number="9")
+        results = sync_series_batch(FakeMetron({100: [_issue(1, "1")], 200: []}), get_all_mapped_series(),
+                                    force=True)
+
+        assert results[0]["full"]
+        assert [i["id"] for i in get_issues_for_series(100)] == [1]
+
+    def test_daily_limit_skips_remaining_series(self, mapped_series, monkeypatch):
+        from config import config
+        from database import get_all_mapped_series
+        from sync import sync_series_batch
+
+        monkeypatch.setattr(config, "getint", lambda section, key, fallback=None: 1
+                            if key == "METRON_SYNC_WORKERS" else fallback)
+        api = FakeMetron({200: [_issue(3, "1")]}, daily_limit_for={100})
+        results = sync_series_batch(api, get_all_mapped_series())
+
+        assert [r["success"] for r in results] == [False, False]
+        assert [params["series_id"] for params in api.issues_calls] == [100]
+        assert "rate limit" in results[1]["error"]
+        assert _series_row(200)["last_synced_at"] is None
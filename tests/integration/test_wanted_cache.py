@@ -0,0 +1,91 @@
+"""Tests for wanted_cache -- incremental refresh of the wanted issues cache."""
+from unittest.mock import patch
+
+import pytest
+
+from tests.factories.db_factories import create_issue, create_publisher, create_series
+
+
+@pytest.fixture
+def two_series(db_connection, tmp_path):
+    pub_id = create_publisher()
+    ids = []
+    for name in ("Batman", "Superman"):
+        folder = tmp_path / name
+        folder.mkdir()
+        series_id = create_series(name=name, publisher_id=pub_id, mapped_path=str(folder))
+        for number in ("1", "2"):
+            create_issue(series_id=series_id, number=number)
+        ids.append(series_id)
+    return ids
+
+
+def _found(numbers):
+    def match(folder, issues, series):
+        return {str(i.number): {"found": str(i.number) in numbers, "file_path": None} for i in issues}
+    return match
+
+
+def _wanted_numbers():
+    from database import get_cached_wanted_issues
+
+    result = {}
+    for item in get_cached_wanted_issues():
+        result.setdefault(item["series_id"], set()).add(str(item["issue_number"]))
+    return result
+
+
+class TestRefreshWantedCache:
+
+    def test_full_refresh(self, two_series):
+        from wanted_cache import refresh_wanted_cache
+
+        with patch("helpers.collection.match_issues_to_collection", side_effect=_found({"1"})):
+            stats = refresh_wanted_cache(full=True)
+
+        assert stats == {"series": 2, "wanted": 2}
+        assert _wanted_numbers() == {two_series[0]: {"2"}, two_series[1]: {"2"}}
+
+    def test_incremental_refreshes_only_dirty_series(self, two_series):
+        from database import get_wanted_dirty_series
+        from wanted_cache import mark_series_dirty, refresh_wanted_cache
+
+        batman, superman = two_series
+        with patch("helpers.collection.match_issues_to_collection", side_effect=_found(set())):
+            refresh_wanted_cache(full=True)
+
+        mark_series_dirty([batman], "files", schedule=False)
+        with patch("helpers.collection.match_issues_to_collection", side_effect=_found({"1", "2"})) as match:
+            stats = refresh_wanted_cache(full=False)
+
+        assert match.call_count == 1
+        assert stats == {"series": 1, "wanted": 0}
+        assert _wanted_numbers() == {superman: {"1", "2"}}
+        assert get_wanted_dirty_series() == {}
+
+    def test_marking_schedules_one_refresh_job(self, two_series):
+        from wanted_cache import mark_paths_dirty
+
+        with patch("job_queue.enqueue_job", return_value=(1, True)) as enqueue:
+            assert mark_paths_dirty(["/nowhere/file.cbz"]) == 0
+            enqueue.assert_not_called()
+
+        from database import get_all_mapped_series
+
+        folder = next(s["mapped_path"] for s in get_all_mapped_series() if s["id"] == two_series[0])
+        with patch("job_queue.enqueue_job", return_value=(1, True)) as enqueue:
+            assert mark_paths_dirty([f"{folder}/Batman 003.cbz"]) == 1
+        enqueue.assert_called_once_with("wanted_refresh", {"full": False}, concurrency_key="wanted_refresh:dirty")
+
+    def test_marking_resolves_paths_in_one_query(self, two_series):
+        import wanted_cache
+        from database import get_all_mapped_series, get_wanted_dirty_series
+
+        folders = [s["mapped_path"] for s in get_all_mapped_series()]
+        paths = [f"{folder}/Issue {n:03d}.cbz" for folder in folders for n in range(50)]
+
+        with patch("wanted_cache.get_series_ids_for_paths", wraps=wanted_cache.get_series_ids_for_paths) as lookup, \
+             patch("job_queue.enqueue_job", return_value=(1, True)):
+            assert wanted_cache.mark_paths_dirty(paths) == 2
+        lookup.assert_called_once()
+        assert set(get_wanted_dirty_series()) == set(two_series)
@@ -7,6 +7,17 @@ from typing import Optional
 from models.providers.base import ProviderCredentials, SearchResult, IssueResult, ProviderType
 
 
+# ---------------------------------------------------------------------------
+# Provider cache
+# ---------------------------------------------------------------------------
+
+@pytest.fixture(autouse=True)
+def _no_provider_cache():
+    """Provider tests exercise the API adapters; keep cached results out of them."""
+    with patch("models.providers.cache.is_provider_cache_enabled", return_value=False):
+        yield
+
+
 # ---------------------------------------------------------------------------
 # Common credential fixtures
 # ---------------------------------------------------------------------------
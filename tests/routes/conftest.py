@@ -155,6 +155,7 @@ def app(db_connection, tmp_path):
     from routes.downloads import downloads_bp
     from routes.series import series_bp
     from routes.metadata import metadata_bp
+    from routes.jobs import jobs_bp
 
     test_app.register_blueprint(favorites_bp)
     test_app.register_blueprint(reading_lists_bp)
@@ -164,6 +165,7 @@ def app(db_connection, tmp_path):
     test_app.register_blueprint(downloads_bp)
     test_app.register_blueprint(series_bp)
     test_app.register_blueprint(metadata_bp)
+    test_app.register_blueprint(jobs_bp)
 
     # Stub routes that app.py defines but aren't in any blueprint.
     # Templates reference these via url_for().
@@ -68,6 +68,22 @@ class TestFolderSize:
         assert data["comic_count"] == 1
         assert data["magazine_count"] == 1
 
+    def test_indexed_path_uses_folder_stats(self, client, tmp_path):
+        from database import add_file_index_entry
+
+        d = tmp_path / "library"
+        d.mkdir()
+        # Stats come from the index, not the (empty) directory on disk
+        add_file_index_entry("a.cbz", f"{d}/a.cbz", "file", size=1000, parent=str(d))
+        add_file_index_entry("b.pdf", f"{d}/b.pdf", "file", size=24, parent=str(d))
+
+        resp = client.get(f"/folder-size?path={d}")
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert data["size"] == 1024
+        assert data["comic_count"] == 1
+        assert data["magazine_count"] == 1
+
     def test_invalid_path(self, client):
         resp = client.get("/folder-size?path=/nonexistent")
         assert resp.status_code == 400
@@ -107,6 +123,24 @@ class TestRename:
         assert resp.status_code == 403
 
 
+class TestRenameDirectory:
+
+    @patch("routes.files.is_critical_path", return_value=False)
+    def test_dry_run_lists_renames_only(self, mock_crit, client, tmp_path):
+        (tmp_path / "Comic Name 051 (2018) (digital).cbz").write_bytes(b"data")
+
+        with patch("cbz_ops.rename.load_custom_rename_config", return_value=(False, "")), \
+             patch("cbz_ops.rename.try_rule_engine", return_value=None):
+            resp = client.post("/rename-directory",
+                               json={"directory": str(tmp_path), "dry_run": True})
+
+        data = resp.get_json()
+        assert resp.status_code == 200
+        assert data["dry_run"] is True
+        assert [r["new_path"] for r in data["renames"]] == [str(tmp_path / "Comic Name 051 (2018).cbz")]
+        assert (tmp_path / "Comic Name 051 (2018) (digital).cbz").exists()
+
+
 class TestCustomRename:
 
     @patch("routes.files.is_critical_path", return_value=False)
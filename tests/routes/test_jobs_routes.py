@@ -0,0 +1,57 @@
+"""Tests for routes/jobs.py -- job listing, starting and cancelling."""
+import pytest
+from unittest.mock import patch
+
+
+class TestListJobs:
+
+    def test_empty(self, client):
+        resp = client.get("/api/jobs")
+        assert resp.status_code == 200
+        assert resp.get_json()["jobs"] == []
+
+    def test_get_missing(self, client):
+        resp = client.get("/api/jobs/nope")
+        assert resp.status_code == 404
+
+
+class TestStartJob:
+
+    def test_unknown_type(self, client):
+        resp = client.post("/api/jobs", json={"type": "bogus"})
+        assert resp.status_code == 400
+
+    def test_missing_directory(self, client):
+        resp = client.post("/api/jobs", json={"type": "rebuild"})
+        assert resp.status_code == 400
+
+    @patch("routes.jobs.is_valid_library_path", return_value=False)
+    def test_directory_outside_library(self, mock_valid, client):
+        resp = client.post("/api/jobs", json={"type": "rebuild", "directory": "/etc"})
+        assert resp.status_code == 403
+
+    @patch("routes.jobs.is_valid_library_path", return_value=True)
+    def test_start_and_dedupe(self, mock_valid, client, tmp_path):
+        directory = str(tmp_path)
+        resp = client.post("/api/jobs", json={"type": "rebuild", "directory": directory})
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert data["created"] is True
+
+        again = client.post("/api/jobs", json={"type": "rebuild", "directory": directory}).get_json()
+        assert again == {"success": True, "job_id": data["job_id"], "created": False}
+
+        job = client.get(f"/api/jobs/{data['job_id']}").get_json()["job"]
+        assert job["status"] == "queued"
+        assert job["params"] == {"directory": directory}
+
+    def test_start_and_cancel(self, client):
+        job_id = client.post("/api/jobs", json={"type": "wanted_refresh"}).get_json()["job_id"]
+
+        resp = client.post(f"/api/jobs/{job_id}/cancel")
+        assert resp.status_code == 200
+        assert resp.get_json()["status"] == "cancelled"
+
+    def test_cancel_missing(self, client):
+        resp = client.post("/api/jobs/nope/cancel")
+        assert resp.status_code == 404
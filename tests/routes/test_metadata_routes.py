@@ -73,3 +73,155 @@ class TestAsText:
     def test_int(self):
         from routes.metadata import _as_text
         assert _as_text(42) == "42"
+
+
+class TestProviderCacheRoutes:
+
+    def test_stats_and_clear(self, client, db_connection):
+        from database import set_provider_cache
+
+        set_provider_cache("metron", "issues", "42", "[]", 600)
+
+        stats = client.get("/api/providers/cache").get_json()
+        assert stats["success"] is True
+        assert stats["providers"]["metron"]["entries"] == {"issues": 1}
+
+        resp = client.delete("/api/providers/cache?provider=metron")
+        assert resp.get_json() == {"success": True, "deleted": 1}
+
+
+class TestBatchMetadata:
+
+    def test_streams_progress_and_result(self, client, app, tmp_path):
+        import json
+        import zipfile
+
+        series_dir = tmp_path / "processed" / "Saga (2012)"
+        series_dir.mkdir()
+        (series_dir / "cvinfo").write_text("https://comicvine.gamespot.com/volume/4050-1234/\n")
+        for n in (1, 2, 3):
+            with zipfile.ZipFile(series_dir / f"Saga {n:03d} (2012).cbz", "w") as zf:
+                zf.writestr("page01.jpg", b"x")
+        app.config["COMICVINE_API_KEY"] = "key"
+
+        def lookup(api_key, volume_id, issue_number, start_year=None):
+            return {"Series": "Saga", "Number": issue_number} if issue_number != "3" else None
+
+        with patch("routes.metadata.gcd.is_mysql_available", return_value=False), \
+             patch("routes.metadata.comicvine.get_volume_details", return_value={}), \
+             patch("routes.metadata.comicvine.get_metadata_by_volume_id", side_effect=lookup), \
+             patch("routes.metadata.add_comicinfo_to_cbz") as add_xml, \
+             patch("database.set_has_comicinfo"):
+            resp = client.post("/api/batch-metadata", json={"directory": str(series_dir)})
+            events = [json.loads(line[len("data: "):])
+                      for line in resp.get_data(as_text=True).splitlines() if line.startswith("data: ")]
+
+        progress = [e for e in events if e["type"] == "progress"]
+        assert [e["current"] for e in progress] == [0, 1, 2, 3]
+        result = events[-1]["result"]
+        assert events[-1]["type"] == "complete"
+        assert (result["processed"], result["skipped"], result["errors"]) == (2, 0, 1)
+        assert [d["status"] for d in result["details"]] == ["success", "success", "error"]
+        assert result["details"][0]["source"] == "ComicVine"
+        assert add_xml.call_count == 2
+
+
+    def _batch(self, client, series_dir):
+        with patch("routes.metadata.gcd.is_mysql_available", return_value=False), \
+             patch("routes.metadata.add_comicinfo_to_cbz"), \
+             patch("database.set_has_comicinfo"):
+            resp = client.post("/api/batch-metadata", json={"directory": str(series_dir)})
+            resp.get_data()
+
+    @pytest.fixture
+    def series_dir(self, tmp_path):
+        import zipfile
+
+        series_dir = tmp_path / "processed" / "Saga (2012)"
+        series_dir.mkdir()
+        (series_dir / "cvinfo").write_text(
+            "https://comicvine.gamespot.com/volume/4050-1234/\nseries_id: 77\nstart_year: 2012\n")
+        for n in (1, 2, 3):
+            with zipfile.ZipFile(series_dir / f"Saga {n:03d} (2012).cbz", "w") as zf:
+                zf.writestr("page01.jpg", b"x")
+        return series_dir
+
+    def test_repeat_metron_batch_served_from_cache(self, client, app, db_connection, series_dir):
+        api = MagicMock()
+        api.issues_list.return_value = [MagicMock(id=500 + n, number=str(n)) for n in (1, 2, 3)]
+        api.issue.side_effect = lambda issue_id: {"id": issue_id, "number": str(issue_id - 500),
+                                                  "series": {"name": "Saga"}}
+        app.config["METRON_PASSWORD"] = "secret"
+
+        with patch("routes.metadata.metron.get_api", return_value=api):
+            self._batch(client, series_dir)
+            # One issue list for the series, then one issue() per file
+            assert api.issues_list.call_count == 1
+            assert api.issue.call_count == 3
+
+            self._batch(client, series_dir)
+        assert api.issues_list.call_count == 1
+        assert api.issue.call_count == 3
+
+    def test_repeat_comicvine_batch_served_from_cache(self, client, app, db_connection, series_dir):
+        app.config["COMICVINE_API_KEY"] = "key"
+        lookup = MagicMock(side_effect=lambda api_key, volume_id, issue_number, year=None: {
+            "id": int(issue_number), "name": "Saga", "issue_number": issue_number})
+
+        with patch("models.comicvine.get_issue_by_number", lookup):
+            self._batch(client, series_dir)
+            assert lookup.call_count == 3
+
+            self._batch(client, series_dir)
+        assert lookup.call_count == 3
+
+
+class TestSearchMetadataFanOut:
+
+    @pytest.fixture
+    def comic(self, app, tmp_path):
+        series_dir = tmp_path / "processed" / "Saga (2012)"
+        series_dir.mkdir()
+        (series_dir / "cvinfo").write_text("https://comicvine.gamespot.com/volume/4050-1234/\nseries_id: 77\n")
+        comic = series_dir / "Saga 001 (2012).cbz"
+        comic.write_bytes(b"")
+        app.config["METRON_PASSWORD"] = "secret"
+        app.config["COMICVINE_API_KEY"] = "key"
+        return comic
+
+    def _search(self, client, comic, metron_result, metron_deadline=5):
+        import time
+        from models.providers.latency import reset_provider_latency_stats
+
+        def slow_metron(cvinfo_path, issue_number):
+            time.sleep(0.2)
+            return metron_result
+
+        reset_provider_latency_stats()
+        with patch("routes.metadata.gcd.is_mysql_available", return_value=False), \
+             patch("routes.metadata._try_metron_single", side_effect=slow_metron), \
+             patch("routes.metadata._try_comicvine_single",
+                   return_value=({"Series": "Saga", "Number": "1"}, None, None, None)), \
+             patch("routes.metadata._provider_deadline",
+                   side_effect=lambda provider: metron_deadline if provider == "metron" else 5), \
+             patch("routes.metadata.add_comicinfo_to_cbz"), \
+             patch("database.set_has_comicinfo"):
+            return client.post("/api/search-metadata", json={
+                "file_path": str(comic), "file_name": comic.name,
+            }).get_json()
+
+    def test_waits_for_higher_priority_provider(self, client, comic):
+        data = self._search(client, comic, ({"Series": "Saga", "Number": "1", "Notes": "metron"}, None))
+        assert data["success"] is True
+        assert data["source"] == "metron"
+
+        latency = client.get("/api/providers/latency").get_json()["providers"]
+        assert latency["metron"]["outcomes"]["hit"] == 1
+        assert latency["metron"]["buckets"]["le_0.1"] == 0
+
+    def test_falls_back_when_provider_misses_deadline(self, client, comic):
+        data = self._search(client, comic, ({"Series": "Saga"}, None), metron_deadline=0)
+        assert data["source"] == "comicvine"
+
+        latency = client.get("/api/providers/latency").get_json()["providers"]
+        assert latency["metron"]["outcomes"]["timeout"] == 1
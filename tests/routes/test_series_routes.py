@@ -240,6 +240,36 @@ class TestLibrariesApi:
         assert resp.status_code == 200
         assert resp.get_json()["success"] is True
 
+    @patch("database.get_library_by_id", return_value={"id": 1, "name": "Old"})
+    @patch("database.update_library", return_value=True)
+    def test_update_compression_policy(self, mock_update, mock_get, client):
+        resp = client.put("/api/libraries/1", json={"compression_policy": "Store"})
+        assert resp.status_code == 200
+        assert mock_update.call_args.kwargs["compression_policy"] == "store"
+
+    @patch("database.get_library_by_id", return_value={"id": 1, "name": "Old"})
+    @patch("database.update_library", return_value=True)
+    def test_update_rejects_unknown_compression_policy(self, mock_update, mock_get, client):
+        resp = client.put("/api/libraries/1", json={"compression_policy": "zstd"})
+        assert resp.status_code == 400
+        mock_update.assert_not_called()
+
+    def test_compression_benchmark(self, client, tmp_path):
+        import zipfile
+        with zipfile.ZipFile(str(tmp_path / "a.cbz"), "w") as zf:
+            zf.writestr("001.jpg", b"\xff\xd8" + b"x" * 1000)
+            zf.writestr("ComicInfo.xml", "<ComicInfo>" + "<Title>x</Title>" * 50 + "</ComicInfo>")
+
+        lib = {"id": 1, "name": "Comics", "path": str(tmp_path), "compression_policy": None}
+        with patch("database.get_library_by_id", return_value=lib), \
+             patch("database.get_libraries", return_value=[lib]):
+            resp = client.get("/api/libraries/1/compression-benchmark?sample=5")
+        data = resp.get_json()
+        assert resp.status_code == 200
+        assert data["archives"] == 1
+        assert data["current_policy"] == "auto"
+        assert set(data["policies"]) == {"auto", "deflate", "store"}
+
     @patch("database.get_library_by_id", return_value=None)
     def test_update_nonexistent(self, mock_get, client):
         resp = client.put("/api/libraries/999", json={"name": "X"})
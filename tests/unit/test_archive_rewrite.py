@@ -0,0 +1,242 @@
+"""Tests for archive_rewrite.py -- in-place member append, raw-copy rewrites, compaction and folder repacking."""
+import os
+import zipfile
+
+import pytest
+
+
+def _make_cbz(path, members, compression=zipfile.ZIP_DEFLATED):
+    with zipfile.ZipFile(str(path), "w", compression=compression) as zf:
+        for name, data in members:
+            zf.writestr(name, data)
+    return str(path)
+
+
+def _pages(count=3, size=50000):
+    return [(f"{i:03d}.jpg", os.urandom(size)) for i in range(count)]
+
+
+def _read_all(path):
+    with zipfile.ZipFile(path) as zf:
+        assert zf.testzip() is None
+        return {name: zf.read(name) for name in zf.namelist()}
+
+
+class TestWriteZipMember:
+
+    def test_adds_member_without_touching_pages(self, tmp_path):
+        from archive_rewrite import write_zip_member
+
+        pages = _pages()
+        path = _make_cbz(tmp_path / "a.cbz", pages)
+        with zipfile.ZipFile(path) as zf:
+            offsets = {i.filename: i.header_offset for i in zf.infolist()}
+
+        assert write_zip_member(path, "ComicInfo.xml", b"<ComicInfo/>") == "appended"
+
+        assert _read_all(path) == dict(pages, **{"ComicInfo.xml": b"<ComicInfo/>"})
+        with zipfile.ZipFile(path) as zf:
+            assert {i.filename: i.header_offset for i in zf.infolist() if i.filename != "ComicInfo.xml"} == offsets
+
+    def test_repeated_replace_stays_bounded(self, tmp_path):
+        from archive_rewrite import COMPACT_DEAD_MIN_BYTES, write_zip_member
+
+        path = _make_cbz(tmp_path / "a.cbz", _pages() + [("ComicInfo.xml", b"<ComicInfo>old</ComicInfo>")])
+        size = os.path.getsize(path)
+
+        results = [write_zip_member(path, "ComicInfo.xml", b"<ComicInfo>new</ComicInfo>") for _ in range(300)]
+
+        assert results[0] == "appended"
+        assert "compacted" in results
+        assert os.path.getsize(path) < size + COMPACT_DEAD_MIN_BYTES + 1024
+        with zipfile.ZipFile(path) as zf:
+            assert zf.namelist().count("ComicInfo.xml") == 1
+            assert zf.read("ComicInfo.xml") == b"<ComicInfo>new</ComicInfo>"
+
+    def test_every_synced_state_is_a_valid_archive(self, tmp_path, monkeypatch):
+        from archive_rewrite import write_zip_member
+
+        pages = _pages()
+        path = _make_cbz(tmp_path / "a.cbz", pages + [("ComicInfo.xml", b"old")])
+        snapshots = []
+        real_fsync = os.fsync
+
+        def fsync(fd):
+            real_fsync(fd)
+            snapshots.append(open(path, "rb").read())
+
+        monkeypatch.setattr(os, "fsync", fsync)
+        assert write_zip_member(path, "ComicInfo.xml", b"new") == "appended"
+
+        # A crash before the last fsync leaves the old archive, after it the new one
+        assert len(snapshots) == 2
+        for snapshot, info in zip(snapshots, (b"old", b"new")):
+            copy = tmp_path / "copy.cbz"
+            copy.write_bytes(snapshot)
+            assert _read_all(str(copy)) == dict(pages, **{"ComicInfo.xml": info})
+
+    def test_large_member_goes_through_rewrite(self, tmp_path):
+        from archive_rewrite import write_zip_member
+
+        pages = _pages(3, 1000000)
+        path = _make_cbz(tmp_path / "a.cbz", pages)
+        big = os.urandom(100000)
+
+        assert write_zip_member(path, "big.bin", big) == "compacted"
+        assert _read_all(path) == dict(pages, **{"big.bin": big})
+
+    def test_replaces_matching_members(self, tmp_path):
+        from archive_rewrite import write_zip_member
+
+        path = _make_cbz(tmp_path / "a.cbz", [("sub/comicinfo.xml", b"old")] + _pages())
+        write_zip_member(path, "ComicInfo.xml", b"new",
+                         replaces=lambda info: os.path.basename(info.filename).lower() == "comicinfo.xml")
+
+        files = _read_all(path)
+        assert "sub/comicinfo.xml" not in files
+        assert files["ComicInfo.xml"] == b"new"
+
+    def test_compacts_when_dead_bytes_pile_up(self, tmp_path):
+        from archive_rewrite import write_zip_member
+
+        big_old = os.urandom(200000)
+        pages = _pages()
+        path = _make_cbz(tmp_path / "a.cbz", [("ComicInfo.xml", big_old)] + pages)
+
+        assert write_zip_member(path, "ComicInfo.xml", b"<ComicInfo/>") == "compacted"
+        assert _read_all(path) == dict(pages, **{"ComicInfo.xml": b"<ComicInfo/>"})
+        assert os.path.getsize(path) < 200000
+        assert not [f for f in os.listdir(tmp_path) if f.startswith(".tmp_")]
+
+    def test_not_a_zip(self, tmp_path):
+        from archive_rewrite import write_zip_member
+
+        path = tmp_path / "a.cbz"
+        path.write_bytes(b"Rar!\x1a\x07\x00" + b"\x00" * 100)
+        with pytest.raises(zipfile.BadZipFile):
+            write_zip_member(str(path), "ComicInfo.xml", b"x")
+        assert path.read_bytes() == b"Rar!\x1a\x07\x00" + b"\x00" * 100
+
+    def test_failed_write_restores_archive(self, tmp_path, monkeypatch):
+        from archive_rewrite import write_zip_member
+
+        path = _make_cbz(tmp_path / "a.cbz", _pages() + [("ComicInfo.xml", b"<ComicInfo>old</ComicInfo>")])
+        before = open(path, "rb").read()
+
+        def boom(*args, **kwargs):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(zipfile.ZipFile, "writestr", boom)
+        with pytest.raises(OSError):
+            write_zip_member(path, "ComicInfo.xml", b"<ComicInfo>new</ComicInfo>")
+
+        assert open(path, "rb").read() == before
+
+
+class TestRewriteZip:
+
+    @pytest.mark.parametrize("compression", [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED])
+    def test_raw_copy_keeps_compressed_bytes(self, tmp_path, compression):
+        from archive_rewrite import rewrite_zip
+
+        pages = _pages()
+        path = _make_cbz(tmp_path / "a.cbz", pages, compression)
+        with zipfile.ZipFile(path) as zf:
+            before = {i.filename: (i.CRC, i.compress_size, i.compress_type) for i in zf.infolist()}
+
+        rewrite_zip(path, keep=lambda info: info.filename != "001.jpg", add=[("extra.txt", b"hi")])
+
+        files = _read_all(path)
+        assert files == dict([pages[0], pages[2], ("extra.txt", b"hi")])
+        with zipfile.ZipFile(path) as zf:
+            for name in ("000.jpg", "002.jpg"):
+                info = zf.getinfo(name)
+                assert (info.CRC, info.compress_size, info.compress_type) == before[name]
+
+    def test_data_descriptor_members(self, tmp_path):
+        from archive_rewrite import rewrite_zip
+
+        # Members written to a non-seekable stream carry a data descriptor
+        class Unseekable:
+            def __init__(self, f):
+                self.f = f
+
+            def write(self, b):
+                return self.f.write(b)
+
+            def flush(self):
+                self.f.flush()
+
+        path = str(tmp_path / "a.cbz")
+        pages = _pages(2, 5000)
+        with open(path, "wb") as raw:
+            with zipfile.ZipFile(Unseekable(raw), "w", zipfile.ZIP_DEFLATED) as zf:
+                for name, data in pages:
+                    zf.writestr(name, data)
+        with zipfile.ZipFile(path) as zf:
+            assert all(i.flag_bits & 0x08 for i in zf.infolist())
+
+        rewrite_zip(path)
+        assert _read_all(path) == dict(pages)
+        with zipfile.ZipFile(path) as zf:
+            assert not any(i.flag_bits & 0x08 for i in zf.infolist())
+
+    def test_rename_and_sort(self, tmp_path):
+        from archive_rewrite import rewrite_zip
+
+        pages = _pages()
+        path = _make_cbz(tmp_path / "a.cbz", [("sub/002.jpg", pages[2][1]), ("sub/000.jpg", pages[0][1])])
+        extra = tmp_path / "001.jpg"
+        extra.write_bytes(pages[1][1])
+
+        rewrite_zip(path, rename=lambda info: info.filename[len("sub/"):],
+                    add=[("001.jpg", str(extra))], sort=True)
+
+        with zipfile.ZipFile(path) as zf:
+            assert zf.namelist() == ["000.jpg", "001.jpg", "002.jpg"]
+        assert _read_all(path) == dict(pages)
+
+    def test_not_a_zip_leaves_file(self, tmp_path):
+        from archive_rewrite import rewrite_zip
+
+        path = tmp_path / "a.cbz"
+        path.write_bytes(b"Rar!\x1a\x07\x00" + b"\x00" * 100)
+        with pytest.raises(zipfile.BadZipFile):
+            rewrite_zip(str(path))
+        assert os.listdir(tmp_path) == ["a.cbz"]
+
+
+class TestRepackFolder:
+
+    def test_copies_unchanged_files_raw(self, tmp_path):
+        from archive_rewrite import repack_folder
+
+        pages = _pages()
+        source = _make_cbz(tmp_path / "a.zip", pages)
+        folder = tmp_path / "a_folder"
+        with zipfile.ZipFile(source) as zf:
+            zf.extractall(str(folder))
+        (folder / "000.jpg").rename(folder / "cover.jpg")
+        (folder / "001.jpg").write_bytes(b"edited")
+        (folder / "new.txt").write_bytes(b"new")
+
+        dest = str(tmp_path / "a.cbz")
+        copied = repack_folder(str(folder), dest, source)
+
+        assert copied == 2
+        assert _read_all(dest) == {
+            "cover.jpg": pages[0][1], "001.jpg": b"edited", "002.jpg": pages[2][1], "new.txt": b"new",
+        }
+        with zipfile.ZipFile(dest) as zf:
+            assert zf.namelist() == sorted(zf.namelist())
+
+    def test_without_source(self, tmp_path):
+        from archive_rewrite import repack_folder
+
+        folder = tmp_path / "f"
+        (folder / "sub").mkdir(parents=True)
+        (folder / "sub" / "p.jpg").write_bytes(b"x")
+
+        dest = str(tmp_path / "a.cbz")
+        assert repack_folder(str(folder), dest) == 0
+        assert _read_all(dest) == {"sub/p.jpg": b"x"}
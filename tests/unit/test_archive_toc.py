@@ -0,0 +1,131 @@
+"""Tests for archive_toc.py -- page ordering, direct ZIP reads, and the LRU cache."""
+import os
+import zipfile
+
+import pytest
+
+
+def _make_cbz(path, names, compression=zipfile.ZIP_DEFLATED):
+    with zipfile.ZipFile(str(path), "w", compression=compression) as zf:
+        for name in names:
+            zf.writestr(name, f"data for {name}".encode() * 20)
+    return str(path)
+
+
+@pytest.fixture
+def cache():
+    from archive_toc import ArchiveTocCache
+    return ArchiveTocCache(max_bytes=1024 * 1024)
+
+
+# ===== Parsing =====
+
+class TestArchiveToc:
+
+    def test_pages_naturally_sorted(self, tmp_path, cache):
+        path = _make_cbz(tmp_path / "a.cbz", ["page10.jpg", "page2.jpg", "page1.jpg"])
+        toc = cache.get(path)
+        assert [p.name for p in toc.pages] == ["page1.jpg", "page2.jpg", "page10.jpg"]
+
+    def test_non_images_and_macos_metadata_skipped(self, tmp_path, cache):
+        path = _make_cbz(tmp_path / "a.cbz", [
+            "001.jpg", "ComicInfo.xml", "__MACOSX/._001.jpg", "sub/.hidden.png", "002.PNG",
+        ])
+        toc = cache.get(path)
+        assert [p.name for p in toc.pages] == ["001.jpg", "002.PNG"]
+
+    def test_page_fields(self, tmp_path, cache):
+        path = _make_cbz(tmp_path / "a.cbz", ["001.webp"])
+        page = cache.get(path).pages[0]
+        assert page.mime_type == "image/webp"
+        assert page.file_size == len(b"data for 001.webp" * 20)
+        assert page.offset == 0
+
+    def test_unsupported_extension(self, tmp_path, cache):
+        path = tmp_path / "a.pdf"
+        path.write_bytes(b"%PDF")
+        with pytest.raises(ValueError):
+            cache.get(str(path))
+
+
+# ===== Cache =====
+
+class TestArchiveTocCache:
+
+    def test_second_lookup_is_a_hit(self, tmp_path, cache):
+        path = _make_cbz(tmp_path / "a.cbz", ["001.jpg"])
+        first = cache.get(path)
+        assert cache.get(path) is first
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_rewritten_archive_is_reparsed(self, tmp_path, cache):
+        path = _make_cbz(tmp_path / "a.cbz", ["001.jpg"])
+        cache.get(path)
+
+        _make_cbz(tmp_path / "a.cbz", ["001.jpg", "002.jpg"])
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+        assert len(cache.get(path).pages) == 2
+        assert cache.get_stats()["stale"] == 1
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        from archive_toc import ArchiveTocCache
+
+        paths = [_make_cbz(tmp_path / f"{i}.cbz", ["001.jpg"]) for i in range(3)]
+        one_entry = ArchiveTocCache(max_bytes=10 ** 6).get(paths[0]).nbytes
+        cache = ArchiveTocCache(max_bytes=one_entry * 2 + 100)
+
+        cache.get(paths[0])
+        cache.get(paths[1])
+        cache.get(paths[0])   # paths[1] is now least recently used
+        cache.get(paths[2])
+
+        stats = cache.get_stats()
+        assert stats["entries"] == 2
+        assert stats["evictions"] == 1
+        assert stats["bytes"] <= one_entry * 2 + 100
+        cache.get(paths[0])
+        assert cache.get_stats()["hits"] == 2
+
+    def test_invalidate(self, tmp_path, cache):
+        path = _make_cbz(tmp_path / "a.cbz", ["001.jpg"])
+        cache.get(path)
+        cache.invalidate(path)
+        assert cache.get_stats()["entries"] == 0
+
+
+# ===== read_archive_page =====
+
+class TestReadArchivePage:
+
+    @pytest.mark.parametrize("compression", [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED])
+    def test_matches_zipfile(self, tmp_path, compression):
+        from archive_toc import read_archive_page
+
+        path = _make_cbz(tmp_path / "a.cbz", ["ComicInfo.xml", "2.jpg", "1.jpg"], compression)
+        data, page = read_archive_page(path, 1)
+
+        assert page.name == "2.jpg"
+        with zipfile.ZipFile(path) as zf:
+            assert data == zf.read("2.jpg")
+
+    def test_falls_back_to_zipfile_for_other_methods(self, tmp_path):
+        from archive_toc import read_archive_page
+
+        path = _make_cbz(tmp_path / "a.cbz", ["1.jpg"], zipfile.ZIP_BZIP2)
+        data, _ = read_archive_page(path, 0)
+        assert data == b"data for 1.jpg" * 20
+
+    def test_out_of_range(self, tmp_path):
+        from archive_toc import read_archive_page
+
+        path = _make_cbz(tmp_path / "a.cbz", ["1.jpg"])
+        with pytest.raises(IndexError):
+            read_archive_page(path, 1)
+        with pytest.raises(IndexError):
+            read_archive_page(path, -1)
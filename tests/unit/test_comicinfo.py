@@ -210,3 +210,34 @@ class TestReadComicinfoFromZip:
         rar_file.write_bytes(b"fake data")
         with pytest.raises(ValueError, match="Only .zip or .cbz"):
             read_comicinfo_from_zip(str(rar_file))
+
+
+# ===== update_comicinfo_in_zip =====
+
+class TestUpdateComicinfoInZip:
+
+    def test_updates_xml_and_keeps_pages(self, create_cbz):
+        import zipfile
+        from comicinfo import update_comicinfo_in_zip, read_comicinfo_from_zip
+        xml = '<ComicInfo><Title>Old</Title><Series>Batman</Series></ComicInfo>'
+        path = create_cbz("test.cbz", num_images=3, comicinfo_xml=xml)
+        with zipfile.ZipFile(path) as zf:
+            pages = {n: zf.read(n) for n in zf.namelist() if n != "ComicInfo.xml"}
+
+        update_comicinfo_in_zip(path, {"Title": "New", "Volume": "2020"})
+
+        result = read_comicinfo_from_zip(path)
+        assert result["Title"] == "New"
+        assert result["Volume"] == "2020"
+        assert result["Series"] == "Batman"
+        with zipfile.ZipFile(path) as zf:
+            assert zf.namelist().count("ComicInfo.xml") == 1
+            assert {n: zf.read(n) for n in zf.namelist() if n != "ComicInfo.xml"} == pages
+
+    def test_no_comicinfo_is_noop(self, create_cbz):
+        import os
+        from comicinfo import update_comicinfo_in_zip
+        path = create_cbz("test.cbz", num_images=1, comicinfo_xml=None)
+        before = os.path.getsize(path)
+        update_comicinfo_in_zip(path, {"Title": "New"})
+        assert os.path.getsize(path) == before
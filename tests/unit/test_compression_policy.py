@@ -0,0 +1,123 @@
+"""Tests for compression_policy.py -- member classification, policy lookup and benchmark."""
+import os
+import zipfile
+from unittest.mock import patch
+
+import pytest
+
+
+def _make_cbz(path, members):
+    with zipfile.ZipFile(str(path), "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in members:
+            zf.writestr(name, data)
+    return str(path)
+
+
+class TestMemberType:
+
+    @pytest.mark.parametrize("name,expected", [
+        ("001.jpg", "image"),
+        ("sub/002.WEBP", "image"),
+        ("ComicInfo.xml", "text"),
+        ("scan.bmp", "other"),
+        ("noext", "other"),
+    ])
+    def test_classifies_by_extension(self, name, expected):
+        from compression_policy import member_type
+        assert member_type(name) == expected
+
+
+class TestCompressionPolicy:
+
+    def test_auto_stores_images_and_deflates_text(self):
+        from compression_policy import CompressionPolicy
+
+        policy = CompressionPolicy("auto")
+        assert policy.options("001.jpg") == {"compress_type": zipfile.ZIP_STORED, "compresslevel": None}
+        assert policy.options("ComicInfo.xml")["compress_type"] == zipfile.ZIP_DEFLATED
+
+    def test_deflate_and_store(self):
+        from compression_policy import CompressionPolicy
+
+        assert CompressionPolicy("deflate").method("001.jpg")[0] == zipfile.ZIP_DEFLATED
+        assert CompressionPolicy("store").method("ComicInfo.xml")[0] == zipfile.ZIP_STORED
+
+    def test_options_work_with_zipfile(self, tmp_path):
+        from compression_policy import CompressionPolicy
+
+        policy = CompressionPolicy("auto")
+        path = str(tmp_path / "a.cbz")
+        with zipfile.ZipFile(path, "w") as zf:
+            for name in ("001.jpg", "ComicInfo.xml"):
+                zf.writestr(name, b"x" * 100, **policy.options(name))
+        with zipfile.ZipFile(path) as zf:
+            assert zf.getinfo("001.jpg").compress_type == zipfile.ZIP_STORED
+            assert zf.getinfo("ComicInfo.xml").compress_type == zipfile.ZIP_DEFLATED
+
+
+class TestGetPolicy:
+
+    def test_library_override(self):
+        from compression_policy import get_policy
+
+        lib = {"path": "/data/comics", "compression_policy": "store"}
+        with patch("helpers.library.get_library_for_path", return_value=lib):
+            assert get_policy("/data/comics/a.cbz").name == "store"
+
+    def test_falls_back_to_setting(self):
+        from compression_policy import get_policy
+        from config import config
+
+        with patch("helpers.library.get_library_for_path", return_value=None), \
+             patch.object(config, "get", return_value="deflate"):
+            assert get_policy("/elsewhere/a.cbz").name == "deflate"
+
+    def test_unknown_name_uses_default(self):
+        from compression_policy import get_policy, DEFAULT_POLICY
+
+        lib = {"path": "/data", "compression_policy": "zstd"}
+        with patch("helpers.library.get_library_for_path", return_value=lib):
+            assert get_policy("/data/a.cbz").name == DEFAULT_POLICY
+
+
+class TestBenchmark:
+
+    def test_reports_bytes_and_cpu_per_policy(self, tmp_path):
+        from compression_policy import benchmark_policies
+
+        xml = b"<ComicInfo>" + b"<Title>Batman</Title>" * 200 + b"</ComicInfo>"
+        page = os.urandom(20000)
+        path = _make_cbz(tmp_path / "a.cbz", [("001.jpg", page), ("ComicInfo.xml", xml)])
+
+        report = benchmark_policies([path])
+
+        assert report["archives"] == 1
+        assert report["members"] == 2
+        assert report["original_bytes"] == len(page) + len(xml)
+        stats = report["policies"]
+        assert stats["store"]["bytes_saved"] == 0
+        assert stats["auto"]["bytes_saved"] > 0
+        # Random page data does not compress; auto saves (almost) as much as deflate
+        assert stats["deflate"]["bytes_saved"] - stats["auto"]["bytes_saved"] < 100
+        assert all(s["cpu_seconds"] >= 0 for s in stats.values())
+
+    def test_skips_bad_archives(self, tmp_path):
+        from compression_policy import benchmark_policies
+
+        bad = tmp_path / "bad.cbz"
+        bad.write_bytes(b"not a zip")
+        report = benchmark_policies([str(bad)])
+        assert report["archives"] == 0
+        assert report["policies"]["auto"]["saved_percent"] == 0.0
+
+    def test_sample_archives(self, tmp_path):
+        from compression_policy import sample_archives
+
+        for i in range(5):
+            (tmp_path / f"{i}.cbz").write_bytes(b"")
+        (tmp_path / "notes.txt").write_bytes(b"")
+        (tmp_path / ".hidden.cbz").write_bytes(b"")
+
+        assert len(sample_archives(str(tmp_path), 3, seed=1)) == 3
+        assert sorted(os.path.basename(p) for p in sample_archives(str(tmp_path), 10)) == \
+            [f"{i}.cbz" for i in range(5)]
@@ -1,4 +1,5 @@
 """Tests for config.py -- configuration loading and defaults."""
+import configparser
 import pytest
 import os
 from unittest.mock import patch
@@ -56,6 +57,18 @@ class TestLoadConfig:
             # Missing keys should get defaults
             assert config.has_option("SETTINGS", "CACHE_DIR")
 
+    def test_metadata_scan_workers_migrated_from_threads(self, tmp_path):
+        config_file = tmp_path / "config.ini"
+        config_file.write_text("[SETTINGS]\nMETADATA_SCAN_THREADS=3\n")
+        parser = configparser.RawConfigParser()
+        parser.optionxform = str
+        with patch("config.CONFIG_FILE", str(config_file)), \
+             patch("config.CONFIG_DIR", str(tmp_path)), \
+             patch("config.config", parser):
+            from config import load_config
+            load_config()
+            assert parser.get("SETTINGS", "METADATA_SCAN_WORKERS") == "3"
+
     def test_case_sensitive_keys(self, tmp_path):
         config_file = str(tmp_path / "config.ini")
         with patch("config.CONFIG_FILE", config_file), \
@@ -0,0 +1,143 @@
+"""Tests for directory_cache.py -- listing reads, invalidation, and the LRU budget."""
+import os
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+@pytest.fixture
+def cache():
+    from directory_cache import DirectoryCache
+    return DirectoryCache(max_bytes=1024 * 1024, max_age=3600, unwatched_seconds=5)
+
+
+def _listing(*names):
+    return {"directories": [], "files": [{"name": name, "size": 1} for name in names]}
+
+
+def _make_library(root):
+    (root / "Batman").mkdir()
+    (root / "Saga").mkdir()
+    (root / "Saga" / "Saga 001.cbz").write_bytes(b"PK" * 10)
+    (root / "missing.txt").write_text("1\n")
+    (root / "cover.jpg").write_bytes(b"x")
+    (root / "cvinfo").write_text("x")
+    (root / ".hidden.cbz").write_bytes(b"x")
+    (root / "_temp").mkdir()
+    return str(root)
+
+
+# ===== Reading =====
+
+class TestReadDirectoryListing:
+
+    def test_filters_and_sorts(self, tmp_path):
+        from directory_cache import read_directory_listing
+
+        listing = read_directory_listing(_make_library(tmp_path))
+        assert listing["directories"] == ["Batman", "Saga"]
+        assert listing["files"] == [{"name": "missing.txt", "size": 2}]
+
+
+# ===== Cache =====
+
+class TestDirectoryCache:
+
+    def test_watched_listing_outlives_unwatched_ttl(self, tmp_path, cache):
+        root = str(tmp_path)
+        cache.add_watched_root(root)
+        cache.put(os.path.join(root, "Saga"), _listing("Saga 001.cbz"))
+        cache.put("/downloads", _listing("new.cbz"))
+
+        with patch("directory_cache.time.time", return_value=time.time() + 60):
+            assert cache.get(os.path.join(root, "Saga")) is not None
+            assert cache.get("/downloads") is None
+
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"], stats["expired"]) == (1, 1, 1)
+
+    def test_dead_watcher_falls_back_to_unwatched_ttl(self, tmp_path, cache):
+        root = str(tmp_path)
+        alive = [True]
+        cache.add_watched_root(root, is_alive=lambda: alive[0])
+        cache.put(os.path.join(root, "Saga"), _listing("Saga 001.cbz"))
+        assert cache.get(os.path.join(root, "Saga")) is not None
+
+        # The observer thread died without stop(); no events will invalidate the listing
+        alive[0] = False
+        assert cache.get(os.path.join(root, "Saga")) is None
+        assert cache.get_stats()["watched_roots"] == []
+
+        cache.put(os.path.join(root, "Saga"), _listing("Saga 001.cbz", "Saga 002.cbz"))
+        with patch("directory_cache.time.time", return_value=time.time() + 60):
+            assert cache.get(os.path.join(root, "Saga")) is None
+
+    def test_invalidate_drops_path_parent_and_children(self, cache):
+        for path in ["/data", "/data/Saga", "/data/Saga/Vol 1", "/data/Sagas", "/data/Batman"]:
+            cache.put(path, _listing())
+
+        assert cache.invalidate(["/data/Saga"]) == 3
+        assert [p for p in ["/data", "/data/Saga", "/data/Saga/Vol 1", "/data/Sagas", "/data/Batman"]
+                if cache.contains(p)] == ["/data/Sagas", "/data/Batman"]
+        assert cache.get_stats()["invalidations"] == 3
+
+    def test_put_skipped_after_concurrent_invalidation(self, cache):
+        generation = cache.generation
+        cache.invalidate(["/data/Saga/Saga 001.cbz"])
+        cache.put("/data/Saga", _listing("Saga 001.cbz"), generation)
+        assert not cache.contains("/data/Saga")
+
+    def test_budget_evicts_least_recently_used(self):
+        from directory_cache import DirectoryCache, listing_nbytes
+
+        size = listing_nbytes("/data/a", _listing("x.cbz"))
+        cache = DirectoryCache(max_bytes=size * 2, max_age=3600, unwatched_seconds=3600)
+        cache.put("/data/a", _listing("x.cbz"))
+        cache.put("/data/b", _listing("x.cbz"))
+        cache.get("/data/a")
+        cache.put("/data/c", _listing("x.cbz"))
+
+        assert cache.contains("/data/a") and cache.contains("/data/c")
+        assert not cache.contains("/data/b")
+        assert cache.get_stats()["bytes"] == size * 2
+
+    def test_trim_halves_memory(self, cache):
+        for n in range(10):
+            cache.put(f"/data/{n}", _listing("x.cbz"))
+        before = cache.get_stats()["bytes"]
+
+        cache.trim(0.5)
+        assert cache.get_stats()["bytes"] <= before // 2
+        assert cache.contains("/data/9")
+
+
+class TestListDirectory:
+
+    def test_second_call_is_cached(self, tmp_path):
+        import directory_cache
+
+        root = _make_library(tmp_path)
+        directory_cache.directory_cache.clear()
+        first, cached = directory_cache.list_directory(root)
+        assert not cached
+        second, cached = directory_cache.list_directory(root)
+        assert cached and second is first
+
+        (tmp_path / "Saga 002.cbz").write_bytes(b"PK")
+        directory_cache.invalidate_directory_listings([str(tmp_path / "Saga 002.cbz")])
+        listing, cached = directory_cache.list_directory(root)
+        assert not cached
+        assert [f["name"] for f in listing["files"]] == ["missing.txt", "Saga 002.cbz"]
+
+    def test_registered_with_memory_monitor(self):
+        from directory_cache import directory_cache
+        from memory_utils import MemoryMonitor, get_global_monitor
+
+        assert directory_cache.trim in get_global_monitor()._cleanup_callbacks
+
+        monitor = MemoryMonitor()
+        callback = MagicMock(side_effect=[RuntimeError("boom")])
+        monitor.register_cleanup(callback)
+        monitor.force_cleanup()
+        callback.assert_called_once()
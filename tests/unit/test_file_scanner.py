@@ -0,0 +1,160 @@
+"""Tests for file_scanner.py -- filters, parallel scandir walk, and timing reports."""
+import os
+import pytest
+import types
+
+
+@pytest.fixture
+def library(tmp_path):
+    """Small library tree with comics, a folder thumbnail, hidden and excluded folders."""
+    root = tmp_path / "library"
+    (root / "DC" / "Batman").mkdir(parents=True)
+    (root / "DC" / "Batman" / "Batman 001.cbz").write_bytes(b"x" * 10)
+    (root / "DC" / "Batman" / "Batman 002.cbr").write_bytes(b"x" * 20)
+    (root / "DC" / "Batman" / "folder.jpg").write_bytes(b"jpg")
+    (root / "DC" / "Batman" / "cvinfo").write_text("info")
+    (root / "Marvel").mkdir()
+    (root / "Marvel" / "missing.txt").write_text("#3")
+    (root / "Marvel" / ".hidden.cbz").write_bytes(b"x")
+    (root / ".git").mkdir()
+    (root / ".git" / "config.cbz").write_bytes(b"x")
+    (root / "_MACOSX").mkdir()
+    (root / "processed").mkdir()
+    (root / "processed" / "New 001.cbz").write_bytes(b"x")
+    return root
+
+
+def _scan(root, **kwargs):
+    from file_scanner import ScanReport, iter_file_index_entries
+    report = ScanReport("test")
+    entries = list(iter_file_index_entries([str(root)], report, **kwargs))
+    return {e["path"]: e for e in entries}, report
+
+
+# ===== should_index_file =====
+
+class TestShouldIndexFile:
+
+    def test_comic_files_indexed(self):
+        from file_scanner import should_index_file
+        assert should_index_file("Batman 001.cbz") is True
+        assert should_index_file("Batman 001.CBR") is True
+
+    def test_images_excluded(self):
+        from file_scanner import should_index_file
+        assert should_index_file("folder.jpg") is False
+        assert should_index_file("cover.PNG") is False
+
+    def test_hidden_excluded(self):
+        from file_scanner import should_index_file
+        assert should_index_file(".DS_Store") is False
+        assert should_index_file("_temp.cbz") is False
+
+    def test_cvinfo_excluded(self):
+        from file_scanner import should_index_file
+        assert should_index_file("cvinfo") is False
+
+    def test_missing_txt_allowed(self):
+        from file_scanner import should_index_file
+        assert should_index_file("missing.txt") is True
+
+
+# ===== iter_file_index_entries =====
+
+class TestIterFileIndexEntries:
+
+    def test_indexes_files_and_directories(self, library):
+        entries, _ = _scan(library)
+        root = str(library)
+        assert set(entries) == {
+            f"{root}/DC",
+            f"{root}/DC/Batman",
+            f"{root}/DC/Batman/Batman 001.cbz",
+            f"{root}/DC/Batman/Batman 002.cbr",
+            f"{root}/Marvel",
+            f"{root}/Marvel/missing.txt",
+            f"{root}/processed",
+            f"{root}/processed/New 001.cbz",
+        }
+
+    def test_file_entry_fields(self, library):
+        entries, _ = _scan(library)
+        path = f"{library}/DC/Batman/Batman 002.cbr"
+        entry = entries[path]
+        assert entry["type"] == "file"
+        assert entry["name"] == "Batman 002.cbr"
+        assert entry["size"] == 20
+        assert entry["parent"] == f"{library}/DC/Batman"
+        assert entry["modified_at"] == pytest.approx(os.path.getmtime(path))
+
+    def test_top_level_parent_is_library_root(self, library):
+        entries, _ = _scan(library)
+        assert entries[f"{library}/DC"]["parent"] == str(library)
+
+    def test_has_thumbnail_from_listing(self, library):
+        entries, _ = _scan(library)
+        assert entries[f"{library}/DC/Batman"]["has_thumbnail"] == 1
+        assert entries[f"{library}/Marvel"]["has_thumbnail"] == 0
+
+    def test_excluded_dirs_not_walked(self, library):
+        entries, _ = _scan(library, excluded_dirs=[str(library / "processed")])
+        assert f"{library}/processed" not in entries
+        assert f"{library}/processed/New 001.cbz" not in entries
+
+    def test_symlinked_dir_indexed_but_not_followed(self, library, tmp_path):
+        outside = tmp_path / "outside"
+        outside.mkdir()
+        (outside / "Other 001.cbz").write_bytes(b"x")
+        os.symlink(outside, library / "Linked")
+
+        entries, _ = _scan(library)
+        assert entries[f"{library}/Linked"]["type"] == "directory"
+        assert f"{library}/Linked/Other 001.cbz" not in entries
+
+    def test_missing_root_skipped(self, tmp_path):
+        entries, report = _scan(tmp_path / "does-not-exist")
+        assert entries == {}
+        assert report.counters["libraries"] == 0
+
+    def test_single_worker_matches_parallel(self, library):
+        parallel, _ = _scan(library, max_workers=4)
+        serial, _ = _scan(library, max_workers=1)
+        assert parallel == serial
+
+    def test_is_a_stream(self, library):
+        from file_scanner import ScanReport, iter_file_index_entries
+        result = iter_file_index_entries([str(library)], ScanReport("test"))
+        assert isinstance(result, types.GeneratorType)
+
+
+# ===== ScanReport =====
+
+class TestScanReport:
+
+    def test_counters_and_phases(self, library):
+        _, report = _scan(library)
+        assert report.counters["libraries"] == 1
+        assert report.counters["directories"] == 4
+        assert report.counters["files"] == 4
+        for phase in ("walk", "scandir", "stat"):
+            assert phase in report.phases
+
+    def test_phase_context_manager(self):
+        from file_scanner import ScanReport
+        report = ScanReport("test")
+        with report.phase("save"):
+            pass
+        with report.phase("save"):
+            pass
+        assert report.phases["save"] >= 0
+
+    def test_finish_publishes_last_report(self):
+        from file_scanner import ScanReport, get_last_scan_report
+        report = ScanReport("published")
+        report.add_time("sync", 1.5)
+        report.finish()
+
+        last = get_last_scan_report()
+        assert last["operation"] == "published"
+        assert last["phases"]["sync"] == 1.5
+        assert last["finished_at"] is not None
@@ -0,0 +1,162 @@
+"""Tests for job_queue.py -- handler outcomes, retries, cancellation and progress."""
+import json
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def job_type():
+    """Register a throwaway job type and remove it afterwards."""
+    import job_queue
+
+    names = []
+
+    def register(name, handler, **kwargs):
+        job_queue.register_job_type(name, handler, **kwargs)
+        names.append(name)
+
+    yield register
+    for name in names:
+        job_queue._job_types.pop(name, None)
+
+
+def _enqueue_and_claim(job_type_name, params=None):
+    from database import claim_next_job
+    from job_queue import enqueue_job
+
+    job_id, created = enqueue_job(job_type_name, params)
+    assert created
+    job = claim_next_job()
+    assert job["id"] == job_id
+    return job
+
+
+class TestRunJob:
+
+    def test_completed_with_result(self, db_connection, job_type):
+        from database import get_job
+        from job_queue import run_job
+
+        job_type("test_add", lambda ctx, a, b: {"sum": a + b})
+        job = _enqueue_and_claim("test_add", {"a": 2, "b": 3})
+        run_job(job)
+
+        stored = get_job(job["id"])
+        assert stored["status"] == "completed"
+        assert json.loads(stored["result"]) == {"sum": 5}
+
+    def test_failure_retries_then_fails(self, db_connection, job_type):
+        from database import claim_next_job, get_job
+        from job_queue import run_job
+
+        def handler(ctx):
+            raise RuntimeError("boom")
+
+        job_type("test_fail", handler, max_attempts=2, retry_delay=0)
+        job = _enqueue_and_claim("test_fail")
+
+        run_job(job)
+        assert get_job(job["id"])["status"] == "queued"
+
+        run_job(claim_next_job())
+        stored = get_job(job["id"])
+        assert stored["status"] == "failed"
+        assert stored["attempts"] == 2
+        assert stored["error"] == "boom"
+
+    def test_cancel_stops_at_next_progress(self, db_connection, job_type):
+        from database import get_job
+        from job_queue import cancel_job, run_job
+
+        def handler(ctx):
+            ctx.progress(1, 3)
+            cancel_job(ctx.id)
+            ctx.progress(2, 3)
+            raise AssertionError("progress() should have raised")
+
+        job_type("test_cancel", handler)
+        job = _enqueue_and_claim("test_cancel")
+        run_job(job)
+
+        stored = get_job(job["id"])
+        assert stored["status"] == "cancelled"
+        assert stored["progress_done"] == 2
+
+    def test_job_runner_progress_recorded(self, db_connection, job_type, tmp_path, monkeypatch):
+        import job_runner
+        from database import get_job
+        from job_queue import run_job
+
+        monkeypatch.setattr(job_runner, "get_job_state_path",
+                            lambda name, scope="": str(tmp_path / f"{name}.jsonl"))
+
+        def handler(ctx):
+            return job_runner.run_jobs(lambda n: n * 2, range(4), "test", workers=1)
+
+        job_type("test_runner", handler)
+        job = _enqueue_and_claim("test_runner")
+        run_job(job)
+
+        stored = get_job(job["id"])
+        assert stored["status"] == "completed"
+        assert (stored["progress_done"], stored["progress_total"]) == (4, 4)
+        assert json.loads(stored["result"]) == [0, 2, 4, 6]
+        assert getattr(job_runner._listener, "callback", None) is None
+
+
+class TestEnqueueJob:
+
+    def test_unknown_type(self, db_connection):
+        from job_queue import enqueue_job
+
+        with pytest.raises(ValueError):
+            enqueue_job("no_such_job")
+
+    def test_concurrency_key_dedupes(self, db_connection):
+        from job_queue import directory_job_key, enqueue_job
+
+        key = directory_job_key("rebuild", "/data/DC")
+        first_id, created = enqueue_job("rebuild", {"directory": "/data/DC"}, concurrency_key=key)
+        assert created
+        assert enqueue_job("rebuild", {"directory": "/data/DC"}, concurrency_key=key) == (first_id, False)
+
+
+class TestLanes:
+
+    def test_long_jobs_do_not_block_default_lane(self, db_connection, job_type, monkeypatch):
+        import job_queue
+        from database import get_job
+        from job_queue import LANE_LONG, JobQueue, enqueue_job
+
+        monkeypatch.setattr(job_queue, "_POLL_SECONDS", 0.05)
+        release = threading.Event()
+        job_type("test_long", lambda ctx: release.wait(5), lane=LANE_LONG)
+        job_type("test_short", lambda ctx: "done")
+
+        first_long, _ = enqueue_job("test_long")
+        second_long, _ = enqueue_job("test_long")
+        short, _ = enqueue_job("test_short")
+
+        queue = JobQueue(workers=1, long_workers=1)
+        queue.start()
+        try:
+            deadline = time.time() + 5
+            while get_job(short)["status"] != "completed" and time.time() < deadline:
+                time.sleep(0.05)
+
+            assert get_job(short)["status"] == "completed"
+            assert get_job(first_long)["status"] == "running"
+            assert get_job(second_long)["status"] == "queued"
+        finally:
+            release.set()
+            queue.stop()
+
+    def test_registered_lanes(self):
+        from job_queue import DIRECTORY_JOB_TYPES, LANE_DEFAULT, LANE_LONG, job_lane
+
+        assert all(job_lane(name) == LANE_LONG for name in DIRECTORY_JOB_TYPES)
+        assert job_lane("thumbnail_scan") == LANE_LONG
+        assert job_lane("wanted_refresh") == LANE_DEFAULT
+        assert job_lane("no_such_job") == LANE_DEFAULT
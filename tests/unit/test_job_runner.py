@@ -0,0 +1,169 @@
+"""Tests for job_runner.py -- ordering, errors, resume and memory throttling."""
+import os
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def state_dir(tmp_path, monkeypatch):
+    import job_runner
+
+    jobs_dir = tmp_path / "jobs"
+    monkeypatch.setattr(job_runner, "get_job_state_path",
+                        lambda name, scope="": str(jobs_dir / f"{name}.jsonl"))
+    return jobs_dir
+
+
+def _slow_square(n):
+    # Later items finish first, so ordering comes from the runner
+    time.sleep(0.01 * (5 - n))
+    return n * n
+
+
+class TestRunJobs:
+
+    def test_results_in_input_order(self, state_dir):
+        from job_runner import run_jobs
+
+        results = run_jobs(_slow_square, range(5), "squares", workers=4, use_processes=False)
+        assert results == [0, 1, 4, 9, 16]
+
+    def test_empty_items(self, state_dir):
+        from job_runner import run_jobs
+
+        assert run_jobs(_slow_square, [], "squares") == []
+
+    def test_failed_item_returns_none(self, state_dir):
+        from job_runner import run_jobs
+
+        def func(n):
+            if n == 2:
+                raise ValueError("bad file")
+            return n
+
+        assert run_jobs(func, range(4), "errors", workers=2) == [0, 1, None, 3]
+
+    def test_single_worker_runs_inline(self, state_dir):
+        from job_runner import run_jobs
+
+        threads = set()
+
+        def func(n):
+            threads.add(threading.current_thread())
+            return n
+
+        run_jobs(func, range(3), "inline", workers=1)
+        assert threads == {threading.current_thread()}
+
+    def test_state_removed_after_run(self, state_dir):
+        from job_runner import run_jobs
+
+        run_jobs(_slow_square, range(3), "squares", workers=2, use_processes=False)
+        assert not (state_dir / "squares.jsonl").exists()
+
+    def test_resume_skips_finished_items(self, state_dir):
+        from job_runner import run_jobs
+
+        def func(n):
+            if n == 2:
+                raise KeyboardInterrupt
+            return n * 10
+
+        with pytest.raises(KeyboardInterrupt):
+            run_jobs(func, range(4), "resume", workers=1)
+        assert (state_dir / "resume.jsonl").exists()
+
+        seen = []
+        results = run_jobs(lambda n: seen.append(n) or n * 10, range(4), "resume", workers=1)
+        assert results == [0, 10, 20, 30]
+        assert seen == [2, 3]
+        assert not (state_dir / "resume.jsonl").exists()
+
+    def _interrupt_after_first(self, items, name):
+        from job_runner import run_jobs
+
+        def func(path):
+            if path == items[1]:
+                raise KeyboardInterrupt
+            return os.path.basename(path)
+
+        with pytest.raises(KeyboardInterrupt):
+            run_jobs(func, items, name, workers=1)
+
+    def test_resume_redoes_files_changed_since(self, state_dir, tmp_path):
+        from job_runner import run_jobs
+
+        items = []
+        for name in ("a.cbz", "b.cbz"):
+            (tmp_path / name).write_bytes(b"PK")
+            items.append(str(tmp_path / name))
+        self._interrupt_after_first(items, "changed")
+
+        (tmp_path / "a.cbz").write_bytes(b"PK rewritten")
+        seen = []
+        run_jobs(lambda p: seen.append(p), items, "changed", workers=1)
+        assert seen == items
+
+    def test_stale_state_is_discarded(self, state_dir, tmp_path):
+        from job_runner import run_jobs
+
+        items = []
+        for name in ("a.cbz", "b.cbz"):
+            (tmp_path / name).write_bytes(b"PK")
+            items.append(str(tmp_path / name))
+        self._interrupt_after_first(items, "stale")
+
+        state_file = state_dir / "stale.jsonl"
+        old = time.time() - 48 * 3600
+        os.utime(state_file, (old, old))
+        seen = []
+        run_jobs(lambda p: seen.append(p), items, "stale", workers=1)
+        assert seen == items
+        assert not state_file.exists()
+
+    def test_resume_disabled(self, state_dir):
+        from job_runner import run_jobs
+
+        run_jobs(_slow_square, range(2), "nostate", workers=1, resume=False)
+        assert not state_dir.exists()
+
+    def test_unpicklable_function_uses_threads(self):
+        from job_runner import _processes_enabled
+
+        assert _processes_enabled(_slow_square, True) is True
+        assert _processes_enabled(lambda n: n, True) is False
+        assert _processes_enabled(_slow_square, False) is False
+
+    def test_memory_throttle_runs_one_job(self, state_dir, monkeypatch):
+        import job_runner
+        from job_runner import run_jobs
+
+        class HighMemory:
+            threshold_mb = 100
+            cleanup_threshold_mb = 50
+
+            def get_process_tree_memory_usage(self):
+                return 500
+
+            def force_cleanup(self):
+                return 0
+
+        monkeypatch.setattr(job_runner, "get_global_monitor", lambda: HighMemory())
+
+        lock = threading.Lock()
+        active = [0]
+        peak = [0]
+
+        def func(n):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            return n
+
+        assert run_jobs(func, range(4), "throttle", workers=4, use_processes=False) == [0, 1, 2, 3]
+        assert peak[0] == 1
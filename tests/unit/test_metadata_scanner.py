@@ -0,0 +1,182 @@
+"""Tests for metadata_scanner.py -- archive reading, dispatch and throughput stats."""
+import threading
+import time
+import zipfile
+from unittest.mock import MagicMock
+
+import pytest
+
+COMICINFO = b"""<?xml version="1.0"?>
+<ComicInfo><Series>Batman</Series><Number>12</Number><Writer>Tom King</Writer></ComicInfo>"""
+
+
+def _make_cbz(path, comicinfo=COMICINFO):
+    with zipfile.ZipFile(str(path), "w") as zf:
+        zf.writestr("001.jpg", b"\xff\xd8\xff")
+        if comicinfo is not None:
+            zf.writestr("ComicInfo.xml", comicinfo)
+    return str(path)
+
+
+def _wait_drained(metadata_scanner, timeout=10):
+    deadline = time.time() + timeout
+    while metadata_scanner.metadata_queue.unfinished_tasks:
+        if time.time() > deadline:
+            raise AssertionError("scanner did not drain")
+        time.sleep(0.01)
+
+
+class TestReadFileMetadata:
+
+    def test_cbz_with_comicinfo(self, tmp_path):
+        from metadata_scanner import read_file_metadata
+
+        db_metadata, has_comicinfo = read_file_metadata(_make_cbz(tmp_path / "a.cbz"))
+        assert has_comicinfo == 1
+        assert db_metadata["ci_series"] == "Batman"
+        assert db_metadata["ci_number"] == "12"
+        assert db_metadata["ci_writer"] == "Tom King"
+        assert db_metadata["ci_genre"] == ""
+
+    def test_cbz_without_comicinfo(self, tmp_path):
+        from metadata_scanner import read_file_metadata
+
+        db_metadata, has_comicinfo = read_file_metadata(_make_cbz(tmp_path / "a.cbz", comicinfo=None))
+        assert has_comicinfo == 0
+        assert set(db_metadata.values()) == {""}
+
+    def test_missing_file(self, tmp_path):
+        from metadata_scanner import read_file_metadata
+
+        assert read_file_metadata(str(tmp_path / "gone.cbz")) is None
+
+    def test_invalid_zip_raises(self, tmp_path):
+        from metadata_scanner import read_file_metadata
+
+        bad = tmp_path / "bad.cbz"
+        bad.write_bytes(b"not a zip")
+        with pytest.raises(zipfile.BadZipFile):
+            read_file_metadata(str(bad))
+
+    def test_cbr_reads_comicinfo_case_insensitively(self, tmp_path, monkeypatch):
+        import comicinfo
+        from metadata_scanner import read_file_metadata
+
+        archive = MagicMock()
+        archive.__enter__.return_value = archive
+        archive.namelist.return_value = ["001.jpg", "comicinfo.xml"]
+        archive.read.return_value = COMICINFO
+        monkeypatch.setattr(comicinfo.rarfile, "RarFile", MagicMock(return_value=archive))
+
+        cbr = tmp_path / "a.cbr"
+        cbr.write_bytes(b"Rar!")
+        db_metadata, has_comicinfo = read_file_metadata(str(cbr))
+        assert has_comicinfo == 1
+        assert db_metadata["ci_series"] == "Batman"
+        archive.read.assert_called_once_with("comicinfo.xml")
+
+    def test_is_scannable(self):
+        from metadata_scanner import is_scannable
+
+        assert is_scannable("/data/a.CBZ")
+        assert is_scannable("/data/a.cbr")
+        assert not is_scannable("/data/a.pdf")
+
+
+@pytest.fixture
+def scanner(monkeypatch):
+    """Run the dispatcher on threads, recording the queued database writes."""
+    import metadata_scanner
+
+    writes = []
+    monkeypatch.setattr(metadata_scanner, "queue_file_metadata",
+                        lambda file_id, metadata, scanned_at, has_comicinfo=None:
+                        writes.append((file_id, metadata["ci_series"], has_comicinfo)))
+    monkeypatch.setattr(metadata_scanner, "queue_metadata_scanned_at",
+                        lambda file_id, scanned_at: writes.append((file_id, None, None)))
+    monkeypatch.setattr(metadata_scanner, "_workers", 2)
+    monkeypatch.setattr(metadata_scanner, "_use_processes", False)
+    monkeypatch.setattr(metadata_scanner, "_max_in_flight", 4)
+    monkeypatch.setattr(metadata_scanner, "_executor", metadata_scanner._create_executor())
+    monkeypatch.setattr(metadata_scanner, "scanner_progress", dict(metadata_scanner.scanner_progress,
+                                                                   scanned_count=0, errors=0,
+                                                                   started_at=time.time() - 10))
+
+    thread = threading.Thread(target=metadata_scanner.scan_dispatcher, daemon=True)
+    thread.start()
+    yield writes
+    metadata_scanner.metadata_queue.put(
+        metadata_scanner.ScanTask(metadata_scanner.PRIORITY_STOP, None, None, None))
+    thread.join(timeout=5)
+    metadata_scanner._executor.shutdown(wait=True)
+
+
+class TestScanDispatcher:
+
+    def test_scans_queued_files(self, scanner, tmp_path):
+        import metadata_scanner
+        from metadata_scanner import ScanTask, PRIORITY_BATCH, _put_task
+
+        good = _make_cbz(tmp_path / "good.cbz")
+        bad = tmp_path / "bad.cbz"
+        bad.write_bytes(b"not a zip")
+
+        _put_task(ScanTask(PRIORITY_BATCH, good, 1, 0))
+        _put_task(ScanTask(PRIORITY_BATCH, str(bad), 2, 0))
+        _put_task(ScanTask(PRIORITY_BATCH, str(tmp_path / "missing.cbz"), 3, 0))
+        _wait_drained(metadata_scanner)
+
+        assert sorted(scanner, key=lambda w: w[0]) == [(1, "Batman", 1), (2, None, None), (3, None, None)]
+        assert metadata_scanner.scanner_progress["scanned_count"] == 3
+        assert metadata_scanner._queued_ids == {}
+
+    def test_skip_queued_dedupes_backlog(self, monkeypatch):
+        import metadata_scanner
+        from metadata_scanner import ScanTask, PRIORITY_BATCH, _put_task
+
+        monkeypatch.setattr(metadata_scanner, "metadata_queue", MagicMock())
+        monkeypatch.setattr(metadata_scanner, "_queued_ids", {})
+
+        assert _put_task(ScanTask(PRIORITY_BATCH, "/data/a.cbz", 7, 0), skip_queued=True) is True
+        assert _put_task(ScanTask(PRIORITY_BATCH, "/data/a.cbz", 7, 0), skip_queued=True) is False
+        # Explicit requests (new or modified files) are always queued
+        assert _put_task(ScanTask(PRIORITY_BATCH, "/data/a.cbz", 7, 0)) is True
+        assert metadata_scanner._queued_ids == {7: 2}
+
+
+class TestConfiguredWorkers:
+
+    @pytest.mark.parametrize("settings, cpus, expected", [
+        ({}, 16, 4),
+        ({}, 2, 2),
+        ({}, None, 2),
+        ({"METADATA_SCAN_THREADS": "3"}, 16, 3),
+        ({"METADATA_SCAN_THREADS": "3", "METADATA_SCAN_WORKERS": "6"}, 16, 6),
+    ])
+    def test_fallbacks(self, monkeypatch, settings, cpus, expected):
+        import configparser
+        import metadata_scanner
+
+        parser = configparser.ConfigParser()
+        parser["SETTINGS"] = settings
+        monkeypatch.setattr(metadata_scanner, "config", parser)
+        monkeypatch.setattr(metadata_scanner.os, "cpu_count", lambda: cpus)
+        assert metadata_scanner.configured_workers() == expected
+
+
+class TestScannerStatus:
+
+    def test_throughput_and_eta(self, monkeypatch):
+        import metadata_scanner
+
+        now = time.time()
+        monkeypatch.setattr(metadata_scanner, "get_metadata_scan_stats",
+                            lambda: {"total": 1000, "scanned": 400, "pending": 600})
+        monkeypatch.setattr(metadata_scanner, "get_db_writer_stats", lambda: {})
+        monkeypatch.setattr(metadata_scanner, "scanner_progress",
+                            dict(metadata_scanner.scanner_progress, started_at=now - 120))
+        monkeypatch.setattr(metadata_scanner, "_finished_times", [now - i * 0.05 for i in range(600)])
+
+        status = metadata_scanner.get_scanner_status()
+        assert status["files_per_second"] == pytest.approx(10.0, abs=0.5)
+        assert status["eta_seconds"] == pytest.approx(60, abs=5)
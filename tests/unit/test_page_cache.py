@@ -0,0 +1,113 @@
+"""Tests for page_cache.py -- page LRU, read-ahead, ETags and session counters."""
+import os
+import time
+import zipfile
+
+import pytest
+
+
+def _make_cbz(path, pages=6, page_size=1000):
+    with zipfile.ZipFile(str(path), "w") as zf:
+        for i in range(pages):
+            zf.writestr(f"{i:03d}.jpg", bytes([i]) * page_size)
+    return str(path)
+
+
+def _toc(path):
+    from archive_toc import ArchiveTocCache
+    return ArchiveTocCache(max_bytes=10 ** 6).get(path)
+
+
+def _wait_for_prefetch(cache, timeout=5):
+    deadline = time.time() + timeout
+    while cache.get_stats()["in_flight"] and time.time() < deadline:
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def cache():
+    from page_cache import PageCache
+    return PageCache(max_bytes=10 ** 6, prefetch_pages=2, workers=1)
+
+
+class TestPageCache:
+
+    def test_miss_then_hit(self, tmp_path, cache):
+        toc = _toc(_make_cbz(tmp_path / "a.cbz"))
+
+        data, mime = cache.get_page(toc, 0)
+        assert data == bytes([0]) * 1000
+        assert mime == "image/jpeg"
+        assert cache.get_page(toc, 0)[0] == data
+
+        stats = cache.get_stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 1
+
+    def test_next_pages_prefetched(self, tmp_path, cache):
+        toc = _toc(_make_cbz(tmp_path / "a.cbz"))
+
+        cache.get_page(toc, 0)
+        _wait_for_prefetch(cache)
+        assert cache.get_stats()["prefetched"] == 2
+
+        assert cache.get_page(toc, 1)[0] == bytes([1]) * 1000
+        stats = cache.get_stats()
+        assert stats["prefetch_hits"] == 1
+        assert stats["prefetch_hit_rate"] == 0.5
+
+    def test_prefetch_stops_at_last_page(self, tmp_path, cache):
+        toc = _toc(_make_cbz(tmp_path / "a.cbz", pages=2))
+
+        cache.get_page(toc, 1)
+        _wait_for_prefetch(cache)
+        assert cache.get_stats()["prefetched"] == 0
+
+    def test_out_of_range(self, tmp_path, cache):
+        toc = _toc(_make_cbz(tmp_path / "a.cbz", pages=2))
+        with pytest.raises(IndexError):
+            cache.get_page(toc, 2)
+
+    def test_budget_evicts_oldest(self, tmp_path):
+        from page_cache import PageCache
+
+        cache = PageCache(max_bytes=2500, prefetch_pages=0)
+        toc = _toc(_make_cbz(tmp_path / "a.cbz"))
+        for n in range(4):
+            cache.get_page(toc, n)
+
+        stats = cache.get_stats()
+        assert stats["entries"] == 2
+        assert stats["bytes"] <= 2500
+        assert stats["evictions"] == 2
+
+    def test_per_session_counters(self, tmp_path, cache):
+        path = _make_cbz(tmp_path / "a.cbz")
+        toc = _toc(path)
+        session = ("10.0.0.1", path)
+
+        cache.get_page(toc, 0, session)
+        _wait_for_prefetch(cache)
+        cache.get_page(toc, 1, session)
+        cache.get_page(toc, 2, session)
+
+        sessions = cache.get_stats()["sessions"]
+        assert len(sessions) == 1
+        assert sessions[0]["client"] == "10.0.0.1"
+        assert sessions[0]["pages"] == 3
+        assert sessions[0]["prefetch_hits"] == 2
+        assert sessions[0]["misses"] == 1
+
+
+class TestPageEtag:
+
+    def test_changes_with_archive(self, tmp_path):
+        from page_cache import get_page_etag
+
+        path = _make_cbz(tmp_path / "a.cbz")
+        before = get_page_etag(_toc(path), 0)
+        assert get_page_etag(_toc(path), 1) != before
+
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert get_page_etag(_toc(path), 0) != before
@@ -0,0 +1,165 @@
+"""Tests for page_renditions.py -- query parsing, resizing and the disk LRU."""
+import io
+import os
+import zipfile
+
+import pytest
+from PIL import Image
+
+
+def _png(width=1200, height=1800, color=(200, 30, 30)):
+    buf = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _reparse(path):
+    from archive_toc import ArchiveTocCache
+    return ArchiveTocCache(max_bytes=10 ** 6).get(path)
+
+
+def _toc(tmp_path, pages=2):
+    path = str(tmp_path / "a.cbz")
+    with zipfile.ZipFile(path, "w") as zf:
+        for i in range(pages):
+            zf.writestr(f"{i:03d}.png", _png())
+    return _reparse(path)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    from page_renditions import RenditionCache
+    return RenditionCache(root=str(tmp_path / "renditions"), max_bytes=10 ** 7)
+
+
+# ===== parse_rendition_args =====
+
+class TestParseRenditionArgs:
+
+    def test_no_params(self):
+        from page_renditions import parse_rendition_args
+        assert parse_rendition_args({}) is None
+
+    def test_full_spec(self):
+        from page_renditions import parse_rendition_args
+
+        spec = parse_rendition_args({"w": "800", "fmt": "WEBP", "q": "60", "gray": "1"})
+        assert (spec.width, spec.height, spec.fmt, spec.quality, spec.grayscale) == (800, 0, "webp", 60, True)
+        assert spec.mime_type == "image/webp"
+        assert spec.key == "w800h0-webp-q60-g"
+
+    def test_defaults(self):
+        from page_renditions import parse_rendition_args, DEFAULT_QUALITY
+
+        spec = parse_rendition_args({"h": "1000"})
+        assert spec.fmt == "jpeg"
+        assert spec.quality == DEFAULT_QUALITY
+        assert not spec.grayscale
+
+    @pytest.mark.parametrize("args", [
+        {"w": "abc"}, {"w": "0"}, {"h": "100000"}, {"q": "101"}, {"fmt": "gif"},
+    ])
+    def test_invalid(self, args):
+        from page_renditions import parse_rendition_args
+        with pytest.raises(ValueError):
+            parse_rendition_args(args)
+
+
+# ===== render_page =====
+
+class TestRenderPage:
+
+    def test_resizes_keeping_aspect_ratio(self):
+        from page_renditions import RenditionSpec, render_page
+
+        data = render_page(_png(), RenditionSpec(width=600, fmt="webp"))
+        img = Image.open(io.BytesIO(data))
+        assert img.format == "WEBP"
+        assert img.size == (600, 900)
+
+    def test_never_upscales(self):
+        from page_renditions import RenditionSpec, render_page
+
+        img = Image.open(io.BytesIO(render_page(_png(300, 400), RenditionSpec(width=1000))))
+        assert img.size == (300, 400)
+
+    def test_grayscale_jpeg(self):
+        from page_renditions import RenditionSpec, render_page
+
+        img = Image.open(io.BytesIO(render_page(_png(), RenditionSpec(height=300, grayscale=True))))
+        assert img.format == "JPEG"
+        assert img.mode == "L"
+        assert img.size == (200, 300)
+
+    def test_alpha_source_converted(self):
+        from page_renditions import RenditionSpec, render_page
+
+        buf = io.BytesIO()
+        Image.new("RGBA", (100, 100), (0, 0, 0, 0)).save(buf, format="PNG")
+        img = Image.open(io.BytesIO(render_page(buf.getvalue(), RenditionSpec())))
+        assert img.mode == "RGB"
+
+
+# ===== RenditionCache =====
+
+class TestRenditionCache:
+
+    def test_miss_then_disk_hit(self, tmp_path, cache):
+        from page_renditions import RenditionSpec
+
+        toc = _toc(tmp_path)
+        spec = RenditionSpec(width=400)
+        loads = []
+
+        def load():
+            loads.append(1)
+            return _png()
+
+        first = cache.get(toc, 0, spec, load)
+        assert os.path.exists(cache.path_for(toc, 0, spec))
+        assert cache.get(toc, 0, spec, load) == first
+        assert len(loads) == 1
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["bytes"] == len(first)
+        assert 0 < stats["size_ratio"] < 1
+
+    def test_key_depends_on_page_spec_and_archive(self, tmp_path, cache):
+        from page_renditions import RenditionSpec
+
+        toc = _toc(tmp_path)
+        path = cache.path_for(toc, 0, RenditionSpec(width=400))
+        assert cache.path_for(toc, 1, RenditionSpec(width=400)) != path
+        assert cache.path_for(toc, 0, RenditionSpec(width=500)) != path
+        assert cache.path_for(toc, 0, RenditionSpec(width=400, fmt="webp")).endswith(".webp")
+
+        st = os.stat(toc.path)
+        os.utime(toc.path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert cache.path_for(_reparse(toc.path), 0, RenditionSpec(width=400)) != path
+
+    def test_size_cap_evicts_least_recently_used(self, tmp_path):
+        from page_renditions import RenditionCache, RenditionSpec
+
+        toc = _toc(tmp_path)
+        probe = RenditionCache(root=str(tmp_path / "probe"), max_bytes=10 ** 7)
+        one = len(probe.get(toc, 0, RenditionSpec(width=100), _png))
+
+        cache = RenditionCache(root=str(tmp_path / "renditions"), max_bytes=int(one * 2.5))
+        specs = [RenditionSpec(width=100, quality=q) for q in (70, 71, 72)]
+        paths = [cache.path_for(toc, 0, s) for s in specs]
+
+        cache.get(toc, 0, specs[0], _png)
+        cache.get(toc, 0, specs[1], _png)
+        os.utime(paths[0], (1, 1))
+        os.utime(paths[1], (2, 2))
+        cache.get(toc, 0, specs[0], _png)   # hit bumps specs[0]; specs[1] is now oldest
+        cache.get(toc, 0, specs[2], _png)
+
+        assert os.path.exists(paths[0])
+        assert not os.path.exists(paths[1])
+        assert os.path.exists(paths[2])
+        stats = cache.get_stats()
+        assert stats["evictions"] == 1
+        assert stats["bytes"] <= int(one * 2.5)
@@ -0,0 +1,207 @@
+"""Tests for models/providers/cache.py -- cached provider lookups, TTLs and stats."""
+import threading
+import time
+
+import pytest
+
+from models.providers.base import BaseProvider, IssueResult, ProviderType, SearchResult
+
+
+class FakeProvider(BaseProvider):
+    """Provider counting the calls that reach the 'API'."""
+
+    provider_type = ProviderType.COMICVINE
+    display_name = "Fake"
+    negative_cache_ttl = 600
+
+    def __init__(self, credentials=None):
+        super().__init__(credentials)
+        self.calls = []
+
+    def test_connection(self):
+        return True
+
+    def search_series(self, query, year=None):
+        from models.providers.cache import mark_lookup_failed
+
+        self.calls.append(("search", query, year))
+        if query == "nothing":
+            return []
+        if query == "broken":
+            mark_lookup_failed()
+            return []
+        return [SearchResult(provider=self.provider_type, id="42", title="Batman", year=2016)]
+
+    def get_series(self, series_id):
+        self.calls.append(("series", series_id))
+        return None
+
+    def get_issues(self, series_id):
+        self.calls.append(("issues", series_id))
+        return [IssueResult(provider=self.provider_type, id=str(n), series_id=series_id, issue_number=str(n))
+                for n in range(1, 4)]
+
+    def get_issue(self, issue_id):
+        self.calls.append(("issue", issue_id))
+        return None
+
+    def to_comicinfo(self, issue, series=None):
+        return {}
+
+
+@pytest.fixture
+def provider(db_connection):
+    from models.providers.cache import reset_provider_cache_stats
+
+    reset_provider_cache_stats()
+    yield FakeProvider()
+    reset_provider_cache_stats()
+
+
+class TestCachedLookups:
+
+    def test_second_call_is_served_from_cache(self, provider):
+        first = provider.get_issues("42")
+        second = FakeProvider().get_issues("42")
+
+        assert provider.calls == [("issues", "42")]
+        assert second == first
+        assert isinstance(second[0], IssueResult)
+        assert second[0].provider is ProviderType.COMICVINE
+
+    def test_search_key_normalizes_query(self, provider):
+        provider.search_series("Batman", 2016)
+        provider.search_series("  batman ", year=2016)
+        provider.search_series("Batman", 2020)
+
+        assert [c[2] for c in provider.calls] == [2016, 2020]
+
+    def test_empty_results_cached(self, provider):
+        assert provider.search_series("nothing") == []
+        assert provider.search_series("nothing") == []
+        assert provider.get_series("7") is None
+        assert provider.get_series("7") is None
+
+        assert provider.calls == [("search", "nothing", None), ("series", "7")]
+
+    def test_failed_lookup_not_cached(self, provider):
+        from models.providers.cache import get_provider_cache_stats
+
+        assert provider.search_series("broken") == []
+        assert provider.search_series("broken") == []
+        provider.search_series("nothing")
+
+        assert provider.calls.count(("search", "broken", None)) == 2
+        stats = get_provider_cache_stats()["providers"]["comicvine"]
+        assert stats["failures"] == 2
+        assert stats["entries"] == {"search": 1}
+
+    def test_concurrent_calls_share_one_lookup(self, provider, monkeypatch):
+        import models.providers.cache as cache
+
+        started = threading.Event()
+        original = FakeProvider.get_series.__wrapped__
+
+        def slow_get_series(self, series_id):
+            started.set()
+            time.sleep(0.2)
+            return original(self, series_id)
+
+        wrapped = cache.cached_provider_method(slow_get_series, "series", lambda series_id: series_id,
+                                               lambda value: value)
+        # Nothing stored: the waiters must reuse the first call's answer
+        monkeypatch.setattr(provider, "negative_cache_ttl", 0)
+        results = []
+
+        def call():
+            results.append(wrapped(provider, "7"))
+
+        first = threading.Thread(target=call)
+        first.start()
+        started.wait(5)
+        waiters = [threading.Thread(target=call) for _ in range(3)]
+        for thread in waiters:
+            thread.start()
+        for thread in [first, *waiters]:
+            thread.join(5)
+
+        assert provider.calls == [("series", "7")]
+        assert results == [None] * 4
+        assert cache._inflight == {}
+
+    def test_expired_entry_refetched(self, provider, db_connection):
+        provider.get_issues("42")
+        db_connection.execute("UPDATE provider_cache SET expires_at = datetime('now', '-1 minute')")
+        db_connection.commit()
+
+        provider.get_issues("42")
+        assert len(provider.calls) == 2
+
+    def test_disabled(self, provider, monkeypatch):
+        import models.providers.cache as cache
+
+        monkeypatch.setattr(cache, "is_provider_cache_enabled", lambda: False)
+        provider.get_issues("42")
+        provider.get_issues("42")
+        assert len(provider.calls) == 2
+
+
+    def test_module_function_cache(self, provider):
+        from models.providers.cache import mark_lookup_failed, provider_cache
+
+        calls = []
+
+        @provider_cache("gcd", "comicinfo", lambda series_id, number: f"{series_id}|{number}", ttl=600)
+        def lookup(series_id, number):
+            calls.append(number)
+            if number == "broken":
+                mark_lookup_failed()
+                return None
+            return {"Series": "Saga", "Number": number} if number != "9" else None
+
+        assert lookup(7, "1") == {"Series": "Saga", "Number": "1"}
+        assert lookup(7, "1") == {"Series": "Saga", "Number": "1"}
+        assert lookup(7, "9") is None
+        assert lookup(7, "9") is None
+        assert lookup(7, "broken") is None
+        assert lookup(7, "broken") is None
+
+        assert calls == ["1", "9", "broken", "broken"]
+
+class TestCacheMaintenance:
+
+    def test_stats(self, provider):
+        from models.providers.cache import get_provider_cache_stats
+
+        provider.get_issues("42")
+        provider.get_issues("42")
+        provider.get_issue("9")
+        provider.get_issue("9")
+
+        stats = get_provider_cache_stats()["providers"]["comicvine"]
+        assert (stats["hits"], stats["negative_hits"], stats["misses"]) == (1, 1, 2)
+        assert stats["hit_rate"] == 0.5
+        assert stats["entries"] == {"issues": 1, "issue": 1}
+
+    def test_sweep_removes_expired(self, provider, db_connection):
+        from models.providers.cache import sweep_provider_cache
+
+        provider.get_issues("42")
+        provider.get_issues("43")
+        db_connection.execute("UPDATE provider_cache SET expires_at = datetime('now', '-1 minute') "
+                              "WHERE provider_id = '42'")
+        db_connection.commit()
+
+        assert sweep_provider_cache() == 1
+
+    def test_clear_negative_only(self, provider):
+        from database import clear_provider_cache
+
+        provider.get_issues("42")
+        provider.get_series("7")
+
+        assert clear_provider_cache("comicvine", negative_only=True) == 1
+        provider.get_issues("42")
+        provider.get_series("7")
+        assert provider.calls[-1] == ("series", "7")
+        assert provider.calls.count(("issues", "42")) == 1
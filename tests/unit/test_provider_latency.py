@@ -0,0 +1,38 @@
+"""Tests for models/providers/latency.py -- provider lookup latency histograms."""
+import pytest
+
+from models.providers.latency import (get_provider_latency_stats, record_provider_latency,
+                                      record_provider_outcome, reset_provider_latency_stats)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_stats():
+    reset_provider_latency_stats()
+    yield
+    reset_provider_latency_stats()
+
+
+def test_buckets_are_cumulative():
+    record_provider_latency("metron", 0.05, "hit")
+    record_provider_latency("metron", 0.8, "miss")
+    record_provider_latency("metron", 45, "error")
+
+    stats = get_provider_latency_stats()["providers"]["metron"]
+    assert stats["count"] == 3
+    assert stats["buckets"]["le_0.1"] == 1
+    assert stats["buckets"]["le_1"] == 2
+    assert stats["buckets"]["le_30"] == 2
+    assert stats["buckets"]["le_inf"] == 3
+    assert stats["max_ms"] == 45000
+    assert stats["outcomes"] == {"hit": 1, "miss": 1, "error": 1, "timeout": 0, "cancelled": 0}
+
+
+def test_outcomes_without_latency():
+    record_provider_outcome("comicvine", "timeout")
+    record_provider_outcome("comicvine", "cancelled")
+
+    stats = get_provider_latency_stats()["providers"]["comicvine"]
+    assert stats["count"] == 0
+    assert stats["mean_ms"] == 0
+    assert stats["outcomes"]["timeout"] == 1
+    assert stats["outcomes"]["cancelled"] == 1
@@ -0,0 +1,124 @@
+"""Tests for models/providers/rate_limit.py -- shared provider request budgets."""
+import threading
+import time
+
+import pytest
+
+from models.providers.rate_limit import TokenBucket, get_rate_limiter, reset_rate_limiters
+
+
+@pytest.fixture(autouse=True)
+def _fresh_limiters():
+    reset_rate_limiters()
+    yield
+    reset_rate_limiters()
+
+
+class TestTokenBucket:
+
+    def test_burst_then_timeout(self):
+        bucket = TokenBucket("test", rate_per_minute=60, burst=3)
+        assert all(bucket.acquire(timeout=0) for _ in range(3))
+        assert bucket.acquire(timeout=0) is False
+
+    def test_refills_at_rate(self):
+        bucket = TokenBucket("test", rate_per_minute=600, burst=1)  # one token per 0.1s
+        assert bucket.acquire(timeout=0)
+        start = time.monotonic()
+        assert bucket.acquire(timeout=1)
+        assert 0.05 <= time.monotonic() - start < 0.5
+
+    def test_pause_blocks_all_callers(self):
+        bucket = TokenBucket("test", rate_per_minute=6000, burst=10)
+        bucket.pause(0.2)
+        assert bucket.paused_for() > 0
+        assert bucket.acquire(timeout=0.05) is False
+
+        acquired = []
+
+        def worker():
+            bucket.acquire()
+            acquired.append(time.monotonic())
+
+        threads = [threading.Thread(target=worker) for _ in range(3)]
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(acquired) == 3
+        assert min(acquired) - start >= 0.1
+
+    def test_shorter_pause_does_not_shorten_longer_one(self):
+        bucket = TokenBucket("test", rate_per_minute=60)
+        bucket.pause(10)
+        bucket.pause(1)
+        assert bucket.paused_for() > 5
+
+
+class TestGetRateLimiter:
+
+    def test_shared_per_provider_with_provider_rate(self):
+        metron = get_rate_limiter("metron")
+        assert get_rate_limiter("metron") is metron
+        assert get_rate_limiter("anilist") is not metron
+        assert metron.rate_per_minute == 30
+        assert get_rate_limiter("anilist").rate_per_minute == 90
+
+    def test_unknown_provider_uses_default(self):
+        assert get_rate_limiter("nope").rate_per_minute == 30
+
+
+class TestMetronMetering:
+
+    @pytest.fixture
+    def bucket(self, monkeypatch):
+        import models.providers.rate_limit as rate_limit
+
+        bucket = TokenBucket("metron", rate_per_minute=60, burst=2)
+        monkeypatch.setattr(rate_limit, "get_rate_limiter", lambda provider_type: bucket)
+        return bucket
+
+    def test_session_takes_token_per_request(self, bucket):
+        from models import metron
+
+        api = metron.get_api("user", "pass")
+        assert metron.meters_requests(api)
+
+        api.rate_limiter.acquire(None)
+        api.rate_limiter.acquire(None)
+        assert bucket.acquire(timeout=0) is False
+
+    def test_rejected_request_pauses_bucket_unless_daily(self, bucket):
+        from models.metron import SharedRateLimiter
+
+        SharedRateLimiter().on_rate_limited(86400)
+        assert bucket.paused_for() == 0
+        SharedRateLimiter().on_rate_limited(5)
+        assert 0 < bucket.paused_for() <= 5
+
+    def test_retry_does_not_take_extra_token(self, bucket):
+        from mokkari.exceptions import RateLimitError
+        from models.metron import _handle_rate_limit
+
+        start = time.monotonic()
+        assert _handle_rate_limit(RateLimitError("slow down", retry_after=0.2), 0, "test") is True
+        # Waiting for the pause is left to the retry's own acquire()
+        assert time.monotonic() - start < 0.1
+        assert bucket.paused_for() > 0
+
+    def test_unmetered_session_retry_waits_for_pause(self, bucket, monkeypatch):
+        from mokkari.exceptions import RateLimitError
+        import models.metron as metron
+
+        monkeypatch.setattr(metron, "_SESSION_METERS_REQUESTS", False)
+        attempts = []
+
+        def fn():
+            attempts.append(time.monotonic())
+            if len(attempts) == 1:
+                raise RateLimitError("slow down", retry_after=0.3)
+            return "ok"
+
+        assert metron._api_call(fn, "test") == "ok"
+        assert attempts[1] - attempts[0] >= 0.25
@@ -1,4 +1,5 @@
 """Tests for cbz_ops/rename.py -- filename parsing and renaming logic."""
+import os
 import pytest
 from unittest.mock import patch, MagicMock
 
@@ -454,6 +455,29 @@ class TestTryRuleEngine:
         result = try_rule_engine("batman 5.cbz", str(cfg))
         assert result == "Batman 005.cbz"
 
+    def test_rules_compiled_once_until_file_changes(self, tmp_path):
+        import configparser
+        from cbz_ops.rename import try_rule_engine
+        cfg = tmp_path / "rules.ini"
+        cfg.write_text(
+            "[RENAME]\n"
+            "myrule.pattern = ^(?P<series>.+?)\\s+(?P<issue>\\d+)\\.cbz$\n"
+            "myrule.output = {series|title} {issue|pad3}.cbz\n"
+        )
+        with patch("cbz_ops.rename.configparser.ConfigParser", wraps=configparser.ConfigParser) as cp:
+            assert try_rule_engine("batman 5.cbz", str(cfg)) == "Batman 005.cbz"
+            assert try_rule_engine("robin 7.cbz", str(cfg)) == "Robin 007.cbz"
+            assert cp.call_count == 1
+
+            cfg.write_text(
+                "[RENAME]\n"
+                "myrule.pattern = ^(?P<series>.+?)\\s+(?P<issue>\\d+)\\.cbz$\n"
+                "myrule.output = {series|upper} {issue|pad4}.cbz\n"
+            )
+            os.utime(cfg, ns=(0, 10**9))
+            assert try_rule_engine("batman 5.cbz", str(cfg)) == "BATMAN 0005.cbz"
+            assert cp.call_count == 2
+
 
 # ===== parentheses_replacer =====
 
@@ -480,3 +504,82 @@ class TestCleanDirectoryName:
         from cbz_ops.rename import clean_directory_name
         result = clean_directory_name("Title [Tag] (2020) (scan)")
         assert result == "Title (2020)"
+
+
+# ===== plan_renames / apply_renames =====
+
+class TestPlanRenames:
+
+    @pytest.fixture(autouse=True)
+    def _builtin_patterns_only(self):
+        with patch("cbz_ops.rename.try_rule_engine", return_value=None), \
+             patch("cbz_ops.rename.load_custom_rename_config", side_effect=AssertionError("loaded per file")):
+            yield
+
+    def _plan(self, directory):
+        from cbz_ops.rename import plan_renames
+        return {os.path.basename(p["old_path"]): p for p in plan_renames(str(directory), custom_config=(False, ""))}
+
+    def test_plans_without_renaming(self, tmp_path):
+        (tmp_path / "Comic Name v3 051 (2018) (DCP-Scan Final).cbz").write_bytes(b"x")
+        (tmp_path / "Comic Name 052 (2018).cbz").write_bytes(b"x")
+        (tmp_path / "random-file.txt").write_bytes(b"x")
+
+        plans = self._plan(tmp_path)
+
+        rename = plans["Comic Name v3 051 (2018) (DCP-Scan Final).cbz"]
+        assert rename["status"] == "rename"
+        assert rename["new_path"] == str(tmp_path / "Comic Name v3 051 (2018).cbz")
+        assert plans["Comic Name 052 (2018).cbz"]["status"] == "unchanged"
+        assert plans["random-file.txt"]["status"] == "unmatched"
+        assert (tmp_path / "Comic Name v3 051 (2018) (DCP-Scan Final).cbz").exists()
+
+    def test_collisions_get_suffixes(self, tmp_path):
+        (tmp_path / "Comic Name 051 (2018).cbz").write_bytes(b"x")
+        (tmp_path / "Comic Name 051 (2018) (digital).cbz").write_bytes(b"x")
+        (tmp_path / "Comic Name 051 (2018) (scan).cbz").write_bytes(b"x")
+
+        plans = self._plan(tmp_path)
+        targets = sorted(p["new_path"] for p in plans.values() if p["status"] == "rename")
+
+        assert targets == [str(tmp_path / "Comic Name 051 (2018) (1).cbz"),
+                           str(tmp_path / "Comic Name 051 (2018) (2).cbz")]
+        assert all(p["collision"] for p in plans.values() if p["status"] == "rename")
+
+    def test_apply_renames_and_updates_index_once(self, tmp_path):
+        from cbz_ops.rename import apply_renames, plan_renames
+        (tmp_path / "Comic Name 051 (2018) (digital).cbz").write_bytes(b"x")
+        (tmp_path / "Comic Name v3 052 (2018) (scan).cbz").write_bytes(b"x")
+
+        plans = plan_renames(str(tmp_path), custom_config=(False, ""))
+        with patch("database.rename_file_index_entries") as update_index:
+            renamed = apply_renames(plans)
+
+        assert sorted(os.listdir(tmp_path)) == ["Comic Name 051 (2018).cbz", "Comic Name v3 052 (2018).cbz"]
+        update_index.assert_called_once_with(renamed)
+        assert len(renamed) == 2
+
+
+class TestBenchmarkRename:
+
+    # Real-world names from the library patterns above
+    CORPUS = [
+        "Leonard Nimoy's Primortals (00 1996).cbz",
+        "Blue Devil, 1984-04-00 (_01) (digital) (Glorith-Novus-HD).cbz",
+        "Legion of Super-Heroes, 1985-07-00 (#14) (digital) (Glorith-Novus-HD).cbz",
+        "Spider-Man 2099 (1992) #44 (digital) (Colecionadores.GO).cbz",
+        "199309 Hokum & Hex v1 001.cbz",
+        "Comic Name v3 051 (2018) (DCP-Scan Final).cbz",
+        "Injustice 2 001 (2018).cbz",
+        "random-file.txt",
+    ]
+
+    def test_reports_throughput(self):
+        from cbz_ops.rename import benchmark_rename
+        with patch("cbz_ops.rename.try_rule_engine", return_value=None):
+            report = benchmark_rename(self.CORPUS * 10)
+
+        assert report["files"] == 80
+        assert report["matched"] == 70
+        assert report["changed"] == 60
+        assert report["files_per_second"] > 0
@@ -0,0 +1,169 @@
+"""Tests for thumbnail_pipeline.py -- cover rendering, priorities and status writes."""
+import io
+import threading
+import time
+import zipfile
+
+import pytest
+from PIL import Image
+
+
+def _jpeg(width=1600, height=2400):
+    buf = io.BytesIO()
+    Image.new("RGB", (width, height), (10, 120, 200)).save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+def _make_cbz(path, pages=None):
+    with zipfile.ZipFile(str(path), "w") as zf:
+        for name, data in (pages if pages is not None else [("001.jpg", _jpeg())]):
+            zf.writestr(name, data)
+    return str(path)
+
+
+def _wait(pipeline, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        stats = pipeline.get_stats()
+        if not stats["pending"] and not stats["running"]:
+            return
+        time.sleep(0.01)
+    raise AssertionError("pipeline did not drain")
+
+
+@pytest.fixture
+def statuses(monkeypatch):
+    import thumbnail_pipeline
+
+    recorded = []
+    monkeypatch.setattr(thumbnail_pipeline, "queue_thumbnail_status",
+                        lambda path, status, file_mtime=None: recorded.append((path, status)))
+    return recorded
+
+
+# ===== render_thumbnail =====
+
+class TestRenderThumbnail:
+
+    def test_jpeg_cover_resized_to_height(self, tmp_path):
+        from thumbnail_pipeline import render_thumbnail, THUMBNAIL_HEIGHT
+
+        out = tmp_path / "thumbs" / "ab" / "x.jpg"
+        assert render_thumbnail(_make_cbz(tmp_path / "a.cbz"), str(out)) == "completed"
+
+        img = Image.open(out)
+        assert img.size == (200, THUMBNAIL_HEIGHT)
+        assert not list(out.parent.glob("*.tmp"))
+
+    def test_png_with_alpha(self, tmp_path):
+        from thumbnail_pipeline import render_thumbnail
+
+        buf = io.BytesIO()
+        Image.new("RGBA", (600, 900), (0, 0, 0, 0)).save(buf, format="PNG")
+        out = tmp_path / "x.jpg"
+        render_thumbnail(_make_cbz(tmp_path / "a.cbz", [("001.png", buf.getvalue())]), str(out))
+        assert Image.open(out).mode == "RGB"
+
+    def test_unsupported_format_skipped(self, tmp_path):
+        from thumbnail_pipeline import render_thumbnail
+
+        pdf = tmp_path / "a.pdf"
+        pdf.write_bytes(b"%PDF")
+        assert render_thumbnail(str(pdf), str(tmp_path / "x.jpg")) == "skipped"
+
+    def test_archive_without_images(self, tmp_path):
+        from thumbnail_pipeline import render_thumbnail
+
+        path = _make_cbz(tmp_path / "a.cbz", [("ComicInfo.xml", b"<ComicInfo/>")])
+        with pytest.raises(IndexError):
+            render_thumbnail(path, str(tmp_path / "x.jpg"))
+
+
+# ===== ThumbnailPipeline =====
+
+class TestThumbnailPipeline:
+
+    def test_generates_and_records_status(self, tmp_path, statuses):
+        from thumbnail_pipeline import ThumbnailPipeline
+
+        pipeline = ThumbnailPipeline(workers=2, use_processes=False)
+        good = _make_cbz(tmp_path / "good.cbz")
+        bad = _make_cbz(tmp_path / "bad.cbz", [])
+        try:
+            pipeline.submit(good, str(tmp_path / "good.jpg"))
+            pipeline.submit(bad, str(tmp_path / "bad.jpg"))
+            _wait(pipeline)
+        finally:
+            pipeline.stop()
+
+        assert sorted(statuses) == [(bad, "error"), (good, "completed")]
+        stats = pipeline.get_stats()
+        assert stats["completed"] == 1
+        assert stats["errors"] == 1
+
+    def test_visible_requests_jump_the_queue(self, tmp_path, statuses, monkeypatch):
+        import thumbnail_pipeline
+        from thumbnail_pipeline import ThumbnailPipeline, PRIORITY_VISIBLE
+
+        gate = threading.Event()
+        order = []
+
+        def fake_render(file_path, cache_path):
+            gate.wait(5)
+            order.append(file_path)
+            return "completed"
+
+        monkeypatch.setattr(thumbnail_pipeline, "render_thumbnail", fake_render)
+        pipeline = ThumbnailPipeline(workers=1, use_processes=False)
+        try:
+            pipeline.submit("blocker", "unused")
+            while not pipeline.get_stats()["running"]:
+                time.sleep(0.01)
+            for name in ("bg1", "bg2", "bg3"):
+                pipeline.submit(name, "unused")
+            pipeline.submit("visible", "unused", PRIORITY_VISIBLE)
+            assert not pipeline.submit("bg3", "unused", PRIORITY_VISIBLE)  # promoted, not duplicated
+            gate.set()
+            _wait(pipeline)
+        finally:
+            pipeline.stop()
+
+        assert order == ["blocker", "visible", "bg3", "bg1", "bg2"]
+        stats = pipeline.get_stats()
+        assert stats["queued"] == 5
+        assert stats["promoted"] == 1
+
+    def test_duplicate_submit_ignored(self, statuses, monkeypatch):
+        import thumbnail_pipeline
+        from thumbnail_pipeline import ThumbnailPipeline
+
+        gate = threading.Event()
+        monkeypatch.setattr(thumbnail_pipeline, "render_thumbnail", lambda *a: gate.wait(5) and "completed")
+        pipeline = ThumbnailPipeline(workers=1, use_processes=False)
+        try:
+            assert pipeline.submit("a", "unused")
+            assert not pipeline.submit("a", "unused")
+            assert pipeline.is_queued("a")
+            gate.set()
+            _wait(pipeline)
+        finally:
+            pipeline.stop()
+
+        assert statuses == [("a", "completed")]
+        assert not pipeline.is_queued("a")
+
+    def test_process_pool(self, tmp_path, statuses):
+        from thumbnail_pipeline import ThumbnailPipeline
+
+        pipeline = ThumbnailPipeline(workers=1, use_processes=True)
+        path = _make_cbz(tmp_path / "a.cbz")
+        out = tmp_path / "a.jpg"
+        try:
+            pipeline.submit(path, str(out))
+            _wait(pipeline, timeout=60)
+        finally:
+            pipeline.stop()
+
+        assert statuses == [(path, "completed")]
+        assert out.exists()
+        assert pipeline.get_stats()["mode"] == "processes"
@@ -0,0 +1,286 @@
+"""
+thumbnail_pipeline.py - Prioritized thumbnail generation
+
+Thumbnails used to go through a fixed 2-thread pool in submission order, so a
+cover the user was looking at waited behind the whole startup library scan.
+This module replaces it with:
+1. A priority queue: covers requested by /api/thumbnail (PRIORITY_VISIBLE)
+   jump ahead of the background scan (PRIORITY_BACKGROUND); a queued path
+   requested again with a better priority is promoted, never duplicated
+2. A process pool sized to the CPU count (THUMBNAIL_WORKERS) for the Pillow
+   decode/resize work, which holds the GIL in threads. Only as many jobs as
+   there are workers are handed to the pool so priorities keep applying to
+   the backlog. THUMBNAIL_USE_PROCESSES = False runs the same work on threads
+3. Reduced-resolution JPEG decoding with Image.draft(), so a 4K cover is
+   decoded at 1/2-1/8 scale before the final resize
+4. CBZ/ZIP and CBR/RAR covers, read through the archive table of contents
+5. Status changes go through the batching database writer instead of one
+   thumbnail_jobs transaction per file
+"""
+
+import hashlib
+import heapq
+import io
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from PIL import Image
+
+from app_logging import app_logger
+from archive_toc import get_archive_kind, read_archive_page
+from config import config
+from db_writer import queue_thumbnail_status
+
+THUMBNAIL_HEIGHT = 300
+THUMBNAIL_QUALITY = 85
+
+PRIORITY_VISIBLE = 0
+PRIORITY_BACKGROUND = 10
+
+
+def get_thumbnail_cache_path(file_path):
+    """Sharded cache location of a file's thumbnail under CACHE_DIR/thumbnails."""
+    path_hash = hashlib.md5(file_path.encode('utf-8'), usedforsecurity=False).hexdigest()
+    thumbnails_dir = os.path.join(config.get("SETTINGS", "CACHE_DIR", fallback="/cache"), "thumbnails")
+    return os.path.join(thumbnails_dir, path_hash[:2], f"{path_hash}.jpg")
+
+
+def render_thumbnail(file_path, cache_path):
+    """
+    Write the cover thumbnail of an archive. Runs inside a pool worker.
+
+    Args:
+        file_path: Path to the comic file
+        cache_path: Where to save the JPEG thumbnail
+
+    Returns:
+        'completed', or 'skipped' for formats without page images (e.g. PDF)
+
+    Raises:
+        IndexError: The archive contains no images
+        Exception: Unreadable archive or image
+    """
+    if not get_archive_kind(file_path):
+        return 'skipped'
+
+    image_data, _ = read_archive_page(file_path, 0)
+    img = Image.open(io.BytesIO(image_data))
+
+    if img.format == 'JPEG':
+        # Let libjpeg decode at the smallest scale still >= the thumbnail size
+        img.draft('RGB', (max(1, THUMBNAIL_HEIGHT * img.width // img.height), THUMBNAIL_HEIGHT))
+    if img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+
+    new_width = int(THUMBNAIL_HEIGHT * img.width / img.height)
+    img.thumbnail((new_width, THUMBNAIL_HEIGHT), Image.Resampling.LANCZOS)
+
+    # Write to a temp file first so /api/thumbnail never serves a partial image
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    img.save(tmp_path, format='JPEG', quality=THUMBNAIL_QUALITY)
+    os.replace(tmp_path, cache_path)
+    return 'completed'
+
+
+class ThumbnailPipeline:
+    """Priority queue of thumbnail jobs feeding a process (or thread) pool."""
+
+    def __init__(self, workers=None, use_processes=None):
+        self._workers = workers
+        self._use_processes = use_processes
+        self._executor = None
+        self._dispatcher = None
+        self._stopping = False
+
+        self._heap = []        # (priority, seq, path); superseded items are skipped
+        self._pending = {}     # path -> (priority, seq, cache_path)
+        self._running = set()
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+        self.stats = {
+            'queued': 0,
+            'promoted': 0,
+            'completed': 0,
+            'skipped': 0,
+            'errors': 0,
+            'render_time': 0.0,
+        }
+
+    @property
+    def workers(self):
+        if self._workers is None:
+            return max(1, config.getint("SETTINGS", "THUMBNAIL_WORKERS", fallback=os.cpu_count() or 2))
+        return self._workers
+
+    def submit(self, file_path, cache_path, priority=PRIORITY_BACKGROUND):
+        """
+        Queue a thumbnail, or promote it if already queued at a lower priority.
+
+        Returns:
+            True if the path was newly queued, False if it was already queued
+            or being generated
+        """
+        with self._cond:
+            if self._stopping:
+                return False
+            if file_path in self._running:
+                return False
+
+            entry = self._pending.get(file_path)
+            if entry is not None:
+                if priority < entry[0]:
+                    seq = next(self._seq)
+                    self._pending[file_path] = (priority, seq, cache_path)
+                    heapq.heappush(self._heap, (priority, seq, file_path))
+                    self.stats['promoted'] += 1
+                    self._cond.notify()
+                return False
+
+            seq = next(self._seq)
+            self._pending[file_path] = (priority, seq, cache_path)
+            heapq.heappush(self._heap, (priority, seq, file_path))
+            self.stats['queued'] += 1
+            self._ensure_started()
+            self._cond.notify()
+            return True
+
+    def is_queued(self, file_path):
+        """Check whether a path is waiting or being generated."""
+        with self._cond:
+            return file_path in self._pending or file_path in self._running
+
+    def stop(self, wait=True):
+        """Drop queued jobs and shut the pool down."""
+        with self._cond:
+            self._stopping = True
+            self._heap.clear()
+            self._pending.clear()
+            self._cond.notify_all()
+            dispatcher, executor = self._dispatcher, self._executor
+        if dispatcher is not None:
+            dispatcher.join(timeout=5)
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def get_stats(self):
+        with self._cond:
+            stats = dict(self.stats)
+            stats['pending'] = len(self._pending)
+            stats['running'] = len(self._running)
+            stats['visible_pending'] = sum(1 for p, _, _ in self._pending.values() if p == PRIORITY_VISIBLE)
+        finished = stats['completed'] + stats['skipped'] + stats['errors']
+        stats['avg_render_ms'] = round(stats.pop('render_time') * 1000 / finished, 1) if finished else 0.0
+        stats['workers'] = self.workers
+        stats['mode'] = 'processes' if self._processes_enabled() else 'threads'
+        return stats
+
+    def _processes_enabled(self):
+        if self._use_processes is None:
+            return config.getboolean("SETTINGS", "THUMBNAIL_USE_PROCESSES", fallback=True)
+        return self._use_processes
+
+    def _ensure_started(self):
+        """Create the pool and dispatcher thread (caller holds the lock)."""
+        if self._dispatcher is not None and self._dispatcher.is_alive():
+            return
+        if self._executor is None:
+            self._executor = self._create_executor()
+        self._dispatcher = threading.Thread(target=self._dispatch, name="ThumbnailDispatcher", daemon=True)
+        self._dispatcher.start()
+        app_logger.info(f"Thumbnail pipeline started ({self.workers} {'processes' if self._processes_enabled() else 'threads'})")
+
+    def _create_executor(self):
+        if self._processes_enabled():
+            # spawn: the web process is multi-threaded, fork could copy held locks
+            return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="Thumbnail")
+
+    def _next_job(self):
+        """Pop the best queued job once a worker is free (caller holds the lock)."""
+        while not self._stopping:
+            if self._heap and len(self._running) < self.workers:
+                priority, seq, path = heapq.heappop(self._heap)
+                entry = self._pending.get(path)
+                if entry is None or entry[1] != seq:
+                    continue  # Superseded by a promotion
+                del self._pending[path]
+                self._running.add(path)
+                return path, entry[2]
+            self._cond.wait()
+        return None
+
+    def _dispatch(self):
+        while True:
+            with self._cond:
+                job = self._next_job()
+            if job is None:
+                return
+            file_path, cache_path = job
+            started = time.perf_counter()
+            try:
+                future = self._executor.submit(render_thumbnail, file_path, cache_path)
+            except BrokenExecutor as e:
+                # A worker died (e.g. OOM on a huge page); replace the pool and carry on
+                app_logger.error(f"Thumbnail pool broken, restarting it: {e}")
+                with self._cond:
+                    self._executor = self._create_executor()
+                self._finish(file_path, 'error', started)
+                continue
+            except RuntimeError:
+                # Pool shut down by stop()
+                self._finish(file_path, 'error', started)
+                return
+            future.add_done_callback(
+                lambda f, path=file_path, start=started: self._on_done(path, f, start)
+            )
+
+    def _on_done(self, file_path, future, started):
+        if future.cancelled():
+            with self._cond:
+                self._running.discard(file_path)
+                self._cond.notify()
+            return
+        try:
+            status = future.result()
+            if status == 'completed':
+                app_logger.debug(f"Thumbnail generated for {file_path}")
+        except Exception as e:
+            app_logger.error(f"Error generating thumbnail for {file_path}: {e}")
+            status = 'error'
+        self._finish(file_path, status, started)
+
+    def _finish(self, file_path, status, started):
+        queue_thumbnail_status(file_path, status)
+        with self._cond:
+            self._running.discard(file_path)
+            self.stats['errors' if status == 'error' else status] += 1
+            self.stats['render_time'] += time.perf_counter() - started
+            self._cond.notify()
+
+
+# Process-wide pipeline used by the library scan and /api/thumbnail
+thumbnail_pipeline = ThumbnailPipeline()
+
+
+def queue_thumbnail(file_path, cache_path=None, priority=PRIORITY_BACKGROUND):
+    """Queue (or promote) a thumbnail on the shared pipeline."""
+    return thumbnail_pipeline.submit(file_path, cache_path or get_thumbnail_cache_path(file_path), priority)
+
+
+def is_thumbnail_queued(file_path):
+    return thumbnail_pipeline.is_queued(file_path)
+
+
+def stop_thumbnail_pipeline():
+    thumbnail_pipeline.stop(wait=False)
+
+
+def get_thumbnail_pipeline_stats():
+    """Queue depth, throughput and outcome counters of the shared pipeline."""
+    return thumbnail_pipeline.get_stats()
@@ -0,0 +1,166 @@
+"""
+wanted_cache.py - Incremental refresh of the wanted issues cache
+
+The wanted page reads the wanted_issues table. It used to be emptied and
+rebuilt one series after another after every sync, so with hundreds of
+mapped series the page was empty or stale for minutes. Now:
+1. Changes mark the affected series dirty (the wanted_dirty_series table):
+   Metron syncs, comic files added or removed under a series' mapped_path
+   (file_watcher, incoming wanted issues) and manual status edits. Marking
+   queues an incremental 'wanted_refresh' job
+2. An incremental refresh recomputes only the dirty series; a full refresh
+   (nightly, or the Refresh button) recomputes every mapped series and drops
+   the rows of series that are no longer mapped
+3. Series are recomputed on WANTED_REFRESH_WORKERS threads through
+   job_runner, so progress shows on the job
+4. Each series' rows are replaced in one transaction; the cache is never
+   cleared as a whole, so readers see the old list until the new one lands
+5. A series marked again while it was being recomputed stays dirty and is
+   picked up by the same run
+"""
+
+import os
+
+from app_logging import app_logger
+from config import config
+from database import (
+    clear_wanted_dirty_series,
+    get_all_mapped_series,
+    get_issues_for_series,
+    get_manual_status_for_series,
+    get_series_ids_for_paths,
+    get_wanted_dirty_series,
+    mark_wanted_series_dirty,
+    prune_wanted_cache,
+    save_wanted_issues_for_series,
+)
+
+DEFAULT_WORKERS = 4
+
+# How often a run re-reads the dirty set for series marked while it ran
+_MAX_DIRTY_ROUNDS = 5
+
+
+def get_wanted_refresh_workers():
+    return max(1, config.getint("SETTINGS", "WANTED_REFRESH_WORKERS", fallback=DEFAULT_WORKERS))
+
+
+def schedule_wanted_refresh():
+    """Queue an incremental refresh job (one at a time)."""
+    from job_queue import enqueue_job
+
+    try:
+        enqueue_job('wanted_refresh', {'full': False}, concurrency_key='wanted_refresh:dirty')
+    except Exception as e:
+        app_logger.error(f"Failed to queue wanted refresh: {e}")
+
+
+def mark_series_dirty(series_ids, reason, schedule=True):
+    """
+    Mark series for recomputation and (by default) queue an incremental refresh.
+
+    Returns:
+        Number of series marked
+    """
+    marked = mark_wanted_series_dirty(series_ids, reason)
+    if marked and schedule:
+        schedule_wanted_refresh()
+    return marked
+
+
+def mark_paths_dirty(paths, reason='files'):
+    """Mark the series whose mapped folders contain any of paths (one query per burst)."""
+    series_ids = get_series_ids_for_paths(paths) if paths else set()
+    return mark_series_dirty(series_ids, reason) if series_ids else 0
+
+
+def compute_wanted_for_series(series):
+    """
+    Wanted issues of one mapped series: issues not found in its folder and
+    not manually marked owned/skipped.
+
+    Returns:
+        List of issue dicts, or None when the series has no folder or no
+        synced issues (its cached rows are dropped)
+    """
+    from helpers.collection import match_issues_to_collection
+    from models.issue import IssueObj, SeriesObj
+
+    series_id = series['id']
+    mapped_path = series.get('mapped_path')
+    if not mapped_path or not os.path.exists(mapped_path):
+        return None
+
+    issues = get_issues_for_series(series_id)
+    if not issues:
+        return None
+
+    issue_status = match_issues_to_collection(mapped_path, [IssueObj(i) for i in issues], SeriesObj(series))
+    manual_status = get_manual_status_for_series(series_id)
+
+    wanted_list = []
+    for issue in issues:
+        issue_num = str(issue.get('number', ''))
+        if not issue_status.get(issue_num, {}).get('found') and issue_num not in manual_status:
+            wanted_list.append(issue)
+    return wanted_list
+
+
+def refresh_series(series):
+    """Recompute one series and swap its cached rows. Returns the wanted count."""
+    wanted_list = compute_wanted_for_series(series) or []
+    save_wanted_issues_for_series(series['id'], series.get('name', ''), series.get('volume'), wanted_list)
+    return len(wanted_list)
+
+
+def _refresh_many(series_list):
+    from job_runner import run_jobs
+
+    counts = run_jobs(
+        refresh_series, series_list, name='wanted_refresh',
+        key=lambda series: str(series['id']), label=lambda series: series.get('name') or str(series['id']),
+        workers=get_wanted_refresh_workers(), use_processes=False, resume=False,
+    )
+    return sum(count or 0 for count in counts)
+
+
+def refresh_wanted_cache(full=True):
+    """
+    Refresh the wanted cache.
+
+    Args:
+        full: Recompute every mapped series; otherwise only dirty ones
+
+    Returns:
+        Dict with the number of series refreshed and wanted issues found
+    """
+    mapped = {series['id']: series for series in get_all_mapped_series()}
+    refreshed = 0
+    wanted = 0
+
+    if full:
+        marks = get_wanted_dirty_series()
+        wanted += _refresh_many(list(mapped.values()))
+        refreshed += len(mapped)
+        # The full pass covered everything marked before it started
+        clear_wanted_dirty_series(marks)
+        pruned = prune_wanted_cache(mapped)
+        if pruned:
+            app_logger.info(f"Removed {pruned} wanted issues of series no longer mapped")
+
+    for _ in range(_MAX_DIRTY_ROUNDS):
+        marks = get_wanted_dirty_series()
+        if not marks:
+            break
+        mapped = {series['id']: series for series in get_all_mapped_series()}
+        series_list = [mapped[series_id] for series_id in marks if series_id in mapped]
+        if series_list:
+            wanted += _refresh_many(series_list)
+            refreshed += len(series_list)
+        for series_id in marks:
+            if series_id not in mapped:
+                # Unmapped since it was marked
+                save_wanted_issues_for_series(series_id, '', None, [])
+        clear_wanted_dirty_series(marks)
+
+    return {'series': refreshed, 'wanted': wanted}